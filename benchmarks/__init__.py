@@ -0,0 +1,20 @@
+"""Suite de rendimiento de los caminos críticos de la calculadora.
+
+Cada caso se mide a varias escalas (1, 10³ y 10⁶ evaluaciones cuando aplica) y
+los resultados se guardan como líneas base JSON que luego pueden compararse:
+
+    python -m benchmarks ejecutar linea_base.json
+    python -m benchmarks ejecutar actual.json -k cilindro --tamanos 1 1000
+    python -m benchmarks comparar linea_base.json actual.json --umbral 0.15
+    python -m benchmarks arranque pages/flujo_interno_cilindro.py
+
+`comparar` termina con código 1 si algún caso es más lento que la línea base
+por encima del umbral relativo. `arranque` muestra el tiempo de importación
+por módulo en la primera ejecución de main.py y de cada página; los casos
+`arranque.*` siguen ese mismo tiempo hasta quedar interactivo. `precision`
+compara el error de interpolación lineal y PCHIP de cada tabla de propiedades
+(el costo de ambos se mide en los casos `propiedades.interpolar*`).
+
+Las líneas base dependen de la máquina: se comparan corridas hechas en el
+mismo equipo.
+"""
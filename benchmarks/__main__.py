@@ -0,0 +1,139 @@
+import argparse
+import subprocess
+import sys
+
+from . import arranque, casos, precision  # noqa: F401  (casos registra los casos)
+from .nucleo import (AUSENTE, REGRESION, REPETICIONES, TIEMPO_MINIMO, UMBRAL, cargar, comparar,
+                     ejecutar, formatear_tiempo, guardar, seleccionar)
+
+
+def imprimir_comparacion(filas, umbral):
+    print(f"{'caso':<50} {'base':>10} {'actual':>10} {'razón':>7}  estado")
+    for f in filas:
+        razon = "-" if f.razon is None else f"{f.razon:.2f}×"
+        print(f"{f.clave:<50} {formatear_tiempo(f.base):>10} {formatear_tiempo(f.actual):>10}"
+              f" {razon:>7}  {f.estado}")
+    regresiones = [f for f in filas if f.estado == REGRESION]
+    ausentes = [f for f in filas if f.estado == AUSENTE]
+    if regresiones:
+        print(f"\n{len(regresiones)} regresiones por encima del {umbral:.0%}")
+    if ausentes:
+        print(f"{len(ausentes)} casos de la línea base no se midieron")
+    return 1 if regresiones else 0
+
+
+def imprimir_arranque(medicion, top):
+    directas = [i for i in medicion.importaciones if i.nivel == 0]
+    total = sum(i.acumulado_s for i in directas)
+    print(f"== {medicion.script}: primera ejecución {formatear_tiempo(medicion.primera_ejecucion_s)}, "
+          f"importaciones {formatear_tiempo(total)} ({len(medicion.importaciones)} módulos)")
+    for paquete, segundos in arranque.resumen_por_paquete(medicion.importaciones)[:top]:
+        print(f"   {paquete:<30} {formatear_tiempo(segundos):>10}")
+    if directas:
+        print("   importaciones directas más costosas:")
+        for i in sorted(directas, key=lambda i: i.acumulado_s, reverse=True)[:top]:
+            print(f"   {i.modulo:<50} {formatear_tiempo(i.acumulado_s):>10}")
+
+
+def imprimir_precision(filas):
+    print(f"{'tabla':<32} {'prop.':<5} {'n':>3} {'lineal medio':>13} {'lineal máx':>11}"
+          f" {'pchip medio':>12} {'pchip máx':>10}")
+    for f in filas:
+        tabla = f"{f.fluido} {f.fase}".strip()
+        print(f"{tabla:<32} {f.propiedad:<5} {f.puntos:>3} {f.lineal_medio:>13.3%} {f.lineal_max:>11.3%}"
+              f" {f.pchip_medio:>12.3%} {f.pchip_max:>10.3%}")
+    mejores = sum(f.pchip_medio < f.lineal_medio for f in filas)
+    print(f"\nPCHIP reduce el error medio en {mejores} de {len(filas)} columnas")
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Rendimiento de los caminos críticos de la calculadora")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    sub = subparsers.add_parser("ejecutar", help="Mide los casos y guarda una línea base JSON")
+    sub.add_argument("salida", help="Archivo JSON de resultados")
+    sub.add_argument("-k", dest="patrones", nargs="+", metavar="PATRON",
+                     help="Solo los casos cuyo nombre contiene el patrón (admite comodines)")
+    sub.add_argument("--tamanos", type=int, nargs="+", help="Solo estos tamaños (p. ej. 1 1000)")
+    sub.add_argument("--repeticiones", type=int, default=REPETICIONES)
+    sub.add_argument("--minimo", type=float, default=TIEMPO_MINIMO,
+                     help="Segundos mínimos por repetición (agrupa llamadas rápidas)")
+    sub.add_argument("--comparar-con", metavar="BASE",
+                     help="Compara al terminar contra esta línea base")
+    sub.add_argument("--umbral", type=float, default=UMBRAL)
+
+    sub = subparsers.add_parser("comparar", help="Compara dos corridas y marca regresiones")
+    sub.add_argument("base", help="Línea base JSON")
+    sub.add_argument("actual", help="Corrida JSON a evaluar")
+    sub.add_argument("--umbral", type=float, default=UMBRAL,
+                     help="Aumento relativo de la mediana tolerado (0.10 = 10 %%)")
+
+    sub = subparsers.add_parser("arranque",
+                                help="Perfil de importaciones de la primera ejecución de cada script")
+    sub.add_argument("scripts", nargs="*", default=list(arranque.SCRIPTS),
+                     help="Scripts relativos a la raíz (por defecto main.py y todas las páginas)")
+    sub.add_argument("--top", type=int, default=10, help="Paquetes y módulos a mostrar")
+
+    subparsers.add_parser("listar", help="Muestra los casos registrados y sus tamaños")
+    subparsers.add_parser("precision",
+                          help="Error de interpolación lineal frente a PCHIP dejando una fila fuera")
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+
+    if args.comando == "listar":
+        for c in seleccionar():
+            print(f"{c.nombre:<50} {', '.join(str(n) for n in c.tamanos)}")
+        return 0
+
+    if args.comando == "precision":
+        imprimir_precision(precision.comparar_precision())
+        return 0
+
+    if args.comando == "arranque":
+        for script in args.scripts:
+            try:
+                imprimir_arranque(arranque.medir_arranque(script, importtime=True), args.top)
+            except (OSError, RuntimeError, subprocess.SubprocessError) as e:
+                print(f"Error: {e}", file=sys.stderr)
+                return 2
+        return 0
+
+    if args.comando == "comparar":
+        try:
+            base, actual = cargar(args.base), cargar(args.actual)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 2
+        filas = comparar(base["resultados"], actual["resultados"], args.umbral)
+        return imprimir_comparacion(filas, args.umbral)
+
+    seleccion = seleccionar(args.patrones)
+    if not seleccion:
+        print("Error: ningún caso coincide con los patrones", file=sys.stderr)
+        return 2
+    base = None
+    if args.comparar_con:
+        try:
+            base = cargar(args.comparar_con)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 2
+    resultados = ejecutar(seleccion, args.tamanos, args.repeticiones, args.minimo)
+    guardar(args.salida, resultados, {"repeticiones": args.repeticiones, "minimo_s": args.minimo})
+    print(f"{len(resultados)} mediciones -> {args.salida}")
+    if base is None:
+        return 0
+    print()
+    # Solo se comparan los casos medidos en esta corrida
+    filas = comparar({k: v for k, v in base["resultados"].items() if k in resultados},
+                     resultados, args.umbral)
+    return imprimir_comparacion(filas, args.umbral)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Arranque en frío de main.py y de cada página.
+
+Cada medición corre en un intérprete nuevo, como un trabajador recién creado:
+se importa Streamlit y se calienta su motor con un script vacío, y luego se
+cronometra la primera ejecución del script hasta que queda interactivo. Con
+`-X importtime` se obtiene además el costo de cada módulo importado por él.
+"""
+import re
+import subprocess
+import sys
+from collections import namedtuple
+
+from .nucleo import RAIZ, caso
+
+SCRIPTS = ("main.py",
+           "pages/flujo_paralelo_placa_plana.py",
+           "pages/flujo_externo_cilindro.py",
+           "pages/flujo_interno_cilindro.py",
+           "pages/conduccion_unidimensional.py")
+
+MARCA = "--- primera ejecucion ---"
+
+_PROGRAMA = f"""
+import sys, time
+from streamlit.testing.v1 import AppTest
+AppTest.from_string("import streamlit as st\\nst.markdown('-')").run()
+app = AppTest.from_file(sys.argv[1], default_timeout=120)
+sys.stderr.write({MARCA!r} + "\\n")
+sys.stderr.flush()
+inicio = time.perf_counter()
+app.run()
+print(time.perf_counter() - inicio)
+"""
+
+PATRON_IMPORTTIME = re.compile(r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|( *)(\S+)\s*$")
+
+ImportacionModulo = namedtuple("ImportacionModulo", "modulo propio_s acumulado_s nivel")
+Arranque = namedtuple("Arranque", "script primera_ejecucion_s importaciones")
+
+
+def medir_arranque(script, importtime=False):
+    """Primera ejecución de `script` en un proceso nuevo y, opcionalmente, sus importaciones"""
+    comando = [sys.executable, *(["-X", "importtime"] if importtime else []),
+               "-c", _PROGRAMA, str(RAIZ / script)]
+    proceso = subprocess.run(comando, cwd=RAIZ, capture_output=True, text=True, timeout=600)
+    if proceso.returncode != 0:
+        raise RuntimeError(f"{script}: {proceso.stderr.strip().splitlines()[-1:]}")
+    importaciones = []
+    if importtime:
+        _, _, posteriores = proceso.stderr.partition(MARCA)
+        for linea in posteriores.splitlines():
+            m = PATRON_IMPORTTIME.match(linea)
+            if m:
+                propio, acumulado, sangria, modulo = m.groups()
+                importaciones.append(ImportacionModulo(
+                    modulo, int(propio) * 1e-6, int(acumulado) * 1e-6, (len(sangria) - 1) // 2))
+    return Arranque(script, float(proceso.stdout.strip().splitlines()[-1]), importaciones)
+
+
+def paquete_raiz(modulo):
+    return modulo.split(".", 1)[0]
+
+
+def resumen_por_paquete(importaciones):
+    """Tiempo propio de importación agregado por paquete de primer nivel, de mayor a menor"""
+    totales = {}
+    for imp in importaciones:
+        raiz = paquete_raiz(imp.modulo)
+        totales[raiz] = totales.get(raiz, 0.0) + imp.propio_s
+    return sorted(totales.items(), key=lambda par: par[1], reverse=True)
+
+
+def _primera_ejecucion(script):
+    return lambda: medir_arranque(script).primera_ejecucion_s
+
+
+for _script in SCRIPTS:
+    _nombre = _script.rsplit("/", 1)[-1][:-3]
+    caso(f"arranque.{_nombre}", (1,), repeticiones=3, cronometro_propio=True)(
+        lambda n, script=_script: _primera_ejecucion(script))
@@ -0,0 +1,428 @@
+"""Casos de rendimiento: motores de `calculos` y reruns completos de las páginas.
+
+Los tamaños indican evaluaciones por llamada (temperaturas, casos, paredes o
+puntos de la curva). Los datos se generan con semilla fija para que dos
+corridas midan exactamente el mismo trabajo.
+"""
+import itertools
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from calculos import (banco_tubos, cache_resultados, cilindro_externo, conduccion, continuo, flujo_interno,
+                      incertidumbre, inverso, lote, placa_plana, propiedades, red_termica, reportes, sensibilidad,
+                      transitorio, unidades)
+from calculos.grafo import MemoriaGrafo
+from .nucleo import RAIZ, caso
+
+SEMILLA = 20240611
+PAGINAS = RAIZ / "pages"
+
+# Las consultas escalares en bucle de Python no llegan a 10⁶ en tiempo razonable
+TAMANOS_ESCALARES = (1, 1_000)
+TAMANOS_PAGINA = (1,)
+REPETICIONES_PAGINA = 3
+
+
+def _rng():
+    return np.random.default_rng(SEMILLA)
+
+
+# --- Propiedades ---
+@caso("propiedades.interpolar")
+def _interpolar(n):
+    T = _rng().uniform(5, 95, n)
+    return lambda: propiedades.interpolar("agua saturada", T, "líquido")
+
+
+@caso("propiedades.interpolar_pchip")
+def _interpolar_pchip(n):
+    T = _rng().uniform(5, 95, n)
+    return lambda: propiedades.interpolar("agua saturada", T, "líquido", metodo=propiedades.PCHIP)
+
+
+@caso("propiedades.interpolar_casos")
+def _interpolar_casos(n):
+    rng = _rng()
+    fluidos = rng.choice(["aire", "agua saturada", "metanol", "glicerina"], n)
+    fases = np.where(fluidos == "agua saturada", "líquido", "")
+    T = rng.uniform(5, 95, n)
+    return lambda: propiedades.interpolar_casos(fluidos, fases, T)
+
+
+@caso("propiedades.puntual_sin_cache", TAMANOS_ESCALARES)
+def _puntual_sin_cache(n):
+    T = _rng().uniform(5, 95, n).tolist()
+
+    def consultar():
+        for t in T:
+            propiedades.interpolar("aire", t)
+    return consultar
+
+
+@caso("propiedades.propiedades_en", TAMANOS_ESCALARES)
+def _propiedades_en(n):
+    # Tras el calentamiento todas las consultas son aciertos de la caché LRU
+    T = _rng().uniform(5, 95, n).tolist()
+
+    def consultar():
+        for t in T:
+            propiedades.propiedades_en("aire", t)
+    return consultar
+
+
+# --- Unidades ---
+@caso("unidades.a_si")
+def _a_si(n):
+    T = _rng().uniform(-40, 400, n)
+    return lambda: unidades.a_si(T, "temperatura", "°F")
+
+
+@caso("unidades.a_si_mixto")
+def _a_si_mixto(n):
+    # Una unidad por elemento, como una columna de velocidades de origen heterogéneo
+    rng = _rng()
+    V = rng.uniform(0.1, 100, n)
+    simbolos = rng.choice(unidades.unidades_de("velocidad"), n)
+    return lambda: unidades.a_si(V, "velocidad", simbolos)
+
+
+# --- Cilindro en flujo cruzado ---
+def _re_pr(n):
+    rng = _rng()
+    return 10 ** rng.uniform(0, 5.5, n), rng.uniform(0.7, 7, n)
+
+
+@caso("cilindro.nusselt_churchill")
+def _nusselt_churchill(n):
+    Re, Pr = _re_pr(n)
+    return lambda: cilindro_externo.nusselt_churchill(Re, Pr)
+
+
+@caso("cilindro.nusselt_compacto")
+def _nusselt_compacto(n):
+    Re, Pr = _re_pr(n)
+    return lambda: cilindro_externo.nusselt_compacto(Re, Pr)
+
+
+@caso("cilindro.calcular_cilindro_externo")
+def _calcular_cilindro(n):
+    rng = _rng()
+    T_f, T_s = rng.uniform(0, 40, n), rng.uniform(60, 100, n)
+    V, D = rng.uniform(0.5, 30, n), rng.uniform(0.005, 0.2, n)
+    return lambda: cilindro_externo.calcular_cilindro_externo(T_f, T_s, V, D, 1.0, "aire")
+
+
+@caso("banco.calcular_banco_tubos", TAMANOS_ESCALARES)
+def _banco_tubos(n):
+    # Bancos escalonados de 20 filas: el avance fila a fila recorre todos los casos a la vez
+    rng = _rng()
+    T_f, T_s, V = rng.uniform(10, 30, n), rng.uniform(60, 100, n), rng.uniform(1, 10, n)
+    return lambda: banco_tubos.calcular_banco_tubos(T_f, T_s, V, 0.0164, 0.0313, 0.0343, 20, 40, 1.0,
+                                                    "aire", disposicion=banco_tubos.ESCALONADO)
+
+
+@caso("banco.filas", (10, 100, 1000))
+def _banco_filas(n):
+    # Un solo banco de n filas × 40 tubos
+    return lambda: banco_tubos.calcular_banco_tubos(20.0, 80.0, 5.0, 0.0164, 0.0313, 0.0343, n, 40, 1.0,
+                                                    "aire", disposicion=banco_tubos.ALINEADO)
+
+
+# --- Placa plana ---
+@caso("placa.calcular_placa_plana")
+def _calcular_placa(n):
+    rng = _rng()
+    L, V = rng.uniform(0.1, 3, n), rng.uniform(0.5, 60, n)
+    T_s, T_inf = rng.uniform(60, 100, n), rng.uniform(0, 40, n)
+    return lambda: placa_plana.calcular_placa_plana(L, 1.0, V, T_s, T_inf, "aire")
+
+
+@caso("placa.perfil_h_local")
+def _perfil_h_local(n):
+    # Curva h_x(x) de la página: propiedades de aire a 50 °C, V = 6 m/s
+    p = propiedades.propiedades_en("aire", 50.0)
+    x = np.linspace(0.001, 0.5, n)
+    return lambda: placa_plana.perfil_h_local(x, 6.0, p.rho, p.mu, p.k, p.pr)
+
+
+def _entradas_placa():
+    return dict(fluido="aire", fase=None, T_s=40.0, T_inf=20.0, V=6.0, L=0.5, b=0.3, presion_kpa=None)
+
+
+@caso("placa.grafo_completo", TAMANOS_PAGINA)
+def _grafo_completo(n):
+    grafo = placa_plana.grafo_placa_plana()
+
+    def ejecutar():
+        calculo = grafo.ejecutar(MemoriaGrafo(), **_entradas_placa())
+        return calculo["q_mixto"], calculo["curva_hx"]
+    return ejecutar
+
+
+@caso("placa.grafo_cambio_ancho", TAMANOS_PAGINA)
+def _grafo_cambio_ancho(n):
+    # Rerun tras cambiar solo b: se recalculan A, q y el desglose mixto
+    grafo, memoria = placa_plana.grafo_placa_plana(), MemoriaGrafo()
+    anchos = itertools.cycle((0.3, 0.4))
+
+    def ejecutar():
+        calculo = grafo.ejecutar(memoria, **{**_entradas_placa(), "b": next(anchos)})
+        return calculo["q_mixto"], calculo["curva_hx"]
+    return ejecutar
+
+
+# --- Conducción ---
+def _paredes(n, capas=5):
+    rng = _rng()
+    e = rng.uniform(0.005, 0.1, (n, capas))
+    k = rng.uniform(0.04, 200, (n, capas))
+    # Una de cada cuatro paredes con una capa menos, para ejercitar el relleno
+    e[::4, -1] = np.nan
+    return e, k
+
+
+@caso("conduccion.calcular_conduccion")
+def _calcular_conduccion(n):
+    e, k = _paredes(n)
+    return lambda: conduccion.calcular_conduccion(conduccion.PLANA, 100.0, 20.0, e, k, h_in=50, h_out=10)
+
+
+@caso("conduccion.geometrias_mixtas")
+def _geometrias_mixtas(n):
+    e, k = _paredes(n)
+    codigos = np.arange(n) % len(conduccion.GEOMETRIAS)
+    return lambda: conduccion.calcular_conduccion(codigos, 100.0, 20.0, e, k, r_i=0.05,
+                                                  h_in=50, h_out=10)
+
+
+@caso("transitorio.simular", TAMANOS_ESCALARES)
+def _simular(n):
+    # n paredes de 3 capas, 50 nodos y 50 pasos de Crank–Nicolson
+    e, k = _paredes(n, capas=3)
+    malla = transitorio.discretizar(conduccion.PLANA, e, k, 2000.0, 900.0, n_nodos=50)
+
+    def integrar():
+        for _ in transitorio.simular(malla, 20.0, 10.0, 50, h_in=np.inf, T_in=100.0,
+                                     h_out=10.0, T_out=20.0, cada=50):
+            pass
+    return integrar
+
+
+def _red_malla(n):
+    # Malla cuadrada de ~n nodos libres con resistencias aleatorias; frontera a 100 °C a la izquierda y 0 °C
+    # a la derecha
+    lado = max(int(round(np.sqrt(n))), 2)
+    indices = np.arange(lado * lado).reshape(lado, lado)
+    rng = _rng()
+    red = red_termica.RedTermica()
+    for j in range(lado):
+        red.nodo(f"izq{j}", T=100.0)
+        red.nodo(f"der{j}", T=0.0)
+    red.agregar(indices[:, :-1].ravel(), indices[:, 1:].ravel(), rng.uniform(0.5, 2.0, lado * (lado - 1)))
+    red.agregar(indices[:-1].ravel(), indices[1:].ravel(), rng.uniform(0.5, 2.0, lado * (lado - 1)))
+    red.agregar([f"izq{j}" for j in range(lado)], indices[:, 0], 0.1)
+    red.agregar(indices[:, -1], [f"der{j}" for j in range(lado)], 0.1)
+    return red
+
+
+@caso("red.factorizar", (1_000, 100_000))
+def _red_factorizar(n):
+    red = _red_malla(n)
+    origen, destino, R, _ = red.elementos()
+    frontera = red.frontera
+    # Las fronteras se dieron de alta alternando izquierda (100 °C) y derecha (0 °C)
+    T_frontera = np.where(np.arange(frontera.sum()) % 2 == 0, 100.0, 0.0)
+    return lambda: red_termica.FactorRed(len(red.nombres), origen, destino, 1 / R, frontera).solucion(
+        T_frontera)
+
+
+@caso("red.resolver_escenarios", (1_000, 100_000))
+def _red_escenarios(n):
+    # 16 escenarios de temperatura de frontera con la factorización ya hecha
+    red = _red_malla(n)
+    red.factor()
+    T_izq = np.linspace(50.0, 150.0, 16)
+    return lambda: red.resolver({"izq0": T_izq, "izq1": T_izq})
+
+
+# --- Flujo interno ---
+def _tubos(n):
+    rng = _rng()
+    return (rng.uniform(10, 30, n), rng.uniform(60, 100, n),
+            rng.uniform(0.05, 2, n), rng.uniform(0.01, 0.05, n), rng.uniform(1, 10, n))
+
+
+@caso("flujo_interno.calcular_flujo_interno")
+def _calcular_flujo_interno(n):
+    T_e, T_p, V, D, L = _tubos(n)
+    T_s = (T_e + T_p) / 2
+    return lambda: flujo_interno.calcular_flujo_interno(T_e, T_s, T_p, V, D, L, "agua saturada", "líquido")
+
+
+@caso("flujo_interno.resolver_temperatura_salida")
+def _resolver_salida(n):
+    T_e, T_p, V, D, L = _tubos(n)
+    return lambda: flujo_interno.resolver_temperatura_salida(T_e, T_p, V, D, L, "agua saturada", "líquido")
+
+
+@caso("cache.resolver_temperatura_salida")
+def _cache_resolver_salida(n):
+    # Acierto en la caché persistente (clave + lectura del SQLite) frente al caso anterior sin caché
+    T_e, T_p, V, D, L = _tubos(n)
+    cache = cache_resultados.CacheResultados(Path(tempfile.mkdtemp()) / "resultados.sqlite")
+    argumentos = (cache_resultados.BALANCE_TUBO, T_e, T_p, V, D, L, "agua saturada", "líquido")
+    cache_resultados.calcular(*argumentos, cache=cache)
+    return lambda: cache_resultados.calcular(*argumentos, cache=cache)
+
+
+# --- Diseño inverso ---
+@caso("inverso.tubo_velocidad", TAMANOS_ESCALARES)
+def _inverso_tubo(n):
+    # Objetivos del directo con velocidades conocidas: todos alcanzables, algunos en el salto de Re = 2300
+    T_e, T_p, V, D, L = _tubos(n)
+    T_s = (T_e + T_p) / 2
+    q = flujo_interno.calcular_flujo_interno(T_e, T_s, T_p, V, D, L, "agua saturada", "líquido")["q"]
+    return lambda: inverso.inverso_tubo(q, "V", T_e, T_s, T_p, None, D, L, "agua saturada", "líquido")
+
+
+@caso("inverso.placa_longitud", TAMANOS_ESCALARES)
+def _inverso_placa(n):
+    rng = _rng()
+    return lambda: inverso.inverso_placa(rng.uniform(50, 5000, n), "L", None, 0.5, rng.uniform(1, 30, n),
+                                         80.0, 20.0, "aire")
+
+
+# --- Incertidumbre ---
+@caso("incertidumbre.cilindro", (100_000, 1_000_000))
+def _incertidumbre_cilindro(n):
+    # Monte Carlo con cinco entradas inciertas y error de tabla en cuatro propiedades
+    Entrada = incertidumbre.Entrada
+    entradas = {"T_fluido": Entrada(25.0, 0.5), "T_superficie": Entrada(80.0, 0.5),
+                "V": Entrada(5.0, 0.02, relativa=True), "D": Entrada(0.02, 0.01, relativa=True),
+                "L": Entrada(1.0, 0.01, relativa=True), **incertidumbre.errores_propiedades(0.02)}
+    return lambda: incertidumbre.propagar(incertidumbre.CILINDRO, entradas, n, fluido="aire")
+
+
+@caso("incertidumbre.conduccion", (100_000, 1_000_000))
+def _incertidumbre_conduccion(n):
+    Entrada = incertidumbre.Entrada
+    entradas = {"T1": Entrada(100.0, 0.5), "T2": Entrada(20.0, 0.5), "h_in": Entrada(50.0, 0.1, relativa=True),
+                "h_out": Entrada(10.0, 0.1, relativa=True),
+                **{f"e{i}": Entrada(0.02, 0.02, relativa=True) for i in (1, 2, 3)},
+                **{f"k{i}": Entrada(k, 0.05, relativa=True) for i, k in ((1, 0.7), (2, 0.04), (3, 45.0))}}
+    return lambda: incertidumbre.propagar(incertidumbre.CONDUCCION, entradas, n, geometria=conduccion.PLANA,
+                                          capas=3)
+
+
+@caso("sensibilidad.sobol_cilindro", (1_024, 16_384))
+def _sobol_cilindro(n):
+    # n filas de A y B con 3 factores y 4 errores de tabla: n·9 evaluaciones, en el propio proceso
+    Entrada, UNIFORME = incertidumbre.Entrada, incertidumbre.UNIFORME
+    factores = {"V": Entrada(5.0, 4.0, UNIFORME), "D": Entrada(0.03, 0.02, UNIFORME), "T_fluido": 25.0,
+                "T_superficie": Entrada(80.0, 20.0, UNIFORME), "L": 1.0,
+                **incertidumbre.errores_propiedades(0.05, UNIFORME)}
+    return lambda: sensibilidad.sobol(incertidumbre.CILINDRO, factores, n, trabajadores=1, fluido="aire")
+
+
+# --- Lotes ---
+def _df_placa(n):
+    rng = _rng()
+    return pd.DataFrame({
+        "L [cm]": rng.uniform(10, 300, n), "b [m]": 1.0, "V [km/h]": rng.uniform(2, 200, n),
+        "T_s [°F]": rng.uniform(140, 212, n), "T_inf [°C]": rng.uniform(0, 40, n),
+        "fluido": rng.choice(["aire", "metanol"], n),
+    })
+
+
+@caso("lote.ejecutar_placa")
+def _lote_placa(n):
+    df = _df_placa(n)
+    return lambda: lote.ejecutar_placa(df, None)
+
+
+class _Sumidero:
+    def write(self, datos):
+        return len(datos)
+
+
+@caso("lote.reportes_zip_placa", TAMANOS_ESCALARES)
+def _reportes_zip_placa(n):
+    # Un TXT comprimido por caso, escrito en flujo sobre un destino que descarta los bytes
+    df = _df_placa(n)
+    completo = pd.concat([df, lote.ejecutar_placa(df, None)], axis=1)
+    args = lote.crear_parser().parse_args(["placa", "entrada.csv", "salida.csv"])
+    return lambda: reportes.escribir_zip(_Sumidero(), lote.reportes_de_lote("placa", [completo], args))
+
+
+@caso("continuo.placa_parquet", (1_000, 100_000))
+def _continuo_placa(n):
+    # Lectura en su hilo, cálculo y una parte Parquet confirmada por fragmento de n/10 casos
+    directorio = Path(tempfile.mkdtemp())
+    _df_placa(n).to_parquet(directorio / "casos.parquet")
+    args = continuo.crear_parser().parse_args(["placa", "casos.parquet", "resultados.parquet"])
+    return lambda: continuo.procesar("placa", directorio / "casos.parquet", directorio / "resultados.parquet",
+                                     args, tamano=max(n // 10, 1))
+
+
+@caso("continuo.placa_csv_fase_vacia", (1_000, 100_000))
+def _continuo_fase_vacia(n):
+    # Los primeros fragmentos traen `fase` vacía (aire) y los siguientes texto (agua líquida):
+    # todas las partes deben compartir el esquema, si no la lectura final falla
+    directorio = Path(tempfile.mkdtemp())
+    df = _df_placa(n).assign(fluido="aire", fase="")
+    df.loc[n // 2:, ["fluido", "fase"]] = ["agua saturada", "líquido"]
+    df.to_csv(directorio / "casos.csv", index=False)
+    args = continuo.crear_parser().parse_args(["placa", "casos.csv", "resultados.parquet"])
+
+    def evaluar():
+        continuo.procesar("placa", directorio / "casos.csv", directorio / "resultados.parquet", args,
+                          tamano=max(n // 10, 1))
+        return pd.read_parquet(directorio / "resultados.parquet")
+    return evaluar
+
+
+# --- Servicio HTTP ---
+_servicio = None
+
+
+@caso("servicio.placa", TAMANOS_ESCALARES)
+def _servicio_placa(n):
+    # Ida y vuelta por localhost de una solicitud con n casos en columnas, con conexión persistente
+    global _servicio
+    import http.client
+
+    from calculos import servicio
+    if _servicio is None:
+        _servicio = servicio.ServicioEnSegundoPlano(trabajadores=1).__enter__()
+    columnas = {c: v.tolist() for c, v in _df_placa(n).items()}
+    conexion = http.client.HTTPConnection(_servicio.host, _servicio.puerto)
+    return lambda: servicio.solicitar(_servicio.url, "/placa", {"casos": columnas}, conexion)
+
+
+# --- Reruns completos de las páginas (los reportes TXT se generan al descargarlos) ---
+def _rerun_pagina(archivo, boton=None):
+    from streamlit.testing.v1 import AppTest
+
+    def preparar(n):
+        # Las páginas leen sus CSV con rutas relativas a la raíz del repositorio
+        os.chdir(RAIZ)
+        app = AppTest.from_file(str(PAGINAS / archivo), default_timeout=120)
+        app.run()
+        if boton is None:
+            return lambda: app.run()
+        pulsar = lambda: next(b for b in app.button if b.label.startswith(boton)).click().run()
+        pulsar()
+        return pulsar
+    return preparar
+
+
+for _archivo, _boton in (("flujo_paralelo_placa_plana.py", None),
+                         ("flujo_externo_cilindro.py", None),
+                         ("flujo_interno_cilindro.py", None),
+                         ("conduccion_unidimensional.py", "**Calcular")):
+    caso(f"pagina.rerun.{_archivo[:-3]}", TAMANOS_PAGINA, REPETICIONES_PAGINA)(
+        _rerun_pagina(_archivo, _boton))
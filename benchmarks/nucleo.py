@@ -0,0 +1,185 @@
+"""Registro de casos, medición con temporizador y líneas base JSON."""
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+TAMANOS = (1, 1_000, 1_000_000)
+REPETICIONES = 5
+TIEMPO_MINIMO = 0.05     # s por repetición: se agrupan llamadas rápidas hasta alcanzarlo
+UMBRAL = 0.10            # regresión si la mediana crece más de un 10 %
+VERSION_FORMATO = 1
+
+Caso = namedtuple("Caso", "nombre tamanos preparar repeticiones cronometro_propio")
+
+CASOS = {}
+
+
+def caso(nombre, tamanos=TAMANOS, repeticiones=None, cronometro_propio=False):
+    """Registra `preparar(n) -> funcion` como caso de rendimiento.
+
+    `preparar` construye los datos fuera del tiempo medido y devuelve la
+    función sin argumentos que se cronometra (una llamada = n evaluaciones).
+    Con `cronometro_propio` la función devuelve ella misma los segundos
+    medidos (p. ej. dentro de un subproceso) y se llama una vez por repetición.
+    """
+    def registrar(preparar):
+        if nombre in CASOS:
+            raise ValueError(f"Caso de rendimiento duplicado: {nombre}")
+        CASOS[nombre] = Caso(nombre, tuple(tamanos), preparar, repeticiones, cronometro_propio)
+        return preparar
+    return registrar
+
+
+def clave(nombre, tamano):
+    return f"{nombre}[{tamano}]"
+
+
+def medir(funcion, repeticiones=REPETICIONES, minimo=TIEMPO_MINIMO):
+    """Tiempo por llamada (s) de `funcion` en cada repetición, estilo timeit.autorange"""
+    funcion()  # calentamiento: cachés, importaciones perezosas, compilación de regex
+    bucles = 1
+    while True:
+        inicio = time.perf_counter()
+        for _ in range(bucles):
+            funcion()
+        duracion = time.perf_counter() - inicio
+        if duracion >= minimo:
+            break
+        bucles *= 2 if duracion == 0 else max(2, min(10, int(minimo / duracion) + 1))
+
+    tiempos = [duracion / bucles]
+    for _ in range(repeticiones - 1):
+        inicio = time.perf_counter()
+        for _ in range(bucles):
+            funcion()
+        tiempos.append((time.perf_counter() - inicio) / bucles)
+    return tiempos, bucles
+
+
+def seleccionar(patrones=None):
+    """Casos cuyo nombre coincide con algún patrón (subcadena o comodín)"""
+    if not patrones:
+        return list(CASOS.values())
+    return [c for c in CASOS.values()
+            if any(p in c.nombre or fnmatch.fnmatch(c.nombre, p) for p in patrones)]
+
+
+def ejecutar(casos, tamanos=None, repeticiones=REPETICIONES, minimo=TIEMPO_MINIMO, informar=print):
+    """Mide cada caso en sus tamaños (filtrados por `tamanos`) y devuelve los resultados"""
+    resultados = {}
+    for c in casos:
+        for n in c.tamanos:
+            if tamanos and n not in tamanos:
+                continue
+            funcion = c.preparar(n)
+            if c.cronometro_propio:
+                tiempos, bucles = [funcion() for _ in range(c.repeticiones or repeticiones)], 1
+            else:
+                tiempos, bucles = medir(funcion, c.repeticiones or repeticiones, minimo)
+            mediana = statistics.median(tiempos)
+            resultados[clave(c.nombre, n)] = {
+                "caso": c.nombre,
+                "tamano": n,
+                "bucles": bucles,
+                "repeticiones": len(tiempos),
+                "mediana_s": mediana,
+                "minimo_s": min(tiempos),
+                "maximo_s": max(tiempos),
+                "por_evaluacion_s": mediana / n,
+            }
+            if informar:
+                informar(f"{clave(c.nombre, n):<50} {formatear_tiempo(mediana):>10}"
+                         f"  ({formatear_tiempo(mediana / n)}/eval, {bucles}×{len(tiempos)})")
+    return resultados
+
+
+def _commit_actual():
+    try:
+        salida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return salida.stdout.strip() or None
+
+
+def entorno():
+    """Metadatos de la máquina y versiones para interpretar una línea base"""
+    return {
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _commit_actual(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "plataforma": platform.platform(),
+        "procesador": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def guardar(ruta, resultados, parametros=None):
+    datos = {
+        "version": VERSION_FORMATO,
+        "entorno": entorno(),
+        "parametros": parametros or {},
+        "resultados": resultados,
+    }
+    Path(ruta).write_text(json.dumps(datos, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def cargar(ruta):
+    datos = json.loads(Path(ruta).read_text(encoding="utf-8"))
+    if datos.get("version") != VERSION_FORMATO:
+        raise ValueError(f"{ruta}: formato de línea base no soportado ({datos.get('version')!r})")
+    return datos
+
+
+Comparacion = namedtuple("Comparacion", "clave base actual razon estado")
+
+REGRESION = "REGRESIÓN"
+MEJORA = "mejora"
+SIN_CAMBIO = "="
+NUEVO = "nuevo"
+AUSENTE = "ausente"
+
+
+def comparar(base, actual, umbral=UMBRAL):
+    """Compara medianas caso a caso; estado REGRESIÓN si actual > base·(1 + umbral)"""
+    filas = []
+    for k in sorted(base.keys() | actual.keys()):
+        if k not in actual:
+            filas.append(Comparacion(k, base[k]["mediana_s"], None, None, AUSENTE))
+            continue
+        if k not in base:
+            filas.append(Comparacion(k, None, actual[k]["mediana_s"], None, NUEVO))
+            continue
+        t_base, t_actual = base[k]["mediana_s"], actual[k]["mediana_s"]
+        razon = t_actual / t_base
+        if razon > 1 + umbral:
+            estado = REGRESION
+        elif razon < 1 / (1 + umbral):
+            estado = MEJORA
+        else:
+            estado = SIN_CAMBIO
+        filas.append(Comparacion(k, t_base, t_actual, razon, estado))
+    return filas
+
+
+def formatear_tiempo(segundos):
+    if segundos is None:
+        return "-"
+    for escala, unidad in ((1, "s"), (1e-3, "ms"), (1e-6, "µs")):
+        if segundos >= escala:
+            return f"{segundos / escala:.3g} {unidad}"
+    return f"{segundos / 1e-9:.3g} ns"
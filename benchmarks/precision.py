@@ -0,0 +1,56 @@
+"""Precisión de la interpolación de propiedades: lineal frente a PCHIP.
+
+Validación dejando uno fuera: se quita cada fila interior de la tabla, se
+interpola a su temperatura con las filas restantes y se compara con el valor
+tabulado. El error relativo mide cuánto se aparta cada método de los datos
+entre nodos, donde la tabla completa no tiene con qué comprobarse.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from calculos import propiedades
+
+Error = namedtuple("Error", "fluido fase propiedad puntos lineal_medio lineal_max pchip_medio pchip_max")
+
+METODOS = {
+    propiedades.LINEAL: propiedades.interpolar_fusionado,
+    propiedades.PCHIP: lambda T, m, x: propiedades.interpolar_pchip(T, propiedades.coeficientes_pchip(T, m), x),
+}
+
+
+def errores_dejando_uno(T_tabla, matriz, metodo):
+    """Error relativo |interpolado - tabulado| / |tabulado| de cada fila interior quitada"""
+    interpolar = METODOS[metodo]
+    errores = np.full((len(T_tabla) - 2, matriz.shape[1]), np.nan)
+    for i in range(1, len(T_tabla) - 1):
+        resto = np.delete(np.arange(len(T_tabla)), i)
+        estimado = interpolar(T_tabla[resto], matriz[resto], T_tabla[i])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            errores[i - 1] = np.abs(estimado - matriz[i]) / np.abs(matriz[i])
+    return errores
+
+
+def _tablas():
+    for fluido in propiedades.ARCHIVOS_FLUIDOS:
+        fases = propiedades.FASES if fluido in propiedades.FLUIDOS_CON_FASES else (None,)
+        for fase in fases:
+            yield fluido, fase, propiedades.cargar_tabla(fluido, fase)
+
+
+def comparar_precision():
+    """Un Error por tabla y propiedad con los estadísticos de ambos métodos"""
+    filas = []
+    for fluido, fase, (T_tabla, matriz) in _tablas():
+        if len(T_tabla) < 4:
+            continue
+        lineal = errores_dejando_uno(T_tabla, matriz, propiedades.LINEAL)
+        pchip = errores_dejando_uno(T_tabla, matriz, propiedades.PCHIP)
+        for j, propiedad in enumerate(propiedades.PROPIEDADES):
+            validos = np.isfinite(lineal[:, j]) & np.isfinite(pchip[:, j])
+            if not validos.any():
+                continue
+            a, b = lineal[validos, j], pchip[validos, j]
+            filas.append(Error(fluido, fase or "", propiedad, int(validos.sum()),
+                               float(a.mean()), float(a.max()), float(b.mean()), float(b.max())))
+    return filas
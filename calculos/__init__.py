@@ -0,0 +1,9 @@
+"""Núcleo de cálculo de la calculadora de transferencia de calor.
+
+Funciones puras (sin Streamlit) que operan sobre arreglos de NumPy, para que
+las páginas y las herramientas por lotes compartan la misma física.
+
+Los motores que importan las páginas dependen solo de NumPy: pandas se importa
+de forma diferida al compilar el almacén y lo cargan de entrada únicamente las
+herramientas por lotes.
+"""
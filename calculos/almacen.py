@@ -0,0 +1,218 @@
+"""Almacén binario precompilado de las tablas de propiedades.
+
+Todas las tablas de fluidos y materiales se compilan en un único archivo
+`propiedades.bin` que se abre con `np.memmap` (sin copias):
+
+    [8 bytes  ] firma b"HTPROP\\0\\0"
+    [4 bytes  ] versión del formato (uint32, little endian)
+    [4 bytes  ] longitud del encabezado JSON (uint32, little endian)
+    [N bytes  ] encabezado JSON (utf-8, relleno hasta múltiplo de 64)
+    [resto    ] bloque de datos float64
+
+El encabezado guarda el SHA-256 de cada CSV de origen, el SHA-256 del bloque de
+datos y la ubicación (desplazamiento, filas, columnas) de cada tabla. Si algún
+CSV cambia, el almacén se recompila automáticamente al abrirlo.
+
+Uso como paso de compilación:
+
+    python -m calculos.almacen            # compila si hace falta
+    python -m calculos.almacen --forzar   # recompila siempre
+"""
+import argparse
+import hashlib
+import json
+import os
+import struct
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from .propiedades import (
+    RAIZ, ARCHIVOS_FLUIDOS, FLUIDOS_CON_FASES, FASES, COLUMNA_T, COLUMNAS, PROPIEDADES,
+    ARCHIVOS_MATERIALES, PROPIEDADES_MATERIALES, nombre_columna
+)
+
+FIRMA = b"HTPROP\0\0"
+VERSION_FORMATO = 1
+ALINEACION = 64
+RUTA_ALMACEN = RAIZ / "propiedades.bin"
+
+
+def clave_tabla(fluido, fase=None):
+    return f"{fluido}|{fase or ''}"
+
+
+def hash_archivo(ruta):
+    return hashlib.sha256(ruta.read_bytes()).hexdigest()
+
+
+def hashes_origen():
+    """SHA-256 de cada CSV del que depende el almacén"""
+    archivos = list(ARCHIVOS_FLUIDOS.values()) + list(ARCHIVOS_MATERIALES.values())
+    return {archivo: hash_archivo(RAIZ / archivo) for archivo in archivos}
+
+
+def _a_numero(serie):
+    import pandas as pd
+
+    # Valores como "-" o rangos "4.8-32" no son utilizables en el cálculo
+    return pd.to_numeric(serie, errors="coerce").to_numpy(dtype=float)
+
+
+def _bloque_fluido(df, fase):
+    columnas = [_a_numero(df[COLUMNA_T])]
+    columnas += [_a_numero(df[nombre_columna(p, fase)]) for p in COLUMNAS]
+    if fase is None and "Viscosidad cinemática (m²/s)" in df.columns:
+        columnas.append(_a_numero(df["Viscosidad cinemática (m²/s)"]))
+    else:
+        columnas.append(columnas[2] / columnas[1])
+    return np.column_stack(columnas)
+
+
+def _bloque_materiales(df):
+    cp = df.filter(like="Calor específico").columns[0]
+    factor_cp = 1000.0 if "kJ" in cp else 1.0
+    return np.column_stack([
+        _a_numero(df["Conductividad térmica (W/m·K)"]),
+        _a_numero(df["Densidad (kg/m³)"]),
+        _a_numero(df[cp]) * factor_cp,
+    ])
+
+
+def compilar(ruta=RUTA_ALMACEN):
+    """Lee todos los CSV y escribe el almacén de forma atómica"""
+    # pandas solo hace falta al compilar; abrir el almacén usa únicamente NumPy
+    import pandas as pd
+
+    bloques = {}
+    for fluido, archivo in ARCHIVOS_FLUIDOS.items():
+        df = pd.read_csv(RAIZ / archivo)
+        fases = FASES if fluido in FLUIDOS_CON_FASES else (None,)
+        for fase in fases:
+            bloques[clave_tabla(fluido, fase)] = _bloque_fluido(df, fase)
+
+    nombres_materiales = {}
+    for categoria, archivo in ARCHIVOS_MATERIALES.items():
+        df = pd.read_csv(RAIZ / archivo)
+        nombres_materiales[categoria] = df["Material"].str.strip().tolist()
+        bloques[categoria] = _bloque_materiales(df)
+
+    tablas = {}
+    partes = []
+    desplazamiento = 0
+    for clave, bloque in bloques.items():
+        bloque = np.ascontiguousarray(bloque, dtype="<f8")
+        tablas[clave] = {"desplazamiento": desplazamiento,
+                         "filas": bloque.shape[0], "columnas": bloque.shape[1]}
+        partes.append(bloque.tobytes())
+        desplazamiento += bloque.size
+    datos = b"".join(partes)
+
+    encabezado = {
+        "version": VERSION_FORMATO,
+        "origen": hashes_origen(),
+        "sha256_datos": hashlib.sha256(datos).hexdigest(),
+        "propiedades": ["T"] + list(PROPIEDADES),
+        "propiedades_materiales": list(PROPIEDADES_MATERIALES),
+        "tablas": tablas,
+        "materiales": nombres_materiales,
+    }
+    texto = json.dumps(encabezado, ensure_ascii=False).encode("utf-8")
+    relleno = -(len(FIRMA) + 8 + len(texto)) % ALINEACION
+    texto += b" " * relleno
+
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(dir=ruta.parent, prefix=".propiedades-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(FIRMA)
+            f.write(struct.pack("<II", VERSION_FORMATO, len(texto)))
+            f.write(texto)
+            f.write(datos)
+        # mkstemp crea el archivo como 0600; el almacén lo leen también otros usuarios
+        os.chmod(temporal, 0o644)
+        # Reemplazo atómico: otros procesos ven el archivo viejo o el nuevo, nunca uno a medias
+        os.replace(temporal, ruta)
+    except BaseException:
+        os.unlink(temporal)
+        raise
+    return ruta
+
+
+def leer_encabezado(ruta=RUTA_ALMACEN):
+    """Devuelve (encabezado, desplazamiento del bloque de datos en bytes)"""
+    with open(ruta, "rb") as f:
+        if f.read(len(FIRMA)) != FIRMA:
+            raise ValueError(f"{ruta} no es un almacén de propiedades")
+        version, largo = struct.unpack("<II", f.read(8))
+        encabezado = json.loads(f.read(largo).decode("utf-8"))
+    if version != VERSION_FORMATO or encabezado.get("version") != VERSION_FORMATO:
+        raise ValueError(f"Versión de almacén no soportada: {version}")
+    return encabezado, len(FIRMA) + 8 + largo
+
+
+class AlmacenPropiedades:
+    """Vista de solo lectura sobre el archivo compilado (memoria mapeada)"""
+
+    def __init__(self, ruta=RUTA_ALMACEN):
+        self.ruta = ruta
+        self.encabezado, inicio = leer_encabezado(ruta)
+        total = sum(t["filas"] * t["columnas"] for t in self.encabezado["tablas"].values())
+        self.datos = np.memmap(ruta, dtype="<f8", mode="r", offset=inicio, shape=(total,))
+
+    def verificar(self):
+        """Comprueba el SHA-256 del bloque de datos"""
+        return hashlib.sha256(self.datos.tobytes()).hexdigest() == self.encabezado["sha256_datos"]
+
+    def bloque(self, clave):
+        info = self.encabezado["tablas"][clave]
+        inicio = info["desplazamiento"]
+        fin = inicio + info["filas"] * info["columnas"]
+        return self.datos[inicio:fin].reshape(info["filas"], info["columnas"])
+
+    def tabla_fluido(self, fluido, fase=None):
+        """(T, matriz) con las columnas en el orden de PROPIEDADES, sin copiar"""
+        bloque = self.bloque(clave_tabla(fluido, fase))
+        return bloque[:, 0], bloque[:, 1:]
+
+    def tabla_materiales(self, categoria):
+        """(nombres, matriz k/rho/cp) de una categoría de materiales"""
+        return self.encabezado["materiales"][categoria], self.bloque(categoria)
+
+
+def abrir_almacen(ruta=RUTA_ALMACEN):
+    """Abre el almacén y lo recompila si falta, es de otra versión o algún CSV cambió"""
+    try:
+        almacen = AlmacenPropiedades(ruta)
+        if almacen.encabezado["origen"] == hashes_origen() and almacen.verificar():
+            return almacen
+    except (OSError, ValueError, KeyError):
+        pass
+    try:
+        compilar(ruta)
+    except OSError:
+        # Directorio de la aplicación de solo lectura: compilar en el temporal del sistema
+        ruta = Path(tempfile.gettempdir()) / ruta.name
+        compilar(ruta)
+    return AlmacenPropiedades(ruta)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compila las tablas CSV en el almacén binario")
+    parser.add_argument("--forzar", action="store_true", help="Recompilar aunque esté al día")
+    parser.add_argument("--ruta", default=str(RUTA_ALMACEN), help="Archivo de salida")
+    args = parser.parse_args(argv)
+
+    ruta = Path(args.ruta)
+    if args.forzar:
+        compilar(ruta)
+    almacen = abrir_almacen(ruta)
+    tablas = almacen.encabezado["tablas"]
+    print(f"Almacén: {ruta} (versión {VERSION_FORMATO}, {ruta.stat().st_size} bytes)")
+    for clave, info in tablas.items():
+        print(f"  {clave:<35} {info['filas']:>4} filas x {info['columnas']} columnas")
+
+
+if __name__ == "__main__":
+    main()
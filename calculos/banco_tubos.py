@@ -0,0 +1,190 @@
+"""Motor vectorizado de convección en bancos de tubos (arreglos alineados y escalonados).
+
+Correlación de Zukauskas sobre la velocidad máxima entre tubos,
+
+    Nu = C2 · C · (S_T/S_L)^p · Re_max^m · Pr^n · (Pr/Pr_s)^(1/4)
+
+con C, m, n y p por rango de Re_max en `tube_bank_constants.csv` y C2 la
+corrección por número de filas (N_L < 20). El fluido se avanza fila por fila:
+cada fila usa las propiedades a la temperatura con que la alcanza el fluido y
+lo calienta (o enfría) con la solución exacta de una fila a pared constante.
+Cada paso opera sobre todos los casos a la vez, así que el costo crece con el
+número de filas, no con el de tubos.
+"""
+import csv
+from functools import lru_cache
+
+import numpy as np
+
+from .flujo_interno import diferencia_media_logaritmica
+from .propiedades import RAIZ, interpolar_casos
+
+ARCHIVO_CONSTANTES = "tube_bank_constants.csv"
+
+ALINEADO = "alineado"
+ESCALONADO = "escalonado"
+DISPOSICIONES = (ALINEADO, ESCALONADO)
+_DISPOSICION_CSV = {"aligned": ALINEADO, "staggered": ESCALONADO}
+
+# Corrección C2 del Nu promedio de un banco de N_L filas; 1 desde 20 filas
+FILAS_CORRECCION = (1, 2, 3, 4, 5, 7, 10, 13, 16, 20)
+CORRECCION_FILAS = {
+    ALINEADO: (0.70, 0.80, 0.86, 0.90, 0.92, 0.95, 0.97, 0.98, 0.99, 1.0),
+    ESCALONADO: (0.64, 0.76, 0.84, 0.89, 0.92, 0.95, 0.97, 0.98, 0.99, 1.0),
+}
+
+PR_MIN = 0.7
+PR_MAX = 500
+
+
+@lru_cache(maxsize=None)
+def cargar_constantes():
+    """{disposición: (re_min, re_max, C, m, n, p)} ordenados por Re, leídos una vez"""
+    with open(RAIZ / ARCHIVO_CONSTANTES, newline="", encoding="utf-8") as f:
+        filas = list(csv.DictReader(f))
+    tablas = {}
+    for clave, disposicion in _DISPOSICION_CSV.items():
+        propias = [fila for fila in filas if fila["Arrangement"] == clave]
+        limites = [fila["Re_D Range"].replace("–", "-").split("-") for fila in propias]
+        tabla = [np.array(columna, dtype=float) for columna in (
+            [re_min for re_min, _ in limites], [re_max for _, re_max in limites],
+            *([fila[c] for fila in propias] for c in ("C", "m", "n", "ST/SL exponent")))]
+        orden = np.argsort(tabla[0], kind="stable")
+        tabla = tuple(a[orden] for a in tabla)
+        re_min, re_max = tabla[:2]
+        if not len(re_min) or np.any(re_min > re_max) or np.any(re_min[1:] < re_max[:-1]):
+            raise ValueError(f"Rangos de Re_max vacíos, solapados o invertidos para {clave!r} "
+                             f"en {ARCHIVO_CONSTANTES}")
+        for a in tabla:
+            a.flags.writeable = False
+        tablas[disposicion] = tabla
+    return tablas
+
+
+def es_escalonado(disposicion, forma=()):
+    """Máscara de casos escalonados; valida cada disposición"""
+    disposicion = np.broadcast_to(np.asarray(disposicion, dtype=str), forma)
+    desconocidas = ~np.isin(disposicion, DISPOSICIONES)
+    if desconocidas.any():
+        raise ValueError(f"Disposición desconocida: {disposicion[desconocidas].flat[0]!r}")
+    return disposicion == ESCALONADO
+
+
+def velocidad_maxima(V, D, S_T, S_L, escalonado):
+    """V_max entre tubos; en escalonado decide la sección frontal o la diagonal, la menor"""
+    V, D, S_T, S_L = (np.asarray(v, dtype=float) for v in (V, D, S_T, S_L))
+    frontal = S_T / (S_T - D)
+    S_D = np.sqrt(S_L ** 2 + (S_T / 2) ** 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        diagonal = S_T / (2 * (S_D - D))
+    return V * np.where(escalonado & (S_D < (S_T + D) / 2), diagonal, frontal)
+
+
+def coeficientes_zukauskas(Re_max, escalonado, S_T, S_L):
+    """C·(S_T/S_L)^p, m y n de cada caso, y máscara de Re_max fuera de todo rango"""
+    Re_max = np.asarray(Re_max, dtype=float)
+    escalonado = np.broadcast_to(escalonado, Re_max.shape)
+    C = np.full(Re_max.shape, np.nan)
+    m, n, p = C.copy(), C.copy(), C.copy()
+    fuera_de_rango = np.ones(Re_max.shape, dtype=bool)
+    for disposicion, mascara in ((ALINEADO, ~escalonado), (ESCALONADO, escalonado)):
+        re_min, re_max, c, mm, nn, pp = cargar_constantes()[disposicion]
+        Re = Re_max[mascara]
+        i = np.minimum(np.searchsorted(re_max, Re, side="left"), len(re_max) - 1)
+        valido = (Re > re_min[0]) & (Re >= re_min[i]) & (Re <= re_max[i])
+        fuera_de_rango[mascara] = ~valido
+        C[mascara], m[mascara], n[mascara], p[mascara] = (np.where(valido, a[i], np.nan)
+                                                          for a in (c, mm, nn, pp))
+    relacion = np.asarray(S_T, dtype=float) / np.asarray(S_L, dtype=float)
+    return C * relacion ** p, m, n, fuera_de_rango
+
+
+def correccion_filas(N_L, escalonado):
+    """C2: corrección del Nu promedio de un banco de N_L filas (interpolada en N_L)"""
+    N_L = np.asarray(N_L, dtype=float)
+    return np.where(escalonado,
+                    np.interp(N_L, FILAS_CORRECCION, CORRECCION_FILAS[ESCALONADO]),
+                    np.interp(N_L, FILAS_CORRECCION, CORRECCION_FILAS[ALINEADO]))
+
+
+def correccion_fila(i, escalonado):
+    """Factor de la fila i (1, 2, ...) tal que el promedio de las N_L primeras sea C2(N_L)"""
+    return i * correccion_filas(i, escalonado) - (i - 1) * correccion_filas(i - 1, escalonado)
+
+
+def calcular_banco_tubos(T_entrada, T_superficie, V, D, S_T, S_L, N_L, N_T, L, fluido, fase=None,
+                         disposicion=ALINEADO):
+    """Banco de N_L filas × N_T tubos a temperatura superficial constante (SI, °C).
+
+    V es la velocidad de aproximación, aguas arriba del banco. Devuelve, por
+    caso, T_salida, q (W), h promedio (q / A·ΔT_ml), Nu, Re_max de entrada,
+    V_max y la validez de la correlación; y por fila (última dimensión, NaN
+    tras la última fila del caso) T_filas (N_L + 1 temperaturas), h_filas y
+    q_filas.
+    """
+    T_entrada, T_superficie, V, D, S_T, S_L, N_L, N_T, L = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (T_entrada, T_superficie, V, D, S_T, S_L, N_L, N_T, L)))
+    forma = T_entrada.shape
+    escalonado = es_escalonado(disposicion, forma)
+    filas = int(N_L.max(initial=0))
+
+    entrada = interpolar_casos(fluido, fase, T_entrada)
+    Pr_s = interpolar_casos(fluido, fase, T_superficie)["pr"]
+    # Flujo másico por la sección frontal; G_max se conserva aunque cambie la densidad
+    m = entrada["rho"] * V * N_T * S_T * L
+    G_max = entrada["rho"] * velocidad_maxima(V, D, S_T, S_L, escalonado)
+    A_fila = N_T * np.pi * D * L
+    # Corrección de cada fila para las dos disposiciones, calculada una vez
+    indices = np.arange(1, filas + 1)
+    factores = np.where(escalonado[..., None], correccion_fila(indices, True),
+                        correccion_fila(indices, False))
+
+    T_filas = np.full(forma + (filas + 1,), np.nan)
+    h_filas = np.full(forma + (filas,), np.nan)
+    q_filas = np.full(forma + (filas,), np.nan)
+    T_filas[..., 0] = T = T_entrada
+    fuera_de_rango = np.zeros(forma, dtype=bool)
+    Pr_valido = np.ones(forma, dtype=bool)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for i in range(1, filas + 1):
+            activa = i <= N_L
+            props = interpolar_casos(fluido, fase, T)
+            Re = G_max * D / props["mu"]
+            C, m_re, n_pr, fuera = coeficientes_zukauskas(Re, escalonado, S_T, S_L)
+            fuera_de_rango |= fuera & activa
+            Pr_valido &= ~activa | ((props["pr"] >= PR_MIN) & (props["pr"] <= PR_MAX))
+            Nu = (factores[..., i - 1] * C * Re ** m_re * props["pr"] ** n_pr
+                  * (props["pr"] / Pr_s) ** 0.25)
+            h = Nu * props["k"] / D
+            # Fila a pared constante: T_sale = T_s - (T_s - T)·exp(-h·A / (ṁ·cp))
+            T_sale = T_superficie - (T_superficie - T) * np.exp(-h * A_fila / (m * props["cp"]))
+            q = m * props["cp"] * (T_sale - T)
+            T = np.where(activa, T_sale, T)
+            T_filas[..., i] = np.where(activa, T_sale, np.nan)
+            h_filas[..., i - 1] = np.where(activa, h, np.nan)
+            q_filas[..., i - 1] = np.where(activa, q, np.nan)
+
+        T_salida = T
+        q = np.nansum(q_filas, axis=-1)
+        A = N_L * A_fila
+        TML = diferencia_media_logaritmica(T_entrada, T_salida, T_superficie)
+        h = q / (A * TML)
+        media = interpolar_casos(fluido, fase, (T_entrada + T_salida) / 2)
+
+    return {
+        **{f"{p}_entrada": v for p, v in entrada.items()},
+        "Pr_s": Pr_s,
+        "V_max": G_max / entrada["rho"],
+        "Re_max": G_max * D / entrada["mu"],
+        "m": m,
+        "A": A,
+        "T_salida": T_salida,
+        "TML": TML,
+        "h": h,
+        "Nu": h * D / media["k"],
+        "q": q,
+        "valido": ~fuera_de_rango & Pr_valido & (N_L >= 1),
+        "T_filas": T_filas,
+        "h_filas": h_filas,
+        "q_filas": q_filas,
+    }
@@ -0,0 +1,279 @@
+"""Barridos de parámetros en paralelo para convección externa en cilindros.
+
+Una malla (cartesiana o hipercubo latino) sobre velocidad, diámetro,
+temperatura del fluido, temperatura de superficie y fluido se reparte en
+fragmentos entre los procesos de un ProcessPoolExecutor; los resultados se
+devuelven fragmento a fragmento a medida que terminan, sin esperar al total:
+
+    malla = MallaCartesiana(V=np.linspace(1, 20, 100), D=np.geomspace(1e-3, 0.05, 100),
+                            T_fluido=25, T_superficie=np.linspace(50, 400, 100),
+                            fluidos=["aire", ("agua saturada", "líquido")])
+    for fragmento in barrer(malla, L=0.1):
+        ...  # fragmento.inicio, fragmento.fin, fragmento.resultados
+
+Desde la terminal (ejes "valor" fijo o "mín máx n"):
+
+    python -m calculos.barrido salida.parquet --V 1 20 100 --D 0.001 0.05 100 \\
+        --T-fluido 25 --T-superficie 50 400 100 --fluido aire "agua saturada:líquido"
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from .cilindro_externo import CHURCHILL, COMPACTA, calcular_cilindro_externo, cargar_coeficientes
+from .propiedades import almacen, normalizar_fase, normalizar_fluido
+
+EJES = ("V", "D", "T_fluido", "T_superficie")
+
+FRAGMENTO_MIN = 10_000
+FRAGMENTO_MAX = 500_000
+# Fragmentos por proceso: suficientes para equilibrar la carga sin saturar el envío
+FRAGMENTOS_POR_TRABAJADOR = 4
+
+Fragmento = namedtuple("Fragmento", ["inicio", "fin", "resultados"])
+
+
+def _pares_fluido(fluidos):
+    """Normaliza la lista de fluidos ("aire" o ("agua saturada", "líquido")) a tuplas (fluido, fase)"""
+    if isinstance(fluidos, str):
+        fluidos = [fluidos]
+    pares = []
+    for f in fluidos:
+        fluido, fase = (f, None) if isinstance(f, str) else f
+        fluido = normalizar_fluido(fluido)
+        pares.append((fluido, normalizar_fase(fluido, fase)))
+    if not pares:
+        raise ValueError("Se requiere al menos un fluido")
+    return tuple(pares)
+
+
+class MallaCartesiana:
+    """Producto cartesiano de los ejes; los puntos se generan por índice, sin materializar la malla"""
+
+    def __init__(self, V, D, T_fluido, T_superficie, fluidos):
+        self.ejes = tuple(np.atleast_1d(np.asarray(v, dtype=float))
+                          for v in (V, D, T_fluido, T_superficie))
+        self.fluidos = _pares_fluido(fluidos)
+        self.forma = tuple(len(e) for e in self.ejes) + (len(self.fluidos),)
+
+    def __len__(self):
+        return int(np.prod(self.forma))
+
+    def puntos(self, inicio, fin):
+        """Ejes y código de fluido de los puntos [inicio, fin)"""
+        indices = np.unravel_index(np.arange(inicio, fin), self.forma)
+        datos = {nombre: eje[i] for nombre, eje, i in zip(EJES, self.ejes, indices)}
+        datos["fluido"] = indices[-1].astype(np.int32)
+        return datos
+
+
+class MallaLatinHypercube:
+    """Muestreo por hipercubo latino: cada eje continuo se divide en n estratos
+    equiprobables y cada estrato se usa exactamente una vez.
+
+    Los ejes se dan como (mín, máx) o como un valor fijo; el fluido se reparte
+    en proporciones iguales y en orden aleatorio.
+    """
+
+    def __init__(self, n, V, D, T_fluido, T_superficie, fluidos, semilla=None):
+        self.n = int(n)
+        self.fluidos = _pares_fluido(fluidos)
+        rng = np.random.default_rng(semilla)
+        self.muestras = {}
+        for nombre, rango in zip(EJES, (V, D, T_fluido, T_superficie)):
+            rango = np.atleast_1d(np.asarray(rango, dtype=float))
+            if len(rango) == 1:
+                self.muestras[nombre] = np.full(self.n, rango[0])
+                continue
+            u = (rng.permutation(self.n) + rng.random(self.n)) / self.n
+            self.muestras[nombre] = rango[0] + u * (rango[-1] - rango[0])
+        self.muestras["fluido"] = rng.permutation(
+            np.arange(self.n, dtype=np.int32) % len(self.fluidos))
+
+    def __len__(self):
+        return self.n
+
+    def puntos(self, inicio, fin):
+        return {nombre: valores[inicio:fin] for nombre, valores in self.muestras.items()}
+
+
+def trabajadores_disponibles():
+    """Núcleos que este proceso puede usar (respeta la afinidad de CPU)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def tamano_fragmento(total, trabajadores):
+    """Fragmentos de tamaño acotado, unos pocos por proceso para equilibrar la carga"""
+    tamano = -(-total // (trabajadores * FRAGMENTOS_POR_TRABAJADOR))
+    return int(min(max(tamano, FRAGMENTO_MIN), FRAGMENTO_MAX))
+
+
+def evaluar_puntos(puntos, fluidos, L, correlacion):
+    """Evalúa un fragmento de la malla; un recorrido vectorizado por fluido"""
+    codigos = puntos["fluido"]
+    n = len(codigos)
+    resultados = None
+    for codigo in np.unique(codigos):
+        mascara = codigos == codigo
+        fluido, fase = fluidos[codigo]
+        r = calcular_cilindro_externo(
+            puntos["T_fluido"][mascara], puntos["T_superficie"][mascara],
+            puntos["V"][mascara], puntos["D"][mascara], L, fluido, fase, correlacion)
+        if resultados is None:
+            resultados = {c: np.empty(n, dtype=v.dtype) for c, v in r.items()}
+        for c, v in r.items():
+            resultados[c][mascara] = v
+    return {**puntos, **resultados}
+
+
+def _inicializar_trabajador():
+    # Abre el almacén y la tabla de coeficientes antes del primer fragmento
+    almacen()
+    cargar_coeficientes()
+
+
+def barrer(malla, L=1.0, correlacion=CHURCHILL, trabajadores=None, fragmento=None,
+           ordenado=False):
+    """Generador de Fragmento(inicio, fin, resultados) a medida que terminan.
+
+    `resultados` contiene los ejes del punto, el código de fluido (índice en
+    `malla.fluidos`) y los campos de `calcular_cilindro_externo`. Con
+    `ordenado=True` los fragmentos se entregan en el orden de la malla.
+    Con un solo trabajador se evalúa en el propio proceso.
+    """
+    if correlacion not in (CHURCHILL, COMPACTA):
+        raise ValueError(f"Correlación desconocida: {correlacion!r}")
+    total = len(malla)
+    trabajadores = trabajadores or trabajadores_disponibles()
+    fragmento = fragmento or tamano_fragmento(total, trabajadores)
+    limites = [(i, min(i + fragmento, total)) for i in range(0, total, fragmento)]
+
+    if trabajadores == 1 or len(limites) == 1:
+        for inicio, fin in limites:
+            yield Fragmento(inicio, fin, evaluar_puntos(
+                malla.puntos(inicio, fin), malla.fluidos, L, correlacion))
+        return
+
+    # Se mantienen a lo sumo 2 fragmentos por proceso en vuelo para acotar la memoria
+    pendientes = deque(limites)
+    en_vuelo = {}
+    listos = {}
+    siguiente = 0
+    with ProcessPoolExecutor(trabajadores, initializer=_inicializar_trabajador) as ejecutor:
+        try:
+            while pendientes or en_vuelo:
+                while pendientes and len(en_vuelo) < 2 * trabajadores:
+                    inicio, fin = pendientes.popleft()
+                    futuro = ejecutor.submit(evaluar_puntos, malla.puntos(inicio, fin),
+                                             malla.fluidos, L, correlacion)
+                    en_vuelo[futuro] = (inicio, fin)
+                terminados, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                for futuro in terminados:
+                    inicio, fin = en_vuelo.pop(futuro)
+                    resultado = Fragmento(inicio, fin, futuro.result())
+                    if not ordenado:
+                        yield resultado
+                        continue
+                    listos[inicio] = resultado
+                    while siguiente in listos:
+                        resultado = listos.pop(siguiente)
+                        siguiente = resultado.fin
+                        yield resultado
+        finally:
+            for futuro in en_vuelo:
+                futuro.cancel()
+
+
+def a_dataframe(fragmento, fluidos):
+    """Fragmento -> DataFrame con columnas anotadas con su unidad, como en calculos.lote"""
+    import pandas as pd
+
+    r = fragmento.resultados
+    nombres = np.array([f if fase is None else f"{f}:{fase}" for f, fase in fluidos])
+    return pd.DataFrame({
+        "V [m/s]": r["V"], "D [m]": r["D"],
+        "T_fluido [°C]": r["T_fluido"], "T_superficie [°C]": r["T_superficie"],
+        "fluido": pd.Categorical.from_codes(r["fluido"], nombres),
+        "T_pelicula [°C]": r["T_pelicula"],
+        "rho [kg/m³]": r["rho"], "mu [kg/m·s]": r["mu"], "k [W/m·K]": r["k"], "Pr": r["pr"],
+        "Re": r["Re"], "Nu": r["Nu"], "h [W/m²·K]": r["h"], "A [m²]": r["A"],
+        "q [W]": r["q"], "valido": r["valido"],
+    }, index=pd.RangeIndex(fragmento.inicio, fragmento.fin))
+
+
+# --- Línea de comandos ---
+def _eje(valores, lhs):
+    """'v' -> valor fijo; 'mín máx n' -> linspace (en hipercubo latino solo el rango)"""
+    if len(valores) == 1:
+        return [valores[0]]
+    if len(valores) != 3:
+        raise ValueError("Cada eje es un valor fijo o 'mín máx n'")
+    minimo, maximo, n = valores
+    return [minimo, maximo] if lhs else np.linspace(minimo, maximo, int(n))
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m calculos.barrido",
+        description="Barrido de parámetros en paralelo para convección externa en cilindros")
+    parser.add_argument("salida", help="CSV o Parquet de resultados")
+    for eje, ayuda in (("V", "velocidad [m/s]"), ("D", "diámetro [m]"),
+                       ("T-fluido", "temperatura del fluido [°C]"),
+                       ("T-superficie", "temperatura de superficie [°C]")):
+        parser.add_argument(f"--{eje}", type=float, nargs="+", required=True,
+                            metavar="VALOR", help=f"{ayuda}: valor fijo o 'mín máx n'")
+    parser.add_argument("--fluido", nargs="+", default=["aire"],
+                        help="Fluidos, con fase como 'agua saturada:líquido'")
+    parser.add_argument("--L", type=float, default=1.0, help="Longitud del cilindro [m]")
+    parser.add_argument("--correlacion", default=CHURCHILL, choices=[CHURCHILL, COMPACTA])
+    parser.add_argument("--lhs", type=int, metavar="N",
+                        help="Hipercubo latino de N puntos en lugar de malla cartesiana")
+    parser.add_argument("--semilla", type=int, help="Semilla del hipercubo latino")
+    parser.add_argument("--trabajadores", type=int, help="Procesos (por defecto, los núcleos disponibles)")
+    parser.add_argument("--fragmento", type=int, help="Puntos por fragmento")
+    return parser
+
+
+def main(argv=None):
+    from .lote import EscritorResultados
+
+    args = crear_parser().parse_args(argv)
+    lhs = args.lhs is not None
+    try:
+        fluidos = [tuple(f.split(":", 1)) if ":" in f else f for f in args.fluido]
+        ejes = dict(V=_eje(args.V, lhs), D=_eje(args.D, lhs),
+                    T_fluido=_eje(args.T_fluido, lhs), T_superficie=_eje(args.T_superficie, lhs))
+        if lhs:
+            malla = MallaLatinHypercube(args.lhs, **ejes, fluidos=fluidos, semilla=args.semilla)
+        else:
+            malla = MallaCartesiana(**ejes, fluidos=fluidos)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    inicio = time.perf_counter()
+    escritor = EscritorResultados(args.salida)
+    try:
+        for fragmento in barrer(malla, args.L, args.correlacion, args.trabajadores,
+                                args.fragmento, ordenado=True):
+            escritor.escribir(a_dataframe(fragmento, malla.fluidos))
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        escritor.cerrar()
+    duracion = time.perf_counter() - inicio
+    print(f"{len(malla)} puntos evaluados en {duracion:.2f} s -> {args.salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
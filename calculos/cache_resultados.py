@@ -0,0 +1,314 @@
+"""Caché persistente de resultados completos, direccionada por contenido.
+
+Cada resultado de los motores de placa, cilindro, tubo y conducción se guarda
+en un SQLite local bajo el SHA-256 de:
+
+- el modelo y la versión de la caché,
+- la versión de las tablas de propiedades (hash de todos los CSV de los que
+  depende el cálculo),
+- el método de interpolación de las propiedades de los fluidos,
+- los argumentos normalizados: los numéricos como float64 en SI con su forma,
+  los de texto como cadenas, y las opciones (correlación, geometría) tal cual.
+
+Así sobrevive a reinicios y la comparten las páginas y los lotes:
+
+    r = calcular(CILINDRO, 25.0, 100.0, 1.0, 0.05, 1.0, "aire", correlacion=COMPACTA,
+                 cache=cache_compartida())
+
+El tamaño total se acota con desalojo LRU. Al editar cualquier CSV cambia la
+versión de las tablas: las entradas viejas dejan de coincidir y se borran la
+próxima vez que se consulta la caché.
+
+    python -m calculos.cache_resultados            # estadísticas
+    python -m calculos.cache_resultados --vaciar   # borra todas las entradas
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import math
+import os
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from . import conduccion, cilindro_externo, flujo_interno, placa_plana, propiedades
+from .propiedades import ARCHIVOS_FLUIDOS, ARCHIVOS_MATERIALES, RAIZ
+
+# Cambiarla invalida todo lo guardado (p. ej. si cambian las correlaciones de los motores)
+VERSION_CACHE = 1
+RUTA_CACHE = RAIZ / "resultados_cache.sqlite"
+LIMITE_MB = 1024
+# Un resultado que ocupa más que esta fracción del límite no se guarda
+FRACCION_MAXIMA = 0.25
+
+PLACA = "placa"
+CILINDRO = "cilindro"
+TUBO = "tubo"
+BALANCE_TUBO = "tubo_balance"
+CONDUCCION = "conduccion"
+
+# Modelo -> (motor, depende de las propiedades de los fluidos)
+MOTORES = {
+    PLACA: (placa_plana.calcular_placa_plana, True),
+    CILINDRO: (cilindro_externo.calcular_cilindro_externo, True),
+    TUBO: (flujo_interno.calcular_flujo_interno, True),
+    BALANCE_TUBO: (flujo_interno.resolver_temperatura_salida, True),
+    CONDUCCION: (conduccion.calcular_conduccion, False),
+}
+
+ARCHIVOS_TABLAS = (tuple(ARCHIVOS_FLUIDOS.values()) + tuple(ARCHIVOS_MATERIALES.values())
+                   + (cilindro_externo.ARCHIVO_COEFICIENTES,))
+_RUTAS_TABLAS = tuple(str(RAIZ / archivo) for archivo in ARCHIVOS_TABLAS)
+
+
+# --- Claves ---
+_firmas_tablas = {}
+
+
+def version_tablas():
+    """SHA-256 conjunto de los CSV de propiedades y coeficientes.
+
+    Los archivos solo se vuelven a leer si cambia su tamaño o su fecha de
+    modificación, así que consultarla en cada cálculo es barato.
+    """
+    estado = tuple((s.st_size, s.st_mtime_ns) for s in map(os.stat, _RUTAS_TABLAS))
+    if estado not in _firmas_tablas:
+        sha = hashlib.sha256()
+        for archivo, ruta in zip(ARCHIVOS_TABLAS, _RUTAS_TABLAS):
+            sha.update(archivo.encode("utf-8") + b"\0" + Path(ruta).read_bytes())
+        _firmas_tablas.clear()
+        _firmas_tablas[estado] = sha.hexdigest()
+    return _firmas_tablas[estado]
+
+
+def _actualizar(sha, valor):
+    if valor is None:
+        sha.update(b"N")
+    elif isinstance(valor, str):
+        sha.update(b"S" + valor.encode("utf-8") + b"\0")
+    elif isinstance(valor, dict):
+        sha.update(b"D%d" % len(valor))
+        for nombre in sorted(valor):
+            _actualizar(sha, nombre)
+            _actualizar(sha, valor[nombre])
+    else:
+        arreglo = np.asarray(valor)
+        if arreglo.dtype.kind in "OUS":
+            # Textos (fluido, fase, geometría): cada elemento como cadena
+            sha.update(b"T" + repr(arreglo.shape).encode())
+            sha.update("\x1f".join(map(str, arreglo.ravel().tolist())).encode("utf-8"))
+        else:
+            # Números: float64 contiguo, de modo que 1, 1.0 y np.float64(1) den la misma clave
+            arreglo = np.ascontiguousarray(arreglo, dtype="<f8")
+            sha.update(b"F" + repr(arreglo.shape).encode())
+            sha.update(arreglo.data)
+
+
+def clave(modelo, argumentos):
+    """SHA-256 de un cálculo: modelo, versiones, interpolación y argumentos por nombre"""
+    sha = hashlib.sha256(f"{modelo}|{VERSION_CACHE}|{version_tablas()}".encode())
+    if MOTORES[modelo][1]:
+        sha.update(propiedades.metodo_interpolacion.encode())
+    for nombre, valor in argumentos.items():
+        _actualizar(sha, nombre)
+        _actualizar(sha, valor)
+    return sha.hexdigest()
+
+
+# --- Serialización ---
+# [4 bytes] longitud del encabezado JSON [(nombre, dtype, forma), ...] y luego los datos crudos de cada
+# arreglo, alineados a 8 bytes. Leer un .npz cuesta más que recalcular un caso suelto.
+def _a_bytes(resultado):
+    """dict de arreglos -> bytes; None si algún valor no es numérico ni texto"""
+    arreglos = {nombre: np.asarray(valor) for nombre, valor in resultado.items()}
+    if any(a.dtype.kind == "O" for a in arreglos.values()):
+        return None
+    encabezado = json.dumps([(n, a.dtype.str, a.shape) for n, a in arreglos.items()]).encode()
+    encabezado += b" " * (-(4 + len(encabezado)) % 8)
+    partes = [struct.pack("<I", len(encabezado)), encabezado]
+    for a in arreglos.values():
+        partes += [a.tobytes(), b"\0" * (-a.nbytes % 8)]
+    return b"".join(partes)
+
+
+def _desde_bytes(datos):
+    # Una sola copia a un búfer propio: los arreglos devueltos se pueden modificar
+    datos = bytearray(datos)
+    largo, = struct.unpack_from("<I", datos)
+    posicion = 4 + largo
+    resultado = {}
+    for nombre, tipo, forma in json.loads(datos[4:posicion]):
+        tipo = np.dtype(tipo)
+        cantidad = math.prod(forma)
+        arreglo = np.frombuffer(datos, tipo, cantidad, posicion).reshape(tuple(forma))
+        posicion += -(-cantidad * tipo.itemsize // 8) * 8
+        # Los 0-d vuelven como escalares de NumPy, igual que los devuelven los motores
+        resultado[nombre] = arreglo[()] if arreglo.ndim == 0 else arreglo
+    return resultado
+
+
+# --- Almacenamiento ---
+class CacheResultados:
+    """Resultados en un SQLite con desalojo LRU; segura entre hilos y entre procesos"""
+
+    def __init__(self, ruta=RUTA_CACHE, limite_mb=LIMITE_MB):
+        self.ruta = Path(ruta)
+        self.limite = int(limite_mb * 2 ** 20)
+        self.aciertos = 0
+        self.fallos = 0
+        self._version = None
+        self._candado = threading.Lock()
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        self._conexion = sqlite3.connect(self.ruta, timeout=30, check_same_thread=False,
+                                         isolation_level=None)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        # Los datos van en su propia tabla: marcar un uso no reescribe la fila con el resultado
+        self._conexion.executescript("""
+            CREATE TABLE IF NOT EXISTS entradas (clave TEXT PRIMARY KEY, version TEXT NOT NULL,
+                modelo TEXT NOT NULL, tamano INTEGER NOT NULL, ultimo_uso REAL NOT NULL);
+            CREATE INDEX IF NOT EXISTS entradas_uso ON entradas (ultimo_uso);
+            CREATE TABLE IF NOT EXISTS datos (clave TEXT PRIMARY KEY, datos BLOB NOT NULL);
+        """)
+
+    def _purgar_versiones(self):
+        """Borra las entradas de otras versiones de las tablas la primera vez que se nota el cambio"""
+        version = f"{VERSION_CACHE}|{version_tablas()}"
+        if version != self._version:
+            with self._transaccion():
+                self._conexion.execute("DELETE FROM datos WHERE clave IN "
+                                       "(SELECT clave FROM entradas WHERE version != ?)", (version,))
+                self._conexion.execute("DELETE FROM entradas WHERE version != ?", (version,))
+            self._version = version
+        return version
+
+    def obtener(self, clave):
+        """Resultado guardado o None"""
+        with self._candado:
+            self._purgar_versiones()
+            fila = self._conexion.execute("SELECT datos FROM datos WHERE clave = ?", (clave,)).fetchone()
+            if fila is None:
+                self.fallos += 1
+                return None
+            self._conexion.execute("UPDATE entradas SET ultimo_uso = ? WHERE clave = ?", (time.time(), clave))
+            self.aciertos += 1
+        return _desde_bytes(fila[0])
+
+    def guardar(self, clave, modelo, resultado):
+        """Guarda el resultado y desaloja los menos usados hasta volver bajo el límite"""
+        datos = _a_bytes(resultado)
+        if datos is None or len(datos) > self.limite * FRACCION_MAXIMA:
+            return False
+        with self._candado:
+            version = self._purgar_versiones()
+            with self._transaccion():
+                self._conexion.execute("INSERT OR REPLACE INTO entradas VALUES (?, ?, ?, ?, ?)",
+                                       (clave, version, modelo, len(datos), time.time()))
+                self._conexion.execute("INSERT OR REPLACE INTO datos VALUES (?, ?)", (clave, datos))
+                self._desalojar()
+        return True
+
+    @contextmanager
+    def _transaccion(self):
+        self._conexion.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conexion.execute("ROLLBACK")
+            raise
+        self._conexion.execute("COMMIT")
+
+    def _desalojar(self):
+        exceso = self._conexion.execute("SELECT COALESCE(SUM(tamano), 0) FROM entradas").fetchone()[0] - self.limite
+        if exceso <= 0:
+            return
+        viejas = []
+        for clave, tamano in self._conexion.execute("SELECT clave, tamano FROM entradas ORDER BY ultimo_uso"):
+            viejas.append((clave,))
+            exceso -= tamano
+            if exceso <= 0:
+                break
+        self._conexion.executemany("DELETE FROM entradas WHERE clave = ?", viejas)
+        self._conexion.executemany("DELETE FROM datos WHERE clave = ?", viejas)
+
+    def estadisticas(self):
+        """(entradas, bytes) guardados"""
+        with self._candado:
+            return self._conexion.execute("SELECT COUNT(*), COALESCE(SUM(tamano), 0) FROM entradas").fetchone()
+
+    def vaciar(self):
+        with self._candado:
+            self._conexion.execute("DELETE FROM entradas")
+            self._conexion.execute("DELETE FROM datos")
+            self._conexion.execute("VACUUM")
+
+    def cerrar(self):
+        with self._candado:
+            self._conexion.close()
+
+
+@lru_cache(maxsize=None)
+def cache_compartida(ruta=RUTA_CACHE, limite_mb=LIMITE_MB):
+    """Caché del proceso; en un directorio de solo lectura se abre en el temporal del sistema"""
+    try:
+        return CacheResultados(ruta, limite_mb)
+    except (OSError, sqlite3.OperationalError):
+        return CacheResultados(Path(tempfile.gettempdir()) / Path(ruta).name, limite_mb)
+
+
+# Caché que usan las llamadas sin `cache` explícita (la activa `calculos.lote`); None = sin caché
+cache_activa = None
+
+
+def configurar_cache(ruta=RUTA_CACHE, limite_mb=LIMITE_MB):
+    """Activa la caché en `ruta` para todo el proceso, o la desactiva con ruta=None"""
+    global cache_activa
+    cache_activa = None if ruta is None else cache_compartida(Path(ruta), limite_mb)
+    return cache_activa
+
+
+def calcular(modelo, *args, cache=None, **kwargs):
+    """Llama al motor del modelo, reutilizando el resultado guardado si lo hay"""
+    funcion, _ = MOTORES[modelo]
+    cache = cache or cache_activa
+    if cache is None:
+        return funcion(*args, **kwargs)
+    argumentos = _firma(funcion).bind(*args, **kwargs)
+    argumentos.apply_defaults()
+    codigo = clave(modelo, argumentos.arguments)
+    resultado = cache.obtener(codigo)
+    if resultado is None:
+        resultado = funcion(*args, **kwargs)
+        cache.guardar(codigo, modelo, resultado)
+    return resultado
+
+
+@lru_cache(maxsize=None)
+def _firma(funcion):
+    return inspect.signature(funcion)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Caché persistente de resultados")
+    parser.add_argument("--ruta", default=str(RUTA_CACHE), help="Archivo SQLite de la caché")
+    parser.add_argument("--vaciar", action="store_true", help="Borra todas las entradas")
+    args = parser.parse_args(argv)
+
+    cache = CacheResultados(args.ruta)
+    if args.vaciar:
+        cache.vaciar()
+    entradas, tamano = cache.estadisticas()
+    print(f"Caché: {cache.ruta} ({entradas} resultados, {tamano / 2 ** 20:.1f} MB de {LIMITE_MB} MB)")
+    print(f"Versión de las tablas: {version_tablas()[:16]}")
+
+
+if __name__ == "__main__":
+    main()
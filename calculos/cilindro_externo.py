@@ -0,0 +1,102 @@
+"""Motor vectorizado de convección externa en cilindros (flujo cruzado)."""
+import csv
+from functools import lru_cache
+
+import numpy as np
+
+from .propiedades import RAIZ, escalar_propiedades, interpolar_casos
+
+ARCHIVO_COEFICIENTES = "cylinder_cross_flow_constants.csv"
+
+CHURCHILL = "churchill"
+COMPACTA = "compacta"
+
+
+@lru_cache(maxsize=None)
+def cargar_coeficientes():
+    """Rangos de Re_D y coeficientes C, m de la correlación compacta, leídos una vez.
+
+    Los rangos quedan ordenados por Re creciente para poder resolverlos con
+    `np.searchsorted`; pueden compartir un límite pero no solaparse.
+    """
+    with open(RAIZ / ARCHIVO_COEFICIENTES, newline="", encoding="utf-8") as f:
+        filas = list(csv.DictReader(f))
+    limites = [fila["Re_D Range"].replace("–", "-").split("-") for fila in filas]
+    tabla = [np.array(columna, dtype=float) for columna in (
+        [re_min for re_min, _ in limites], [re_max for _, re_max in limites],
+        [fila["C"] for fila in filas], [fila["m"] for fila in filas])]
+    orden = np.argsort(tabla[0], kind="stable")
+    tabla = tuple(a[orden] for a in tabla)
+    re_min, re_max = tabla[:2]
+    if np.any(re_min > re_max) or np.any(re_min[1:] < re_max[:-1]):
+        raise ValueError(f"Rangos de Re_D solapados o invertidos en {ARCHIVO_COEFICIENTES}")
+    for a in tabla:
+        a.flags.writeable = False
+    return tabla
+
+
+def coeficientes_compactos(Re):
+    """C y m de la correlación compacta para cada Re, y máscara de Re fuera de todo rango.
+
+    Donde Re queda fuera de rango, C y m son NaN. En un límite compartido se
+    usa el rango inferior (el primero de la tabla).
+    """
+    Re = np.asarray(Re, dtype=float)
+    re_min, re_max, C, m = cargar_coeficientes()
+    # Primer rango cuyo máximo alcanza a Re; luego basta comprobar su mínimo
+    i = np.minimum(np.searchsorted(re_max, Re, side="left"), len(re_max) - 1)
+    fuera_de_rango = ~((Re >= re_min[i]) & (Re <= re_max[i]))
+    return (np.where(fuera_de_rango, np.nan, C[i]), np.where(fuera_de_rango, np.nan, m[i]),
+            fuera_de_rango)
+
+
+def nusselt_churchill(Re, Pr):
+    """Churchill-Bernstein; NaN donde Pr <= 0.2 (fuera de validez)"""
+    Re = np.asarray(Re, dtype=float)
+    Pr = np.asarray(Pr, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        term1 = 0.62 * np.sqrt(Re) * np.cbrt(Pr)
+        term2 = (1 + (0.4 / Pr) ** (2 / 3)) ** (1 / 4)
+        term3 = (1 + (Re / 282000) ** (5 / 8)) ** (4 / 5)
+        Nu = 0.3 + term1 / term2 * term3
+    return np.where(Pr > 0.2, Nu, np.nan)
+
+
+def nusselt_compacto(Re, Pr):
+    """Correlación compacta Nu = C Re^m Pr^(1/3); NaN si Re no cae en ningún rango"""
+    C, m, _ = coeficientes_compactos(Re)
+    with np.errstate(invalid="ignore"):
+        return C * np.asarray(Re, dtype=float) ** m * np.cbrt(np.asarray(Pr, dtype=float))
+
+
+def calcular_cilindro_externo(T_fluido, T_superficie, V, D, L, fluido, fase=None,
+                              correlacion=CHURCHILL, factores_propiedades=None):
+    """Convección externa en un cilindro para uno o muchos casos (SI, °C)"""
+    T_fluido, T_superficie, V, D, L = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (T_fluido, T_superficie, V, D, L)))
+
+    T_pelicula = (T_fluido + T_superficie) / 2
+    props = escalar_propiedades(interpolar_casos(fluido, fase, T_pelicula), factores_propiedades)
+    Re = V * D * props["rho"] / props["mu"]
+
+    if correlacion == CHURCHILL:
+        Nu = nusselt_churchill(Re, props["pr"])
+    elif correlacion == COMPACTA:
+        Nu = nusselt_compacto(Re, props["pr"])
+    else:
+        raise ValueError(f"Correlación desconocida: {correlacion!r}")
+
+    h = Nu * props["k"] / D
+    A = np.pi * D * L
+    dT = T_superficie - T_fluido
+    return {
+        "T_pelicula": T_pelicula,
+        **props,
+        "Re": Re,
+        "Nu": Nu,
+        "h": h,
+        "A": A,
+        "dT": dT,
+        "q": h * A * dT,
+        "valido": ~np.isnan(Nu),
+    }
@@ -0,0 +1,138 @@
+"""Motor vectorizado de conducción unidimensional estacionaria en capas en serie.
+
+Cada caso (pared) es una fila y cada capa una columna: N paredes × M capas en
+arreglos rellenos (espesor, k, r_i, r_o y una máscara de capas válidas). Las
+paredes con menos capas llevan NaN en el espesor, y cada pared puede tener
+su propia geometría.
+"""
+import numpy as np
+
+PLANA = "Plana"
+CILINDRICA = "Cilíndrica"
+ESFERICA = "Esférica"
+GEOMETRIAS = (PLANA, CILINDRICA, ESFERICA)
+
+# Códigos numéricos de geometría (índices en GEOMETRIAS)
+CODIGO_PLANA, CODIGO_CILINDRICA, CODIGO_ESFERICA = range(len(GEOMETRIAS))
+
+
+def rellenar_capas(espesores, k):
+    """Listas de capas de distinta longitud -> arreglos (N, M) rellenos con NaN y máscara.
+
+    `espesores` y `k` son secuencias de secuencias, una por pared.
+    """
+    if len(espesores) != len(k):
+        raise ValueError("Se requiere la misma cantidad de paredes en espesores y k")
+    M = max((len(e) for e in espesores), default=0)
+    e_rell = np.full((len(espesores), M), np.nan)
+    k_rell = np.full((len(espesores), M), np.nan)
+    for i, (e_i, k_i) in enumerate(zip(espesores, k)):
+        if len(e_i) != len(k_i):
+            raise ValueError(f"La pared {i} tiene {len(e_i)} espesores y {len(k_i)} conductividades")
+        e_rell[i, :len(e_i)] = e_i
+        k_rell[i, :len(k_i)] = k_i
+    return e_rell, k_rell, np.isfinite(e_rell)
+
+
+def codigos_geometria(geometria, n):
+    """Código de geometría de cada pared.
+
+    `geometria` es un nombre, un arreglo de nombres o un arreglo de códigos ya calculado.
+    """
+    if np.ndim(geometria) == 0:
+        if geometria not in GEOMETRIAS:
+            raise ValueError(f"Geometría desconocida: {geometria!r}")
+        return np.full(n, GEOMETRIAS.index(geometria))
+    geometria = np.broadcast_to(np.asarray(geometria), (n,))
+    if np.issubdtype(geometria.dtype, np.integer):
+        return geometria
+    codigos = np.full(n, -1)
+    for codigo, nombre in enumerate(GEOMETRIAS):
+        codigos[geometria == nombre] = codigo
+    if (codigos < 0).any():
+        raise ValueError(f"Geometría desconocida: {str(geometria[codigos < 0][0])!r}")
+    return codigos
+
+
+def resistencias_capas(geometria, espesores, k, area=1.0, longitud=1.0, r_i=None):
+    """Resistencia de cada capa (K/W), forma (paredes, capas); 0 en las capas de relleno.
+
+    Devuelve también los radios interior y exterior de cada capa (NaN en plana
+    y en el relleno) y la máscara de capas válidas.
+    """
+    e = np.atleast_2d(np.asarray(espesores, dtype=float))
+    n = e.shape[0]
+    k = np.broadcast_to(np.asarray(k, dtype=float), e.shape)
+    mascara = np.isfinite(e) & (e > 0)
+    e = np.where(mascara, e, 0.0)
+    codigos = codigos_geometria(geometria, n)
+    area, longitud = (np.broadcast_to(np.asarray(v, dtype=float), (n,)).reshape(-1, 1)
+                      for v in (area, longitud))
+
+    radiales = codigos != CODIGO_PLANA
+    r_i = np.broadcast_to(np.asarray(np.nan if r_i is None else r_i, dtype=float), (n,))
+    if np.isnan(r_i[radiales]).any():
+        raise ValueError("Las geometrías cilíndrica y esférica requieren el radio interior r_i")
+    # Radios acumulados capa a capa desde r_i, en el mismo orden que la página
+    r_out = np.cumsum(np.column_stack([r_i, e]), axis=1)[:, 1:]
+    r_in = np.column_stack([r_i, r_out[:, :-1]])
+
+    R = np.zeros(e.shape)
+    # Un recorrido por geometría presente, solo sobre sus filas
+    with np.errstate(divide="ignore", invalid="ignore"):
+        presentes = np.unique(codigos)
+        for codigo in presentes:
+            filas = slice(None) if len(presentes) == 1 else codigos == codigo
+            if codigo == CODIGO_PLANA:
+                R[filas] = e[filas] / (k[filas] * area[filas])
+            elif codigo == CODIGO_CILINDRICA:
+                R[filas] = np.log(r_out[filas] / r_in[filas]) / (2 * np.pi * longitud[filas] * k[filas])
+            else:
+                R[filas] = (1 / r_in[filas] - 1 / r_out[filas]) / (4 * np.pi * k[filas])
+
+    radio_valido = mascara & radiales.reshape(-1, 1)
+    return (np.where(mascara, R, 0.0), np.where(radio_valido, r_in, np.nan),
+            np.where(radio_valido, r_out, np.nan), mascara)
+
+
+def calcular_conduccion(geometria, T1, T2, espesores, k, area=1.0, longitud=1.0,
+                        r_i=None, h_in=0.0, h_out=0.0):
+    """Resistencias en serie y flujo de calor para muchas paredes (SI, °C).
+
+    `geometria` puede ser un nombre para todas las paredes o uno por pared
+    (nombre o código). h_in / h_out iguales a 0 significan que no se incluye esa convección.
+    """
+    n = np.atleast_2d(np.asarray(espesores)).shape[0]
+    codigos = codigos_geometria(geometria, n)
+    R, r_in, r_out, mascara = resistencias_capas(codigos, espesores, k, area, longitud, r_i)
+    T1, T2, area, longitud, h_in, h_out = (
+        np.broadcast_to(np.asarray(v, dtype=float), (n,))
+        for v in (T1, T2, area, longitud, h_in, h_out))
+
+    # Radios de las superficies interior y exterior de cada pared
+    r_int = np.broadcast_to(np.asarray(np.nan if r_i is None else r_i, dtype=float), (n,))
+    e = np.where(mascara, np.atleast_2d(espesores), 0.0)
+    r_ext = np.cumsum(np.column_stack([r_int, e]), axis=1)[:, -1]
+    ramas = [codigos == CODIGO_PLANA, codigos == CODIGO_CILINDRICA]
+    A_in = np.select(ramas, [area, 2 * np.pi * r_int * longitud], 4 * np.pi * r_int ** 2)
+    A_out = np.select(ramas, [area, 2 * np.pi * r_ext * longitud], 4 * np.pi * r_ext ** 2)
+
+    with np.errstate(divide="ignore"):
+        R_conv_in = np.where(h_in > 0, 1 / (h_in * A_in), 0.0)
+        R_conv_out = np.where(h_out > 0, 1 / (h_out * A_out), 0.0)
+    R_capas = R.sum(axis=1)
+    R_total = R_capas + R_conv_in + R_conv_out
+    q = (T1 - T2) / R_total
+
+    return {
+        "R_capa": R,
+        "r_in": r_in,
+        "r_out": r_out,
+        "mascara": mascara,
+        "R_capas": R_capas,
+        "R_conv_in": R_conv_in,
+        "R_conv_out": R_conv_out,
+        "R_total": R_total,
+        "q": q,
+        "q_area": np.where(codigos == CODIGO_PLANA, q / area, np.nan),
+    }
@@ -0,0 +1,351 @@
+"""Procesamiento en flujo continuo de archivos de casos muy grandes, reanudable.
+
+Cadena de generadores que avanza un fragmento de tamaño fijo a la vez:
+
+    lectura (hilo propio) -> cola acotada -> cálculo -> escritura -> punto de control
+
+Un hilo lee y analiza el siguiente fragmento mientras el principal calcula el
+actual; la cola de `--profundidad` fragmentos frena al lector si el cálculo va
+más lento (contrapresión), así que la memoria queda en unos pocos fragmentos
+sin importar el tamaño del archivo. El cálculo de cada fragmento es el de
+`calculos.lote`: conversión de unidades, propiedades y correlación en los
+motores vectorizados.
+
+    python -m calculos.continuo placa casos.csv resultados.csv --fragmento 200000
+    python -m calculos.continuo tubo casos.parquet resultados.parquet --reanudar
+
+Cada fragmento escrito se confirma en `<salida>.progreso.json` (entrada,
+opciones, casos y posición de lectura). Con `--reanudar`, una ejecución
+interrumpida sigue desde el último fragmento confirmado: el CSV de salida se
+recorta a lo confirmado y la lectura salta directo a esa posición (byte del CSV
+o fila del Parquet), sin volver a leer lo ya hecho. La salida Parquet es un
+directorio con una parte por fragmento, que pandas y pyarrow leen como una
+sola tabla (`pd.read_parquet("resultados.parquet")`).
+
+Los CSV de entrada se cortan por líneas: no admiten saltos de línea dentro de
+campos entre comillas.
+"""
+import argparse
+import io
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import namedtuple
+from contextlib import closing
+from itertools import islice
+from pathlib import Path
+
+import pandas as pd
+
+from . import propiedades
+from .lote import AYUDAS, EJECUTORES, _pyarrow_parquet, agregar_opciones_calculo, tipos_csv
+
+FRAGMENTO = 200_000
+# Fragmentos leídos que pueden esperar al cálculo antes de que el lector se detenga
+PROFUNDIDAD = 2
+VERSION_PROGRESO = 1
+OPCIONES = ("interpolacion", "correlacion", "geometria")
+
+# `posicion`: dónde sigue la lectura después de este fragmento (byte del CSV o fila del Parquet)
+Fragmento = namedtuple("Fragmento", ["numero", "inicio", "datos", "posicion"])
+
+
+# --- Lectura ---
+def leer_csv(ruta, tamano, posicion=None):
+    """Fragmentos de `tamano` filas desde el byte `posicion` (None = tras el encabezado)"""
+    with open(ruta, "rb") as f:
+        encabezado = f.readline()
+        # Los mismos tipos en todos los fragmentos, aunque una columna venga vacía en alguno
+        tipos = tipos_csv(pd.read_csv(io.BytesIO(encabezado), nrows=0).columns)
+        if posicion is not None:
+            f.seek(posicion)
+        while True:
+            lineas = list(islice(f, tamano))
+            if not lineas:
+                return
+            yield pd.read_csv(io.BytesIO(encabezado + b"".join(lineas)), dtype=tipos), f.tell()
+
+
+def leer_parquet(ruta, tamano, posicion=None):
+    """Fragmentos de hasta `tamano` filas desde la fila `posicion`, saltando grupos enteros"""
+    archivo = _pyarrow_parquet().ParquetFile(ruta)
+    posicion = posicion or 0
+    grupo, inicio = 0, 0
+    while grupo < archivo.num_row_groups and inicio + archivo.metadata.row_group(grupo).num_rows <= posicion:
+        inicio += archivo.metadata.row_group(grupo).num_rows
+        grupo += 1
+    saltar = posicion - inicio
+    for lote in archivo.iter_batches(batch_size=tamano, row_groups=range(grupo, archivo.num_row_groups)):
+        if saltar:
+            omitidas = min(saltar, lote.num_rows)
+            lote, saltar, inicio = lote.slice(omitidas), saltar - omitidas, inicio + omitidas
+        inicio += lote.num_rows
+        if lote.num_rows:
+            yield lote.to_pandas(), inicio
+
+
+def leer(ruta, tamano, posicion=None, numero=0, inicio=0):
+    """Fragmentos numerados del CSV o Parquet, con la fila global de su primer caso"""
+    lector = leer_parquet if Path(ruta).suffix.lower() == ".parquet" else leer_csv
+    for datos, siguiente in lector(ruta, tamano, posicion):
+        datos.index = pd.RangeIndex(inicio, inicio + len(datos))
+        yield Fragmento(numero, inicio, datos, siguiente)
+        numero += 1
+        inicio += len(datos)
+
+
+class _Fin:
+    def __init__(self, error=None):
+        self.error = error
+
+
+def en_segundo_plano(iterable, profundidad=PROFUNDIDAD):
+    """Consume `iterable` en un hilo aparte, con a lo sumo `profundidad` elementos por delante.
+
+    Los errores del hilo se relanzan en el consumidor; si el consumidor se
+    detiene, el hilo termina y cierra el iterable (y con él el archivo).
+    """
+    cola = queue.Queue(maxsize=profundidad)
+    parar = threading.Event()
+
+    def poner(elemento):
+        while not parar.is_set():
+            try:
+                cola.put(elemento, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def producir():
+        iterador = iter(iterable)
+        try:
+            for elemento in iterador:
+                if not poner(elemento):
+                    return
+            poner(_Fin())
+        except BaseException as e:
+            poner(_Fin(e))
+        finally:
+            getattr(iterador, "close", lambda: None)()
+
+    hilo = threading.Thread(target=producir, name="lector", daemon=True)
+    hilo.start()
+    try:
+        while True:
+            elemento = cola.get()
+            if isinstance(elemento, _Fin):
+                if elemento.error is not None:
+                    raise elemento.error
+                return
+            yield elemento
+    finally:
+        parar.set()
+        hilo.join()
+
+
+# --- Cálculo ---
+def calcular(fragmentos, modo, args):
+    """Agrega a cada fragmento las columnas de resultados de `calculos.lote`"""
+    ejecutor = EJECUTORES[modo]
+    for fragmento in fragmentos:
+        resultados = ejecutor(fragmento.datos, args)
+        resultados.index = fragmento.datos.index
+        yield fragmento._replace(datos=pd.concat([fragmento.datos, resultados], axis=1))
+
+
+# --- Escritura y puntos de control ---
+class EscritorCSV:
+    """Agrega fragmentos a un CSV; al reanudar, recorta lo escrito después de lo confirmado"""
+
+    def __init__(self, ruta, confirmado=None):
+        self.ruta = Path(ruta)
+        if confirmado is None:
+            self._archivo = open(self.ruta, "wb")
+        else:
+            if self.ruta.stat().st_size < confirmado["bytes_salida"]:
+                raise ValueError(f"{self.ruta} es más corto que lo confirmado: no se puede reanudar")
+            self._archivo = open(self.ruta, "r+b")
+            self._archivo.truncate(confirmado["bytes_salida"])
+            self._archivo.seek(confirmado["bytes_salida"])
+
+    def escribir(self, fragmento):
+        """Escribe el fragmento de forma durable y devuelve lo que hay que confirmar"""
+        encabezado = self._archivo.tell() == 0
+        texto = fragmento.datos.to_csv(header=encabezado, index=False, float_format="%.10g")
+        self._archivo.write(texto.encode("utf-8"))
+        self._archivo.flush()
+        os.fsync(self._archivo.fileno())
+        return {"bytes_salida": self._archivo.tell()}
+
+    def cerrar(self):
+        self._archivo.close()
+
+
+class EscritorParquet:
+    """Una parte `parte-NNNNNN.parquet` por fragmento dentro del directorio de salida"""
+
+    def __init__(self, ruta, confirmado=None):
+        self.ruta = Path(ruta)
+        if self.ruta.exists() and not self.ruta.is_dir():
+            raise ValueError(f"{self.ruta} existe y no es un directorio: la salida Parquet en flujo "
+                             "continuo es un directorio de partes")
+        self.ruta.mkdir(parents=True, exist_ok=True)
+        # Partes que quedaron sin confirmar (o de una ejecución anterior si no se reanuda)
+        hechos = confirmado["fragmentos"] if confirmado else 0
+        for parte in self.ruta.glob("parte-*.parquet"):
+            if int(parte.stem.split("-")[1]) >= hechos:
+                parte.unlink()
+        # Todas las partes llevan el esquema de la primera para leerse como una sola tabla
+        primera = self.ruta / "parte-000000.parquet"
+        self._esquema = _pyarrow_parquet().read_schema(primera) if hechos else None
+
+    def escribir(self, fragmento):
+        import pyarrow as pa
+
+        pq = _pyarrow_parquet()
+        destino = self.ruta / f"parte-{fragmento.numero:06d}.parquet"
+        temporal = destino.with_name("." + destino.name)
+        tabla = pa.Table.from_pandas(fragmento.datos, preserve_index=False)
+        if self._esquema is None:
+            self._esquema = tabla.schema
+        else:
+            tabla = tabla.cast(self._esquema)
+        pq.write_table(tabla, temporal)
+        os.replace(temporal, destino)
+        return {}
+
+    def cerrar(self):
+        pass
+
+
+def escritor_para(ruta, confirmado=None):
+    clase = EscritorParquet if Path(ruta).suffix.lower() == ".parquet" else EscritorCSV
+    return clase(ruta, confirmado)
+
+
+class PuntoControl:
+    """Progreso confirmado de una ejecución, en un JSON junto a la salida.
+
+    La firma (modo, entrada, tamaño de fragmento y opciones) impide reanudar
+    sobre una entrada distinta o con otras opciones.
+    """
+
+    def __init__(self, salida, firma):
+        self.ruta = Path(f"{salida}.progreso.json")
+        self.firma = firma
+
+    def leer(self):
+        """Estado confirmado, o None si no hay nada que reanudar"""
+        try:
+            estado = json.loads(self.ruta.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        if estado.get("version") != VERSION_PROGRESO or estado.get("firma") != self.firma:
+            raise ValueError(f"{self.ruta} corresponde a otra entrada u otras opciones: "
+                             "bórralo o ejecuta sin --reanudar")
+        return estado
+
+    def confirmar(self, **estado):
+        # Reemplazo atómico: una interrupción deja el punto anterior o el nuevo, nunca uno a medias
+        temporal = self.ruta.with_name("." + self.ruta.name)
+        temporal.write_text(json.dumps({"version": VERSION_PROGRESO, "firma": self.firma, **estado},
+                                       ensure_ascii=False), encoding="utf-8")
+        os.replace(temporal, self.ruta)
+
+    def borrar(self):
+        self.ruta.unlink(missing_ok=True)
+
+
+def firma(modo, entrada, tamano, args):
+    info = Path(entrada).stat()
+    return {"modo": modo, "entrada": str(Path(entrada).resolve()), "bytes_entrada": info.st_size,
+            "modificada_ns": info.st_mtime_ns, "fragmento": tamano,
+            "opciones": {o: getattr(args, o) for o in OPCIONES if hasattr(args, o)}}
+
+
+Resumen = namedtuple("Resumen", ["casos", "total", "fragmentos", "reanudado_desde"])
+
+
+def procesar(modo, entrada, salida, args, tamano=FRAGMENTO, reanudar=False, profundidad=PROFUNDIDAD):
+    """Procesa el archivo en flujo continuo y devuelve un Resumen.
+
+    `casos` son los calculados en esta ejecución y `total` los de toda la
+    salida; `reanudado_desde` es el primer fragmento de esta ejecución si se
+    reanudó (None si empezó de cero).
+    """
+    punto = PuntoControl(salida, firma(modo, entrada, tamano, args))
+    confirmado = punto.leer() if reanudar else None
+    if confirmado is None:
+        # Un punto de control viejo no debe aplicarse a la salida que se empieza a escribir
+        punto.borrar()
+        numero, inicio, posicion = 0, 0, None
+    else:
+        numero, inicio, posicion = confirmado["fragmentos"], confirmado["casos"], confirmado["posicion"]
+        if confirmado["completo"]:
+            return Resumen(0, inicio, numero, numero)
+    desde = numero
+
+    escritor = escritor_para(salida, confirmado)
+    casos = 0
+    try:
+        with closing(en_segundo_plano(leer(entrada, tamano, posicion, numero, inicio), profundidad)) as leidos:
+            for fragmento in calcular(leidos, modo, args):
+                extra = escritor.escribir(fragmento)
+                casos += len(fragmento.datos)
+                numero = fragmento.numero + 1
+                # Se confirma después de que el fragmento quedó escrito
+                punto.confirmar(fragmentos=numero, casos=inicio + casos, posicion=fragmento.posicion,
+                                completo=False, **extra)
+    finally:
+        escritor.cerrar()
+    estado = punto.leer() or {}
+    punto.confirmar(**{**estado, "fragmentos": numero, "casos": inicio + casos, "completo": True})
+    return Resumen(casos, inicio + casos, numero, desde if confirmado else None)
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m calculos.continuo",
+        description="Procesamiento en flujo continuo y reanudable de archivos de casos muy grandes")
+    subparsers = parser.add_subparsers(dest="modo", required=True)
+    for modo, ayuda in AYUDAS.items():
+        sub = subparsers.add_parser(modo, help=ayuda, description=ayuda)
+        sub.add_argument("entrada", help="CSV o Parquet de casos")
+        sub.add_argument("salida", help="CSV, o directorio .parquet de partes")
+        sub.add_argument("--fragmento", type=int, default=FRAGMENTO,
+                         help="Casos por fragmento (la memoria depende de esto, no del archivo)")
+        sub.add_argument("--profundidad", type=int, default=PROFUNDIDAD,
+                         help="Fragmentos que el lector puede adelantar al cálculo")
+        sub.add_argument("--reanudar", action="store_true",
+                         help="Seguir desde el último fragmento confirmado de una ejecución anterior")
+        agregar_opciones_calculo(sub, modo)
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    if args.modo != "conduccion":
+        propiedades.configurar_interpolacion(args.interpolacion)
+    if args.fragmento < 1 or args.profundidad < 1:
+        print("Error: --fragmento y --profundidad deben ser positivos", file=sys.stderr)
+        return 1
+    inicio = time.perf_counter()
+    try:
+        r = procesar(args.modo, args.entrada, args.salida, args, args.fragmento, args.reanudar, args.profundidad)
+    except (ValueError, KeyError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    duracion = time.perf_counter() - inicio
+    if r.reanudado_desde is not None:
+        print(f"Reanudado desde el fragmento {r.reanudado_desde} ({r.total - r.casos} casos ya confirmados)")
+    print(f"{r.casos} casos procesados en {duracion:.2f} s ({r.fragmentos} fragmentos, {r.total} casos en "
+          f"total) -> {args.salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
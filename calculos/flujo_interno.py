@@ -0,0 +1,164 @@
+"""Motor vectorizado de convección interna forzada en tubos a temperatura de pared constante.
+
+`calcular_flujo_interno` parte de una temperatura de salida conocida;
+`resolver_temperatura_salida` la obtiene cerrando el balance de energía.
+"""
+import numpy as np
+
+from .propiedades import escalar_propiedades, interpolar_casos
+
+RE_LAMINAR = 2300
+RE_TURBULENTO = 10000
+NU_LAMINAR = 3.66
+
+# Tolerancia (relativa a |T_pared - T_entrada|) e iteraciones máximas del
+# solucionador de T_salida
+TOL_SALIDA = 1e-10
+MAX_ITER_SALIDA = 100
+
+# Códigos de régimen devueltos en el campo "regimen"
+LAMINAR = 0
+TRANSICION = 1
+TURBULENTO = 2
+
+NOMBRES_REGIMEN = {LAMINAR: "Laminar", TRANSICION: "Transición", TURBULENTO: "Turbulento"}
+
+
+def diferencia_media_logaritmica(T_entrada, T_salida, T_pared):
+    """ΔT_ml con el caso ΔT1 = ΔT2 resuelto sin dividir por cero"""
+    dT1 = np.abs(np.asarray(T_pared, dtype=float) - T_entrada)
+    dT2 = np.abs(np.asarray(T_pared, dtype=float) - T_salida)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dTml = (dT2 - dT1) / np.log(dT2 / dT1)
+    return np.where(dT1 == dT2, dT1, dTml)
+
+
+def nusselt_tubo(Re, Pr, n):
+    """Nu = 3.66 en laminar, Dittus-Boelter Nu = 0.023 Re^0.8 Pr^n en los demás casos"""
+    Re = np.asarray(Re, dtype=float)
+    return np.where(Re < RE_LAMINAR, NU_LAMINAR, 0.023 * Re ** 0.8 * Pr ** n)
+
+
+def calcular_flujo_interno(T_entrada, T_salida, T_pared, V, D, L, fluido, fase=None, factores_propiedades=None):
+    """Convección interna con T_salida conocida, para uno o muchos casos (SI, °C)"""
+    T_entrada, T_salida, T_pared, V, D, L = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (T_entrada, T_salida, T_pared, V, D, L)))
+
+    TML = diferencia_media_logaritmica(T_entrada, T_salida, T_pared)
+    T_pelicula = (T_entrada + T_salida) / 2
+    props = escalar_propiedades(interpolar_casos(fluido, fase, T_pelicula), factores_propiedades)
+
+    Re = V * D * props["rho"] / props["mu"]
+    regimen = np.select([Re < RE_LAMINAR, Re < RE_TURBULENTO], [LAMINAR, TRANSICION], TURBULENTO)
+    # Exponente de Dittus-Boelter: 0.4 calentamiento, 0.3 enfriamiento
+    n = np.where(T_salida > T_entrada, 0.4, 0.3)
+    Nu = nusselt_tubo(Re, props["pr"], n)
+
+    h = Nu * props["k"] / D
+    A = np.pi * D * L
+    return {
+        "T_pelicula": T_pelicula,
+        "TML": TML,
+        **props,
+        "Re": Re,
+        "regimen": regimen,
+        "n": n,
+        "Nu": Nu,
+        "h": h,
+        "A": A,
+        "q": h * A * TML,
+    }
+
+
+def _tomar(valor, mascara):
+    """Subconjunto de un argumento que puede ser escalar o arreglo por caso"""
+    return valor if np.ndim(valor) == 0 else valor[mascara]
+
+
+def _salida_balance(T_salida, T_entrada, T_pared, V, D, L, fluido, fase, factores_propiedades=None):
+    """T_salida que cierra el balance con propiedades a la temperatura media dada.
+
+    Con pared a temperatura constante, h·A·ΔT_ml = ṁ·cp·(T_s - T_e) equivale a
+    T_s = T_p - (T_p - T_e)·exp(-h·A / (ṁ·cp)).
+    """
+    props = escalar_propiedades(interpolar_casos(fluido, fase, (T_entrada + T_salida) / 2),
+                                factores_propiedades)
+    Re = V * D * props["rho"] / props["mu"]
+    n = np.where(T_pared > T_entrada, 0.4, 0.3)
+    h = nusselt_tubo(Re, props["pr"], n) * props["k"] / D
+    m = props["rho"] * V * np.pi * D ** 2 / 4
+    return T_pared - (T_pared - T_entrada) * np.exp(-h * np.pi * D * L / (m * props["cp"]))
+
+
+def resolver_temperatura_salida(T_entrada, T_pared, V, D, L, fluido, fase=None,
+                                tol=TOL_SALIDA, max_iter=MAX_ITER_SALIDA, factores_propiedades=None):
+    """T_salida consistente con el balance de energía para uno o muchos tubos (SI, °C).
+
+    Itera a la vez la temperatura de salida, las propiedades a la temperatura
+    media y h (3.66 o Dittus-Boelter) con el método de la secante acotada sobre
+    F(T) = g(T) - T, todos los tubos en bloque; cada iteración solo reevalúa
+    los tubos que aún no convergieron. Devuelve los campos de
+    `calcular_flujo_interno` más T_salida, m (kg/s), q_conveccion (h·A·ΔT_ml),
+    iteraciones y convergido; aquí q es ṁ·cp·|T_salida - T_entrada|.
+    """
+    forma = np.broadcast_shapes(*(np.shape(v) for v in (T_entrada, T_pared, V, D, L)),
+                                np.shape(fluido), np.shape(fase),
+                                *(np.shape(f) for f in (factores_propiedades or {}).values()))
+    # Se trabaja en 1-D para poder enmascarar también el caso escalar
+    T_entrada, T_pared, V, D, L = (np.broadcast_to(np.asarray(v, dtype=float), forma).ravel()
+                                   for v in (T_entrada, T_pared, V, D, L))
+    if np.ndim(fluido) > 0:
+        fluido = np.broadcast_to(np.asarray(fluido, dtype=str), forma).ravel()
+    if np.ndim(fase) > 0:
+        fase = np.broadcast_to(np.asarray(fase, dtype=str), forma).ravel()
+    factores = {p: np.broadcast_to(np.asarray(f, dtype=float), forma).ravel()
+                for p, f in (factores_propiedades or {}).items()}
+    bajo = np.minimum(T_entrada, T_pared)
+    alto = np.maximum(T_entrada, T_pared)
+
+    def g(T, mascara):
+        return _salida_balance(T, T_entrada[mascara], T_pared[mascara], V[mascara],
+                               D[mascara], L[mascara], _tomar(fluido, mascara),
+                               _tomar(fase, mascara), {p: f[mascara] for p, f in factores.items()})
+
+    # F >= 0 en el extremo inferior y F <= 0 en el superior, porque g(T) siempre
+    # cae entre T_entrada y T_pared: la raíz queda acotada desde el inicio.
+    lo, hi = bajo.copy(), alto.copy()
+    tol = tol * (alto - bajo)
+
+    # Primer paso: punto fijo desde T_salida = T_entrada
+    todos = np.ones(T_entrada.shape, dtype=bool)
+    T_ant = T_entrada.copy()
+    F_ant = g(T_ant, todos) - T_ant
+    T = T_ant + F_ant
+    iteraciones = np.ones(T_entrada.shape, dtype=int)
+    activos = np.abs(F_ant) > tol
+    T[~activos] = T_ant[~activos]
+
+    for _ in range(max_iter):
+        if not activos.any():
+            break
+        t, t_ant, f_ant = T[activos], T_ant[activos], F_ant[activos]
+        f = g(t, activos) - t
+        a = np.where(f > 0, t, lo[activos])
+        b = np.where(f > 0, hi[activos], t)
+        lo[activos], hi[activos] = a, b
+        with np.errstate(divide="ignore", invalid="ignore"):
+            nuevo = t - f * (t - t_ant) / (f - f_ant)
+        # Si la secante degenera o sale del intervalo se biseca; así también se
+        # converge en el salto de Nu entre laminar y turbulento (Re = 2300)
+        nuevo = np.where(np.isfinite(nuevo) & (nuevo > a) & (nuevo < b), nuevo, (a + b) / 2)
+        cerrado = np.abs(f) <= tol[activos]
+        T_ant[activos], F_ant[activos] = t, f
+        T[activos] = np.where(cerrado, t, nuevo)
+        iteraciones[activos] += 1
+        activos[activos] = ~cerrado & (b - a > tol[activos])
+
+    resultado = calcular_flujo_interno(T_entrada, T, T_pared, V, D, L, fluido, fase, factores)
+    m = resultado["rho"] * V * np.pi * D ** 2 / 4
+    # q del balance de energía; q_conveccion = h·A·ΔT_ml coincide con él salvo
+    # cuando la salida alcanza la pared (ΔT_ml -> 0) o en el salto de Re = 2300
+    resultado.update(T_salida=T, m=m, q_conveccion=resultado["q"],
+                     q=m * resultado["cp"] * np.abs(T - T_entrada),
+                     iteraciones=iteraciones, convergido=~activos)
+    return {c: v.reshape(forma) for c, v in resultado.items()}
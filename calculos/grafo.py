@@ -0,0 +1,167 @@
+"""Grafo de dependencias con memoización por nodo para recálculos incrementales.
+
+Cada nodo es una función cuyas dependencias son los nombres de sus parámetros:
+otros nodos del grafo o entradas de la ejecución. Una MemoriaGrafo guarda el
+último valor de cada nodo con la versión de sus dependencias, de modo que en
+una nueva ejecución solo se recalculan los nodos cuyas entradas cambiaron.
+Si un nodo recalculado produce el mismo valor, sus dependientes se reutilizan.
+Los nodos se evalúan a demanda: lo que nadie pide no se calcula.
+"""
+import inspect
+import time
+from collections import namedtuple
+
+import numpy as np
+
+ENTRADA = "entrada"
+ENTRADA_MODIFICADA = "entrada modificada"
+RECALCULADO = "recalculado"
+REUTILIZADO = "reutilizado"
+
+Traza = namedtuple("Traza", "nodo estado duracion")
+_Registro = namedtuple("_Registro", "valor version firma")
+
+
+def iguales(a, b):
+    """Igualdad de valores de nodos: escalares, arreglos (NaN = NaN), dicts y tuplas"""
+    if a is b:
+        return True
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        try:
+            return np.shape(a) == np.shape(b) and np.array_equal(a, b, equal_nan=True)
+        except TypeError:
+            return np.shape(a) == np.shape(b) and np.array_equal(a, b)
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(iguales(a[k], b[k]) for k in a)
+    if isinstance(a, (tuple, list)) and type(a) is type(b):
+        return len(a) == len(b) and all(map(iguales, a, b))
+    if isinstance(a, float) and isinstance(b, float) and a != a and b != b:
+        return True
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        return False
+
+
+class MemoriaGrafo:
+    """Último valor y versión de cada nodo; se conserva entre ejecuciones (p. ej. en la sesión)"""
+
+    def __init__(self):
+        self._registros = {}
+        self._version = 0
+
+    def _nueva_version(self):
+        self._version += 1
+        return self._version
+
+    def limpiar(self):
+        self._registros.clear()
+
+
+class Grafo:
+    def __init__(self):
+        self._nodos = {}
+
+    def agregar(self, nombre, funcion, dependencias=None):
+        """Registra un nodo; por defecto sus dependencias son los parámetros de `funcion`"""
+        if dependencias is None:
+            dependencias = tuple(inspect.signature(funcion).parameters)
+        self._nodos[nombre] = (funcion, tuple(dependencias))
+        return funcion
+
+    def nodo(self, funcion):
+        """Decorador: el nombre de la función es el nombre del nodo"""
+        return self.agregar(funcion.__name__, funcion)
+
+    def dependencias(self, nombre):
+        return self._nodos[nombre][1]
+
+    @property
+    def nodos(self):
+        return tuple(self._nodos)
+
+    def ejecutar(self, memoria, **entradas):
+        return Ejecucion(self, memoria, entradas)
+
+
+class Ejecucion:
+    """Una pasada del grafo con entradas fijas; `ejecucion[nombre]` calcula o reutiliza"""
+
+    def __init__(self, grafo, memoria, entradas):
+        self.grafo = grafo
+        self.memoria = memoria
+        self.traza = []
+        self._versiones = {}
+        self._en_curso = set()
+        for nombre, valor in entradas.items():
+            if nombre in grafo._nodos:
+                raise ValueError(f"'{nombre}' es un nodo del grafo, no una entrada")
+            previo = memoria._registros.get(nombre)
+            if previo is not None and iguales(previo.valor, valor):
+                version, estado = previo.version, ENTRADA
+            else:
+                version, estado = memoria._nueva_version(), ENTRADA_MODIFICADA
+            memoria._registros[nombre] = _Registro(valor, version, None)
+            self._versiones[nombre] = version
+            self.traza.append(Traza(nombre, estado, 0.0))
+        self._entradas = set(entradas)
+
+    def __getitem__(self, nombre):
+        self._resolver(nombre)
+        return self.memoria._registros[nombre].valor
+
+    def _resolver(self, nombre):
+        if nombre in self._versiones:
+            return self._versiones[nombre]
+        if nombre not in self.grafo._nodos:
+            raise KeyError(f"Falta la entrada o el nodo '{nombre}'")
+        if nombre in self._en_curso:
+            raise ValueError(f"Ciclo en el grafo de cálculo en el nodo '{nombre}'")
+
+        self._en_curso.add(nombre)
+        funcion, dependencias = self.grafo._nodos[nombre]
+        firma = tuple(self._resolver(d) for d in dependencias)
+        self._en_curso.discard(nombre)
+
+        previo = self.memoria._registros.get(nombre)
+        if previo is not None and previo.firma == firma:
+            self.traza.append(Traza(nombre, REUTILIZADO, 0.0))
+            self._versiones[nombre] = previo.version
+            return previo.version
+
+        inicio = time.perf_counter()
+        valor = funcion(*(self.memoria._registros[d].valor for d in dependencias))
+        duracion = time.perf_counter() - inicio
+        # Corte temprano: un valor igual conserva la versión y no invalida a los dependientes
+        if previo is not None and iguales(previo.valor, valor):
+            version = previo.version
+        else:
+            version = self.memoria._nueva_version()
+        self.memoria._registros[nombre] = _Registro(valor, version, firma)
+        self.traza.append(Traza(nombre, RECALCULADO, duracion))
+        self._versiones[nombre] = version
+        return version
+
+    def estado(self, nombre):
+        """Estado del nodo en esta ejecución, o None si no se pidió"""
+        for t in self.traza:
+            if t.nodo == nombre:
+                return t.estado
+        return None
+
+    def dot(self):
+        """Grafo en formato DOT coloreado según el estado de cada nodo en esta ejecución"""
+        colores = {ENTRADA: "#d6eaf8", ENTRADA_MODIFICADA: "#5dade2", RECALCULADO: "#f8c471",
+                   REUTILIZADO: "#abebc6", None: "#ffffff"}
+        lineas = ["digraph {", "  rankdir=LR;",
+                  '  node [shape=box, style="rounded,filled", fontname="sans-serif"];']
+        entradas = sorted(self._entradas | {d for n in self.grafo._nodos for d in self.grafo.dependencias(n)
+                                            if d not in self.grafo._nodos})
+        for nombre in entradas:
+            lineas.append(f'  "{nombre}" [shape=ellipse, fillcolor="{colores[self.estado(nombre)]}"];')
+        for nombre in self.grafo._nodos:
+            lineas.append(f'  "{nombre}" [fillcolor="{colores[self.estado(nombre)]}"];')
+            for dependencia in self.grafo.dependencias(nombre):
+                lineas.append(f'  "{dependencia}" -> "{nombre}";')
+        lineas.append("}")
+        return "\n".join(lineas)
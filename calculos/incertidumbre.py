@@ -0,0 +1,272 @@
+"""Propagación de incertidumbre por Monte Carlo, por fragmentos de memoria acotada.
+
+Cada entrada se describe con su valor nominal, su tolerancia y una
+distribución; las muestras se evalúan con los mismos motores vectorizados de
+las páginas, un fragmento a la vez, y de cada fragmento solo se conserva un
+resumen: momentos, extremos y un histograma fino del que salen los
+percentiles. La memoria depende del tamaño del fragmento, no del número de
+muestras, así que 10⁷ muestras caben en el mismo presupuesto que 10⁵:
+
+    entradas = {"V": Entrada(5.0, 0.05, relativa=True), "D": Entrada(0.02, 0.0005),
+                "T_fluido": 25.0, "T_superficie": Entrada(80.0, 1.0, UNIFORME),
+                **errores_propiedades(0.02)}
+    r = propagar(CILINDRO, entradas, n=10_000_000, fluido="aire")
+    r.percentiles[2.5], r.percentiles[97.5], r.histograma
+
+Los errores de tabla multiplican las propiedades del fluido (ver
+`propiedades.escalar_propiedades`).
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from .cilindro_externo import CHURCHILL, calcular_cilindro_externo
+from .conduccion import calcular_conduccion
+from .flujo_interno import calcular_flujo_interno, resolver_temperatura_salida
+from .placa_plana import calcular_placa_plana
+from .propiedades import PROPIEDADES_BASE
+
+NORMAL = "normal"
+UNIFORME = "uniforme"
+TRIANGULAR = "triangular"
+DISTRIBUCIONES = (NORMAL, UNIFORME, TRIANGULAR)
+
+CONDUCCION = "conduccion"
+PLACA = "placa"
+CILINDRO = "cilindro"
+TUBO = "tubo"
+
+SEMILLA = 20240611
+PERCENTILES = (0.5, 2.5, 5.0, 25.0, 50.0, 75.0, 95.0, 97.5, 99.5)
+MEMORIA_MB = 256
+FRAGMENTO_MIN = 10_000
+# Celdas del histograma fino que resume cada fragmento y barras del histograma que se informa
+RESOLUCION = 8192
+BARRAS = 60
+# El histograma informado cubre estos percentiles; las colas quedan fuera
+RANGO_HISTOGRAMA = (0.1, 99.9)
+
+# Tolerancia: desviación estándar (normal) o semiancho (uniforme y triangular, simétricas)
+Entrada = namedtuple("Entrada", ["nominal", "tolerancia", "distribucion", "relativa"],
+                     defaults=(0.0, NORMAL, False))
+
+ResultadoIncertidumbre = namedtuple("ResultadoIncertidumbre", [
+    "n",            # muestras evaluadas
+    "validas",      # muestras con q finito (las demás caen fuera de las correlaciones o de la física)
+    "nominal",      # q con todas las entradas en su valor nominal
+    "media",
+    "desviacion",
+    "minimo",
+    "maximo",
+    "percentiles",  # {percentil: q}
+    "histograma",   # (bordes, conteos) entre los percentiles de RANGO_HISTOGRAMA
+    "fragmento",    # muestras por fragmento
+])
+
+
+def errores_propiedades(tolerancia, distribucion=NORMAL):
+    """Entradas de error relativo de la tabla, independientes, para rho, mu, k y cp"""
+    return {f"error_{p}": Entrada(1.0, tolerancia, distribucion, relativa=True) for p in PROPIEDADES_BASE}
+
+
+def muestrear(entrada, n, rng):
+    """n muestras de una Entrada; un número se toma como valor fijo"""
+    if not isinstance(entrada, Entrada):
+        return np.float64(entrada)
+    if entrada.distribucion not in DISTRIBUCIONES:
+        raise ValueError(f"Distribución desconocida: {entrada.distribucion!r} "
+                         f"(se admite {', '.join(DISTRIBUCIONES)})")
+    escala = entrada.tolerancia * (abs(entrada.nominal) if entrada.relativa else 1.0)
+    if escala == 0:
+        return np.float64(entrada.nominal)
+    if entrada.distribucion == NORMAL:
+        ruido = rng.standard_normal(n)
+    elif entrada.distribucion == UNIFORME:
+        ruido = rng.uniform(-1.0, 1.0, n)
+    else:
+        ruido = rng.triangular(-1.0, 0.0, 1.0, n)
+    return entrada.nominal + escala * ruido
+
+
+def cuantiles(entrada, u):
+    """Valores de la Entrada en las probabilidades u ∈ (0, 1) (inversa de la distribución)"""
+    if not isinstance(entrada, Entrada):
+        return np.full(np.shape(u), float(entrada))
+    escala = entrada.tolerancia * (abs(entrada.nominal) if entrada.relativa else 1.0)
+    u = np.asarray(u, dtype=float)
+    if entrada.distribucion == NORMAL:
+        from scipy.special import ndtri
+        ruido = ndtri(u)
+    elif entrada.distribucion == UNIFORME:
+        ruido = 2 * u - 1
+    elif entrada.distribucion == TRIANGULAR:
+        ruido = np.where(u < 0.5, np.sqrt(2 * u) - 1, 1 - np.sqrt(2 * (1 - u)))
+    else:
+        raise ValueError(f"Distribución desconocida: {entrada.distribucion!r} "
+                         f"(se admite {', '.join(DISTRIBUCIONES)})")
+    return entrada.nominal + escala * ruido
+
+
+def _factores(m):
+    return {p: m[f"error_{p}"] for p in PROPIEDADES_BASE if f"error_{p}" in m}
+
+
+def _q_conduccion(m, geometria, capas, area=1.0, longitud=1.0, r_i=None):
+    n = max(np.size(v) for v in m.values())
+    e = np.column_stack([np.broadcast_to(m[f"e{i}"], (n,)) for i in range(1, capas + 1)])
+    k = np.column_stack([np.broadcast_to(m[f"k{i}"], (n,)) for i in range(1, capas + 1)])
+    # Espesores y conductividades no positivos no son paredes: la muestra entera se descarta como inválida.
+    # El NaN solo evita evaluar esas capas; el motor lo tomaría como relleno (R = 0) y daría un q válido.
+    fisicas = (e > 0) & (k > 0)
+    q = calcular_conduccion(geometria, m["T1"], m["T2"], np.where(fisicas, e, np.nan), k, area, longitud, r_i,
+                            np.maximum(m.get("h_in", 0.0), 0.0), np.maximum(m.get("h_out", 0.0), 0.0))["q"]
+    return np.where(fisicas.all(axis=1), q, np.nan)
+
+
+def _q_placa(m, fluido, fase=None, presion_kpa=None):
+    return calcular_placa_plana(m["L"], m["b"], m["V"], m["T_s"], m["T_inf"], fluido, fase, presion_kpa,
+                                _factores(m))["q"]
+
+
+def _q_cilindro(m, fluido, fase=None, correlacion=CHURCHILL):
+    return calcular_cilindro_externo(m["T_fluido"], m["T_superficie"], m["V"], m["D"], m["L"], fluido, fase,
+                                     correlacion, _factores(m))["q"]
+
+
+def _q_tubo(m, fluido, fase=None):
+    # Sin T_salida, cada muestra cierra su propio balance de energía
+    if "T_salida" in m:
+        return calcular_flujo_interno(m["T_entrada"], m["T_salida"], m["T_pared"], m["V"], m["D"], m["L"],
+                                      fluido, fase, _factores(m))["q"]
+    return resolver_temperatura_salida(m["T_entrada"], m["T_pared"], m["V"], m["D"], m["L"], fluido, fase,
+                                       factores_propiedades=_factores(m))["q"]
+
+
+MODELOS = {CONDUCCION: _q_conduccion, PLACA: _q_placa, CILINDRO: _q_cilindro, TUBO: _q_tubo}
+# Arreglos de float64 vivos por muestra durante una evaluación (estimación para el tamaño del fragmento)
+ARREGLOS_POR_MUESTRA = {CONDUCCION: 40, PLACA: 48, CILINDRO: 40, TUBO: 80}
+
+
+def tamano_fragmento(modelo, n_entradas, memoria_mb=MEMORIA_MB):
+    """Muestras por fragmento para no pasar de memoria_mb en la evaluación"""
+    por_muestra = 8 * (ARREGLOS_POR_MUESTRA[modelo] + n_entradas)
+    return max(FRAGMENTO_MIN, int(memoria_mb * 2 ** 20 // por_muestra))
+
+
+class ResumenFlujo:
+    """Momentos, extremos e histograma fino de una secuencia de fragmentos.
+
+    Las celdas se fijan con el primer fragmento (su rango ampliado a cada lado
+    en la mitad de su ancho); los valores que caen fuera se guardan tal cual,
+    así que los percentiles de las colas son exactos.
+    """
+
+    def __init__(self, resolucion=RESOLUCION):
+        self.resolucion = resolucion
+        self.n = self.validas = 0
+        self.media = self._m2 = 0.0
+        self.minimo, self.maximo = np.inf, -np.inf
+        self.conteos = np.zeros(resolucion, dtype=np.int64)
+        self.lo = self.ancho = None
+        self._fuera = []
+
+    def agregar(self, valores):
+        valores = np.asarray(valores, dtype=float).ravel()
+        self.n += valores.size
+        valores = valores[np.isfinite(valores)]
+        if not valores.size:
+            return
+        # Fusión de momentos de Chan et al.
+        n_a, n_b = self.validas, valores.size
+        media_b = valores.mean()
+        delta = media_b - self.media
+        total = n_a + n_b
+        self.media += delta * n_b / total
+        self._m2 += ((valores - media_b) ** 2).sum() + delta ** 2 * n_a * n_b / total
+        self.validas = total
+        self.minimo, self.maximo = min(self.minimo, valores.min()), max(self.maximo, valores.max())
+
+        if self.lo is None:
+            lo, hi = valores.min(), valores.max()
+            margen = (hi - lo) / 2 or max(abs(lo) * 1e-6, 1e-12)
+            self.lo, self.ancho = lo - margen, (hi - lo + 2 * margen) / self.resolucion
+        celdas = np.floor((valores - self.lo) / self.ancho)
+        dentro = (celdas >= 0) & (celdas < self.resolucion)
+        self.conteos += np.bincount(celdas[dentro].astype(np.intp), minlength=self.resolucion)
+        if not dentro.all():
+            self._fuera.append(valores[~dentro])
+
+    @property
+    def desviacion(self):
+        return np.sqrt(self._m2 / (self.validas - 1)) if self.validas > 1 else np.nan
+
+    def percentiles(self, ps):
+        """Percentiles interpolando dentro de las celdas; exactos en las colas guardadas"""
+        fuera = np.sort(np.concatenate(self._fuera)) if self._fuera else np.empty(0)
+        bajos, altos = fuera[fuera < self.lo], fuera[fuera >= self.lo]
+        acumulado = np.concatenate([[0], np.cumsum(self.conteos)]) + bajos.size
+        resultado = {}
+        for p in ps:
+            if not self.validas:
+                resultado[p] = np.nan
+                continue
+            rango = p / 100 * self.validas
+            if rango <= bajos.size and bajos.size:
+                resultado[p] = bajos[min(int(rango), bajos.size - 1)]
+            elif rango >= acumulado[-1] and altos.size:
+                resultado[p] = altos[min(int(rango - acumulado[-1]), altos.size - 1)]
+            else:
+                i = min(max(np.searchsorted(acumulado, rango, side="right") - 1, 0), self.resolucion - 1)
+                fraccion = (rango - acumulado[i]) / self.conteos[i] if self.conteos[i] else 0.0
+                resultado[p] = self.lo + (i + fraccion) * self.ancho
+        return resultado
+
+    def histograma(self, barras=BARRAS, rango=RANGO_HISTOGRAMA):
+        """(bordes, conteos) reagrupando las celdas finas entre dos percentiles"""
+        inferior, superior = self.percentiles(rango).values()
+        if not np.isfinite(inferior) or superior <= inferior:
+            return np.array([self.minimo, self.maximo]), np.array([self.validas])
+        bordes = np.linspace(inferior, superior, barras + 1)
+        centros = self.lo + (np.arange(self.resolucion) + 0.5) * self.ancho
+        conteos, _ = np.histogram(centros, bordes, weights=self.conteos)
+        if self._fuera:
+            conteos += np.histogram(np.concatenate(self._fuera), bordes)[0]
+        return bordes, conteos.astype(np.int64)
+
+
+def propagar(modelo, entradas, n=1_000_000, semilla=SEMILLA, memoria_mb=MEMORIA_MB, fragmento=None,
+             percentiles=PERCENTILES, progreso=None, **fijos):
+    """Distribución de q (W) para las entradas inciertas del modelo.
+
+    `entradas` asocia cada entrada del modelo a una Entrada o a un número
+    fijo; `fijos` son los argumentos no numéricos (fluido, fase, geometría,
+    capas, correlación...). Cada fragmento usa su propia semilla derivada de
+    `semilla`, de modo que el resultado es reproducible. `progreso(hechas, n)`
+    se llama tras cada fragmento.
+    """
+    if modelo not in MODELOS:
+        raise ValueError(f"Modelo desconocido: {modelo!r} (se admite {', '.join(MODELOS)})")
+    evaluar = MODELOS[modelo]
+    n = int(n)
+    fragmento = int(fragmento or tamano_fragmento(modelo, len(entradas), memoria_mb))
+    nominal = evaluar({c: np.atleast_1d(np.float64(e.nominal if isinstance(e, Entrada) else e))
+                       for c, e in entradas.items()}, **fijos)
+
+    resumen = ResumenFlujo()
+    inicios = range(0, n, fragmento)
+    semillas = np.random.SeedSequence(semilla).spawn(len(inicios))
+    for inicio, semilla_fragmento in zip(inicios, semillas):
+        tamano = min(fragmento, n - inicio)
+        rng = np.random.default_rng(semilla_fragmento)
+        muestras = {c: muestrear(e, tamano, rng) for c, e in entradas.items()}
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            q = np.broadcast_to(evaluar(muestras, **fijos), (tamano,))
+        resumen.agregar(q)
+        if progreso is not None:
+            progreso(inicio + tamano, n)
+
+    return ResultadoIncertidumbre(
+        n=resumen.n, validas=resumen.validas, nominal=float(np.asarray(nominal).ravel()[0]),
+        media=resumen.media if resumen.validas else np.nan, desviacion=resumen.desviacion,
+        minimo=resumen.minimo, maximo=resumen.maximo, percentiles=resumen.percentiles(percentiles),
+        histograma=resumen.histograma(), fragmento=fragmento)
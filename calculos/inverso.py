@@ -0,0 +1,275 @@
+"""Diseño inverso: velocidad, diámetro o longitud que logran un q o un h objetivo.
+
+Cada caso de un arreglo se resuelve por separado pero en bloque:
+
+    r = inverso_tubo(5000.0, "V", T_entrada=25, T_salida=50, T_pared=100,
+                     D=0.05, L=2, fluido="agua saturada", fase="líquido")
+    r["V"], r["estado"], r["iteraciones"]
+
+Las correlaciones cambian de rama en Re = 2300 / 10000 (tubo), 5·10⁵ (placa)
+y en los límites de la tabla compacta (cilindro). Como las propiedades se
+evalúan a una temperatura que no depende de la incógnita, Re es proporcional
+a ella y esos cambios caen en puntos conocidos: se agregan a un barrido
+logarítmico del intervalo, se toma el primer tramo donde el residuo cambia de
+signo y se refina con regula falsi (Illinois) en escala logarítmica, con
+bisección como respaldo. Si el objetivo cae dentro de un salto de la
+correlación, el intervalo se cierra sobre el salto y el caso se marca SALTO.
+"""
+import numpy as np
+
+from . import cilindro_externo, flujo_interno, placa_plana
+from .propiedades import interpolar_casos
+
+# Intervalo de búsqueda por defecto de cada incógnita (SI)
+LIMITES = {"V": (1e-4, 1e3), "D": (1e-5, 10.0), "L": (1e-4, 1e3)}
+
+PUNTOS_BARRIDO = 16
+TOL_INVERSO = 1e-9       # residuo relativo al objetivo
+TOL_X = 1e-12            # ancho relativo mínimo del intervalo
+MAX_ITER_INVERSO = 100
+
+MAGNITUDES = ("q", "h")
+
+# Códigos de diagnóstico devueltos en el campo "estado"
+CONVERGIDO = 0
+SALTO = 1
+FUERA_DE_ALCANCE = 2
+NO_CONVERGIO = 3
+
+NOMBRES_ESTADO = {
+    CONVERGIDO: "Convergido",
+    SALTO: "Objetivo dentro de un salto de régimen",
+    FUERA_DE_ALCANCE: "Objetivo fuera de alcance en el intervalo",
+    NO_CONVERGIO: "Sin convergencia",
+}
+
+
+def _tomar(valor, casos):
+    """Valores de los casos indicados de un argumento que puede ser escalar o arreglo por caso"""
+    return valor if np.ndim(valor) == 0 else valor[casos]
+
+
+def resolver_acotado(evaluar, objetivo, lo, hi, cortes=None, tol=TOL_INVERSO,
+                     max_iter=MAX_ITER_INVERSO, puntos=PUNTOS_BARRIDO):
+    """x en [lo, hi] con evaluar(x, casos) = objetivo, para cada caso (arreglos 1-D).
+
+    `evaluar(x, casos)` recibe los valores de prueba y el índice del caso al
+    que corresponde cada uno (puede repetirse) y devuelve la magnitud en cada
+    punto. `cortes` (casos × k, NaN = sin corte) son los valores de x donde la
+    función cambia de rama; el barrido los incluye para que cada tramo
+    refinado sea suave. Se devuelve la primera raíz (la de menor x).
+    """
+    objetivo = np.asarray(objetivo, dtype=float)
+    n = objetivo.size
+    lo = np.broadcast_to(np.asarray(lo, dtype=float), (n,))
+    hi = np.broadcast_to(np.asarray(hi, dtype=float), (n,))
+
+    X = lo[:, None] * (hi / lo)[:, None] ** np.linspace(0.0, 1.0, puntos)
+    if cortes is not None:
+        cortes = np.asarray(cortes, dtype=float).reshape(n, -1)
+        dentro = (cortes > lo[:, None]) & (cortes < hi[:, None])
+        # Los cortes fuera del intervalo repiten el extremo superior: un tramo vacío
+        X = np.sort(np.concatenate([X, np.where(dentro, cortes, hi[:, None])], axis=1), axis=1)
+
+    casos = np.repeat(np.arange(n), X.shape[1])
+    with np.errstate(all="ignore"):
+        F = evaluar(X.ravel(), casos).reshape(X.shape) - objetivo[:, None]
+    finitos = np.isfinite(F)
+    # Magnitud mínima y máxima halladas en el barrido (NaN si ningún punto es válido)
+    alcance_min = np.where(finitos.any(axis=1), np.where(finitos, F, np.inf).min(axis=1), np.nan)
+    alcance_max = np.where(finitos.any(axis=1), np.where(finitos, F, -np.inf).max(axis=1), np.nan)
+    cambio = finitos[:, :-1] & finitos[:, 1:] & (np.sign(F[:, :-1]) * np.sign(F[:, 1:]) <= 0)
+    tiene_raiz = cambio.any(axis=1)
+    j = np.argmax(cambio, axis=1)
+    filas = np.arange(n)
+    a, b = X[filas, j], X[filas, j + 1]
+    fa, fb = F[filas, j], F[filas, j + 1]
+
+    escala = tol * np.abs(objetivo)
+    x = np.where(np.abs(fa) <= np.abs(fb), a, b)
+    f = np.where(np.abs(fa) <= np.abs(fb), fa, fb)
+    iteraciones = np.ones(n, dtype=int)
+    estado = np.where(tiene_raiz, NO_CONVERGIO, FUERA_DE_ALCANCE)
+    estado[tiene_raiz & (np.abs(f) <= escala)] = CONVERGIDO
+    activos = estado == NO_CONVERGIO
+    # Extremo conservado en la iteración anterior (-1 a, +1 b) para el ajuste de Illinois
+    lado = np.zeros(n, dtype=np.int8)
+    # Veces seguidas que se ha conservado ese extremo
+    racha = np.zeros(n, dtype=int)
+
+    for _ in range(max_iter):
+        if not activos.any():
+            break
+        ia, ib, ifa, ifb = a[activos], b[activos], fa[activos], fb[activos]
+        la, lb = np.log(ia), np.log(ib)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = lb - ifb * (lb - la) / (ifb - ifa)
+        # Fuera del intervalo, sin pendiente o con el mismo extremo conservado dos veces
+        # seguidas (junto a un salto Illinois apenas acerca el otro): bisección geométrica
+        secante = np.isfinite(t) & (t > la) & (t < lb) & (racha[activos] < 2)
+        t = np.where(secante, t, (la + lb) / 2)
+        xt = np.exp(t)
+        with np.errstate(all="ignore"):
+            ft = evaluar(xt, np.flatnonzero(activos)) - objetivo[activos]
+        iteraciones[activos] += 1
+
+        # Un NaN dentro del tramo (p. ej. hueco de la tabla compacta) se trata como
+        # si tuviera el signo de b, así el intervalo se acerca a la rama finita de a
+        ft_signo = np.where(np.isfinite(ft), ft, ifb)
+        hacia_a = np.sign(ft_signo) == np.sign(ifa)
+        l = lado[activos]
+        # Illinois: si se conserva el mismo extremo dos veces, se reduce su residuo a la mitad
+        nfa = np.where(hacia_a, ft_signo, np.where(l == -1, ifa / 2, ifa))
+        nfb = np.where(hacia_a, np.where(l == 1, ifb / 2, ifb), ft_signo)
+        a[activos] = np.where(hacia_a, xt, ia)
+        b[activos] = np.where(hacia_a, ib, xt)
+        fa[activos], fb[activos] = nfa, nfb
+        nuevo_lado = np.where(hacia_a, 1, -1)
+        racha[activos] = np.where(nuevo_lado == l, racha[activos] + 1, 1)
+        lado[activos] = nuevo_lado
+
+        mejor = np.isfinite(ft) & (np.abs(ft) <= np.abs(f[activos]))
+        x[activos] = np.where(mejor, xt, x[activos])
+        f[activos] = np.where(mejor, ft, f[activos])
+
+        resuelto = np.abs(f[activos]) <= escala[activos]
+        cerrado = b[activos] - a[activos] <= TOL_X * b[activos]
+        sub = estado[activos]
+        sub[resuelto] = CONVERGIDO
+        # El intervalo se cerró sin alcanzar el objetivo: la función salta por encima de él
+        sub[cerrado & ~resuelto] = SALTO
+        estado[activos] = sub
+        activos[activos] = ~(resuelto | cerrado)
+
+    x = np.where(estado == FUERA_DE_ALCANCE, np.nan, x)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        residuo = np.where(estado == FUERA_DE_ALCANCE, np.nan, f / objetivo)
+    return {
+        "x": x,
+        "residuo": residuo,
+        "iteraciones": iteraciones,
+        "estado": estado,
+        "convergido": estado == CONVERGIDO,
+        "alcance_min": alcance_min + objetivo,
+        "alcance_max": alcance_max + objetivo,
+    }
+
+
+def _aplanar(entradas, objetivo):
+    """Forma común y entradas en 1-D; texto y None escalares se dejan tal cual"""
+    forma = np.broadcast_shapes(np.shape(objetivo), *(np.shape(v) for v in entradas.values()
+                                                      if v is not None))
+    planas = {}
+    for nombre, valor in entradas.items():
+        if valor is None or (np.ndim(valor) == 0 and isinstance(valor, str)):
+            planas[nombre] = valor
+        else:
+            tipo = str if np.asarray(valor).dtype.kind in "UO" else float
+            planas[nombre] = np.broadcast_to(np.asarray(valor, dtype=tipo), forma).ravel()
+    objetivo = np.broadcast_to(np.asarray(objetivo, dtype=float), forma).ravel()
+    return forma, planas, objetivo
+
+
+def _resolver_motor(calcular, entradas, incognita, objetivo, magnitud, limites, cortes, tol, max_iter):
+    if magnitud not in MAGNITUDES:
+        raise ValueError(f"Magnitud objetivo desconocida: {magnitud!r}")
+    entradas = dict(entradas, **{incognita: 1.0})
+    forma, planas, objetivo = _aplanar(entradas, objetivo)
+    lo, hi = limites or LIMITES[incognita]
+    if not 0 < lo < hi:
+        raise ValueError(f"Intervalo de búsqueda no válido para {incognita}: ({lo}, {hi})")
+
+    def evaluar(x, casos):
+        argumentos = {k: _tomar(v, casos) for k, v in planas.items()}
+        argumentos[incognita] = x
+        return calcular(**argumentos)[magnitud]
+
+    solucion = resolver_acotado(evaluar, objetivo, lo, hi,
+                                None if cortes is None else cortes(planas), tol, max_iter)
+    # Estado final del motor con la incógnita hallada (NaN donde no hay solución)
+    with np.errstate(all="ignore"):
+        resultado = calcular(**dict(planas, **{incognita: solucion["x"]}))
+    resultado.update({incognita: solucion.pop("x"), "objetivo": objetivo, **solucion})
+    return {c: np.reshape(v, forma) for c, v in resultado.items()}
+
+
+def _validar_incognita(incognita, admitidas):
+    if incognita not in admitidas:
+        raise ValueError(f"Incógnita no válida: {incognita!r} (se admite {', '.join(admitidas)})")
+
+
+def inverso_placa(objetivo, incognita, L, b, V, T_s, T_inf, fluido, fase=None, presion_kpa=None,
+                  magnitud="q", limites=None, tol=TOL_INVERSO, max_iter=MAX_ITER_INVERSO):
+    """V o L de una placa plana que dan el q (W) o h (W/m²·K) objetivo.
+
+    El argumento de la incógnita se ignora (puede ser None). Devuelve los campos
+    de `calcular_placa_plana` en la solución más la incógnita y el diagnóstico
+    de `resolver_acotado`.
+    """
+    _validar_incognita(incognita, ("V", "L"))
+
+    def cortes(e):
+        # Re_L por unidad de V·L, con la misma corrección de presión del motor
+        props = interpolar_casos(e["fluido"], e["fase"], (e["T_s"] + e["T_inf"]) / 2)
+        with np.errstate(divide="ignore"):
+            por_unidad = (placa_plana.reynolds_placa(props, 1.0, 1.0, e["fluido"], e["presion_kpa"])
+                          * e["L" if incognita == "V" else "V"])
+            return np.array([placa_plana.RE_CRITICO, placa_plana.RE_MAXIMO]) / por_unidad[:, None]
+
+    entradas = {"L": L, "b": b, "V": V, "T_s": T_s, "T_inf": T_inf, "fluido": fluido, "fase": fase,
+                "presion_kpa": presion_kpa}
+    return _resolver_motor(placa_plana.calcular_placa_plana, entradas, incognita, objetivo,
+                           magnitud, limites, cortes, tol, max_iter)
+
+
+def inverso_cilindro(objetivo, incognita, T_fluido, T_superficie, V, D, L, fluido, fase=None,
+                     correlacion=cilindro_externo.CHURCHILL, magnitud="q", limites=None,
+                     tol=TOL_INVERSO, max_iter=MAX_ITER_INVERSO):
+    """V, D o L de un cilindro en flujo cruzado que dan el q o h objetivo"""
+    _validar_incognita(incognita, ("V", "D", "L"))
+
+    def cortes(e):
+        # Churchill-Bernstein es suave; la tabla compacta cambia de C y m en cada límite de Re_D
+        if correlacion != cilindro_externo.COMPACTA or incognita == "L":
+            return None
+        re_min, re_max, _, _ = cilindro_externo.cargar_coeficientes()
+        props = interpolar_casos(e["fluido"], e["fase"], (e["T_fluido"] + e["T_superficie"]) / 2)
+        por_unidad = props["rho"] * e["D" if incognita == "V" else "V"] / props["mu"]
+        return np.unique(np.concatenate([re_min, re_max])) / por_unidad[:, None]
+
+    def calcular(**argumentos):
+        return cilindro_externo.calcular_cilindro_externo(**argumentos, correlacion=correlacion)
+
+    entradas = {"T_fluido": T_fluido, "T_superficie": T_superficie, "V": V, "D": D, "L": L,
+                "fluido": fluido, "fase": fase}
+    return _resolver_motor(calcular, entradas, incognita, objetivo, magnitud, limites,
+                           cortes, tol, max_iter)
+
+
+def inverso_tubo(objetivo, incognita, T_entrada, T_salida, T_pared, V, D, L, fluido, fase=None,
+                 magnitud="q", limites=None, tol=TOL_INVERSO, max_iter=MAX_ITER_INVERSO):
+    """V, D o L de un tubo a temperatura de pared constante que dan el q o h objetivo.
+
+    Con T_salida conocida se usa `calcular_flujo_interno`; con `T_salida=None`
+    cada evaluación cierra el balance de energía (`resolver_temperatura_salida`).
+    En ese caso las propiedades dependen de la incógnita y los cortes de Re no
+    se conocen de antemano: un salto en Re = 2300 se detecta al cerrarse el
+    intervalo y se informa como SALTO.
+    """
+    _validar_incognita(incognita, ("V", "D", "L"))
+    entradas = {"T_entrada": T_entrada, "T_pared": T_pared, "V": V, "D": D, "L": L,
+                "fluido": fluido, "fase": fase}
+    if T_salida is None:
+        return _resolver_motor(flujo_interno.resolver_temperatura_salida, entradas, incognita,
+                               objetivo, magnitud, limites, None, tol, max_iter)
+
+    def cortes(e):
+        if incognita == "L":
+            return None
+        props = interpolar_casos(e["fluido"], e["fase"], (e["T_entrada"] + e["T_salida"]) / 2)
+        por_unidad = props["rho"] * e["D" if incognita == "V" else "V"] / props["mu"]
+        return np.array([flujo_interno.RE_LAMINAR, flujo_interno.RE_TURBULENTO]) / por_unidad[:, None]
+
+    entradas["T_salida"] = T_salida
+    return _resolver_motor(flujo_interno.calcular_flujo_interno, entradas, incognita, objetivo,
+                           magnitud, limites, cortes, tol, max_iter)
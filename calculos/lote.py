@@ -0,0 +1,530 @@
+"""Ejecución por lotes (sin navegador) de las cuatro calculadoras.
+
+Lee un CSV o Parquet de casos, una fila por caso, con columnas anotadas con su
+unidad entre corchetes (sin unidad se asume SI y °C):
+
+    python -m calculos.lote placa casos.csv resultados.csv
+    python -m calculos.lote cilindro casos.parquet resultados.parquet --correlacion compacta
+    python -m calculos.lote tubo casos.csv resultados.csv
+    python -m calculos.lote conduccion paredes.csv resultados.csv --geometria Cilíndrica
+
+Ejemplo de encabezado para placa:  L [in],b [in],V [ft/s],T_s [°F],T_inf [°F],fluido,fase
+
+El archivo se procesa por fragmentos, de modo que la memoria no depende del
+número de casos. La salida contiene las columnas de entrada seguidas de los
+mismos resultados que el reporte TXT de cada página. En modo tubo, los casos
+sin T_salida la obtienen cerrando el balance de energía.
+
+Para estudios de millones de casos conviene Parquet (requiere pyarrow): el
+cálculo es mucho más rápido que el formateo de texto que exige un CSV.
+
+Para archivos de decenas de GB, con lectura en segundo plano y la posibilidad
+de reanudar una ejecución interrumpida, ver `calculos.continuo`.
+
+Con `--reportes reportes.zip` se escribe además el reporte TXT de cada caso,
+con la misma plantilla que la página, directamente en un ZIP comprimido:
+
+    python -m calculos.lote placa casos.csv resultados.csv --reportes reportes.zip
+
+`--interpolacion pchip` interpola las propiedades de los fluidos con cúbicas
+monótonas en lugar de rectas entre filas de la tabla (lineal por defecto).
+
+Los resultados de cada fragmento se guardan en la caché persistente de
+`calculos.cache_resultados` (la misma que usan las páginas): repetir un lote
+con los mismos casos y las mismas tablas no recalcula nada. `--sin-cache` la
+desactiva y `--cache-mb` acota su tamaño en disco.
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import cache_resultados, placa_plana, cilindro_externo, flujo_interno, conduccion, propiedades, reportes
+from .cache_resultados import calcular
+from .unidades import a_si, unidad_si
+
+# Campos numéricos de entrada de cada modo: nombre -> (dimensión, valor por defecto o None si es obligatorio)
+CAMPOS = {
+    "placa": {
+        "L": ("longitud", None), "b": ("longitud", None), "V": ("velocidad", None),
+        "T_s": ("temperatura", None), "T_inf": ("temperatura", None),
+        "presion": ("presion", np.nan),
+    },
+    "cilindro": {
+        "T_fluido": ("temperatura", None), "T_superficie": ("temperatura", None),
+        "V": ("velocidad", None), "D": ("longitud", None), "L": ("longitud", None),
+    },
+    "tubo": {
+        "T_entrada": ("temperatura", None), "T_salida": ("temperatura", np.nan),
+        "T_pared": ("temperatura", None), "V": ("velocidad", None),
+        "D": ("longitud", None), "L": ("longitud", None),
+    },
+    "conduccion": {
+        "T1": ("temperatura", None), "T2": ("temperatura", None),
+        "A": ("area", 1.0), "L": ("longitud", 1.0), "r_i": ("longitud", np.nan),
+        "h_in": ("coef_h", 0.0), "h_out": ("coef_h", 0.0),
+    },
+}
+
+# Columnas de texto de las entradas; el resto de los campos son numéricos
+CAMPOS_TEXTO = ("fluido", "fase", "geometria")
+
+PATRON_COLUMNA = re.compile(r"^\s*([^\[\]]+?)\s*(?:\[(.+)\])?\s*$")
+PATRON_CAPA = re.compile(r"^(e|k)(\d+)$")
+
+
+def separar_columna(nombre):
+    """'T_s [°F]' -> ('T_s', '°F'); 'T_s' -> ('T_s', None)"""
+    coincidencia = PATRON_COLUMNA.match(str(nombre))
+    return coincidencia.group(1), coincidencia.group(2)
+
+
+def columnas_si(df, campos):
+    """Extrae y convierte a SI los campos numéricos del fragmento"""
+    por_nombre = {separar_columna(c)[0]: c for c in df.columns}
+    datos = {}
+    for campo, (dimension, defecto) in campos.items():
+        if campo in por_nombre:
+            columna = por_nombre[campo]
+            unidad = separar_columna(columna)[1] or unidad_si(dimension)
+            valores = a_si(df[columna].to_numpy(), dimension, unidad)
+            if defecto is not None:
+                valores = np.where(np.isnan(valores), defecto, valores)
+            datos[campo] = valores
+        elif defecto is not None:
+            datos[campo] = np.full(len(df), defecto)
+        else:
+            raise ValueError(f"Falta la columna obligatoria {campo!r}")
+    return datos, por_nombre
+
+
+def tipos_csv(columnas):
+    """Tipos fijos de las columnas conocidas de un CSV de casos.
+
+    pandas infiere los tipos en cada fragmento por separado: una `fase` vacía
+    en todo un fragmento saldría como float y en el siguiente como texto, y los
+    fragmentos ya no compartirían el esquema de la salida Parquet.
+    """
+    numericos = {campo for campos in CAMPOS.values() for campo in campos}
+    tipos = {}
+    for columna in columnas:
+        nombre = separar_columna(columna)[0]
+        if nombre in CAMPOS_TEXTO:
+            tipos[columna] = str
+        elif nombre in numericos or PATRON_CAPA.match(nombre):
+            tipos[columna] = float
+    return tipos
+
+
+def columna_texto(df, por_nombre, campo, defecto=""):
+    if campo not in por_nombre:
+        return np.full(len(df), defecto, dtype=object)
+    return df[por_nombre[campo]].fillna(defecto).astype(str).str.strip().to_numpy()
+
+
+# --- Modos ---
+def ejecutar_placa(df, args):
+    datos, por_nombre = columnas_si(df, CAMPOS["placa"])
+    fluido = columna_texto(df, por_nombre, "fluido")
+    fase = columna_texto(df, por_nombre, "fase")
+    presion = datos["presion"]
+    r = calcular(
+        cache_resultados.PLACA, datos["L"], datos["b"], datos["V"], datos["T_s"], datos["T_inf"], fluido, fase,
+        presion_kpa=None if np.isnan(presion).all() else presion)
+    return pd.DataFrame({
+        "T_film [°C]": r["T_film"],
+        "mu [kg/m·s]": r["mu"], "k [W/m·K]": r["k"], "rho [kg/m³]": r["rho"],
+        "cp [J/kg·K]": r["cp"], "Pr": r["pr"],
+        "Re_L": r["Re_L"],
+        "regimen": pd.Series(r["regimen"]).map(placa_plana.NOMBRES_REGIMEN).to_numpy(),
+        "x_c [m]": r["x_c"],
+        "Nu": r["Nu"], "h [W/m²·K]": r["h"], "A [m²]": r["A"], "q [W]": r["q"],
+        "q_laminar [W]": r["q_lam"], "q_turbulento [W]": r["q_turb"],
+    })
+
+
+def ejecutar_cilindro(df, args):
+    datos, por_nombre = columnas_si(df, CAMPOS["cilindro"])
+    fluido = columna_texto(df, por_nombre, "fluido")
+    fase = columna_texto(df, por_nombre, "fase")
+    r = calcular(
+        cache_resultados.CILINDRO, datos["T_fluido"], datos["T_superficie"], datos["V"], datos["D"], datos["L"],
+        fluido, fase, correlacion=args.correlacion)
+    return pd.DataFrame({
+        "T_pelicula [°C]": r["T_pelicula"],
+        "rho [kg/m³]": r["rho"], "mu [kg/m·s]": r["mu"], "k [W/m·K]": r["k"],
+        "Pr": r["pr"], "cp [J/kg·K]": r["cp"],
+        "Re": r["Re"], "correlacion": args.correlacion,
+        "Nu": r["Nu"], "h [W/m²·K]": r["h"], "A [m²]": r["A"],
+        "dT [°C]": r["dT"], "q [W]": r["q"], "valido": r["valido"],
+    })
+
+
+def ejecutar_tubo(df, args):
+    datos, por_nombre = columnas_si(df, CAMPOS["tubo"])
+    fluido = columna_texto(df, por_nombre, "fluido")
+    fase = columna_texto(df, por_nombre, "fase")
+    r = calcular(
+        cache_resultados.TUBO, datos["T_entrada"], datos["T_salida"], datos["T_pared"],
+        datos["V"], datos["D"], datos["L"], fluido, fase)
+    r["T_salida"] = datos["T_salida"]
+    # Los casos sin T_salida se resuelven por balance de energía; ṁ, la convergencia
+    # y las iteraciones solo existen para ellos (vacíos en los demás casos)
+    sin_salida = np.isnan(datos["T_salida"])
+    m = np.full(len(df), np.nan)
+    convergido = pd.array([pd.NA] * len(df), dtype="boolean")
+    iteraciones = pd.array([pd.NA] * len(df), dtype="Int64")
+    if sin_salida.any():
+        balance = calcular(
+            cache_resultados.BALANCE_TUBO,
+            *(datos[c][sin_salida] for c in ("T_entrada", "T_pared", "V", "D", "L")),
+            fluido[sin_salida], fase[sin_salida])
+        for c in r:
+            r[c] = np.array(r[c])
+            r[c][sin_salida] = balance[c]
+        m[sin_salida] = balance["m"]
+        convergido[sin_salida] = balance["convergido"]
+        iteraciones[sin_salida] = balance["iteraciones"]
+    return pd.DataFrame({
+        "T_salida [°C]": r["T_salida"],
+        "T_pelicula [°C]": r["T_pelicula"], "TML [°C]": r["TML"],
+        "rho [kg/m³]": r["rho"], "mu [kg/m·s]": r["mu"], "k [W/m·K]": r["k"], "Pr": r["pr"],
+        "cp [J/kg·K]": r["cp"],
+        "Re": r["Re"],
+        "regimen": pd.Series(r["regimen"]).map(flujo_interno.NOMBRES_REGIMEN).to_numpy(),
+        "n": r["n"], "Nu": r["Nu"], "h [W/m²·K]": r["h"], "A [m²]": r["A"], "q [W]": r["q"],
+        "m [kg/s]": m, "convergido [-]": convergido, "iteraciones": iteraciones,
+    })
+
+
+def ejecutar_conduccion(df, args):
+    datos, por_nombre = columnas_si(df, CAMPOS["conduccion"])
+    geometrias = columna_texto(df, por_nombre, "geometria", args.geometria)
+
+    # Capas e1, k1, e2, k2, ...: cada una con su propia unidad
+    capas = sorted({int(m.group(2)) for c in por_nombre if (m := PATRON_CAPA.match(c))})
+    if not capas:
+        raise ValueError("Se requieren columnas de capas e1, k1, e2, k2, ...")
+    espesores = np.full((len(df), len(capas)), np.nan)
+    k = np.full((len(df), len(capas)), np.nan)
+    for j, capa in enumerate(capas):
+        for destino, campo, dimension in ((espesores, f"e{capa}", "longitud"),
+                                          (k, f"k{capa}", "conductividad")):
+            columna = por_nombre.get(campo)
+            if columna is None:
+                raise ValueError(f"Falta la columna {campo!r}")
+            unidad = separar_columna(columna)[1] or unidad_si(dimension)
+            destino[:, j] = a_si(df[columna].to_numpy(), dimension, unidad)
+
+    r = calcular(
+        cache_resultados.CONDUCCION, geometrias, datos["T1"], datos["T2"], espesores, k, area=datos["A"],
+        longitud=datos["L"], r_i=datos["r_i"], h_in=datos["h_in"], h_out=datos["h_out"])
+    salida = pd.DataFrame({
+        "R_conv_in [K/W]": r["R_conv_in"], "R_capas [K/W]": r["R_capas"],
+        "R_conv_out [K/W]": r["R_conv_out"], "R_total [K/W]": r["R_total"],
+        "q [W]": r["q"], "q_area [W/m²]": r["q_area"],
+    }, index=df.index)
+    for j, capa in enumerate(capas):
+        salida[f"R_capa{capa} [K/W]"] = r["R_capa"][:, j]
+    return salida
+
+
+EJECUTORES = {
+    "placa": ejecutar_placa,
+    "cilindro": ejecutar_cilindro,
+    "tubo": ejecutar_tubo,
+    "conduccion": ejecutar_conduccion,
+}
+
+
+# --- Reportes por caso ---
+# Cada columna puede venir en su propia unidad: los reportes de lote se escriben en SI y °C
+UNIDADES_REPORTE = {"unidad_temp": "°C", "unidad_longitud": "m", "unidad_velocidad": "m/s",
+                    "unidad_vel": "m/s", "unidad_dia": "m", "unidad_long": "m", "unidad_area": "m²",
+                    "unidad_radio": "m", "unidad_espesor": "m", "unidad_h": "W/m²·K",
+                    "unidad_flujo": "W", "unidad_flujo_area": "W/m²"}
+
+
+def contexto_placa(fila, e, args):
+    Re_L = fila["Re_L"]
+    if Re_L < 5e5:
+        regimen = "Laminar"
+    elif Re_L <= 1e7:
+        regimen = "Mixto o Turbulento"
+    else:
+        regimen = "Fuera de rango (Re > 10⁷)"
+
+    resultados = {}
+    nombre = fila["regimen"]
+    if nombre in ("Laminar", "Turbulento completo"):
+        resultados = {"numero_nusselt": fila["Nu"], "coeficiente_conveccion": fila["h [W/m²·K]"],
+                      "flujo_calor_total": fila["q [W]"]}
+    elif nombre == "Mixto":
+        resultados = {"longitud_critica": fila["x_c [m]"], "numero_nusselt_mixto": fila["Nu"],
+                      "coeficiente_conveccion_mixto": fila["h [W/m²·K]"],
+                      "flujo_laminar": fila["q_laminar [W]"], "flujo_turbulento": fila["q_turbulento [W]"],
+                      "flujo_mixto_total": fila["q [W]"]}
+    if resultados:
+        resultados.update(tipo_analisis=reportes.PROMEDIO, regimen=nombre, area_transferencia=fila["A [m²]"])
+
+    return {
+        **UNIDADES_REPORTE,
+        "fluido": e["fluido"], "estado": e["fase"] or "Fase única",
+        "T_inf": e["T_inf"], "T_s": e["T_s"], "V": e["V"], "L": e["L"], "b": e["b"],
+        "presion_kpa": None if np.isnan(e["presion"]) else e["presion"],
+        "T_film": fila["T_film [°C]"], "mu": fila["mu [kg/m·s]"], "k": fila["k [W/m·K]"],
+        "rho": fila["rho [kg/m³]"], "cp": fila["cp [J/kg·K]"], "pr": fila["Pr"],
+        "Re_L": Re_L, "regimen": regimen, "resultados": resultados,
+    }
+
+
+def contexto_cilindro(fila, e, args):
+    return {
+        **UNIDADES_REPORTE,
+        "fluido": e["fluido"], "fase": e["fase"] or "Monofásico",
+        "T_fluido": e["T_fluido"], "T_superficie": e["T_superficie"],
+        "velocidad": e["V"], "diametro": e["D"], "longitud": e["L"],
+        "correlacion": args.correlacion, "churchill": args.correlacion == cilindro_externo.CHURCHILL,
+        "T_pelicula": fila["T_pelicula [°C]"], "rho": fila["rho [kg/m³]"], "mu": fila["mu [kg/m·s]"],
+        "k": fila["k [W/m·K]"], "pr": fila["Pr"], "cp": fila["cp [J/kg·K]"],
+        "Re": fila["Re"], "Nu": fila["Nu"], "h": fila["h [W/m²·K]"], "A": fila["A [m²]"],
+        "dT": fila["dT [°C]"], "q": fila["q [W]"],
+    }
+
+
+def contexto_tubo(fila, e, args):
+    n = fila["n"]
+    return {
+        "fluido": e["fluido"], "fase": e["fase"] or None,
+        "T_entrada": e["T_entrada"], "T_salida": fila["T_salida [°C]"], "T_pared": e["T_pared"],
+        "velocidad": e["V"], "diametro": e["D"], "longitud": e["L"],
+        "regimen_termico": "Calentamiento (n=0.4)" if n == 0.4 else "Enfriamiento (n=0.3)",
+        # Como en la página: el origen de T_salida, ṁ y cp solo cuando viene del balance
+        "balance": None if pd.isna(fila["iteraciones"]) else {
+            "m": fila["m [kg/s]"], "cp": fila["cp [J/kg·K]"], "iteraciones": fila["iteraciones"],
+            "convergido": fila["convergido [-]"]},
+        "T_pelicula": fila["T_pelicula [°C]"], "TML": fila["TML [°C]"],
+        "rho": fila["rho [kg/m³]"], "mu": fila["mu [kg/m·s]"], "k": fila["k [W/m·K]"], "pr": fila["Pr"],
+        "Re": fila["Re"], "regimen": fila["regimen"], "Nu": fila["Nu"], "n": n,
+        "h": fila["h [W/m²·K]"], "A": fila["A [m²]"], "q": fila["q [W]"],
+    }
+
+
+def contexto_conduccion(fila, e, args):
+    geometria = e["geometria"] or args.geometria
+    radial = geometria != conduccion.PLANA and not np.isnan(e["r_i"])
+
+    # Las capas de espesor vacío no existen en esta pared
+    capas, r = [], e["r_i"]
+    for espesor, k in e["capas"]:
+        if np.isnan(espesor):
+            continue
+        capas.append({"n": len(capas) + 1, "material": f"Capa {len(capas) + 1}", "L": espesor, "k": k,
+                      "r_i": r if radial else None, "r_o": r + espesor if radial else None,
+                      "categoria": None, "k_tabla": "-"})
+        r += espesor
+
+    R = {c: fila[f"{c} [K/W]"] for c in ("R_conv_in", "R_capas", "R_conv_out", "R_total")}
+    return {
+        **UNIDADES_REPORTE,
+        "titulo": reportes.TITULOS_CONDUCCION[geometria].upper(), "geometria": geometria,
+        "n_capas": len(capas), "T1": e["T1"], "T2": e["T2"], "A_total": e["A"], "L_cil": e["L"],
+        "usar_conveccion": bool(e["h_in"] > 0 or e["h_out"] > 0), "h_in": e["h_in"], "h_out": e["h_out"],
+        "capas": capas, **R,
+        "pct_conv_in": R["R_conv_in"] / R["R_total"] * 100,
+        "pct_capas": R["R_capas"] / R["R_total"] * 100,
+        "pct_conv_out": R["R_conv_out"] / R["R_total"] * 100,
+        "dT": e["T1"] - e["T2"],
+        "q": fila["q [W]"], "q_unidad": fila["q [W]"], "q_area_unidad": fila["q_area [W/m²]"],
+        "A_ref": e["A"],
+    }
+
+
+CONTEXTOS = {
+    "placa": contexto_placa,
+    "cilindro": contexto_cilindro,
+    "tubo": contexto_tubo,
+    "conduccion": contexto_conduccion,
+}
+
+
+def _entradas_si(fragmento, modo):
+    """Entradas del fragmento en SI (convertidas en bloque) y campos de texto, por columna"""
+    datos, por_nombre = columnas_si(fragmento, CAMPOS[modo])
+    for campo in CAMPOS_TEXTO:
+        datos[campo] = columna_texto(fragmento, por_nombre, campo)
+    if modo == "conduccion":
+        capas = sorted({int(m.group(2)) for c in por_nombre if (m := PATRON_CAPA.match(c))})
+        espesor, k = (np.column_stack([
+            a_si(fragmento[por_nombre[f"{prefijo}{capa}"]].to_numpy(), dimension,
+                 separar_columna(por_nombre[f"{prefijo}{capa}"])[1] or unidad_si(dimension))
+            for capa in capas]).tolist() for prefijo, dimension in (("e", "longitud"), ("k", "conductividad")))
+        datos["capas"] = [tuple(zip(fila_e, fila_k)) for fila_e, fila_k in zip(espesor, k)]
+    return datos
+
+
+def reportes_de_lote(modo, fragmentos, args):
+    """Pares (nombre, texto) del reporte de cada caso, generados de a uno por vez"""
+    plantilla, contexto = reportes.PLANTILLAS[modo], CONTEXTOS[modo]
+    for fragmento in fragmentos:
+        entradas = _entradas_si(fragmento, modo)
+        campos, columnas = list(entradas), list(fragmento.columns)
+        for indice, valores, valores_si in zip(fragmento.index, fragmento.itertuples(index=False, name=None),
+                                              zip(*(entradas[c] for c in campos))):
+            fila, e = dict(zip(columnas, valores)), dict(zip(campos, valores_si))
+            yield f"{modo}_{indice:08d}.txt", reportes.generar(plantilla, contexto(fila, e, args))
+
+
+# --- Entrada / salida por fragmentos ---
+def _pyarrow_parquet():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Leer o escribir Parquet requiere instalar pyarrow") from None
+    return pq
+
+
+def leer_fragmentos(ruta, tamano):
+    """Fragmentos con el número de fila global como índice (los reportes se nombran con él)"""
+    ruta = Path(ruta)
+    if ruta.suffix.lower() == ".parquet":
+        pq = _pyarrow_parquet()
+        inicio = 0
+        for lote in pq.ParquetFile(ruta).iter_batches(batch_size=tamano):
+            # Cada lote de pyarrow empieza su índice en 0
+            fragmento = lote.to_pandas()
+            fragmento.index = pd.RangeIndex(inicio, inicio + len(fragmento))
+            inicio += len(fragmento)
+            yield fragmento
+    else:
+        columnas = pd.read_csv(ruta, nrows=0).columns
+        yield from pd.read_csv(ruta, chunksize=tamano, dtype=tipos_csv(columnas))
+
+
+class EscritorResultados:
+    """Escribe los fragmentos a CSV o Parquet a medida que se calculan"""
+
+    def __init__(self, ruta):
+        self.ruta = Path(ruta)
+        self.parquet = self.ruta.suffix.lower() == ".parquet"
+        self._escritor = None
+        self._primero = True
+
+    def escribir(self, df):
+        if self.parquet:
+            import pyarrow as pa
+            pq = _pyarrow_parquet()
+            tabla = pa.Table.from_pandas(df, preserve_index=False)
+            if self._escritor is None:
+                self._escritor = pq.ParquetWriter(self.ruta, tabla.schema)
+            else:
+                # Columnas ajenas a los campos conocidos pueden inferirse distinto en cada fragmento
+                tabla = tabla.cast(self._escritor.schema)
+            self._escritor.write_table(tabla)
+        else:
+            df.to_csv(self.ruta, mode="w" if self._primero else "a",
+                      header=self._primero, index=False, float_format="%.10g")
+        self._primero = False
+
+    def cerrar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+
+
+def procesar(modo, entrada, salida, args, tamano=1_000_000, ruta_reportes=None):
+    """Procesa el archivo completo y devuelve el número de casos"""
+    ejecutor = EJECUTORES[modo]
+    escritor = EscritorResultados(salida)
+    total = 0
+
+    def fragmentos_resueltos():
+        nonlocal total
+        for fragmento in leer_fragmentos(entrada, tamano):
+            resultados = ejecutor(fragmento, args)
+            resultados.index = fragmento.index
+            completo = pd.concat([fragmento, resultados], axis=1)
+            escritor.escribir(completo)
+            total += len(fragmento)
+            yield completo
+
+    try:
+        if ruta_reportes is None:
+            for _ in fragmentos_resueltos():
+                pass
+        else:
+            # Cada fragmento se escribe y se reporta antes de leer el siguiente
+            reportes.escribir_zip(ruta_reportes, reportes_de_lote(modo, fragmentos_resueltos(), args))
+    finally:
+        escritor.cerrar()
+    return total
+
+
+AYUDAS = {
+    "placa": "Convección en flujo paralelo sobre placa plana",
+    "cilindro": "Convección externa en cilindros",
+    "tubo": "Convección interna forzada en tubos",
+    "conduccion": "Conducción unidimensional en capas",
+}
+
+
+def agregar_opciones_calculo(sub, modo):
+    """Opciones que cambian los resultados de un modo (compartidas con `calculos.continuo`)"""
+    if modo != "conduccion":
+        sub.add_argument("--interpolacion", default=propiedades.LINEAL,
+                         choices=propiedades.METODOS_INTERPOLACION,
+                         help="Interpolación de las propiedades del fluido")
+    if modo == "cilindro":
+        sub.add_argument("--correlacion", default=cilindro_externo.CHURCHILL,
+                         choices=[cilindro_externo.CHURCHILL, cilindro_externo.COMPACTA])
+    if modo == "conduccion":
+        sub.add_argument("--geometria", default=conduccion.PLANA, choices=conduccion.GEOMETRIAS,
+                         help="Geometría si el archivo no trae la columna 'geometria'")
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m calculos.lote",
+        description="Calculadora de transferencia de calor por lotes")
+    subparsers = parser.add_subparsers(dest="modo", required=True)
+
+    for modo, ayuda in AYUDAS.items():
+        sub = subparsers.add_parser(modo, help=ayuda, description=ayuda)
+        sub.add_argument("entrada", help="CSV o Parquet de casos")
+        sub.add_argument("salida", help="CSV o Parquet de resultados")
+        sub.add_argument("--fragmento", type=int, default=1_000_000,
+                         help="Casos por fragmento (controla la memoria)")
+        sub.add_argument("--reportes", metavar="ZIP",
+                         help="Escribe además el reporte TXT de cada caso en este ZIP")
+        sub.add_argument("--sin-cache", action="store_true",
+                         help="No leer ni guardar resultados en la caché persistente")
+        sub.add_argument("--cache-mb", type=float, default=cache_resultados.LIMITE_MB,
+                         help="Tamaño máximo de la caché persistente en MB")
+        agregar_opciones_calculo(sub, modo)
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    if args.modo != "conduccion":
+        propiedades.configurar_interpolacion(args.interpolacion)
+    cache = cache_resultados.configurar_cache(None if args.sin_cache else cache_resultados.RUTA_CACHE,
+                                              args.cache_mb)
+    inicio = time.perf_counter()
+    try:
+        total = procesar(args.modo, args.entrada, args.salida, args, args.fragmento, args.reportes)
+    except (ValueError, KeyError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    duracion = time.perf_counter() - inicio
+    print(f"{total} casos procesados en {duracion:.2f} s -> {args.salida}")
+    if cache is not None and cache.aciertos:
+        print(f"Caché: {cache.aciertos} de {cache.aciertos + cache.fallos} cálculos reutilizados")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""Motor vectorizado de convección en flujo paralelo sobre placa plana.
+
+Todas las funciones reciben escalares o arreglos de NumPy (unidades SI, °C) y
+evalúan todos los casos en una sola pasada, resolviendo las ramas de régimen
+con máscaras en lugar de if/else.
+"""
+import numpy as np
+
+from .grafo import Grafo
+from .propiedades import escalar_propiedades, interpolar_casos, normalizar_fluido
+
+RE_CRITICO = 5e5
+RE_MAXIMO = 1e7
+PR_MIN = 0.6
+PR_MAX = 60
+P_ATM_KPA = 101.325
+
+# Códigos de régimen devueltos en el campo "regimen"
+FUERA_DE_RANGO = -1
+LAMINAR = 0
+MIXTO = 1
+TURBULENTO = 2
+
+NOMBRES_REGIMEN = {
+    FUERA_DE_RANGO: "Fuera de rango",
+    LAMINAR: "Laminar",
+    MIXTO: "Mixto",
+    TURBULENTO: "Turbulento completo",
+}
+
+
+def _es_aire(fluidos, forma):
+    if np.ndim(fluidos) == 0:
+        return np.full(forma, normalizar_fluido(fluidos) == "aire")
+    fluidos = np.broadcast_to(np.asarray(fluidos, dtype=str), forma)
+    return np.char.startswith(np.char.lower(np.char.strip(fluidos)), "aire")
+
+
+def reynolds_placa(props, V, L, fluido, presion_kpa=None):
+    """Re_L con las propiedades dadas; con `presion_kpa` corrige la viscosidad del aire"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        Re_L = props["rho"] * V * L / props["mu"]
+        if presion_kpa is not None:
+            presion_kpa = np.asarray(presion_kpa, dtype=float)
+            nu = props["nu"] * P_ATM_KPA / presion_kpa
+            corregir = _es_aire(fluido, np.shape(Re_L)) & ~np.isnan(presion_kpa)
+            Re_L = np.where(corregir, V * L / nu, Re_L)
+    return Re_L
+
+
+def longitud_critica(props, V):
+    """Posición x_c donde Re_x alcanza RE_CRITICO"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return RE_CRITICO * props["mu"] / (props["rho"] * V)
+
+
+def regimen_placa(Re_L, Pr, x_c, L):
+    """Código de régimen promedio: LAMINAR, MIXTO, TURBULENTO o FUERA_DE_RANGO"""
+    laminar = (Re_L < RE_CRITICO) & (Pr > PR_MIN)
+    turbulento_valido = ((Re_L >= RE_CRITICO) & (Re_L <= RE_MAXIMO)
+                         & (Pr >= PR_MIN) & (Pr <= PR_MAX))
+    mixto = turbulento_valido & (x_c < L)
+    turbulento = turbulento_valido & ~mixto
+    return np.select([laminar, mixto, turbulento], [LAMINAR, MIXTO, TURBULENTO], FUERA_DE_RANGO)
+
+
+def nusselt_promedio(Re_L, Pr, regimen):
+    """Nu promedio de la correlación de cada régimen; NaN fuera de rango"""
+    with np.errstate(invalid="ignore"):
+        Pr_13 = np.cbrt(Pr)
+        Re_45 = Re_L ** 0.8
+        return np.select([regimen == LAMINAR, regimen == MIXTO, regimen == TURBULENTO], [
+            0.664 * np.sqrt(Re_L) * Pr_13,
+            (0.037 * Re_45 - 871) * Pr_13,
+            0.037 * Re_45 * Pr_13,
+        ], np.nan)
+
+
+def desglose_mixto(regimen, Pr, k, x_c, dT, b, q):
+    """(q_lam, q_turb) del régimen mixto: tramo laminar hasta x_c y resto turbulento"""
+    mixto = regimen == MIXTO
+    with np.errstate(divide="ignore", invalid="ignore"):
+        h_lam = 0.664 * np.sqrt(RE_CRITICO) * np.cbrt(Pr) * k / x_c
+        q_lam = np.where(mixto, h_lam * dT * x_c * b, np.nan)
+        q_turb = np.where(mixto, q - q_lam, np.nan)
+    return q_lam, q_turb
+
+
+def calcular_placa_plana(L, b, V, T_s, T_inf, fluido, fase=None, presion_kpa=None, factores_propiedades=None):
+    """Flujo de calor promedio sobre la placa para uno o muchos casos.
+
+    Si se indica `presion_kpa`, los casos con aire usan la viscosidad cinemática
+    corregida por presión para el Reynolds, igual que la página (NaN = sin corrección).
+    `factores_propiedades` aplica un error relativo a las propiedades de la
+    tabla (ver `escalar_propiedades`).
+    Devuelve un diccionario de arreglos con propiedades, Re_L, régimen, Nu, h y q.
+    """
+    L, b, V, T_s, T_inf = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (L, b, V, T_s, T_inf)))
+
+    T_film = (T_inf + T_s) / 2
+    props = escalar_propiedades(interpolar_casos(fluido, fase, T_film), factores_propiedades)
+    Re_L = reynolds_placa(props, V, L, fluido, presion_kpa)
+    x_c = longitud_critica(props, V)
+    regimen = regimen_placa(Re_L, props["pr"], x_c, L)
+    Nu = nusselt_promedio(Re_L, props["pr"], regimen)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        A = L * b
+        dT = T_s - T_inf
+        h = Nu * props["k"] / L
+        q = h * dT * A
+    q_lam, q_turb = desglose_mixto(regimen, props["pr"], props["k"], x_c, dT, b, q)
+
+    return {
+        "T_film": T_film,
+        **props,
+        "Re_L": Re_L,
+        "regimen": regimen,
+        "x_c": x_c,
+        "Nu": Nu,
+        "h": h,
+        "A": A,
+        "q": q,
+        "q_lam": q_lam,
+        "q_turb": q_turb,
+    }
+
+
+def nusselt_local(Re_x, Pr):
+    """Nu_x laminar (Re_x < 5e5) o turbulento, sin validar el rango"""
+    Re_x = np.asarray(Re_x, dtype=float)
+    Pr_13 = np.cbrt(Pr)
+    return np.where(Re_x < RE_CRITICO,
+                    0.332 * np.sqrt(Re_x) * Pr_13,
+                    0.0296 * Re_x ** 0.8 * Pr_13)
+
+
+def regimen_local(Re_x, Pr):
+    """LAMINAR, TURBULENTO o FUERA_DE_RANGO según la validez de la correlación local"""
+    Re_x = np.asarray(Re_x, dtype=float)
+    laminar = (Re_x < RE_CRITICO) & (Pr > PR_MIN)
+    turbulento = ((Re_x >= RE_CRITICO) & (Re_x <= RE_MAXIMO)
+                  & (Pr >= PR_MIN) & (Pr <= PR_MAX))
+    return np.select([laminar, turbulento], [LAMINAR, TURBULENTO], FUERA_DE_RANGO)
+
+
+def perfil_h_local(x, V, rho, mu, k, Pr):
+    """Curva h_x(x) a lo largo de la placa"""
+    x = np.asarray(x, dtype=float)
+    Re_x = rho * V * x / mu
+    return nusselt_local(Re_x, Pr) * k / x
+
+
+PUNTOS_CURVA_HX = 100
+
+
+def grafo_placa_plana():
+    """Cadena T_film → propiedades → Re_L → Nu → h → q (y la curva h_x) como grafo incremental.
+
+    Entradas: fluido, fase, T_s, T_inf, V, L, b y presion_kpa (None = sin
+    corrección). Cambiar solo el ancho b recalcula A, q y el desglose mixto.
+    """
+    grafo = Grafo()
+
+    @grafo.nodo
+    def T_film(T_s, T_inf):
+        return (T_inf + T_s) / 2
+
+    @grafo.nodo
+    def propiedades(fluido, fase, T_film):
+        return interpolar_casos(fluido, fase, T_film)
+
+    @grafo.nodo
+    def Re_L(propiedades, V, L, fluido, presion_kpa):
+        return reynolds_placa(propiedades, V, L, fluido, presion_kpa)
+
+    @grafo.nodo
+    def x_c(propiedades, V):
+        return longitud_critica(propiedades, V)
+
+    @grafo.nodo
+    def regimen(Re_L, propiedades, x_c, L):
+        return regimen_placa(Re_L, propiedades["pr"], x_c, L)
+
+    @grafo.nodo
+    def Nu(Re_L, propiedades, regimen):
+        return nusselt_promedio(Re_L, propiedades["pr"], regimen)
+
+    @grafo.nodo
+    def h(Nu, propiedades, L):
+        return Nu * propiedades["k"] / L
+
+    @grafo.nodo
+    def A(L, b):
+        return L * b
+
+    @grafo.nodo
+    def q(h, A, T_s, T_inf):
+        return h * (T_s - T_inf) * A
+
+    @grafo.nodo
+    def q_mixto(regimen, propiedades, x_c, T_s, T_inf, b, q):
+        return desglose_mixto(regimen, propiedades["pr"], propiedades["k"], x_c, T_s - T_inf, b, q)
+
+    @grafo.nodo
+    def curva_hx(propiedades, V, L):
+        x = np.linspace(0.001, L, PUNTOS_CURVA_HX)
+        return x, perfil_h_local(x, V, propiedades["rho"], propiedades["mu"], propiedades["k"],
+                                 propiedades["pr"])
+
+    return grafo
@@ -0,0 +1,394 @@
+"""Tablas de propiedades termofísicas de fluidos e interpolación vectorizada."""
+import threading
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+ARCHIVOS_FLUIDOS = {
+    "agua saturada": "tabla_a9.csv",
+    "refrigerante 134a": "tabla_a10.csv",
+    "amoniaco": "tabla_a11.csv",
+    "propano": "tabla_a12.csv",
+    "aire": "tabla_a15.csv",
+    "glicerina": "tabla_glicerina.csv",
+    "isobutano": "tabla_isobutano.csv",
+    "metano": "tabla_metano.csv",
+    "metanol": "tabla_metanol.csv",
+    "aceite para motor": "tabla_aceitemotor.csv"
+}
+
+FLUIDOS_CON_FASES = ("agua saturada", "refrigerante 134a", "amoniaco", "propano")
+FASES = ("líquido", "vapor")
+
+COLUMNA_T = "Temp. (°C)"
+
+# Nombre corto -> (nombre base de la columna, unidad)
+COLUMNAS = {
+    "rho": ("Densidad", "kg/m³"),
+    "mu": ("Viscosidad dinámica", "kg/m·s"),
+    "k": ("Conductividad térmica", "W/m·K"),
+    "cp": ("Calor específico", "J/kg·K"),
+    "pr": ("Número de Prandtl", None),
+}
+
+# Orden fijo de propiedades; "nu" (viscosidad cinemática) se calcula como mu/rho
+# cuando la tabla no la trae.
+PROPIEDADES = ("rho", "mu", "k", "cp", "pr", "nu")
+
+ARCHIVOS_MATERIALES = {
+    "Metales sólidos": "tabla_a3.csv",
+    "No metales sólidos": "tabla_a4.csv",
+    "Materiales de construcción": "tabla_a5.csv",
+    "Aislantes": "tabla_a6.csv"
+}
+
+# k (W/m·K), densidad (kg/m³) y calor específico (J/kg·K); NaN si la tabla no da un valor
+PROPIEDADES_MATERIALES = ("k", "rho", "cp")
+
+
+def normalizar_fluido(nombre):
+    """Acepta 'aire', 'Aire' o 'aire (tabla_a15.csv)' y devuelve la clave corta"""
+    clave = str(nombre).split("(")[0].strip().lower()
+    if clave not in ARCHIVOS_FLUIDOS:
+        raise ValueError(f"Fluido desconocido: {nombre!r}")
+    return clave
+
+
+def tiene_fases(fluido):
+    return normalizar_fluido(fluido) in FLUIDOS_CON_FASES
+
+
+def normalizar_fase(fluido, fase):
+    """Devuelve 'líquido'/'vapor' para fluidos bifásicos y None para los demás"""
+    if not tiene_fases(fluido):
+        return None
+    if fase is None:
+        raise ValueError(f"El fluido {fluido!r} requiere indicar la fase (líquido o vapor)")
+    clave = str(fase).strip().lower()
+    if clave not in FASES:
+        raise ValueError(f"Fase desconocida: {fase!r}")
+    return clave
+
+
+def nombre_columna(propiedad, fase=None):
+    base, unidad = COLUMNAS[propiedad]
+    nombre = f"{base} {fase}" if fase else base
+    return f"{nombre} ({unidad})" if unidad else nombre
+
+
+@lru_cache(maxsize=None)
+def almacen():
+    """Almacén binario compartido por todo el proceso (ver calculos.almacen)"""
+    from .almacen import abrir_almacen
+    return abrir_almacen()
+
+
+def cargar_tabla(fluido, fase=None):
+    """Devuelve (T, matriz) del fluido con columnas en el orden de PROPIEDADES.
+
+    Son vistas de solo lectura sobre el almacén en memoria mapeada, sin copias.
+    """
+    fluido = normalizar_fluido(fluido)
+    return _vista_tabla(fluido, normalizar_fase(fluido, fase))
+
+
+@lru_cache(maxsize=None)
+def _vista_tabla(fluido, fase):
+    T, matriz = almacen().tabla_fluido(fluido, fase)
+    return np.asarray(T), np.asarray(matriz)
+
+
+def tabla_materiales(categoria):
+    """(nombres, matriz) de una categoría con columnas en el orden de PROPIEDADES_MATERIALES"""
+    nombres, matriz = almacen().tabla_materiales(categoria)
+    return tuple(nombres), matriz
+
+
+def interpolar_fusionado(T_tabla, matriz, T):
+    """Interpola todas las columnas de `matriz` con una sola búsqueda del intervalo.
+
+    Equivale a aplicar np.interp columna por columna (con los extremos fijos fuera
+    de la tabla) pero recorre la tabla una sola vez. Devuelve forma T.shape + (columnas,).
+    """
+    T = np.asarray(T, dtype=float)
+    i = np.clip(np.searchsorted(T_tabla, T, side="right") - 1, 0, len(T_tabla) - 2)
+    pendientes = np.diff(matriz, axis=0) / np.diff(T_tabla)[:, None]
+    dT = (np.clip(T, T_tabla[0], T_tabla[-1]) - T_tabla[i])[..., None]
+
+    resultado = np.take(matriz, i, axis=0)
+    incremento = np.take(pendientes, i, axis=0)
+    # En un nodo exacto no se usa la pendiente (puede ser NaN si la fila siguiente lo es)
+    np.copyto(incremento, 0.0, where=dT == 0.0)
+    incremento *= dT
+    resultado += incremento
+    return resultado
+
+
+# --- Interpolación cúbica monótona (PCHIP) ---
+LINEAL = "lineal"
+PCHIP = "pchip"
+METODOS_INTERPOLACION = (LINEAL, PCHIP)
+
+# Método de todas las consultas que no indican uno; lineal salvo que se configure otro
+metodo_interpolacion = LINEAL
+
+
+def configurar_interpolacion(metodo):
+    """Cambia el método por defecto: "lineal" (np.interp) o "pchip" (cúbica monótona, derivada continua)"""
+    global metodo_interpolacion
+    if metodo not in METODOS_INTERPOLACION:
+        raise ValueError(f"Método de interpolación desconocido: {metodo!r}")
+    metodo_interpolacion = metodo
+    return metodo
+
+
+def _derivada_extremo(h0, h1, delta0, delta1):
+    # Fórmula de tres puntos no centrada, acotada para conservar la forma (como en SciPy)
+    d = ((2 * h0 + h1) * delta0 - h0 * delta1) / (h0 + h1)
+    if np.sign(d) != np.sign(delta0):
+        return 0.0
+    if np.sign(delta0) != np.sign(delta1) and abs(d) > 3 * abs(delta0):
+        return 3 * delta0
+    return d
+
+
+def _derivadas_pchip(h, delta):
+    """Derivadas nodales de Fritsch–Carlson de un tramo sin huecos"""
+    if len(h) == 1:
+        return np.array([delta[0], delta[0]])
+    d = np.empty(len(h) + 1)
+    w1, w2 = 2 * h[1:] + h[:-1], h[1:] + 2 * h[:-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        media = (w1 + w2) / (w1 / delta[:-1] + w2 / delta[1:])
+    # Media armónica ponderada si las pendientes vecinas tienen el mismo signo; si no, extremo local
+    d[1:-1] = np.where(delta[:-1] * delta[1:] > 0, media, 0.0)
+    d[0] = _derivada_extremo(h[0], h[1], delta[0], delta[1])
+    d[-1] = _derivada_extremo(h[-1], h[-2], delta[-1], delta[-2])
+    return d
+
+
+def coeficientes_pchip(T_tabla, matriz):
+    """Coeficientes (c0, c1, c2, c3) de cada intervalo y columna: forma (4, filas - 1, columnas).
+
+    En el intervalo i, p(T) = c0 + c1·dT + c2·dT² + c3·dT³ con dT = T - T_tabla[i].
+    Cada grado es un bloque contiguo, así que evaluar son cuatro lecturas de filas.
+    Cada columna se ajusta por tramos de valores finitos; los intervalos que tocan
+    un NaN conservan solo c0 (el valor del nodo), igual que la interpolación lineal.
+    """
+    T_tabla = np.asarray(T_tabla, dtype=float)
+    matriz = np.asarray(matriz, dtype=float)
+    coeficientes = np.full((4, len(T_tabla) - 1, matriz.shape[1]), np.nan)
+    coeficientes[0] = matriz[:-1]
+    for j in range(matriz.shape[1]):
+        finitos = np.isfinite(matriz[:, j])
+        # Tramos [a, b) de filas consecutivas con valor
+        bordes = np.flatnonzero(np.diff(np.concatenate(([0], finitos.view(np.int8), [0]))))
+        for a, b in zip(bordes[::2], bordes[1::2]):
+            if b - a < 2:
+                continue
+            T, y = T_tabla[a:b], matriz[a:b, j]
+            h = np.diff(T)
+            delta = np.diff(y) / h
+            d = _derivadas_pchip(h, delta)
+            coeficientes[1, a:b - 1, j] = d[:-1]
+            coeficientes[2, a:b - 1, j] = (3 * delta - 2 * d[:-1] - d[1:]) / h
+            coeficientes[3, a:b - 1, j] = (d[:-1] + d[1:] - 2 * delta) / h ** 2
+    return coeficientes
+
+
+def interpolar_pchip(T_tabla, coeficientes, T):
+    """Evalúa los polinomios de `coeficientes_pchip` con una búsqueda y Horner.
+
+    Mismo contrato que `interpolar_fusionado`: extremos fijos fuera de la tabla y
+    forma T.shape + (columnas,).
+    """
+    T = np.asarray(T, dtype=float)
+    i = np.clip(np.searchsorted(T_tabla, T, side="right") - 1, 0, len(T_tabla) - 2)
+    dT = (np.clip(T, T_tabla[0], T_tabla[-1]) - T_tabla[i])[..., None]
+
+    # Horner sobre un único arreglo de salida (take copia también con T escalar)
+    c0, c1, c2, c3 = coeficientes
+    resultado = c3.take(i, axis=0)
+    resultado *= dT
+    resultado += c2.take(i, axis=0)
+    resultado *= dT
+    resultado += c1.take(i, axis=0)
+    resultado *= dT
+    # En un nodo exacto solo cuenta el valor del nodo (el resto puede ser NaN junto a un hueco)
+    np.copyto(resultado, 0.0, where=dT == 0.0)
+    resultado += c0.take(i, axis=0)
+    return resultado
+
+
+@lru_cache(maxsize=None)
+def _coeficientes_tabla(fluido, fase):
+    # Una vez por tabla y proceso: las consultas solo buscan el intervalo y evalúan
+    coeficientes = coeficientes_pchip(*_vista_tabla(fluido, fase))
+    coeficientes.setflags(write=False)
+    return coeficientes
+
+
+def _interpolar_tabla(fluido, fase, T, metodo):
+    """Todas las columnas de la tabla (ya normalizada) a T, con el método pedido"""
+    metodo = metodo or metodo_interpolacion
+    T_tabla, matriz = _vista_tabla(fluido, fase)
+    if metodo == LINEAL:
+        return interpolar_fusionado(T_tabla, matriz, T)
+    if metodo == PCHIP:
+        return interpolar_pchip(T_tabla, _coeficientes_tabla(fluido, fase), T)
+    raise ValueError(f"Método de interpolación desconocido: {metodo!r}")
+
+
+def interpolar(fluido, T, fase=None, metodo=None):
+    """Interpola todas las propiedades de un fluido a las temperaturas T (°C)"""
+    fluido = normalizar_fluido(fluido)
+    valores = _interpolar_tabla(fluido, normalizar_fase(fluido, fase), T, metodo)
+    return {p: valores[..., j] for j, p in enumerate(PROPIEDADES)}
+
+
+# --- Memoización de consultas puntuales ---
+RegistroPropiedades = namedtuple("RegistroPropiedades", PROPIEDADES)
+
+
+class CacheInterpolacion:
+    """Caché LRU acotada de propiedades por (fluido, fase, temperatura cuantizada).
+
+    Con `cuanto` > 0 la temperatura se redondea al múltiplo más cercano de `cuanto`
+    (°C) y se interpola en ese punto, de modo que consultas cercanas comparten
+    entrada. Con `cuanto` = 0 la clave es la temperatura exacta.
+    """
+
+    def __init__(self, capacidad=4096, cuanto=0.0):
+        if capacidad < 1:
+            raise ValueError("La capacidad de la caché debe ser al menos 1")
+        if cuanto < 0:
+            raise ValueError("El cuanto de temperatura no puede ser negativo")
+        self.capacidad = capacidad
+        self.cuanto = cuanto
+        self._entradas = OrderedDict()
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def obtener(self, fluido, T, fase=None, metodo=None):
+        """Devuelve un RegistroPropiedades con todas las propiedades del fluido a T"""
+        fluido = normalizar_fluido(fluido)
+        fase = normalizar_fase(fluido, fase)
+        metodo = metodo or metodo_interpolacion
+        T = float(T)
+        if self.cuanto > 0:
+            paso = round(T / self.cuanto)
+            T = paso * self.cuanto
+            clave = (fluido, fase, paso, metodo)
+        else:
+            clave = (fluido, fase, T, metodo)
+
+        with self._candado:
+            registro = self._entradas.get(clave)
+            if registro is not None:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return registro
+            self.fallos += 1
+
+        registro = RegistroPropiedades(*_interpolar_tabla(fluido, fase, T, metodo).tolist())
+
+        with self._candado:
+            self._entradas[clave] = registro
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.capacidad:
+                self._entradas.popitem(last=False)
+                self.desalojos += 1
+        return registro
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "desalojos": self.desalojos,
+            "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+            "tasa_fallos": self.fallos / consultas if consultas else 0.0,
+            "entradas": len(self._entradas),
+            "capacidad": self.capacidad,
+            "cuanto": self.cuanto,
+        }
+
+    def limpiar(self):
+        """Vacía la caché y reinicia los contadores"""
+        with self._candado:
+            self._entradas.clear()
+            self.aciertos = self.fallos = self.desalojos = 0
+
+
+cache_propiedades = CacheInterpolacion()
+
+
+def configurar_cache(capacidad=None, cuanto=None):
+    """Reemplaza la caché global (p. ej. cuanto=0.01 °C para barridos extensos)"""
+    global cache_propiedades
+    cache_propiedades = CacheInterpolacion(
+        capacidad if capacidad is not None else cache_propiedades.capacidad,
+        cuanto if cuanto is not None else cache_propiedades.cuanto,
+    )
+    return cache_propiedades
+
+
+# Propiedades de la tabla que admiten un factor de error; nu y pr se derivan de ellas
+PROPIEDADES_BASE = ("rho", "mu", "k", "cp")
+
+
+def escalar_propiedades(props, factores=None):
+    """Propiedades multiplicadas por factores de error de la tabla (arreglos o escalares).
+
+    `factores` asocia rho, mu, k o cp a su factor (1 = valor de la tabla);
+    nu = mu/rho y pr = mu·cp/k se escalan en consecuencia.
+    """
+    if not factores:
+        return props
+    desconocidos = set(factores) - set(PROPIEDADES_BASE)
+    if desconocidos:
+        raise ValueError(f"Solo se admiten factores para {', '.join(PROPIEDADES_BASE)}: "
+                         f"{', '.join(sorted(desconocidos))}")
+    f = {p: np.asarray(factores.get(p, 1.0), dtype=float) for p in PROPIEDADES_BASE}
+    escaladas = {p: props[p] * f[p] for p in PROPIEDADES_BASE}
+    escaladas["nu"] = props["nu"] * f["mu"] / f["rho"]
+    escaladas["pr"] = props["pr"] * f["mu"] * f["cp"] / f["k"]
+    return escaladas
+
+
+def propiedades_en(fluido, T, fase=None, metodo=None):
+    """Consulta puntual memoizada: RegistroPropiedades(rho, mu, k, cp, pr, nu)"""
+    return cache_propiedades.obtener(fluido, T, fase, metodo)
+
+
+def interpolar_casos(fluidos, fases, T, metodo=None):
+    """Interpola propiedades cuando cada caso puede tener su propio fluido y fase.
+
+    `fluidos` y `fases` pueden ser escalares o arreglos que se difunden contra T.
+    """
+    T = np.asarray(T, dtype=float)
+    if np.ndim(fluidos) == 0 and np.ndim(fases) == 0:
+        return interpolar(fluidos, T, fases, metodo)
+
+    fluidos = np.broadcast_to(np.asarray(fluidos, dtype=str), T.shape)
+    fases = np.broadcast_to(np.asarray(fases, dtype=str), T.shape)
+    props = {p: np.full(T.shape, np.nan) for p in PROPIEDADES}
+
+    # Un solo recorrido por cada par (fluido, fase) distinto
+    nombres_f, idx_f = np.unique(fluidos, return_inverse=True)
+    nombres_s, idx_s = np.unique(fases, return_inverse=True)
+    codigos = (idx_f * len(nombres_s) + idx_s).reshape(T.shape)
+    for codigo in np.unique(codigos):
+        mascara = codigos == codigo
+        fluido = nombres_f[codigo // len(nombres_s)]
+        fase = nombres_s[codigo % len(nombres_s)]
+        parcial = interpolar(fluido, T[mascara], None if fase in ("", "None") else fase, metodo)
+        for p in PROPIEDADES:
+            props[p][mascara] = parcial[p]
+    return props
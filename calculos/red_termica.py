@@ -0,0 +1,361 @@
+"""Redes de resistencias térmicas en régimen estacionario (análisis nodal disperso).
+
+Los nodos se unen con resistencias de conducción (L / k·A), convección
+(1 / h·A), contacto (R''_c / A) o de valor directo, en cualquier topología:
+caminos en paralelo (montantes a través del aislante), resistencias de
+contacto y varias temperaturas de frontera. Con las conductancias G = 1/R se
+arma la matriz nodal dispersa y las temperaturas de los nodos libres salen de
+una sola solución lineal
+
+    G_ll · T_l = q_l - G_lf · T_f
+
+La factorización LU dispersa de G_ll (SciPy) se guarda: cambiar solo las
+temperaturas de frontera o las fuentes vuelve a resolver con la misma
+factorización, y varios escenarios se resuelven juntos como columnas:
+
+    red = RedTermica()
+    red.nodo("interior", T=20)
+    red.nodo("exterior", T=-10)
+    red.conveccion("interior", "pared_in", h=8, A=1)
+    red.conduccion("pared_in", "pared_out", L=0.09, k=0.04, A=0.9)    # aislante
+    red.conduccion("pared_in", "pared_out", L=0.09, k=0.12, A=0.1)    # montante
+    red.conveccion("pared_out", "exterior", h=25, A=1)
+    sol = red.resolver()                                   # sol.T, sol.flujos, sol.q_frontera
+    sol = red.resolver({"exterior": [-10, 0, 10]})         # tres escenarios, sin refactorizar
+
+Desde la terminal, con tablas de nodos y elementos (columnas con su unidad
+entre corchetes, como en `calculos.lote`):
+
+    python -m calculos.red_termica nodos.csv elementos.csv temperaturas.csv \\
+        --escenarios escenarios.csv --flujos flujos.csv
+
+SciPy se importa al factorizar, no al importar el módulo.
+"""
+import argparse
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+CONDUCCION = "conduccion"
+CONVECCION = "conveccion"
+CONTACTO = "contacto"
+RESISTENCIA = "resistencia"
+TIPOS = (CONDUCCION, CONVECCION, CONTACTO, RESISTENCIA)
+
+SolucionRed = namedtuple("SolucionRed", [
+    "T",           # (nodos,) o (nodos, escenarios), °C
+    "flujos",      # (elementos, ...) calor de origen a destino, W
+    "q_frontera",  # (fronteras, ...) calor que entra a la red por cada nodo de frontera, W
+])
+
+
+def resistencias_elementos(tipo, L=np.nan, k=np.nan, h=np.nan, R_contacto=np.nan, A=1.0, R=np.nan):
+    """R (K/W) de cada elemento según su tipo; todos los argumentos se difunden entre sí"""
+    tipo = np.asarray(tipo, dtype=str)
+    L, k, h, R_contacto, A, R = (np.asarray(v, dtype=float) for v in (L, k, h, R_contacto, A, R))
+    desconocidos = ~np.isin(tipo, TIPOS)
+    if desconocidos.any():
+        raise ValueError(f"Tipo de elemento desconocido: {tipo[desconocidos].flat[0]!r} "
+                         f"(se admite {', '.join(TIPOS)})")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.select([tipo == CONDUCCION, tipo == CONVECCION, tipo == CONTACTO],
+                         [L / (k * A), 1 / (h * A), R_contacto / A], R)
+
+
+class FactorRed:
+    """Matriz nodal factorizada de una red fija; resuelve para cualquier T de frontera y fuentes"""
+
+    def __init__(self, n_nodos, origen, destino, G, frontera, nombres=None):
+        from scipy.sparse import coo_matrix
+        from scipy.sparse.csgraph import connected_components
+        from scipy.sparse.linalg import splu
+
+        self.n_nodos = n_nodos
+        self.origen, self.destino, self.G = origen, destino, G
+        self.frontera = np.flatnonzero(frontera)
+        self.libres = np.flatnonzero(~frontera)
+        filas = np.concatenate([origen, destino, origen, destino])
+        columnas = np.concatenate([origen, destino, destino, origen])
+        valores = np.concatenate([G, G, -G, -G])
+        # Los elementos repetidos entre dos nodos (caminos en paralelo) se suman al convertir
+        nodal = coo_matrix((valores, (filas, columnas)), shape=(n_nodos, n_nodos)).tocsr()
+        # Un nodo libre sin camino a una frontera deja la matriz singular
+        _, etiquetas = connected_components(nodal, directed=False)
+        con_frontera = np.bincount(etiquetas, weights=frontera) > 0
+        flotantes = np.flatnonzero(~frontera & ~con_frontera[etiquetas])
+        if flotantes.size:
+            ejemplos = [nombres[i] if nombres is not None else i for i in flotantes[:5].tolist()]
+            raise ValueError(f"{flotantes.size} nodos sin camino a una temperatura de frontera: "
+                             f"{', '.join(map(str, ejemplos))}")
+        self.G_lf = nodal[self.libres][:, self.frontera]
+        # Filas de frontera, para el calor que entra por cada una
+        self.G_f = nodal[self.frontera]
+        self.lu = splu(nodal[self.libres][:, self.libres].tocsc()) if self.libres.size else None
+
+    def resolver(self, T_frontera, q=0.0):
+        """Temperaturas de todos los nodos; T_frontera (fronteras, ...) y q (nodos, ...) en columnas"""
+        T_frontera = np.asarray(T_frontera, dtype=float)
+        columnas = T_frontera.shape[1:]
+        q = np.broadcast_to(np.asarray(q, dtype=float), (self.n_nodos,) + columnas)
+        T = np.empty((self.n_nodos,) + columnas)
+        T[self.frontera] = T_frontera
+        if self.lu is not None:
+            T[self.libres] = self.lu.solve(np.ascontiguousarray(q[self.libres] - self.G_lf @ T_frontera))
+        return T
+
+    def solucion(self, T_frontera, q=0.0):
+        T = self.resolver(T_frontera, q)
+        flujos = (self.G * (T[self.origen] - T[self.destino]).T).T
+        return SolucionRed(T, flujos, self.G_f @ T)
+
+
+class RedTermica:
+    """Nodos y resistencias de una red térmica; se factoriza una vez por topología.
+
+    Los nodos con temperatura fija son fronteras; los demás pueden tener una
+    fuente de calor q (W). Un nodo nombrado en un elemento se crea libre si no
+    existía.
+    """
+
+    def __init__(self):
+        self.nombres = []
+        self._indices = {}
+        self._T = []
+        self._q = []
+        self._origen = []
+        self._destino = []
+        self._R = []
+        self._tipos = []
+        self._factor = None
+
+    def _indice(self, nombre):
+        i = self._indices.get(nombre)
+        if i is None:
+            i = self._indices[nombre] = len(self.nombres)
+            self.nombres.append(nombre)
+            self._T.append(np.nan)
+            self._q.append(0.0)
+            self._factor = None
+        return i
+
+    def indices(self, nombres):
+        """Índices de los nodos (creándolos si hace falta), para escalares o arreglos de nombres"""
+        if np.ndim(nombres) == 0:
+            return self._indice(np.asarray(nombres).item())
+        return np.fromiter((self._indice(n) for n in np.asarray(nombres).tolist()), dtype=np.intp)
+
+    def nodo(self, nombre, T=None, q=0.0):
+        """Crea o actualiza un nodo: T fija (frontera) o None (libre) y fuente q en W"""
+        i = self._indice(nombre)
+        T = np.nan if T is None else float(T)
+        if np.isnan(T) != np.isnan(self._T[i]):
+            self._factor = None  # cambia el conjunto de fronteras
+        self._T[i], self._q[i] = T, float(q)
+        return i
+
+    def agregar(self, origen, destino, R, tipo=RESISTENCIA):
+        """Elementos de resistencia R (K/W) entre nodos; admite escalares o arreglos"""
+        R = np.atleast_1d(np.asarray(R, dtype=float))
+        origen, destino = (np.atleast_1d(self.indices(n)) for n in (origen, destino))
+        origen, destino, R = np.broadcast_arrays(origen, destino, R)
+        if not np.all(np.isfinite(R) & (R > 0)):
+            malo = int(np.flatnonzero(~(np.isfinite(R) & (R > 0)))[0])
+            raise ValueError(f"Resistencia no válida ({R[malo]}) entre {self.nombres[origen[malo]]!r} "
+                             f"y {self.nombres[destino[malo]]!r}")
+        if np.any(origen == destino):
+            raise ValueError(f"Elemento que une el nodo {self.nombres[origen[origen == destino][0]]!r} "
+                             "consigo mismo")
+        self._origen.append(origen.copy())
+        self._destino.append(destino.copy())
+        self._R.append(R.copy())
+        self._tipos.append(np.broadcast_to(np.asarray(tipo, dtype=str), R.shape).copy())
+        self._factor = None
+        return self
+
+    def conduccion(self, origen, destino, L, k, A=1.0):
+        return self.agregar(origen, destino, resistencias_elementos(CONDUCCION, L=L, k=k, A=A), CONDUCCION)
+
+    def conveccion(self, origen, destino, h, A=1.0):
+        return self.agregar(origen, destino, resistencias_elementos(CONVECCION, h=h, A=A), CONVECCION)
+
+    def contacto(self, origen, destino, R_contacto, A=1.0):
+        """Resistencia de contacto a partir de R''_c (m²·K/W)"""
+        return self.agregar(origen, destino, resistencias_elementos(CONTACTO, R_contacto=R_contacto, A=A),
+                            CONTACTO)
+
+    def elementos(self):
+        """(origen, destino, R, tipo) de todos los elementos, en orden de alta"""
+        if not self._R:
+            vacio = np.empty(0, dtype=np.intp)
+            return vacio, vacio, np.empty(0), np.empty(0, dtype=str)
+        return (np.concatenate(self._origen), np.concatenate(self._destino), np.concatenate(self._R),
+                np.concatenate(self._tipos))
+
+    @property
+    def frontera(self):
+        return ~np.isnan(np.array(self._T, dtype=float))
+
+    def factor(self):
+        """FactorRed vigente; se rehace solo si cambian los elementos o qué nodos son frontera"""
+        if self._factor is None:
+            frontera = self.frontera
+            if not frontera.any():
+                raise ValueError("La red necesita al menos un nodo con temperatura fija")
+            origen, destino, R, _ = self.elementos()
+            self._factor = FactorRed(len(self.nombres), origen, destino, 1 / R, frontera, self.nombres)
+        return self._factor
+
+    def resolver(self, T_frontera=None, q=None):
+        """SolucionRed con las T de frontera y fuentes actuales, o con las dadas.
+
+        `T_frontera` y `q` son diccionarios nombre -> valor o arreglo de
+        escenarios (todos del mismo largo); los nodos no mencionados conservan
+        su valor.
+        """
+        factor = self.factor()
+        T_frontera, q = T_frontera or {}, q or {}
+        escenarios = np.broadcast_shapes(*(np.shape(v) for d in (T_frontera, q) for v in d.values()))
+        # Valores actuales repetidos en cada escenario; luego se sobrescriben los indicados
+        ejes = (1,) * len(escenarios)
+        T_f = np.broadcast_to(np.array(self._T)[factor.frontera].reshape((-1,) + ejes),
+                              (factor.frontera.size,) + escenarios).copy()
+        q_n = np.broadcast_to(np.array(self._q).reshape((-1,) + ejes),
+                              (len(self.nombres),) + escenarios).copy()
+        posicion = {i: j for j, i in enumerate(factor.frontera.tolist())}
+        for nombre, valor in T_frontera.items():
+            i = self._indices.get(nombre)
+            if i not in posicion:
+                raise ValueError(f"{nombre!r} no es un nodo de frontera")
+            T_f[posicion[i]] = valor
+        for nombre, valor in q.items():
+            if nombre not in self._indices:
+                raise ValueError(f"Nodo desconocido: {nombre!r}")
+            q_n[self._indices[nombre]] = valor
+        return factor.solucion(T_f, q_n)
+
+
+# --- Tablas de nodos y elementos (terminal e interfaz) ---
+# Columnas numéricas: nombre -> (dimensión, valor por defecto), como en `calculos.lote`
+CAMPOS_NODOS = {"T": ("temperatura", np.nan), "q": ("potencia", 0.0)}
+CAMPOS_ELEMENTOS = {
+    "L": ("longitud", np.nan), "k": ("conductividad", np.nan), "h": ("coef_h", np.nan),
+    "R_c": ("resistencia_contacto", np.nan), "A": ("area", 1.0), "R": ("resistencia", np.nan),
+}
+
+
+def red_desde_tablas(nodos, elementos):
+    """RedTermica a partir de DataFrames de nodos (nodo, T, q) y elementos (desde, hasta, tipo, ...).
+
+    Un T vacío deja el nodo libre; los nodos que solo aparecen en los
+    elementos también son libres y sin fuente.
+    """
+    from .lote import columna_texto, columnas_si
+
+    datos, por_nombre = columnas_si(nodos, CAMPOS_NODOS)
+    nombres = columna_texto(nodos, por_nombre, "nodo")
+    if "nodo" not in por_nombre or np.any(nombres == ""):
+        raise ValueError("Cada fila de la tabla de nodos necesita un 'nodo'")
+    red = RedTermica()
+    for nombre, T, q in zip(nombres.tolist(), datos["T"].tolist(), datos["q"].tolist()):
+        red.nodo(nombre, None if np.isnan(T) else T, q)
+
+    datos, por_nombre = columnas_si(elementos, CAMPOS_ELEMENTOS)
+    desde, hasta = (columna_texto(elementos, por_nombre, c) for c in ("desde", "hasta"))
+    if np.any(desde == "") or np.any(hasta == ""):
+        raise ValueError("Cada elemento necesita 'desde' y 'hasta'")
+    tipo = np.char.lower(columna_texto(elementos, por_nombre, "tipo", RESISTENCIA).astype(str))
+    R = resistencias_elementos(tipo, datos["L"], datos["k"], datos["h"], datos["R_c"], datos["A"],
+                               datos["R"])
+    red.agregar(desde, hasta, R, tipo)
+    return red
+
+
+def temperaturas_escenarios(escenarios):
+    """{nodo de frontera: T (°C) por escenario} y nombres de los escenarios de un DataFrame"""
+    from .lote import separar_columna
+    from .unidades import a_si, unidad_si
+
+    T_frontera = {}
+    for columna in escenarios.columns:
+        nombre, unidad = separar_columna(columna)
+        if nombre == "escenario":
+            continue
+        T_frontera[nombre] = a_si(escenarios[columna].to_numpy(dtype=float), "temperatura",
+                                  unidad or unidad_si("temperatura"))
+    if "escenario" in escenarios.columns:
+        etiquetas = escenarios["escenario"].astype(str).tolist()
+    else:
+        etiquetas = [str(i) for i in range(1, len(escenarios) + 1)]
+    return T_frontera, etiquetas
+
+
+def tablas_solucion(red, sol, etiquetas=None):
+    """DataFrames de temperaturas por nodo y de calor por elemento; una columna por escenario"""
+    import pandas as pd
+
+    origen, destino, R, tipos = red.elementos()
+    sufijos = [""] if sol.T.ndim == 1 else [f"_{e}" for e in etiquetas]
+    T, flujos = sol.T.reshape(len(red.nombres), -1), sol.flujos.reshape(len(R), -1)
+    q_frontera = np.full_like(T, np.nan)
+    q_frontera[red.factor().frontera] = sol.q_frontera.reshape(-1, T.shape[1])
+    nombres = np.array(red.nombres, dtype=object)
+    temperaturas = pd.DataFrame({"nodo": nombres, "frontera": red.frontera,
+                                 **{f"T{s} [°C]": T[:, j] for j, s in enumerate(sufijos)},
+                                 **{f"q_frontera{s} [W]": q_frontera[:, j] for j, s in enumerate(sufijos)}})
+    elementos = pd.DataFrame({"desde": nombres[origen], "hasta": nombres[destino], "tipo": tipos,
+                              "R [K/W]": R, **{f"q{s} [W]": flujos[:, j] for j, s in enumerate(sufijos)}})
+    return temperaturas, elementos
+
+
+def _leer_tabla(ruta):
+    import pandas as pd
+
+    from .lote import leer_fragmentos
+
+    return pd.concat(leer_fragmentos(ruta, 1_000_000), ignore_index=True)
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m calculos.red_termica",
+        description="Red de resistencias térmicas en régimen estacionario")
+    parser.add_argument("nodos", help="CSV o Parquet de nodos: nodo, T (vacía si es libre), q")
+    parser.add_argument("elementos", help="CSV o Parquet de elementos: desde, hasta, tipo, L, k, h, R_c, A, R")
+    parser.add_argument("salida", help="CSV o Parquet con la temperatura de cada nodo")
+    parser.add_argument("--escenarios", metavar="ARCHIVO",
+                        help="Temperaturas de frontera por escenario: una columna por nodo, una fila por "
+                             "escenario; se resuelven todos con la misma factorización")
+    parser.add_argument("--flujos", metavar="ARCHIVO", help="Escribe además el calor de cada elemento")
+    return parser
+
+
+def main(argv=None):
+    from .lote import EscritorResultados
+
+    args = crear_parser().parse_args(argv)
+    inicio = time.perf_counter()
+    try:
+        red = red_desde_tablas(_leer_tabla(args.nodos), _leer_tabla(args.elementos))
+        T_frontera, etiquetas = (temperaturas_escenarios(_leer_tabla(args.escenarios)) if args.escenarios
+                                 else (None, None))
+        sol = red.resolver(T_frontera)
+        temperaturas, elementos = tablas_solucion(red, sol, etiquetas)
+        for tabla, ruta in ((temperaturas, args.salida), (elementos, args.flujos)):
+            if ruta:
+                escritor = EscritorResultados(ruta)
+                escritor.escribir(tabla)
+                escritor.cerrar()
+    except (ValueError, KeyError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    duracion = time.perf_counter() - inicio
+    escenarios = f", {len(etiquetas)} escenarios" if etiquetas else ""
+    print(f"{len(red.nombres)} nodos y {len(elementos)} elementos{escenarios} resueltos en "
+          f"{duracion:.2f} s -> {args.salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
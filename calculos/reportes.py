@@ -0,0 +1,457 @@
+"""Reportes TXT de las calculadoras generados a partir de plantillas.
+
+Una plantilla es una secuencia (anidable) de líneas con campos de `str.format`,
+bloques condicionales `Si` y bloques repetidos `ParaCada`. El contexto es un
+dict con los valores del caso; las páginas arman uno y generan el texto solo al
+descargar, y los lotes escriben miles de reportes a un ZIP de a uno por vez:
+
+    escribir_zip("reportes.zip", ((f"caso_{i}.txt", generar(PLANTILLA_PLACA, c))
+                                  for i, c in enumerate(contextos)))
+"""
+import struct
+import tempfile
+import time
+import zlib
+from collections import ChainMap, namedtuple
+from functools import lru_cache
+
+ANCHO = 80
+
+PROMEDIO = "Flujo de calor promedio"
+LOCAL = "Flujo de calor local"
+
+TITULOS_CONDUCCION = {
+    "Plana": "Pared Compuesta en Serie (Plana)",
+    "Cilíndrica": "Cilindro Multicapa en Serie",
+    "Esférica": "Esfera Multicapa en Serie",
+}
+
+
+class Si(namedtuple("Si", "condicion entonces sino", defaults=((),))):
+    """Bloque condicional: `condicion` es una clave del contexto (se evalúa su verdad) o una función"""
+
+
+class ParaCada(namedtuple("ParaCada", "clave cuerpo")):
+    """Repite `cuerpo` por cada dict de `contexto[clave]`, que se superpone al contexto"""
+
+
+def encabezado(titulo):
+    return ("=" * ANCHO, titulo, "=" * ANCHO, "")
+
+
+def seccion(titulo):
+    return (titulo + ":", "-" * 50)
+
+
+def pie(texto="Fin del reporte"):
+    return ("", "=" * ANCHO, texto, "=" * ANCHO)
+
+
+def _cumple(condicion, contexto):
+    if callable(condicion):
+        return condicion(contexto)
+    return bool(contexto[condicion])
+
+
+@lru_cache(maxsize=None)
+def compilar(plantilla):
+    """Aplana la plantilla y une las líneas consecutivas en un solo formato, una vez por plantilla"""
+    partes = []
+
+    def agregar(elemento):
+        if isinstance(elemento, str):
+            if partes and isinstance(partes[-1], str):
+                partes[-1] += elemento + "\n"
+            else:
+                partes.append(elemento + "\n")
+        elif isinstance(elemento, Si):
+            partes.append(Si(elemento.condicion, compilar(_como_tupla(elemento.entonces)),
+                             compilar(_como_tupla(elemento.sino))))
+        elif isinstance(elemento, ParaCada):
+            partes.append(ParaCada(elemento.clave, compilar(_como_tupla(elemento.cuerpo))))
+        else:
+            for parte in elemento:
+                agregar(parte)
+
+    agregar(plantilla)
+    return tuple(partes)
+
+
+def _como_tupla(elemento):
+    return (elemento,) if isinstance(elemento, (str, Si, ParaCada)) else elemento
+
+
+def _volcar(compilada, contexto, salida):
+    for parte in compilada:
+        if isinstance(parte, str):
+            salida.append(parte.format_map(contexto))
+        elif isinstance(parte, Si):
+            _volcar(parte.entonces if _cumple(parte.condicion, contexto) else parte.sino, contexto, salida)
+        else:
+            for elemento in contexto[parte.clave]:
+                _volcar(parte.cuerpo, ChainMap(elemento, contexto), salida)
+
+
+def generar(plantilla, contexto):
+    salida = []
+    _volcar(compilar(plantilla), contexto, salida)
+    return "".join(salida)
+
+
+# --- Plantillas ---
+PLANTILLA_PLACA = (
+    encabezado("ANÁLISIS DE CONVECCIÓN EN FLUJO EXTERNO - PLACA PLANA"),
+    seccion("DATOS DE ENTRADA"),
+    "Fluido seleccionado:           {fluido}",
+    "Estado del fluido:             {estado}",
+    "Temperatura del fluido:        {T_inf:.2f} {unidad_temp}",
+    "Temperatura de superficie:     {T_s:.2f} {unidad_temp}",
+    "Velocidad del fluido:          {V:.2f} {unidad_velocidad}",
+    "Longitud de la placa:          {L:.4f} {unidad_longitud}",
+    "Ancho de la placa:             {b:.4f} {unidad_longitud}",
+    Si(lambda c: c["presion_kpa"] is not None, "Presión del aire:              {presion_kpa:.1f} kPa"),
+    "",
+    "Sistema de unidades usado:     Temp={unidad_temp}, Long={unidad_longitud}, Vel={unidad_velocidad}",
+    "",
+    seccion("PROPIEDADES DEL FLUIDO"),
+    "Temperatura de película:       {T_film:.2f} °C",
+    "Viscosidad dinámica:           {mu:.6e} kg/m·s",
+    "Conductividad térmica:         {k:.6f} W/m·K",
+    "Densidad:                      {rho:.2f} kg/m³",
+    "Calor específico:              {cp:.1f} J/kg·K",
+    "Número de Prandtl:             {pr:.6f}",
+    "Número de Reynolds:            {Re_L:.0f}",
+    "Régimen de flujo:              {regimen}",
+    "",
+    seccion("VALIDACIÓN DE CORRELACIONES"),
+    Si(lambda c: 0.6 <= c["pr"] <= 60,
+       "✓ Número de Prandtl dentro del rango válido (0.6 ≤ Pr ≤ 60)",
+       "⚠ Número de Prandtl fuera del rango válido"),
+    Si(lambda c: c["Re_L"] <= 1e7,
+       "✓ Reynolds dentro del rango de validez (Re ≤ 10⁷)",
+       "⚠ Reynolds fuera del rango de validez"),
+    "",
+    seccion("RESULTADOS DEL ANÁLISIS"),
+    Si("resultados", (
+        Si(lambda c: c["resultados"].get("tipo_analisis") == PROMEDIO, (
+            "Tipo de análisis: FLUJO DE CALOR PROMEDIO",
+            "",
+            Si(lambda c: c["resultados"].get("regimen") == "Laminar", (
+                "Régimen: LAMINAR",
+                "Número de Nusselt:             {resultados[numero_nusselt]:.6f}",
+                "Coeficiente de convección:     {resultados[coeficiente_conveccion]:.6f} W/m²·K",
+                "Flujo de calor total:          {resultados[flujo_calor_total]:.6f} W",
+                "Área de transferencia:         {resultados[area_transferencia]:.6f} m²",
+            )),
+            Si(lambda c: c["resultados"].get("regimen") == "Mixto", (
+                "Régimen: MIXTO (Laminar + Turbulento)",
+                "Longitud crítica:              {resultados[longitud_critica]:.6f} m",
+                "Número de Nusselt mixto:       {resultados[numero_nusselt_mixto]:.6f}",
+                "Coef. convección mixto:        {resultados[coeficiente_conveccion_mixto]:.6f} W/m²·K",
+                "Flujo laminar:                 {resultados[flujo_laminar]:.6f} W",
+                "Flujo turbulento:              {resultados[flujo_turbulento]:.6f} W",
+                "Flujo mixto total:             {resultados[flujo_mixto_total]:.6f} W",
+                "Área de transferencia:         {resultados[area_transferencia]:.6f} m²",
+            )),
+            Si(lambda c: c["resultados"].get("regimen") == "Turbulento completo", (
+                "Régimen: TURBULENTO COMPLETO",
+                "Número de Nusselt:             {resultados[numero_nusselt]:.6f}",
+                "Coeficiente de convección:     {resultados[coeficiente_conveccion]:.6f} W/m²·K",
+                "Flujo de calor total:          {resultados[flujo_calor_total]:.6f} W",
+                "Área de transferencia:         {resultados[area_transferencia]:.6f} m²",
+            )),
+        )),
+        Si(lambda c: c["resultados"].get("tipo_analisis") == LOCAL, (
+            "Tipo de análisis: FLUJO DE CALOR LOCAL",
+            "",
+            "Posición analizada (x):        {x_unidad:.6f} {unidad_longitud} ({resultados[posicion_x]:.6f} m)",
+            "Reynolds local:                {resultados[reynolds_local]:.0f}",
+            "Régimen local:                 {resultados[regimen_local]}",
+            "Número de Nusselt local:       {resultados[numero_nusselt_local]:.6f}",
+            "Coef. convección local:        {resultados[coeficiente_conveccion_local]:.6f} W/m²·K",
+            "Flujo de calor local:          {resultados[flujo_calor_local]:.6f} W/m²",
+        )),
+    ), "No se encontraron resultados válidos para las condiciones dadas."),
+    pie(),
+)
+
+PLANTILLA_CILINDRO = (
+    encabezado("ANÁLISIS DE CONVECCIÓN EXTERNA EN CILINDROS"),
+    seccion("DATOS DE ENTRADA"),
+    "Fluido seleccionado:           {fluido}",
+    "Fase del fluido:               {fase}",
+    "Temperatura del fluido:        {T_fluido:.2f} {unidad_temp}",
+    "Temperatura de superficie:     {T_superficie:.2f} {unidad_temp}",
+    "Velocidad del fluido:          {velocidad:.2f} {unidad_vel}",
+    "Diámetro del cilindro:         {diametro:.4f} {unidad_dia}",
+    "Longitud del cilindro:         {longitud:.4f} {unidad_long}",
+    "Correlación utilizada:         {correlacion}",
+    "",
+    "Sistema de unidades usado:     Temp={unidad_temp}, Vel={unidad_vel}, Diám={unidad_dia}, Long={unidad_long}",
+    "",
+    seccion("PROPIEDADES DEL FLUIDO"),
+    "Temperatura de película:       {T_pelicula:.2f} °C",
+    "Densidad:                      {rho:.2f} kg/m³",
+    "Viscosidad dinámica:           {mu:.6e} kg/m·s",
+    "Conductividad térmica:         {k:.6f} W/m·K",
+    "Número de Prandtl:             {pr:.6f}",
+    "Calor específico:              {cp:.1f} J/kg·K",
+    "",
+    seccion("NÚMEROS ADIMENSIONALES"),
+    "Número de Reynolds:            {Re:.2f}",
+    "Número de Prandtl:             {pr:.6f}",
+    "",
+    seccion("RESULTADOS DEL ANÁLISIS"),
+    "Correlación utilizada:         {correlacion}",
+    "Número de Nusselt:             {Nu:.6f}",
+    "Coeficiente de convección:     {h:.6f} W/m²·K",
+    "Área de transferencia:         {A:.6f} m²",
+    "Diferencia de temperatura:     {dT:.2f} °C",
+    "Transferencia de calor:        {q:.6f} W",
+    "",
+    seccion("VALIDACIÓN"),
+    Si("churchill",
+       Si(lambda c: c["pr"] > 0.2,
+          "✓ Correlación Churchill-Bernstein válida (Pr > 0.2)",
+          "⚠ Correlación Churchill-Bernstein no válida (Pr ≤ 0.2)"),
+       "✓ Correlación compacta utilizada"),
+    pie(),
+)
+
+PLANTILLA_TUBO = (
+    encabezado("ANÁLISIS DE CONVECCIÓN INTERNA FORZADA EN TUBOS"),
+    seccion("DATOS DE ENTRADA"),
+    "Fluido seleccionado:           {fluido}",
+    Si("fase", "Fase del fluido:               {fase}"),
+    "Temperatura de entrada:        {T_entrada:.2f} °C",
+    "Temperatura de salida:         {T_salida:.2f} °C",
+    "Temperatura de pared:          {T_pared:.2f} °C",
+    "Velocidad del fluido:          {velocidad:.4f} m/s",
+    "Diámetro interno del tubo:     {diametro:.6f} m",
+    "Longitud del tubo:             {longitud:.4f} m",
+    "Régimen térmico:               {regimen_termico}",
+    Si("balance", "Temperatura de salida:         calculada por balance de energía "
+                  "({balance[iteraciones]} iteraciones)"),
+    "",
+    "Sistema de unidades usado:     Temp=°C, Vel=m/s, Long=m",
+    "",
+    seccion("TEMPERATURAS CARACTERÍSTICAS"),
+    "Temperatura de película:       {T_pelicula:.4f} °C",
+    "Temperatura media logarítmica: {TML:.4f} °C",
+    "",
+    seccion("PROPIEDADES TERMOFÍSICAS (a temperatura de película)"),
+    "Densidad (ρ):                  {rho:.6f} kg/m³",
+    "Viscosidad dinámica (μ):       {mu:.6e} kg/m·s",
+    "Conductividad térmica (k):     {k:.6f} W/m·K",
+    "Número de Prandtl (Pr):        {pr:.6f}",
+    "",
+    seccion("ANÁLISIS DIMENSIONAL"),
+    "Número de Reynolds:            {Re:.2f}",
+    "Régimen de flujo:              {regimen}",
+    "Número de Nusselt:             {Nu:.4f}",
+    "",
+    seccion("RESULTADOS DEL ANÁLISIS"),
+    "Coeficiente de transferencia:  {h:.4f} W/m²·K",
+    "Área de transferencia:         {A:.6f} m²",
+    "Transferencia de calor total:  {q:.4f} W",
+    Si("balance", (
+        "Flujo másico:                  {balance[m]:.6e} kg/s",
+        "Calor específico (cp):         {balance[cp]:.4f} J/kg·K",
+    )),
+    "",
+    Si(lambda c: c["Re"] < 2300,
+       "Correlación utilizada:         Nu = 3.66 (flujo laminar desarrollado)",
+       ("Correlación utilizada:         Nu = 0.023 × Re^0.8 × Pr^{n} (Dittus-Boelter)",
+        Si(lambda c: c["n"] == 0.4,
+           "Exponente n utilizado:         {n} (calentamiento)",
+           "Exponente n utilizado:         {n} (enfriamiento)"))),
+    pie("Fin del reporte - Convección Interna Forzada"),
+)
+
+PLANTILLA_CONDUCCION = (
+    encabezado("ANÁLISIS DE CONDUCCIÓN - {titulo}"),
+    seccion("DATOS DE ENTRADA"),
+    "Geometría del problema:        {geometria}",
+    "Número de capas:               {n_capas}",
+    "Temperatura interna:           {T1:.2f} {unidad_temp}",
+    "Temperatura externa:           {T2:.2f} {unidad_temp}",
+    Si(lambda c: c["geometria"] == "Plana",
+       "Área total de transferencia:   {A_total:.4f} {unidad_area}",
+       "Longitud del cilindro:         {L_cil:.4f} {unidad_longitud}"),
+    Si("usar_conveccion",
+       ("Coef. convección interior:    {h_in:.2f} {unidad_h}",
+        "Coef. convección exterior:     {h_out:.2f} {unidad_h}"),
+       "Convección:                    No incluida"),
+    "",
+    "Sistema de unidades usado:     Long={unidad_longitud}, Radio={unidad_radio}, "
+    "Esp={unidad_espesor}, Temp={unidad_temp}",
+    "",
+    seccion("CONFIGURACIÓN DE CAPAS"),
+    ParaCada("capas", (
+        "Capa {n}:",
+        "  Material:                    {material}",
+        "  Espesor:                     {L:.6f} m",
+        "  Conductividad térmica:       {k:.6f} W/m·K",
+        Si(lambda c: c["r_i"] is not None, (
+            "  Radio interior:              {r_i:.6f} m",
+            "  Radio exterior:              {r_o:.6f} m",
+        )),
+        "",
+    )),
+    seccion("RESISTENCIAS TÉRMICAS"),
+    "Resistencia por convección interna:  {R_conv_in:.8f} K/W ({pct_conv_in:.2f}%)",
+    "Resistencia por conducción (capas):  {R_capas:.8f} K/W ({pct_capas:.2f}%)",
+    "Resistencia por convección externa:  {R_conv_out:.8f} K/W ({pct_conv_out:.2f}%)",
+    "Resistencia térmica total:           {R_total:.8f} K/W",
+    "",
+    seccion("RESULTADOS DEL ANÁLISIS"),
+    "Diferencia de temperatura:     {dT:.2f} °C",
+    "Flujo de calor total:          {q_unidad:.6f} {unidad_flujo}",
+    "Flujo de calor (base SI):      {q:.6f} W",
+    Si(lambda c: c["geometria"] == "Plana", (
+        "Flujo de calor por área:       {q_area_unidad:.6f} {unidad_flujo_area}",
+        "Área de referencia:            {A_ref:.6f} m²",
+    )),
+    "",
+    seccion("MATERIALES UTILIZADOS"),
+    ParaCada("capas", (
+        "Capa {n}: {material}",
+        Si(lambda c: c["categoria"] is not None,
+           ("  Categoría: {categoria}",
+            "  Conductividad térmica: {k_tabla} W/m·K"),
+           ("  Material personalizado",
+            "  Conductividad térmica: {k:.6f} W/m·K")),
+        "",
+    )),
+    pie(),
+)
+
+PLANTILLAS = {
+    "placa": PLANTILLA_PLACA,
+    "cilindro": PLANTILLA_CILINDRO,
+    "tubo": PLANTILLA_TUBO,
+    "conduccion": PLANTILLA_CONDUCCION,
+}
+
+
+# --- Archivos ZIP ---
+_LOCAL = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL = struct.Struct("<IHHHHHHIIIHHHHHII")
+_FIN = struct.Struct("<IHHHHIIH")
+_FIN64 = struct.Struct("<IQHHIIQQQQ")
+_LOCALIZADOR64 = struct.Struct("<IIQI")
+_UTF8 = 0x0800
+_MAX16, _MAX32 = 0xFFFF, 0xFFFFFFFF
+
+
+class ZipEnFlujo:
+    """Escritor ZIP de solo avance con memoria acotada.
+
+    Cada entrada se comprime y se escribe de inmediato en `destino`, que solo
+    necesita `write` (un archivo, un socket, una respuesta HTTP). El directorio
+    central, que el formato exige al final, se acumula en un archivo temporal y
+    no en memoria, así que la memoria no depende del número de entradas. Usa
+    ZIP64 cuando hay más de 65535 entradas o el archivo pasa de 4 GiB.
+    """
+
+    def __init__(self, destino, nivel=6):
+        self.destino = destino
+        self.nivel = nivel
+        self.entradas = 0
+        self._posicion = 0
+        self._directorio = tempfile.TemporaryFile()
+        self._tamano_directorio = 0
+        ahora = time.localtime()
+        self._hora = ahora.tm_hour << 11 | ahora.tm_min << 5 | ahora.tm_sec // 2
+        self._fecha = (ahora.tm_year - 1980) << 9 | ahora.tm_mon << 5 | ahora.tm_mday
+
+    def _escribir(self, datos):
+        self.destino.write(datos)
+        self._posicion += len(datos)
+
+    def agregar(self, nombre, contenido):
+        if isinstance(contenido, str):
+            contenido = contenido.encode("utf-8")
+        nombre = nombre.encode("utf-8")
+        compresor = zlib.compressobj(self.nivel, zlib.DEFLATED, -15)
+        comprimido = compresor.compress(contenido) + compresor.flush()
+        crc = zlib.crc32(contenido)
+        if max(len(contenido), len(comprimido)) >= _MAX32:
+            raise ValueError(f"La entrada {nombre!r} supera los 4 GiB")
+
+        desplazamiento = self._posicion
+        self._escribir(_LOCAL.pack(0x04034B50, 20, _UTF8, zlib.DEFLATED, self._hora, self._fecha,
+                                   crc, len(comprimido), len(contenido), len(nombre), 0))
+        self._escribir(nombre)
+        self._escribir(comprimido)
+
+        extra = b""
+        if desplazamiento >= _MAX32:
+            extra = struct.pack("<HHQ", 0x0001, 8, desplazamiento)
+        registro = _CENTRAL.pack(
+            0x02014B50, 3 << 8 | 45, 45 if extra else 20, _UTF8, zlib.DEFLATED, self._hora, self._fecha,
+            crc, len(comprimido), len(contenido), len(nombre), len(extra), 0, 0, 0,
+            0o100644 << 16, _MAX32 if extra else desplazamiento) + nombre + extra
+        self._directorio.write(registro)
+        self._tamano_directorio += len(registro)
+        self.entradas += 1
+
+    def cerrar(self):
+        inicio = self._posicion
+        self._directorio.seek(0)
+        while bloque := self._directorio.read(1 << 20):
+            self._escribir(bloque)
+        self._directorio.close()
+
+        if self.entradas >= _MAX16 or inicio >= _MAX32 or self._tamano_directorio >= _MAX32:
+            fin64 = self._posicion
+            self._escribir(_FIN64.pack(0x06064B50, _FIN64.size - 12, 45, 45, 0, 0, self.entradas,
+                                       self.entradas, self._tamano_directorio, inicio))
+            self._escribir(_LOCALIZADOR64.pack(0x07064B50, 0, fin64, 1))
+        self._escribir(_FIN.pack(0x06054B50, 0, 0, min(self.entradas, _MAX16), min(self.entradas, _MAX16),
+                                 min(self._tamano_directorio, _MAX32), min(inicio, _MAX32), 0))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if tipo is None:
+            self.cerrar()
+        else:
+            self._directorio.close()
+
+
+class _Acumulador:
+    """Destino que guarda lo escrito hasta que se retira"""
+
+    def __init__(self):
+        self._partes = []
+
+    def write(self, datos):
+        self._partes.append(datos)
+
+    def retirar(self):
+        datos = b"".join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+def zip_en_fragmentos(reportes, nivel=6):
+    """Genera los bytes de un ZIP con los pares (nombre, texto) a medida que se comprimen"""
+    salida = _Acumulador()
+    with ZipEnFlujo(salida, nivel) as archivo:
+        for nombre, texto in reportes:
+            archivo.agregar(nombre, texto)
+            yield salida.retirar()
+    yield salida.retirar()
+
+
+def escribir_zip(destino, reportes, nivel=6):
+    """Escribe los reportes en un ZIP (ruta o archivo binario) y devuelve cuántos se escribieron"""
+    if not hasattr(destino, "write"):
+        with open(destino, "wb") as f:
+            return escribir_zip(f, reportes, nivel)
+    with ZipEnFlujo(destino, nivel) as archivo:
+        for nombre, texto in reportes:
+            archivo.agregar(nombre, texto)
+    return archivo.entradas
@@ -0,0 +1,270 @@
+"""Análisis de sensibilidad global (índices de Sobol) con el esquema de Saltelli.
+
+Con dos matrices de muestras A y B (N filas, una columna por factor) y las
+matrices AB_i, iguales a A salvo la columna i tomada de B, el modelo se evalúa
+N·(d + 2) veces y de ahí salen, para cada factor,
+
+    S_i  = media(f_B · (f_AB_i - f_A)) / Var(f)        (primer orden, Saltelli 2010)
+    ST_i = media((f_A - f_AB_i)²) / (2 · Var(f))        (total, Jansen)
+
+Las muestras salen de una secuencia de Sobol aleatorizada (SciPy) y se llevan
+a la distribución de cada factor con su inversa; los intervalos de confianza
+se obtienen remuestreando las N filas (bootstrap). Los modelos son los mismos
+motores vectorizados de `calculos.incertidumbre`, evaluados por fragmentos en
+un ProcessPoolExecutor:
+
+    factores = {"V": Entrada(5.0, 0.5, UNIFORME), "D": Entrada(0.02, 0.005, UNIFORME),
+                "T_fluido": 25.0, "T_superficie": Entrada(80.0, 10.0, UNIFORME), "L": 1.0,
+                **errores_propiedades(0.05, UNIFORME)}
+    r = sobol(CILINDRO, factores, n=2**15, fluido="aire")
+    r.S1, r.ST, r.S1_ic, r.ST_ic
+
+Desde la terminal (factores uniformes "mín máx", fijos con un solo valor):
+
+    python -m calculos.sensibilidad cilindro --factor V 1 10 --factor D 0.01 0.05 \\
+        --factor T_superficie 60 100 --fijo T_fluido 25 --fijo L 1 --fluido aire \\
+        --error-propiedades 0.05 -n 32768
+"""
+import argparse
+import math
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from .barrido import tamano_fragmento, trabajadores_disponibles
+from .incertidumbre import MODELOS, SEMILLA, UNIFORME, Entrada, cuantiles, errores_propiedades
+from .propiedades import almacen
+
+BOOTSTRAP = 200
+CONFIANZA = 0.95
+
+ResultadoSobol = namedtuple("ResultadoSobol", [
+    "factores",     # nombres, en el orden de las columnas
+    "S1",           # (d,) índices de primer orden
+    "ST",           # (d,) índices totales
+    "S1_ic",        # (d, 2) intervalo de confianza bootstrap
+    "ST_ic",        # (d, 2)
+    "n",            # filas de A y B (potencia de 2)
+    "validas",      # filas con todas sus evaluaciones finitas
+    "evaluaciones", # n·(d + 2)
+    "media",
+    "varianza",
+])
+
+
+def matrices_saltelli(factores, n, semilla=SEMILLA):
+    """A y B (n × d) en unidades físicas; n se redondea a la potencia de 2 siguiente"""
+    from scipy.stats import qmc
+
+    entradas = list(factores.values())
+    d = len(entradas)
+    m = max(int(math.ceil(math.log2(max(n, 2)))), 1)
+    u = qmc.Sobol(2 * d, scramble=True, seed=semilla).random_base2(m)
+    # Nunca exactamente 0 o 1: la inversa de la normal sería infinita
+    u = np.clip(u, 1e-12, 1 - 1e-12)
+    A = np.column_stack([cuantiles(e, u[:, i]) for i, e in enumerate(entradas)])
+    B = np.column_stack([cuantiles(e, u[:, d + i]) for i, e in enumerate(entradas)])
+    return A, B
+
+
+def _estimadores(f_A, f_B, f_AB):
+    """S1 y ST de todos los factores; f_AB es (d, N)"""
+    varianza = np.var(np.concatenate([f_A, f_B], axis=-1), axis=-1)[..., None]
+    S1 = np.mean(f_B[..., None, :] * (f_AB - f_A[..., None, :]), axis=-1) / varianza
+    ST = 0.5 * np.mean((f_A[..., None, :] - f_AB) ** 2, axis=-1) / varianza
+    return S1, ST
+
+
+def indices_sobol(f_A, f_B, f_AB, bootstrap=BOOTSTRAP, confianza=CONFIANZA, semilla=SEMILLA):
+    """(S1, ST, S1_ic, ST_ic, validas) a partir de las evaluaciones de A, B y AB_i.
+
+    Se descartan las filas con alguna evaluación no finita (fuera de las
+    correlaciones). El bootstrap remuestrea filas con reemplazo, por tandas
+    para acotar la memoria.
+    """
+    f_A, f_B, f_AB = (np.asarray(v, dtype=float) for v in (f_A, f_B, f_AB))
+    validas = np.isfinite(f_A) & np.isfinite(f_B) & np.isfinite(f_AB).all(axis=0)
+    f_A, f_B, f_AB = f_A[validas], f_B[validas], f_AB[:, validas]
+    N, d = f_A.size, f_AB.shape[0]
+    if N < 2:
+        raise ValueError("No hay suficientes muestras válidas para estimar los índices")
+    S1, ST = _estimadores(f_A, f_B, f_AB)
+
+    rng = np.random.default_rng(semilla)
+    # Remuestreos por tanda, para no pasar de ~2·10⁷ valores en memoria
+    tanda = max(1, int(2e7 // (N * (d + 2))))
+    S1_b, ST_b = [], []
+    for inicio in range(0, bootstrap, tanda):
+        filas = rng.integers(0, N, (min(tanda, bootstrap - inicio), N))
+        s1, st = _estimadores(f_A[filas], f_B[filas], np.moveaxis(f_AB[:, filas], 0, 1))
+        S1_b.append(s1)
+        ST_b.append(st)
+    alfa = (1 - confianza) / 2 * 100
+    S1_ic = np.percentile(np.concatenate(S1_b), [alfa, 100 - alfa], axis=0).T
+    ST_ic = np.percentile(np.concatenate(ST_b), [alfa, 100 - alfa], axis=0).T
+    return S1, ST, S1_ic, ST_ic, int(validas.sum())
+
+
+def evaluar_fragmento(modelo, nombres, valores, fijos):
+    """q del modelo para un fragmento de filas (columnas en el orden de `nombres`)"""
+    muestras = {**fijos["valores"], **{c: valores[:, i] for i, c in enumerate(nombres)}}
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        q = MODELOS[modelo](muestras, **fijos["argumentos"])
+    return np.broadcast_to(q, (len(valores),))
+
+
+def _inicializar_trabajador():
+    # Abre el almacén de propiedades antes del primer fragmento
+    almacen()
+
+
+def _bloques(A, B):
+    """Matrices A, B y AB_i una a una, sin materializarlas todas a la vez"""
+    yield A
+    yield B
+    for i in range(A.shape[1]):
+        AB = A.copy()
+        AB[:, i] = B[:, i]
+        yield AB
+
+
+def sobol(modelo, factores, n=2 ** 14, bootstrap=BOOTSTRAP, confianza=CONFIANZA, semilla=SEMILLA,
+          trabajadores=None, fragmento=None, progreso=None, **argumentos):
+    """Índices de Sobol de q (W) respecto de cada factor incierto del modelo.
+
+    `factores` sigue la convención de `incertidumbre.propagar`: cada entrada
+    del modelo es una Entrada (factor) o un número (fijo); `argumentos` son los
+    no numéricos (fluido, fase, geometría, capas...). Con un solo trabajador se
+    evalúa en el propio proceso. `progreso(hechas, total)` cuenta evaluaciones.
+    """
+    if modelo not in MODELOS:
+        raise ValueError(f"Modelo desconocido: {modelo!r} (se admite {', '.join(MODELOS)})")
+    inciertas = {c: e for c, e in factores.items() if isinstance(e, Entrada) and e.tolerancia > 0}
+    if not inciertas:
+        raise ValueError("Se requiere al menos un factor con tolerancia")
+    nombres = list(inciertas)
+    fijos = {"valores": {c: e.nominal if isinstance(e, Entrada) else float(e)
+                         for c, e in factores.items() if c not in inciertas},
+             "argumentos": argumentos}
+    A, B = matrices_saltelli(inciertas, n, semilla)
+    N, d = A.shape
+    total = N * (d + 2)
+    trabajadores = trabajadores or trabajadores_disponibles()
+    fragmento = fragmento or tamano_fragmento(total, trabajadores)
+    f = np.empty((d + 2, N))
+    hechas = 0
+
+    if trabajadores == 1 or total <= fragmento:
+        for j, bloque in enumerate(_bloques(A, B)):
+            for inicio in range(0, N, fragmento):
+                q = evaluar_fragmento(modelo, nombres, bloque[inicio:inicio + fragmento], fijos)
+                f[j, inicio:inicio + len(q)] = q
+                hechas += len(q)
+                if progreso is not None:
+                    progreso(hechas, total)
+    else:
+        # A lo sumo 2 fragmentos por proceso en vuelo, como en `barrido`
+        # y las matrices AB_i se arman recién al enviar su primer fragmento
+        tareas = ((j, bloque, inicio) for j, bloque in enumerate(_bloques(A, B))
+                  for inicio in range(0, N, fragmento))
+        siguiente = next(tareas, None)
+        en_vuelo = {}
+        with ProcessPoolExecutor(trabajadores, initializer=_inicializar_trabajador) as ejecutor:
+            try:
+                while siguiente is not None or en_vuelo:
+                    while siguiente is not None and len(en_vuelo) < 2 * trabajadores:
+                        j, bloque, inicio = siguiente
+                        siguiente = next(tareas, None)
+                        futuro = ejecutor.submit(evaluar_fragmento, modelo, nombres,
+                                                 bloque[inicio:inicio + fragmento], fijos)
+                        en_vuelo[futuro] = (j, inicio)
+                    terminados, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                    for futuro in terminados:
+                        j, inicio = en_vuelo.pop(futuro)
+                        q = futuro.result()
+                        f[j, inicio:inicio + len(q)] = q
+                        hechas += len(q)
+                        if progreso is not None:
+                            progreso(hechas, total)
+            finally:
+                for futuro in en_vuelo:
+                    futuro.cancel()
+
+    S1, ST, S1_ic, ST_ic, validas = indices_sobol(f[0], f[1], f[2:], bootstrap, confianza, semilla)
+    todas = f[:2].ravel()
+    todas = todas[np.isfinite(todas)]
+    return ResultadoSobol(nombres, S1, ST, S1_ic, ST_ic, N, validas, total, todas.mean(), todas.var())
+
+
+def a_dataframe(resultado):
+    import pandas as pd
+
+    return pd.DataFrame({
+        "factor": resultado.factores,
+        "S1": resultado.S1, "S1_min": resultado.S1_ic[:, 0], "S1_max": resultado.S1_ic[:, 1],
+        "ST": resultado.ST, "ST_min": resultado.ST_ic[:, 0], "ST_max": resultado.ST_ic[:, 1],
+    })
+
+
+# --- Línea de comandos ---
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m calculos.sensibilidad",
+        description="Índices de Sobol de q para los modelos de conducción y convección")
+    parser.add_argument("modelo", choices=list(MODELOS))
+    parser.add_argument("--factor", nargs=3, action="append", default=[], metavar=("NOMBRE", "MIN", "MAX"),
+                        help="Factor uniforme entre MIN y MAX (SI, °C)")
+    parser.add_argument("--fijo", nargs=2, action="append", default=[], metavar=("NOMBRE", "VALOR"),
+                        help="Entrada fija (SI, °C)")
+    parser.add_argument("--error-propiedades", type=float, default=0.0, metavar="FRACCION",
+                        help="Error relativo uniforme (±) de ρ, μ, k y cp del fluido, como factores")
+    parser.add_argument("--fluido", help="Fluido (placa, cilindro y tubo)")
+    parser.add_argument("--fase", help="Fase del fluido, si tiene")
+    parser.add_argument("--correlacion", help="Correlación del cilindro")
+    parser.add_argument("--geometria", help="Geometría de la pared (conducción)")
+    parser.add_argument("--capas", type=int, help="Número de capas (conducción: factores e1.., k1..)")
+    parser.add_argument("-n", type=int, default=2 ** 14, help="Filas de A y B (se redondea a potencia de 2)")
+    parser.add_argument("--bootstrap", type=int, default=BOOTSTRAP)
+    parser.add_argument("--semilla", type=int, default=SEMILLA)
+    parser.add_argument("--trabajadores", type=int, help="Procesos (por defecto, los núcleos disponibles)")
+    parser.add_argument("--salida", help="CSV o Parquet con los índices")
+    return parser
+
+
+def main(argv=None):
+    from .lote import EscritorResultados
+
+    args = crear_parser().parse_args(argv)
+    factores = {}
+    for nombre, minimo, maximo in args.factor:
+        minimo, maximo = float(minimo), float(maximo)
+        factores[nombre] = Entrada((minimo + maximo) / 2, (maximo - minimo) / 2, UNIFORME)
+    factores.update({nombre: float(valor) for nombre, valor in args.fijo})
+    if args.error_propiedades > 0:
+        factores.update(errores_propiedades(args.error_propiedades, UNIFORME))
+    argumentos = {c: v for c, v in (("fluido", args.fluido), ("fase", args.fase),
+                                    ("correlacion", args.correlacion), ("geometria", args.geometria),
+                                    ("capas", args.capas)) if v is not None}
+    inicio = time.perf_counter()
+    try:
+        r = sobol(args.modelo, factores, args.n, args.bootstrap, semilla=args.semilla,
+                  trabajadores=args.trabajadores, **argumentos)
+    except (ValueError, KeyError, TypeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    duracion = time.perf_counter() - inicio
+    tabla = a_dataframe(r)
+    print(tabla.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    print(f"{r.evaluaciones} evaluaciones ({r.validas} de {r.n} filas válidas) en {duracion:.2f} s")
+    if args.salida:
+        escritor = EscritorResultados(args.salida)
+        escritor.escribir(tabla)
+        escritor.cerrar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,640 @@
+"""Servicio local HTTP/JSON de las cuatro calculadoras.
+
+Un servidor asyncio (sin dependencias fuera de la biblioteca estándar) recibe
+las solicitudes y entrega los cálculos, que son de CPU, a un ProcessPoolExecutor
+cuyos procesos abren una sola vez el almacén de propiedades compartido:
+
+    python -m calculos.servicio --puerto 8765 --trabajadores 4
+
+Rutas:
+
+    POST /placa, /cilindro, /tubo, /conduccion   cálculo de uno o varios casos
+    GET  /salud                                   {"estado": "ok"}
+    GET  /metrics                                 métricas en formato de texto de Prometheus
+
+Los casos usan las mismas columnas que `calculos.lote`, con la unidad entre
+corchetes (sin unidad se asume SI y °C). El cuerpo puede ser un caso, una lista
+de casos o un objeto con "casos" (lista de casos o columnas como listas) y
+"opciones" ("correlacion" en cilindro, "geometria" en conducción):
+
+    {"casos": [{"L [cm]": 50, "b": 0.3, "V": 6, "T_s": 40, "T_inf": 20, "fluido": "aire"}]}
+    {"casos": {"T1": [100, 80], "T2": [20, 20], "e1 [mm]": [10, 20], "k1": [0.7, 0.7]},
+     "opciones": {"geometria": "Plana"}}
+
+La respuesta es {"resultados": [...]}, un objeto por caso con las columnas de
+resultados de `calculos.lote` (null donde el resultado no está definido). Si
+los casos se enviaron como columnas, los resultados vuelven también como
+columnas, {"resultados": {"q [W]": [...], ...}}: para lotes grandes es bastante
+más rápido de codificar y de leer.
+
+Las solicitudes que llegan casi a la vez con el mismo modo, opciones y
+columnas se agrupan en un único lote para el pool: mientras el pool está ocupado
+las solicitudes se siguen sumando al lote que espera turno (hasta `max_lote`
+casos), de modo que los lotes crecen con la carga; si el lote falla, cada solicitud se recalcula por separado
+para que el error de una no afecte a las demás.
+
+Para probarlo sin red basta con levantarlo en segundo plano sobre localhost:
+
+    with ServicioEnSegundoPlano(trabajadores=1) as servicio:
+        codigo, respuesta = solicitar(servicio.url, "/placa", {...})
+"""
+import argparse
+import asyncio
+import bisect
+import http.client
+import json
+import math
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from .barrido import trabajadores_disponibles
+from .cilindro_externo import CHURCHILL, COMPACTA, cargar_coeficientes
+from .conduccion import GEOMETRIAS, PLANA
+from .propiedades import almacen
+
+HOST = "127.0.0.1"
+PUERTO = 8765
+ESPERA = 0.0            # s mínimos que una solicitud espera a otras para formar un lote
+MAX_LOTE = 100_000      # casos por lote enviado al pool
+MAX_CUERPO = 32 * 2**20
+MAX_ENCABEZADOS = 100
+
+MODOS = ("placa", "cilindro", "tubo", "conduccion")
+
+# Opciones de cada modo: nombre -> (valor por defecto, valores admitidos); iguales a las de calculos.lote
+OPCIONES = {
+    "placa": {},
+    "cilindro": {"correlacion": (CHURCHILL, (CHURCHILL, COMPACTA))},
+    "tubo": {},
+    "conduccion": {"geometria": (PLANA, GEOMETRIAS)},
+}
+
+# Límites de los histogramas: segundos de latencia y casos por lote
+LIMITES_LATENCIA = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LIMITES_CASOS = (1, 2, 5, 10, 50, 100, 500, 1_000, 5_000, 10_000, 50_000, 100_000)
+
+JSON = "application/json; charset=utf-8"
+TEXTO_METRICAS = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class ErrorSolicitud(Exception):
+    """Error del cliente: se responde con `codigo` y el mensaje en JSON"""
+
+    def __init__(self, mensaje, codigo=HTTPStatus.BAD_REQUEST):
+        super().__init__(mensaje)
+        self.codigo = codigo
+
+
+# --- Métricas ---
+def _etiquetas(nombres, valores):
+    if not nombres:
+        return ""
+    pares = (f'{n}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+             for n, v in zip(nombres, valores))
+    return "{" + ",".join(pares) + "}"
+
+
+def _numero(valor):
+    return "+Inf" if valor == math.inf else repr(float(valor))
+
+
+class Contador:
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre, self.ayuda, self.etiquetas = nombre, ayuda, tuple(etiquetas)
+        self._valores = {}
+
+    def incrementar(self, *etiquetas, valor=1):
+        self._valores[etiquetas] = self._valores.get(etiquetas, 0) + valor
+
+    def texto(self):
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} counter"]
+        for etiquetas, valor in sorted(self._valores.items()):
+            lineas.append(f"{self.nombre}{_etiquetas(self.etiquetas, etiquetas)} {valor}")
+        return lineas
+
+
+class Histograma:
+    """Histograma acumulativo con límites fijos, como los de Prometheus"""
+
+    def __init__(self, nombre, ayuda, limites, etiquetas=()):
+        self.nombre, self.ayuda, self.etiquetas = nombre, ayuda, tuple(etiquetas)
+        self.limites = tuple(sorted(limites))
+        self._series = {}
+
+    def observar(self, valor, *etiquetas):
+        serie = self._series.get(etiquetas)
+        if serie is None:
+            serie = self._series[etiquetas] = [[0] * (len(self.limites) + 1), 0.0]
+        serie[0][bisect.bisect_left(self.limites, valor)] += 1
+        serie[1] += valor
+
+    def cuantil(self, q, *etiquetas):
+        """Estimación del cuantil q a partir de las cubetas (interpolación lineal dentro de la cubeta)"""
+        serie = self._series.get(etiquetas)
+        if serie is None:
+            return math.nan
+        cuentas = serie[0]
+        objetivo = q * sum(cuentas)
+        acumulado = 0
+        for i, cuenta in enumerate(cuentas):
+            if cuenta and acumulado + cuenta >= objetivo:
+                inferior = self.limites[i - 1] if i else 0.0
+                superior = self.limites[i] if i < len(self.limites) else self.limites[-1]
+                return inferior + (superior - inferior) * (objetivo - acumulado) / cuenta
+            acumulado += cuenta
+        return self.limites[-1]
+
+    def texto(self):
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} histogram"]
+        nombres = self.etiquetas + ("le",)
+        for etiquetas, (cuentas, suma) in sorted(self._series.items()):
+            acumulado = 0
+            for limite, cuenta in zip(self.limites + (math.inf,), cuentas):
+                acumulado += cuenta
+                lineas.append(f"{self.nombre}_bucket{_etiquetas(nombres, etiquetas + (_numero(limite),))} "
+                              f"{acumulado}")
+            base = _etiquetas(self.etiquetas, etiquetas)
+            lineas.append(f"{self.nombre}_sum{base} {_numero(suma)}")
+            lineas.append(f"{self.nombre}_count{base} {acumulado}")
+        return lineas
+
+
+class Metricas:
+    def __init__(self):
+        self.solicitudes = Contador("servicio_solicitudes_total", "Solicitudes atendidas",
+                                    ("ruta", "codigo"))
+        self.latencia = Histograma("servicio_latencia_segundos",
+                                   "Tiempo desde leer la solicitud hasta enviar la respuesta",
+                                   LIMITES_LATENCIA, ("ruta",))
+        self.ejecucion = Histograma("servicio_lote_ejecucion_segundos",
+                                    "Tiempo de cada lote en el pool de procesos", LIMITES_LATENCIA,
+                                    ("modo",))
+        self.casos_lote = Histograma("servicio_lote_casos", "Casos por lote enviado al pool",
+                                     LIMITES_CASOS, ("modo",))
+        self.solicitudes_lote = Histograma("servicio_lote_solicitudes",
+                                           "Solicitudes agrupadas en cada lote", LIMITES_CASOS,
+                                           ("modo",))
+        self.inicio = time.time()
+
+    def texto(self):
+        lineas = ["# HELP servicio_inicio_segundos Hora de inicio del servicio (epoch)",
+                  "# TYPE servicio_inicio_segundos gauge",
+                  f"servicio_inicio_segundos {self.inicio:.3f}"]
+        for metrica in (self.solicitudes, self.latencia, self.ejecucion, self.casos_lote,
+                        self.solicitudes_lote):
+            lineas += metrica.texto()
+        return "\n".join(lineas) + "\n"
+
+
+# --- Cálculo en los procesos del pool ---
+def _inicializar_trabajador():
+    # Abre el almacén compartido, la tabla de coeficientes e importa pandas antes del primer lote
+    from . import lote  # noqa: F401
+    almacen()
+    cargar_coeficientes()
+
+
+def _lista_json(serie):
+    """Columna -> lista de Python con None en lugar de NaN e infinitos (JSON no los admite)"""
+    if not isinstance(serie.dtype, np.dtype):
+        # Tipos anulables de pandas (p. ej. las iteraciones del balance del tubo): pd.NA -> None
+        return serie.to_numpy(dtype=object, na_value=None).tolist()
+    valores = serie.to_numpy()
+    if valores.dtype.kind == "f":
+        finitos = np.isfinite(valores)
+        if not finitos.all():
+            valores = valores.astype(object)
+            valores[~finitos] = None
+    return valores.tolist()
+
+
+def _cuerpo(resultados, inicio, fin, por_columnas):
+    if por_columnas:
+        salida = {c: valores[inicio:fin] for c, valores in resultados.items()}
+    else:
+        nombres = list(resultados)
+        filas = zip(*(valores[inicio:fin] for valores in resultados.values()))
+        salida = [dict(zip(nombres, fila)) for fila in filas]
+    return json.dumps({"resultados": salida}, ensure_ascii=False).encode("utf-8")
+
+
+def _error(mensaje):
+    return json.dumps({"error": mensaje}, ensure_ascii=False).encode("utf-8")
+
+
+def evaluar_lote(modo, opciones, columnas, cortes, por_columnas=False):
+    """Calcula un lote y devuelve ([(código, cuerpo JSON) por corte [inicio, fin)], segundos)"""
+    import pandas as pd
+
+    from .lote import EJECUTORES
+
+    args = argparse.Namespace(**dict(opciones))
+    inicio = time.perf_counter()
+    try:
+        df = pd.DataFrame(columnas)
+        resultados = EJECUTORES[modo](df, args)
+    except (ValueError, KeyError, TypeError) as e:
+        if len(cortes) > 1:
+            # Se aísla la solicitud con datos inválidos: las demás del lote se responden igual
+            respuestas = []
+            for a, b in cortes:
+                parte = {c: v[a:b] for c, v in columnas.items()}
+                respuestas += evaluar_lote(modo, opciones, parte, [(0, b - a)], por_columnas)[0]
+            return respuestas, time.perf_counter() - inicio
+        return [(HTTPStatus.BAD_REQUEST, _error(str(e)))], time.perf_counter() - inicio
+
+    listas = {c: _lista_json(resultados[c]) for c in resultados.columns}
+    return [(HTTPStatus.OK, _cuerpo(listas, a, b, por_columnas)) for a, b in cortes], time.perf_counter() - inicio
+
+
+# --- Agrupación de solicitudes ---
+_Pendiente = namedtuple("_Pendiente", "columnas cortes futuros temporizador")
+
+
+class Agrupador:
+    """Junta en un único lote las solicitudes compatibles que esperan turno en el pool.
+
+    Un lote sale en cuanto vence `espera` si hay lugar en el pool (a lo sumo
+    `limite` lotes en vuelo); si no, sigue sumando solicitudes hasta que se
+    libere un lugar. Con poca carga no se agrega latencia y con mucha los lotes
+    crecen solos, hasta `max_lote` casos.
+    """
+
+    def __init__(self, ejecutar_lote, limite, espera=ESPERA, max_lote=MAX_LOTE):
+        self._ejecutar_lote = ejecutar_lote
+        self.limite = limite
+        self.espera = espera
+        self.max_lote = max_lote
+        self._pendientes = {}
+        self._listos = deque()
+        self._en_vuelo = 0
+
+    def agregar(self, clave, columnas, n):
+        """Futuro con (código, cuerpo) de la solicitud; `clave` = (modo, opciones, columnas, formato)"""
+        loop = asyncio.get_running_loop()
+        pendiente = self._pendientes.get(clave)
+        if pendiente is not None and pendiente.cortes[-1][1] + n > self.max_lote:
+            self._lanzar(clave)
+            pendiente = None
+        if pendiente is None:
+            pendiente = _Pendiente({c: [] for c in columnas}, [], [],
+                                   loop.call_later(self.espera, self._listo, clave))
+            self._pendientes[clave] = pendiente
+        inicio = pendiente.cortes[-1][1] if pendiente.cortes else 0
+        for c, valores in columnas.items():
+            pendiente.columnas[c].extend(valores)
+        pendiente.cortes.append((inicio, inicio + n))
+        futuro = loop.create_future()
+        pendiente.futuros.append(futuro)
+        if inicio + n >= self.max_lote:
+            self._lanzar(clave)
+        return futuro
+
+    def _listo(self, clave):
+        if self._en_vuelo < self.limite:
+            self._lanzar(clave)
+        else:
+            self._listos.append(clave)
+
+    def _lanzar(self, clave):
+        pendiente = self._pendientes.pop(clave, None)
+        if pendiente is None:
+            return
+        pendiente.temporizador.cancel()
+        self._en_vuelo += 1
+        tarea = asyncio.ensure_future(self._ejecutar_lote(clave, pendiente.columnas, pendiente.cortes,
+                                                          pendiente.futuros))
+        tarea.add_done_callback(self._terminado)
+
+    def _terminado(self, tarea):
+        self._en_vuelo -= 1
+        while self._listos and self._en_vuelo < self.limite:
+            self._lanzar(self._listos.popleft())
+
+
+# --- Lectura de solicitudes ---
+def _casos_y_opciones(datos):
+    """Cuerpo JSON -> (columnas, número de casos, opciones sin validar, si vino por columnas)"""
+    opciones = {}
+    if isinstance(datos, dict) and "casos" in datos:
+        opciones = datos.get("opciones") or {}
+        if not isinstance(opciones, dict):
+            raise ErrorSolicitud("'opciones' debe ser un objeto")
+        casos = datos["casos"]
+    elif isinstance(datos, dict):
+        casos = [datos]
+    else:
+        casos = datos
+
+    if isinstance(casos, dict):
+        columnas = {str(c): v if isinstance(v, list) else [v] for c, v in casos.items()}
+        largos = {len(v) for v in columnas.values()}
+        if len(largos) > 1:
+            raise ErrorSolicitud("Todas las columnas de 'casos' deben tener el mismo largo")
+        n = largos.pop() if largos else 0
+    elif isinstance(casos, list):
+        if not all(isinstance(caso, dict) for caso in casos):
+            raise ErrorSolicitud("Cada caso debe ser un objeto con sus columnas")
+        nombres = list(dict.fromkeys(c for caso in casos for c in caso))
+        columnas = {str(c): [caso.get(c) for caso in casos] for c in nombres}
+        n = len(casos)
+    else:
+        raise ErrorSolicitud("Se esperaba un caso, una lista de casos o {'casos': ...}")
+    if n == 0 or not columnas:
+        raise ErrorSolicitud("La solicitud no contiene casos")
+    return columnas, n, opciones, isinstance(casos, dict)
+
+
+def _validar_opciones(modo, opciones):
+    admitidas = OPCIONES[modo]
+    desconocidas = set(opciones) - set(admitidas)
+    if desconocidas:
+        raise ErrorSolicitud(f"Opciones no válidas para {modo}: {', '.join(sorted(desconocidas))}")
+    validadas = []
+    for nombre, (defecto, valores) in admitidas.items():
+        valor = opciones.get(nombre, defecto)
+        if valor not in valores:
+            raise ErrorSolicitud(f"{nombre} debe ser uno de: {', '.join(valores)}")
+        validadas.append((nombre, valor))
+    return tuple(validadas)
+
+
+class Servicio:
+    """Servidor HTTP/1.1 mínimo sobre asyncio con un pool de procesos para los cálculos.
+
+    Con `trabajadores=0` los lotes se calculan en un hilo del propio proceso.
+    """
+
+    def __init__(self, trabajadores=None, espera=ESPERA, max_lote=MAX_LOTE, max_cuerpo=MAX_CUERPO):
+        self.trabajadores = trabajadores_disponibles() if trabajadores is None else trabajadores
+        self.max_cuerpo = max_cuerpo
+        self.metricas = Metricas()
+        # A lo sumo 2 lotes por proceso en vuelo: el resto se sigue agrupando en vez de hacer cola en el pool
+        self.agrupador = Agrupador(self._ejecutar_lote, 2 * max(self.trabajadores, 1), espera, max_lote)
+        self._pool = None
+        self._servidor = None
+        self._conexiones = {}
+
+    async def iniciar(self, host=HOST, puerto=PUERTO):
+        """Abre el pool y el socket; devuelve el puerto real (útil con puerto=0)"""
+        if self.trabajadores > 0:
+            self._pool = ProcessPoolExecutor(self.trabajadores, initializer=_inicializar_trabajador)
+        else:
+            _inicializar_trabajador()
+        self._servidor = await asyncio.start_server(self._atender, host, puerto)
+        return self._servidor.sockets[0].getsockname()[1]
+
+    async def servir(self):
+        async with self._servidor:
+            await self._servidor.serve_forever()
+
+    async def detener(self):
+        if self._servidor is not None:
+            self._servidor.close()
+            # Las conexiones abiertas (keep-alive) no se cierran solas al cerrar el servidor:
+            # al cerrar su transporte, el lector recibe fin de archivo y la tarea termina
+            for escritor in list(self._conexiones.values()):
+                escritor.close()
+            await asyncio.gather(*self._conexiones, return_exceptions=True)
+            await self._servidor.wait_closed()
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+
+    async def _ejecutar_lote(self, clave, columnas, cortes, futuros):
+        modo, opciones, _, por_columnas = clave
+        loop = asyncio.get_running_loop()
+        try:
+            respuestas, duracion = await loop.run_in_executor(
+                self._pool, evaluar_lote, modo, opciones, columnas, cortes, por_columnas)
+            self.metricas.ejecucion.observar(duracion, modo)
+            self.metricas.casos_lote.observar(cortes[-1][1], modo)
+            self.metricas.solicitudes_lote.observar(len(cortes), modo)
+        except BrokenProcessPool:
+            respuestas = [(HTTPStatus.SERVICE_UNAVAILABLE, _error("El pool de cálculo no está disponible"))]
+            respuestas *= len(futuros)
+        except Exception as e:  # noqa: BLE001 - el cliente debe recibir una respuesta siempre
+            respuestas = [(HTTPStatus.INTERNAL_SERVER_ERROR, _error(f"Error interno: {e}"))] * len(futuros)
+        for futuro, respuesta in zip(futuros, respuestas):
+            if not futuro.done():
+                futuro.set_result(respuesta)
+
+    async def _calcular(self, modo, cuerpo):
+        try:
+            datos = json.loads(cuerpo)
+        except ValueError as e:
+            raise ErrorSolicitud(f"JSON no válido: {e}") from None
+        columnas, n, opciones, por_columnas = _casos_y_opciones(datos)
+        clave = (modo, _validar_opciones(modo, opciones), tuple(sorted(columnas)), por_columnas)
+        return await self.agrupador.agregar(clave, columnas, n)
+
+    async def _responder(self, metodo, ruta, cuerpo):
+        """(código, cuerpo, tipo de contenido, encabezados extra) de una solicitud"""
+        modo = ruta.lstrip("/")
+        if modo in MODOS:
+            if metodo != "POST":
+                raise ErrorSolicitud("Use POST", HTTPStatus.METHOD_NOT_ALLOWED)
+            codigo, contenido = await self._calcular(modo, cuerpo)
+            return codigo, contenido, JSON
+        if ruta in ("/salud", "/metrics"):
+            if metodo not in ("GET", "HEAD"):
+                raise ErrorSolicitud("Use GET", HTTPStatus.METHOD_NOT_ALLOWED)
+            if ruta == "/salud":
+                return HTTPStatus.OK, b'{"estado": "ok"}', JSON
+            return HTTPStatus.OK, self.metricas.texto().encode("utf-8"), TEXTO_METRICAS
+        raise ErrorSolicitud(f"Ruta desconocida: {ruta}", HTTPStatus.NOT_FOUND)
+
+    async def _leer_solicitud(self, lector):
+        """(método, ruta, encabezados, cuerpo) o None si el cliente cerró la conexión"""
+        linea = await lector.readline()
+        if not linea.strip():
+            return None
+        try:
+            metodo, objetivo, version = linea.decode("latin-1").split()
+        except ValueError:
+            raise ErrorSolicitud("Línea de solicitud mal formada") from None
+        encabezados = {"version": version}
+        for _ in range(MAX_ENCABEZADOS):
+            linea = await lector.readline()
+            if linea in (b"\r\n", b"\n", b""):
+                break
+            nombre, _, valor = linea.decode("latin-1").partition(":")
+            encabezados[nombre.strip().lower()] = valor.strip()
+        else:
+            raise ErrorSolicitud("Demasiados encabezados")
+        if "chunked" in encabezados.get("transfer-encoding", "").lower():
+            raise ErrorSolicitud("Se requiere Content-Length", HTTPStatus.LENGTH_REQUIRED)
+        try:
+            largo = int(encabezados.get("content-length", 0))
+        except ValueError:
+            raise ErrorSolicitud("Content-Length no válido") from None
+        if largo > self.max_cuerpo:
+            raise ErrorSolicitud(f"El cuerpo supera {self.max_cuerpo} bytes",
+                                 HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        cuerpo = await lector.readexactly(largo) if largo else b""
+        ruta = urlsplit(objetivo).path.rstrip("/") or "/"
+        return metodo.upper(), ruta, encabezados, cuerpo
+
+    async def _atender(self, lector, escritor):
+        tarea = asyncio.current_task()
+        self._conexiones[tarea] = escritor
+        try:
+            while True:
+                inicio = time.perf_counter()
+                ruta, mantener, metodo = "-", False, "GET"
+                try:
+                    solicitud = await self._leer_solicitud(lector)
+                    if solicitud is None:
+                        break
+                    metodo, ruta, encabezados, cuerpo = solicitud
+                    inicio = time.perf_counter()
+                    conexion = encabezados.get("connection", "").lower()
+                    mantener = conexion == "keep-alive" or (encabezados["version"] == "HTTP/1.1"
+                                                            and conexion != "close")
+                    codigo, contenido, tipo = await self._responder(metodo, ruta, cuerpo)
+                except ErrorSolicitud as e:
+                    codigo, contenido, tipo = e.codigo, _error(str(e)), JSON
+                    # Tras un error de lectura el flujo puede estar desalineado: se cierra
+                    mantener = mantener and e.codigo not in (HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                                             HTTPStatus.LENGTH_REQUIRED)
+
+                codigo = HTTPStatus(codigo)
+                escritor.write(
+                    f"HTTP/1.1 {codigo.value} {codigo.phrase}\r\n"
+                    f"Content-Type: {tipo}\r\nContent-Length: {len(contenido)}\r\n"
+                    f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n".encode("latin-1"))
+                if metodo != "HEAD":
+                    escritor.write(contenido)
+                await escritor.drain()
+                etiqueta = ruta if ruta in ("/salud", "/metrics") or ruta.lstrip("/") in MODOS else "otra"
+                self.metricas.latencia.observar(time.perf_counter() - inicio, etiqueta)
+                self.metricas.solicitudes.incrementar(etiqueta, codigo.value)
+                if not mantener:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            self._conexiones.pop(tarea, None)
+            escritor.close()
+            try:
+                await escritor.wait_closed()
+            except ConnectionError:
+                pass
+
+
+# --- Uso desde otros programas y pruebas locales ---
+class ServicioEnSegundoPlano:
+    """Servicio en un hilo con su propio bucle de eventos, sobre localhost y un puerto libre"""
+
+    def __init__(self, host=HOST, puerto=0, **opciones):
+        self.host = host
+        self._puerto_pedido = puerto
+        self.servicio = Servicio(**opciones)
+        self.puerto = None
+        self._loop = None
+        self._hilo = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.puerto}"
+
+    def __enter__(self):
+        listo = threading.Event()
+        fallo = []
+
+        def correr():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self.puerto = self._loop.run_until_complete(
+                    self.servicio.iniciar(self.host, self._puerto_pedido))
+            except BaseException as e:  # noqa: BLE001 - se relanza en el hilo que lo pidió
+                fallo.append(e)
+                listo.set()
+                return
+            listo.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self.servicio.detener())
+            self._loop.close()
+
+        self._hilo = threading.Thread(target=correr, name="servicio", daemon=True)
+        self._hilo.start()
+        listo.wait()
+        if fallo:
+            raise fallo[0]
+        return self
+
+    def __exit__(self, *excepcion):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._hilo.join()
+
+
+def solicitar(url, ruta, datos=None, conexion=None, tiempo_limite=60):
+    """(código, respuesta) de una solicitud; POST con `datos` como JSON, GET si es None.
+
+    Se puede pasar una `http.client.HTTPConnection` abierta para reutilizarla.
+    """
+    propia = conexion is None
+    if propia:
+        partes = urlsplit(url)
+        conexion = http.client.HTTPConnection(partes.hostname, partes.port, timeout=tiempo_limite)
+    try:
+        if datos is None:
+            conexion.request("GET", ruta)
+        else:
+            cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+            conexion.request("POST", ruta, cuerpo, {"Content-Type": JSON})
+        respuesta = conexion.getresponse()
+        contenido = respuesta.read()
+        if respuesta.getheader("Content-Type", "").startswith("application/json"):
+            return respuesta.status, json.loads(contenido)
+        return respuesta.status, contenido.decode("utf-8")
+    finally:
+        if propia:
+            conexion.close()
+
+
+# --- Línea de comandos ---
+def crear_parser():
+    parser = argparse.ArgumentParser(prog="python -m calculos.servicio",
+                                     description="Servicio local HTTP/JSON de las calculadoras")
+    parser.add_argument("--host", default=HOST, help="Dirección de escucha (por defecto solo localhost)")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--trabajadores", type=int,
+                        help="Procesos de cálculo (por defecto, los núcleos disponibles; 0 = en el propio proceso)")
+    parser.add_argument("--espera-ms", type=float, default=ESPERA * 1000,
+                        help="Milisegundos mínimos que una solicitud espera a otras para agruparse")
+    parser.add_argument("--max-lote", type=int, default=MAX_LOTE, help="Casos por lote como máximo")
+    return parser
+
+
+async def _servir(args):
+    servicio = Servicio(args.trabajadores, args.espera_ms / 1000, args.max_lote)
+    puerto = await servicio.iniciar(args.host, args.puerto)
+    print(f"Servicio en http://{args.host}:{puerto} ({servicio.trabajadores} trabajadores)", flush=True)
+    try:
+        await servicio.servir()
+    finally:
+        await servicio.detener()
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    try:
+        asyncio.run(_servir(args))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
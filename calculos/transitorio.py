@@ -0,0 +1,249 @@
+"""Conducción unidimensional transitoria en paredes multicapa (plana, cilíndrica, esférica).
+
+Volúmenes finitos con Crank–Nicolson: cada paso resuelve un sistema
+tridiagonal con el algoritmo de Thomas en O(N). La matriz no cambia entre
+pasos, así que se factoriza una sola vez. Muchas paredes se integran a la vez
+a lo largo del primer eje (B paredes × N nodos). Las temperaturas se entregan
+como instantáneas a medida que avanza el tiempo, sin guardar la historia
+completa:
+
+    malla = discretizar(CILINDRICA, espesores, k, rho, cp, n_nodos=400, longitud=1.0, r_i=0.02)
+    for foto in simular(malla, T_inicial=20, dt=1.0, n_pasos=3600, h_in=np.inf, T_in=150,
+                        h_out=10, T_out=20, cada=60):
+        ...  # foto.t, foto.T (B, N), foto.q_in, foto.q_out
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from .conduccion import CODIGO_CILINDRICA, CODIGO_PLANA, codigos_geometria
+
+MallaTransitoria = namedtuple("MallaTransitoria", [
+    "x",           # (B, N) posición del centro de cada nodo (radio en cilindro/esfera), m
+    "caras",       # (B, N+1) posición de las caras de los volúmenes, m
+    "capa",        # (B, N) índice de la capa a la que pertenece cada nodo
+    "C",           # (B, N) capacidad térmica de cada volumen, J/K
+    "G",           # (B, N-1) conductancia entre nodos vecinos, W/K
+    "R_borde_in",  # (B,) resistencia de la cara interior al primer nodo, K/W
+    "R_borde_out", # (B,) resistencia del último nodo a la cara exterior, K/W
+    "A_in",        # (B,) área de la superficie interior, m²
+    "A_out",       # (B,) área de la superficie exterior, m²
+])
+
+# Hasta este número de paredes el barrido de Thomas se hace con floats de Python
+LOTE_ESCALAR = 8
+
+Instantanea = namedtuple("Instantanea", ["paso", "t", "T", "q_in", "q_out"])
+
+
+def _casquete(codigos, a, b, k, area, longitud):
+    """Resistencia de conducción entre las posiciones a < b (misma forma que k)"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.select(
+            [codigos == CODIGO_PLANA, codigos == CODIGO_CILINDRICA],
+            [(b - a) / (k * area), np.log(b / a) / (2 * np.pi * longitud * k)],
+            (1 / a - 1 / b) / (4 * np.pi * k))
+
+
+def _area(codigos, r, area, longitud):
+    return np.select([codigos == CODIGO_PLANA, codigos == CODIGO_CILINDRICA],
+                     [area + 0 * r, 2 * np.pi * r * longitud], 4 * np.pi * r ** 2)
+
+
+def _volumen(codigos, a, b, area, longitud):
+    return np.select([codigos == CODIGO_PLANA, codigos == CODIGO_CILINDRICA],
+                     [area * (b - a), np.pi * longitud * (b ** 2 - a ** 2)],
+                     4 / 3 * np.pi * (b ** 3 - a ** 3))
+
+
+def nodos_por_capa(espesores, n_nodos):
+    """Reparte n_nodos entre las capas de cada pared en proporción a su espesor (mínimo 1)"""
+    e = np.atleast_2d(np.asarray(espesores, dtype=float))
+    mascara = np.isfinite(e) & (e > 0)
+    if n_nodos < mascara.sum(axis=1).max():
+        raise ValueError("Se requiere al menos un nodo por capa")
+    e = np.where(mascara, e, 0.0)
+    n = np.where(mascara, np.maximum(np.floor(n_nodos * e / e.sum(axis=1, keepdims=True)), 1), 0)
+    # El resto (positivo o negativo) se asigna a la capa más gruesa
+    gruesa = np.argmax(e, axis=1)
+    filas = np.arange(len(e))
+    n[filas, gruesa] += n_nodos - n.sum(axis=1)
+    if (n[filas, gruesa] < 1).any():
+        raise ValueError("Demasiadas capas para el número de nodos indicado")
+    return n.astype(int)
+
+
+def discretizar(geometria, espesores, k, rho, cp, n_nodos=100, area=1.0, longitud=1.0, r_i=None):
+    """Malla de volúmenes finitos de B paredes con N nodos cada una (SI).
+
+    espesores, k, rho y cp tienen forma (B, M) rellena con NaN como en
+    `calculos.conduccion`; los nodos se reparten entre capas según su espesor
+    y sus caras coinciden con las interfaces entre capas.
+    """
+    e = np.atleast_2d(np.asarray(espesores, dtype=float))
+    B, M = e.shape
+    codigos = codigos_geometria(geometria, B)
+    k, rho, cp = (np.broadcast_to(np.asarray(v, dtype=float), e.shape) for v in (k, rho, cp))
+    area, longitud = (np.broadcast_to(np.asarray(v, dtype=float), (B,)) for v in (area, longitud))
+    radiales = codigos != CODIGO_PLANA
+    r_i = np.broadcast_to(np.asarray(np.nan if r_i is None else r_i, dtype=float), (B,))
+    if np.isnan(r_i[radiales]).any():
+        raise ValueError("Las geometrías cilíndrica y esférica requieren el radio interior r_i")
+    inicio = np.where(radiales, r_i, 0.0)
+
+    n = nodos_por_capa(e, n_nodos)
+    # Capa de cada nodo: cada fila de n suma n_nodos, así que el resultado es (B, N)
+    capa = np.repeat(np.tile(np.arange(M), B), n.ravel()).reshape(B, n_nodos)
+    tomar = lambda v: np.take_along_axis(v, capa, axis=1)
+    e_nodo, n_nodo = tomar(e), tomar(n)
+    k_nodo, rho_nodo, cp_nodo = tomar(k), tomar(rho), tomar(cp)
+    if not (np.isfinite(k_nodo).all() and np.isfinite(rho_nodo).all() and np.isfinite(cp_nodo).all()):
+        raise ValueError("Cada capa requiere k, densidad y calor específico numéricos")
+
+    caras = np.cumsum(np.column_stack([inicio, e_nodo / n_nodo]), axis=1)
+    x = (caras[:, :-1] + caras[:, 1:]) / 2
+
+    cod, A, Lc = codigos[:, None], area[:, None], longitud[:, None]
+    R_izq = _casquete(cod, caras[:, :-1], x, k_nodo, A, Lc)
+    R_der = _casquete(cod, x, caras[:, 1:], k_nodo, A, Lc)
+    C = rho_nodo * cp_nodo * _volumen(cod, caras[:, :-1], caras[:, 1:], A, Lc)
+
+    return MallaTransitoria(
+        x=x, caras=caras, capa=capa, C=C,
+        G=1 / (R_der[:, :-1] + R_izq[:, 1:]),
+        R_borde_in=R_izq[:, 0], R_borde_out=R_der[:, -1],
+        A_in=_area(codigos, caras[:, 0], area, longitud),
+        A_out=_area(codigos, caras[:, -1], area, longitud),
+    )
+
+
+class FactorTridiagonal:
+    """Factorización de Thomas de un sistema tridiagonal, reutilizable mientras la matriz no cambie.
+
+    Los tres arreglos tienen forma (N, ...) con el sistema a lo largo del primer
+    eje y los demás ejes como lote; inferior[0] y superior[-1] no se usan.
+    """
+
+    def __init__(self, inferior, diagonal, superior):
+        N = diagonal.shape[0]
+        self.inferior = np.asarray(inferior, dtype=float)
+        self.c_prima = np.empty_like(diagonal, dtype=float)
+        self.inv_den = np.empty_like(diagonal, dtype=float)
+        self.inv_den[0] = 1 / diagonal[0]
+        self.c_prima[0] = superior[0] * self.inv_den[0]
+        for i in range(1, N):
+            self.inv_den[i] = 1 / (diagonal[i] - self.inferior[i] * self.c_prima[i - 1])
+            self.c_prima[i] = superior[i] * self.inv_den[i] if i < N - 1 else 0.0
+        self._listas = None
+
+    def resolver(self, d):
+        """Resuelve en sitio sobre `d` (misma forma que la diagonal); O(N)"""
+        if d[0].size <= LOTE_ESCALAR:
+            return self._resolver_escalar(d)
+        inferior, c_prima, inv_den = self.inferior, self.c_prima, self.inv_den
+        N = d.shape[0]
+        d[0] *= inv_den[0]
+        for i in range(1, N):
+            d[i] -= inferior[i] * d[i - 1]
+            d[i] *= inv_den[i]
+        for i in range(N - 2, -1, -1):
+            d[i] -= c_prima[i] * d[i + 1]
+        return d
+
+    def _resolver_escalar(self, d):
+        # Con pocos sistemas, el barrido con floats de Python evita el costo fijo
+        # de una operación de NumPy por nodo
+        N = d.shape[0]
+        columnas = d.reshape(N, -1)
+        if self._listas is None:
+            self._listas = [tuple(v.reshape(N, -1)[:, j].tolist() for v in
+                                  (self.inferior, self.c_prima, self.inv_den))
+                            for j in range(columnas.shape[1])]
+        for j, (inferior, c_prima, inv_den) in enumerate(self._listas):
+            x = columnas[:, j].tolist()
+            y = x[0] * inv_den[0]
+            x[0] = y
+            for i in range(1, N):
+                y = (x[i] - inferior[i] * y) * inv_den[i]
+                x[i] = y
+            for i in range(N - 2, -1, -1):
+                y = x[i] - c_prima[i] * y
+                x[i] = y
+            columnas[:, j] = x
+        return d
+
+
+def _conductancia_borde(h, A, R_borde):
+    # h = 0: adiabático; h = inf: temperatura de superficie impuesta
+    with np.errstate(divide="ignore"):
+        return 1 / (1 / (h * A) + R_borde)
+
+
+def simular(malla, T_inicial, dt, n_pasos, h_in=0.0, T_in=0.0, h_out=0.0, T_out=0.0, cada=1,
+            arranque=2, pasos=()):
+    """Integra con Crank–Nicolson y entrega Instantanea cada `cada` pasos (y al final).
+
+    `pasos` agrega instantáneas en esos números de paso aunque no sean múltiplos de `cada`.
+
+    Los primeros `arranque` pasos se dan con Euler implícito en medios pasos.
+
+    En cada borde el medio a T_in / T_out se acopla con un coeficiente h
+    (W/m²·K): 0 es adiabático y np.inf impone la temperatura en la superficie.
+    T_inicial puede ser un escalar, uno por pared (B,) o un perfil (B, N).
+    Las instantáneas incluyen la temperatura nodal (B, N) y el calor que entra
+    por la cara interior y sale por la exterior (W).
+    """
+    B, N = malla.C.shape
+    h_in, T_in, h_out, T_out = (np.broadcast_to(np.asarray(v, dtype=float), (B,))
+                                for v in (h_in, T_in, h_out, T_out))
+    G_in = _conductancia_borde(h_in, malla.A_in, malla.R_borde_in)
+    G_out = _conductancia_borde(h_out, malla.A_out, malla.R_borde_out)
+
+    # Se trabaja con nodos en el primer eje: cada fila del barrido es contigua
+    C_dt = np.ascontiguousarray(malla.C.T) / dt
+    G = np.ascontiguousarray(malla.G.T)
+    suma_G = np.zeros((N, B))
+    suma_G[:-1] += G
+    suma_G[1:] += G
+    suma_G[0] += G_in
+    suma_G[-1] += G_out
+    fuente = np.zeros((N, B))
+    fuente[0] += G_in * T_in
+    fuente[-1] += G_out * T_out
+
+    # (C/dt + K/2) T^{n+1} = (C/dt - K/2) T^n + fuente
+    inferior = np.zeros((N, B))
+    superior = np.zeros((N, B))
+    inferior[1:] = -G / 2
+    superior[:-1] = -G / 2
+    factor = FactorTridiagonal(inferior, C_dt + suma_G / 2, superior)
+    diag_explicita = C_dt - suma_G / 2
+    G_medio = G / 2
+
+    T = np.array(np.broadcast_to(np.asarray(T_inicial, dtype=float).T, (N, B)))
+
+    def foto(paso):
+        return Instantanea(paso, paso * dt, T.T.copy(),
+                           G_in * (T_in - T[0]), G_out * (T[-1] - T_out))
+
+    pasos = frozenset(pasos)
+    yield foto(0)
+    d = np.empty((N, B))
+    for paso in range(1, n_pasos + 1):
+        if paso <= arranque:
+            # Arranque de Rannacher: dos medios pasos de Euler implícito amortiguan
+            # las oscilaciones de Crank–Nicolson ante un salto de temperatura.
+            # (2C/dt + K) es el doble de la matriz de CN: se reutiliza el factor.
+            for _ in range(2):
+                np.multiply(C_dt, T, out=d)
+                d += fuente / 2
+                T, d = factor.resolver(d), T
+        else:
+            np.multiply(diag_explicita, T, out=d)
+            d[:-1] += G_medio * T[1:]
+            d[1:] += G_medio * T[:-1]
+            d += fuente
+            # El búfer de la temperatura anterior se reutiliza para el siguiente lado derecho
+            T, d = factor.resolver(d), T
+        if paso % cada == 0 or paso == n_pasos or paso in pasos:
+            yield foto(paso)
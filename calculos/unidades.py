@@ -0,0 +1,145 @@
+"""Registro único de unidades con conversión vectorizada.
+
+Cada unidad pertenece a una dimensión y se define por (factor, desplazamiento)
+hacia la unidad SI de esa dimensión (la primera de su tabla):
+
+    valor_si = valor * factor + desplazamiento
+
+Las tablas se validan y se precalculan al importar el módulo, de modo que
+convertir un arreglo completo es un solo multiplicar-sumar, sin diccionarios ni
+bucles por elemento:
+
+    a_si(T, "temperatura", "°F")               # arreglo o escalar en °C
+    desde_si(q, "potencia", "BTU/h")           # de W a BTU/h
+    convertir(L, "longitud", "in", "cm")
+    a_si(V, "velocidad", ["ft/s", "mph", ...])  # una unidad por elemento
+"""
+import math
+from collections import namedtuple
+
+import numpy as np
+
+# Unidad -> (factor, desplazamiento) hacia SI / °C, agrupadas por dimensión; la primera es la SI
+UNIDADES = {
+    "temperatura": {"°C": (1.0, 0.0), "°F": (5 / 9, -32 * 5 / 9), "K": (1.0, -273.15),
+                    "R": (5 / 9, -491.67 * 5 / 9)},
+    "longitud": {"m": (1.0, 0.0), "cm": (0.01, 0.0), "mm": (0.001, 0.0), "μm": (1e-6, 0.0),
+                 "in": (0.0254, 0.0), "ft": (0.3048, 0.0)},
+    "velocidad": {"m/s": (1.0, 0.0), "cm/s": (0.01, 0.0), "km/h": (1 / 3.6, 0.0),
+                  "ft/s": (0.3048, 0.0), "mph": (0.44704, 0.0)},
+    "area": {"m²": (1.0, 0.0), "cm²": (1e-4, 0.0), "mm²": (1e-6, 0.0),
+             "ft²": (0.092903, 0.0), "in²": (0.00064516, 0.0)},
+    "presion": {"kPa": (1.0, 0.0), "Pa": (0.001, 0.0), "bar": (100.0, 0.0),
+                "atm": (101.325, 0.0), "psi": (6.894757, 0.0)},
+    "conductividad": {"W/m·K": (1.0, 0.0), "W/cm·K": (100.0, 0.0), "W/mm·K": (1000.0, 0.0),
+                      "BTU/(h·ft·°F)": (1.73073, 0.0)},
+    "coef_h": {"W/m²·K": (1.0, 0.0), "W/cm²·K": (1e4, 0.0), "BTU/(h·ft²·°F)": (5.67826, 0.0)},
+    "tiempo": {"s": (1.0, 0.0), "min": (60.0, 0.0), "h": (3600.0, 0.0)},
+    "potencia": {"W": (1.0, 0.0), "BTU/h": (1 / 3.41214, 0.0), "kcal/h": (1 / 0.859845, 0.0)},
+    "flujo_calor": {"W/m²": (1.0, 0.0), "BTU/(h·ft²)": (1 / 0.316998, 0.0),
+                    "kcal/(h·m²)": (1 / 0.859845, 0.0)},
+    "resistencia": {"K/W": (1.0, 0.0), "°F·h/BTU": (1.895634, 0.0)},
+    "resistencia_contacto": {"m²·K/W": (1.0, 0.0), "h·ft²·°F/BTU": (0.1761102, 0.0)},
+}
+
+# Tablas precalculadas de una dimensión: posición de cada unidad y arreglos de factores
+Tabla = namedtuple("Tabla", "si indices factores desplazamientos inversos")
+
+
+def _validar(unidades):
+    """Comprueba el registro y devuelve las tablas por dimensión"""
+    tablas = {}
+    for dimension, tabla in unidades.items():
+        if not tabla:
+            raise ValueError(f"La dimensión {dimension!r} no tiene unidades")
+        si = next(iter(tabla))
+        if tabla[si] != (1.0, 0.0):
+            raise ValueError(f"La primera unidad de {dimension!r} ({si}) debe ser la SI: (1, 0)")
+        for unidad, (factor, desplazamiento) in tabla.items():
+            if not (math.isfinite(factor) and factor > 0 and math.isfinite(desplazamiento)):
+                raise ValueError(f"Conversión no válida para {unidad!r} en {dimension!r}")
+        factores = np.array([f for f, _ in tabla.values()])
+        desplazamientos = np.array([d for _, d in tabla.values()])
+        tablas[dimension] = Tabla(si, {u: i for i, u in enumerate(tabla)}, factores, desplazamientos,
+                                  {u: (1 / f, -d / f) for u, (f, d) in tabla.items()})
+    return tablas
+
+
+TABLAS = _validar(UNIDADES)
+
+
+def _tabla(dimension):
+    try:
+        return TABLAS[dimension]
+    except KeyError:
+        raise ValueError(f"Dimensión desconocida: {dimension!r}") from None
+
+
+def unidad_si(dimension):
+    return _tabla(dimension).si
+
+
+def unidades_de(dimension):
+    """Símbolos admitidos para la dimensión, empezando por la unidad SI"""
+    _tabla(dimension)
+    return tuple(UNIDADES[dimension])
+
+
+def validar_unidad(dimension, unidad):
+    if unidad not in _tabla(dimension).indices:
+        raise ValueError(f"Unidad {unidad!r} no válida para {dimension}")
+    return unidad
+
+
+def _coeficientes(dimension, unidad, inversa=False):
+    """(factor, desplazamiento) escalares, o arreglos si `unidad` trae una unidad por elemento"""
+    tabla = _tabla(dimension)
+    if isinstance(unidad, str):
+        validar_unidad(dimension, unidad)
+        if inversa:
+            return tabla.inversos[unidad]
+        return UNIDADES[dimension][unidad]
+    # Pocas unidades por dimensión: una comparación vectorizada por unidad, sin ordenar cadenas
+    simbolos = np.asarray(unidad, dtype=str)
+    posiciones = np.full(simbolos.shape, -1, dtype=np.intp)
+    for simbolo, i in tabla.indices.items():
+        posiciones[simbolos == simbolo] = i
+    if (posiciones < 0).any():
+        validar_unidad(dimension, str(simbolos[posiciones < 0][0]))
+    factores, desplazamientos = tabla.factores[posiciones], tabla.desplazamientos[posiciones]
+    if inversa:
+        return 1 / factores, -desplazamientos / factores
+    return factores, desplazamientos
+
+
+def _aplicar(valores, factor, desplazamiento):
+    if np.ndim(valores) == 0 and np.ndim(factor) == 0:
+        # Escalares de la interfaz: float de Python, sin pasar por NumPy
+        return float(valores) * factor + desplazamiento
+    # Un solo temporal: se multiplica y se suma en el mismo arreglo
+    resultado = np.asarray(valores, dtype=float) * factor
+    if np.ndim(desplazamiento) or desplazamiento:
+        resultado += desplazamiento
+    return resultado
+
+
+def a_si(valores, dimension, unidad):
+    """Convierte a la unidad SI de la dimensión (°C para temperaturas)"""
+    return _aplicar(valores, *_coeficientes(dimension, unidad))
+
+
+def desde_si(valores, dimension, unidad):
+    """Convierte desde la unidad SI de la dimensión a `unidad`"""
+    return _aplicar(valores, *_coeficientes(dimension, unidad, inversa=True))
+
+
+def convertir(valores, dimension, origen, destino):
+    """Convierte entre dos unidades de la misma dimensión"""
+    if isinstance(origen, str) and isinstance(destino, str):
+        f1, d1 = _coeficientes(dimension, origen)
+        f2, d2 = _coeficientes(dimension, destino, inversa=True)
+        if origen == destino:
+            return _aplicar(valores, 1.0, 0.0)
+        # Ambas transformaciones son afines: se componen en una sola
+        return _aplicar(valores, f1 * f2, d1 * f2 + d2)
+    return desde_si(a_si(valores, dimension, origen), dimension, destino)
@@ -0,0 +1,4 @@
+"""Utilidades de interfaz compartidas por las páginas de Streamlit.
+
+A diferencia de `calculos`, estos módulos sí dependen de Streamlit.
+"""
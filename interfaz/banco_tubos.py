@@ -0,0 +1,85 @@
+"""Modo banco de tubos de la página de convección externa en cilindros."""
+import numpy as np
+import streamlit as st
+
+from calculos.banco_tubos import ALINEADO, ESCALONADO, PR_MAX, PR_MIN, calcular_banco_tubos, correccion_filas
+from calculos.unidades import a_si
+from interfaz.graficos import grafico_linea_interactivo
+
+DISPOSICIONES = {ALINEADO: "Alineado", ESCALONADO: "Escalonado"}
+
+
+def mostrar_banco_tubos(fluido, fase, unidad_temp, unidad_vel, unidad_dia, unidad_long):
+    """Entradas, resultados y perfil fila a fila de un banco de tubos (Zukauskas)"""
+    disposicion = st.radio("Disposición de los tubos", list(DISPOSICIONES), horizontal=True,
+                           format_func=DISPOSICIONES.get)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        T_fluido_input = st.number_input(f"Temperatura del fluido a la entrada ({unidad_temp})", value=15.0)
+        T_superficie_input = st.number_input(f"Temperatura superficie ({unidad_temp})", value=70.0)
+        velocidad_input = st.number_input(f"Velocidad de aproximación ({unidad_vel})", value=6.0,
+                                          min_value=0.0)
+    with col2:
+        diametro_input = st.number_input(f"Diámetro de los tubos ({unidad_dia})", value=0.0164,
+                                         min_value=0.0, format="%.4f")
+        S_T_input = st.number_input(f"Paso transversal S_T ({unidad_dia})", value=0.0313,
+                                    min_value=0.0, format="%.4f")
+        S_L_input = st.number_input(f"Paso longitudinal S_L ({unidad_dia})", value=0.0343,
+                                    min_value=0.0, format="%.4f")
+    with col3:
+        N_L = st.number_input("Filas en la dirección del flujo (N_L)", value=7, min_value=1, step=1)
+        N_T = st.number_input("Tubos por fila (N_T)", value=8, min_value=1, step=1)
+        longitud_input = st.number_input(f"Longitud de los tubos ({unidad_long})", value=1.0, min_value=0.0)
+
+    if unidad_temp in ["K", "R"] and (T_fluido_input < 0 or T_superficie_input < 0):
+        st.error("❌ No se permiten temperaturas negativas en escalas absolutas (K, R)")
+        st.stop()
+
+    T_fluido = a_si(T_fluido_input, "temperatura", unidad_temp)
+    T_superficie = a_si(T_superficie_input, "temperatura", unidad_temp)
+    velocidad = a_si(velocidad_input, "velocidad", unidad_vel)
+    diametro, S_T, S_L = (a_si(v, "longitud", unidad_dia) for v in (diametro_input, S_T_input, S_L_input))
+    longitud = a_si(longitud_input, "longitud", unidad_long)
+
+    if min(velocidad, diametro, longitud) <= 0:
+        st.error("❌ Velocidad, diámetro y longitud deben ser positivos")
+        st.stop()
+    if S_T <= diametro or (disposicion == ESCALONADO and np.hypot(S_L, S_T / 2) <= diametro):
+        st.error("❌ Los pasos deben dejar espacio entre tubos (S_T > D y, en escalonado, S_D > D)")
+        st.stop()
+
+    try:
+        r = calcular_banco_tubos(T_fluido, T_superficie, velocidad, diametro, S_T, S_L, N_L, N_T,
+                                 longitud, fluido, fase, disposicion)
+    except Exception as e:
+        st.error(f"Error en los cálculos: {str(e)}")
+        st.stop()
+    escalares = {c: v.item() for c, v in r.items() if np.ndim(v) == 0}
+
+    st.subheader("1. Velocidad máxima y Reynolds")
+    cols = st.columns(3)
+    cols[0].metric("Velocidad máxima", f"{escalares['V_max']:.3f} m/s")
+    cols[1].metric("Re_max (entrada)", f"{escalares['Re_max']:,.0f}")
+    cols[2].metric("Corrección por filas C2", f"{float(correccion_filas(N_L, disposicion == ESCALONADO)):.3f}")
+    if not escalares["valido"]:
+        st.warning(f"⚠️ Fuera de la validez de Zukauskas (Re_max ≤ 2·10⁶ y {PR_MIN} ≤ Pr ≤ {PR_MAX}) "
+                   "en alguna fila")
+
+    st.subheader("2. Transferencia de calor")
+    cols = st.columns(3)
+    cols[0].metric("Temperatura de salida", f"{escalares['T_salida']:.2f} °C")
+    cols[1].metric("ΔT media logarítmica", f"{escalares['TML']:.2f} °C")
+    cols[2].metric("Área total", f"{escalares['A']:.4f} m²")
+    cols = st.columns(3)
+    cols[0].metric("Nusselt promedio", f"{escalares['Nu']:.2f}")
+    cols[1].metric("h promedio", f"{escalares['h']:.2f} W/m²·K")
+    cols[2].metric("Flujo másico", f"{escalares['m']:.4f} kg/s")
+    st.success(f"## 🔥 Transferencia de calor del banco ({N_L * N_T} tubos): {escalares['q']:.2f} W")
+
+    st.subheader("3. Avance fila por fila")
+    filas = np.arange(N_L + 1)
+    grafico_linea_interactivo(filas, r["T_filas"], "Fila", "Temperatura del fluido (°C)",
+                              titulo="Temperatura del fluido a la salida de cada fila")
+    st.dataframe({"Fila": filas[1:], "T entrada (°C)": r["T_filas"][:-1], "T salida (°C)": r["T_filas"][1:],
+                  "h (W/m²·K)": r["h_filas"], "q (W)": r["q_filas"]}, width="stretch")
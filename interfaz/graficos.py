@@ -0,0 +1,202 @@
+"""Renderizado de gráficos con caché de imágenes y ciclo de vida explícito de las figuras.
+
+Las figuras se crean con `matplotlib.figure.Figure`, fuera del registro de
+pyplot, y se vacían al salir de `figura_temporal`, así que una sesión larga no
+acumula figuras. Las imágenes rasterizadas se guardan en una caché LRU acotada,
+compartida por todas las sesiones y con clave en la función de dibujo y sus
+argumentos: un diagrama idéntico no se vuelve a dibujar.
+"""
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+import streamlit as st
+
+# Las mismas opciones con que st.pyplot rasteriza, para que la imagen no cambie
+OPCIONES_GUARDADO = {"format": "png", "bbox_inches": "tight", "dpi": 200}
+
+
+@contextmanager
+def figura_temporal(figsize=None):
+    """Figura fuera de pyplot que se vacía al salir del bloque"""
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    try:
+        yield fig
+    finally:
+        fig.clear()
+
+
+def a_png(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, **OPCIONES_GUARDADO)
+    return buffer.getvalue()
+
+
+class CacheImagenes:
+    """Caché LRU de imágenes acotada por cantidad de entradas y por bytes totales"""
+
+    def __init__(self, capacidad=64, max_bytes=64 * 2**20):
+        if capacidad < 1:
+            raise ValueError("La capacidad de la caché debe ser al menos 1")
+        self.capacidad = capacidad
+        self.max_bytes = max_bytes
+        self._entradas = OrderedDict()
+        self._candado = threading.Lock()
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def obtener(self, clave, producir):
+        """Imagen de `clave`; si no está, la genera con `producir()` y la guarda"""
+        with self._candado:
+            imagen = self._entradas.get(clave)
+            if imagen is not None:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return imagen
+            self.fallos += 1
+
+        imagen = producir()
+
+        with self._candado:
+            if clave not in self._entradas:
+                self._entradas[clave] = imagen
+                self.bytes += len(imagen)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > 1 and (len(self._entradas) > self.capacidad
+                                               or self.bytes > self.max_bytes):
+                _, desalojada = self._entradas.popitem(last=False)
+                self.bytes -= len(desalojada)
+                self.desalojos += 1
+        return imagen
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "desalojos": self.desalojos,
+            "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+            "entradas": len(self._entradas),
+            "bytes": self.bytes,
+            "capacidad": self.capacidad,
+        }
+
+    def limpiar(self):
+        with self._candado:
+            self._entradas.clear()
+            self.bytes = 0
+            self.aciertos = self.fallos = self.desalojos = 0
+
+
+cache_imagenes = CacheImagenes()
+
+
+def _congelar(valor):
+    """Representación hashable de los argumentos de dibujo (listas, dicts y arreglos)"""
+    if isinstance(valor, np.ndarray):
+        datos = np.ascontiguousarray(valor)
+        return ("ndarray", datos.dtype.str, datos.shape, hashlib.blake2b(datos.tobytes()).hexdigest())
+    if isinstance(valor, np.generic):
+        valor = valor.item()
+    if isinstance(valor, float) and valor != valor:
+        return ("nan",)  # NaN != NaN: sin esto nunca habría acierto
+    if isinstance(valor, dict):
+        return ("dict", tuple((k, _congelar(v)) for k, v in sorted(valor.items())))
+    if isinstance(valor, (list, tuple)):
+        return tuple(_congelar(v) for v in valor)
+    hash(valor)
+    return valor
+
+
+def imagen(dibujar, *args, figsize=None, **kwargs):
+    """PNG de `dibujar(fig, *args, **kwargs)`, cacheado por función y argumentos.
+
+    `dibujar` solo debe depender de sus argumentos: cualquier otro dato que use
+    quedaría fuera de la clave de la caché.
+    """
+    codigo = dibujar.__code__
+    clave = (codigo.co_filename, dibujar.__qualname__, figsize, _congelar(args), _congelar(kwargs))
+
+    def producir():
+        with figura_temporal(figsize) as fig:
+            dibujar(fig, *args, **kwargs)
+            return a_png(fig)
+    return cache_imagenes.obtener(clave, producir)
+
+
+def mostrar_png(png):
+    """Muestra una imagen PNG al ancho del contenedor, como st.pyplot"""
+    st.image(png, width="stretch", output_format="PNG")
+
+
+def mostrar(dibujar, *args, figsize=None, **kwargs):
+    """Muestra la imagen cacheada de `dibujar(fig, *args, **kwargs)`"""
+    mostrar_png(imagen(dibujar, *args, figsize=figsize, **kwargs))
+
+
+def mostrar_figura(fig):
+    """Muestra una figura de un solo uso, sin pasar por la caché"""
+    mostrar_png(a_png(fig))
+
+
+def grafico_linea_interactivo(x, y, titulo_x, titulo_y, titulo=None, marca_x=None, etiqueta_marca=None):
+    """Curva y(x) vectorial con zoom y tooltip (Vega-Lite, sin rasterizar en el servidor)"""
+    valores = [{"x": xi, "y": yi} for xi, yi in zip(np.asarray(x, dtype=float).tolist(),
+                                                   np.asarray(y, dtype=float).tolist())]
+    capas = [{
+        "mark": {"type": "line", "strokeWidth": 2, "color": "blue"},
+        "encoding": {
+            "x": {"field": "x", "type": "quantitative", "title": titulo_x},
+            "y": {"field": "y", "type": "quantitative", "title": titulo_y},
+            "tooltip": [{"field": "x", "type": "quantitative", "title": titulo_x, "format": ".4f"},
+                        {"field": "y", "type": "quantitative", "title": titulo_y, "format": ".2f"}],
+        },
+        "params": [{"name": "zoom", "select": "interval", "bind": "scales"}],
+    }]
+    if marca_x is not None:
+        capas.append({
+            "data": {"values": [{"x": float(marca_x), "etiqueta": etiqueta_marca or ""}]},
+            "mark": {"type": "rule", "color": "red", "strokeDash": [6, 4], "strokeWidth": 2},
+            "encoding": {"x": {"field": "x", "type": "quantitative"},
+                         "tooltip": [{"field": "etiqueta", "type": "nominal", "title": "Marca"}]},
+        })
+    especificacion = {"data": {"values": valores}, "layer": capas}
+    if titulo:
+        especificacion["title"] = titulo
+    st.vega_lite_chart(especificacion, width="stretch")
+
+
+def histograma_interactivo(bordes, conteos, titulo_x, titulo=None, marcas=None):
+    """Barras de un histograma ya agrupado, con reglas verticales opcionales {etiqueta: x}"""
+    bordes = np.asarray(bordes, dtype=float).tolist()
+    valores = [{"x": a, "x2": b, "n": int(c)} for a, b, c in zip(bordes[:-1], bordes[1:], np.asarray(conteos).tolist())]
+    capas = [{
+        "mark": {"type": "bar", "color": "steelblue", "opacity": 0.8},
+        "encoding": {
+            "x": {"field": "x", "type": "quantitative", "title": titulo_x, "scale": {"zero": False}},
+            "x2": {"field": "x2"},
+            "y": {"field": "n", "type": "quantitative", "title": "Muestras"},
+            "tooltip": [{"field": "x", "type": "quantitative", "title": "Desde", "format": ".4g"},
+                        {"field": "x2", "type": "quantitative", "title": "Hasta", "format": ".4g"},
+                        {"field": "n", "type": "quantitative", "title": "Muestras", "format": ","}],
+        },
+    }]
+    if marcas:
+        capas.append({
+            "data": {"values": [{"x": float(x), "etiqueta": etiqueta} for etiqueta, x in marcas.items()]},
+            "mark": {"type": "rule", "color": "red", "strokeDash": [6, 4], "strokeWidth": 2},
+            "encoding": {"x": {"field": "x", "type": "quantitative"},
+                         "tooltip": [{"field": "etiqueta", "type": "nominal", "title": "Marca"},
+                                     {"field": "x", "type": "quantitative", "title": titulo_x, "format": ".4g"}]},
+        })
+    especificacion = {"data": {"values": valores}, "layer": capas}
+    if titulo:
+        especificacion["title"] = titulo
+    st.vega_lite_chart(especificacion, width="stretch")
@@ -0,0 +1,118 @@
+"""Sección de incertidumbre (Monte Carlo) y sensibilidad (Sobol) compartida por las páginas de cálculo."""
+import numpy as np
+import streamlit as st
+
+from calculos.incertidumbre import DISTRIBUCIONES, NORMAL, Entrada, errores_propiedades, propagar
+from calculos.unidades import a_si, desde_si
+from interfaz.graficos import histograma_interactivo
+
+MUESTRAS = (100_000, 1_000_000, 10_000_000)
+NOMBRES_DISTRIBUCION = {NORMAL: "Normal (tolerancia = σ)", "uniforme": "Uniforme (± tolerancia)",
+                        "triangular": "Triangular (± tolerancia)"}
+COLUMNAS = 4
+# Filas de A y B para los índices de Sobol desde la página: N·(d + 2) evaluaciones
+FILAS_SOBOL = 2 ** 13
+ERRORES_TABLA = {"error_rho": "Error de tabla ρ", "error_mu": "Error de tabla μ", "error_k": "Error de tabla k",
+                 "error_cp": "Error de tabla cp"}
+
+
+def seccion_incertidumbre(modelo, variables, unidad_flujo="W", errores_tabla=False, **fijos):
+    """Tolerancias de las entradas, distribución de q e índices de Sobol.
+
+    `variables` asocia cada entrada del modelo de `calculos.incertidumbre` a
+    (etiqueta, valor nominal SI, tolerancia por defecto, unidad de temperatura
+    o None). Con unidad, la tolerancia es absoluta en esa escala; sin ella, es
+    un porcentaje del nominal. `fijos` pasa al motor tal cual.
+    """
+    with st.expander("🎲 Incertidumbre y sensibilidad: distribución de q e índices de Sobol"):
+        col1, col2, col3 = st.columns(3)
+        distribucion = col1.radio("Distribución de las entradas", DISTRIBUCIONES,
+                                  format_func=NOMBRES_DISTRIBUCION.get, key=f"mc_dist_{modelo}")
+        n = col2.selectbox("Muestras", MUESTRAS, index=1, format_func="{:,}".format, key=f"mc_n_{modelo}")
+        error_tabla = (col3.number_input("Error de las tablas de propiedades (± %)", value=2.0, min_value=0.0,
+                                         help="Error relativo independiente en ρ, μ, k y cp del fluido",
+                                         key=f"mc_tabla_{modelo}")
+                       if errores_tabla else 0.0)
+
+        entradas = {}
+        columnas = st.columns(COLUMNAS)
+        for i, (nombre, (etiqueta, nominal, defecto, unidad)) in enumerate(variables.items()):
+            sufijo = f"± {unidad}" if unidad else "± %"
+            tolerancia = columnas[i % COLUMNAS].number_input(f"{etiqueta} ({sufijo})", value=float(defecto),
+                                                             min_value=0.0, key=f"mc_{modelo}_{nombre}")
+            if unidad:
+                # Tolerancia de una diferencia de temperatura: solo cuenta el factor de la escala
+                tolerancia = a_si(tolerancia, "temperatura", unidad) - a_si(0.0, "temperatura", unidad)
+                entradas[nombre] = Entrada(nominal, tolerancia, distribucion)
+            else:
+                entradas[nombre] = Entrada(nominal, tolerancia / 100, distribucion, relativa=True)
+        if error_tabla > 0:
+            entradas.update(errores_propiedades(error_tabla / 100, distribucion))
+
+        col1, col2 = st.columns(2)
+        propagar_mc = col1.button("Propagar incertidumbre", key=f"mc_boton_{modelo}")
+        if col2.button("Índices de Sobol (qué entrada domina q)", key=f"sobol_boton_{modelo}"):
+            etiquetas = {**{c: v[0] for c, v in variables.items()}, **ERRORES_TABLA}
+            _mostrar_sobol(modelo, entradas, etiquetas, fijos)
+        if not propagar_mc:
+            return
+        barra = st.progress(0.0, text="Evaluando muestras...")
+        try:
+            r = propagar(modelo, entradas, n, progreso=lambda hechas, total: barra.progress(hechas / total),
+                         **fijos)
+        except Exception as e:
+            st.error(f"Error en la propagación: {str(e)}")
+            return
+        barra.empty()
+
+        def q(valor):
+            return desde_si(valor, "potencia", unidad_flujo)
+
+        cols = st.columns(4)
+        cols[0].metric("q nominal", f"{q(r.nominal):.4g} {unidad_flujo}")
+        cols[1].metric("q medio", f"{q(r.media):.4g} {unidad_flujo}")
+        cols[2].metric("Desviación estándar", f"{q(r.desviacion):.3g} {unidad_flujo}",
+                       help=f"{r.desviacion / abs(r.media) * 100:.2f} % de la media" if r.media else None)
+        cols[3].metric("Intervalo del 95 %", f"{q(r.percentiles[2.5]):.4g} – {q(r.percentiles[97.5]):.4g}")
+        if r.validas < r.n:
+            st.warning(f"⚠️ {r.n - r.validas:,} de {r.n:,} muestras quedaron fuera de las correlaciones o "
+                       "sin sentido físico (espesores o conductividades no positivos) y no se cuentan")
+
+        bordes, conteos = r.histograma
+        histograma_interactivo(q(bordes), conteos, f"q ({unidad_flujo})",
+                               titulo=f"Distribución de q ({r.validas:,} muestras válidas)",
+                               marcas={"Nominal": q(r.nominal), "P2.5": q(r.percentiles[2.5]),
+                                       "P97.5": q(r.percentiles[97.5])})
+        import pandas as pd
+
+        st.dataframe(pd.DataFrame({"Percentil": [f"P{p:g}" for p in r.percentiles],
+                                   f"q ({unidad_flujo})": q(np.array(list(r.percentiles.values())))}),
+                     hide_index=True)
+        st.caption(f"Fragmentos de {r.fragmento:,} muestras; la memoria no crece con el número de muestras.")
+
+
+def _mostrar_sobol(modelo, entradas, etiquetas, fijos):
+    """Índices de primer orden y totales con las mismas tolerancias como rangos"""
+    # pandas y el motor de Sobol solo se cargan al pedir los índices, no en el arranque de la página
+    import pandas as pd
+
+    from calculos.sensibilidad import sobol
+
+    barra = st.progress(0.0, text="Evaluando las matrices de Saltelli...")
+    try:
+        r = sobol(modelo, entradas, FILAS_SOBOL, progreso=lambda hechas, total: barra.progress(hechas / total),
+                  **fijos)
+    except Exception as e:
+        st.error(f"Error en el análisis de sensibilidad: {str(e)}")
+        return
+    barra.empty()
+    tabla = pd.DataFrame({
+        "Entrada": [etiquetas.get(c, c) for c in r.factores],
+        "S1 (primer orden)": r.S1, "IC 95 % S1": [f"{a:.3f} – {b:.3f}" for a, b in r.S1_ic],
+        "ST (total)": r.ST, "IC 95 % ST": [f"{a:.3f} – {b:.3f}" for a, b in r.ST_ic],
+    }).sort_values("ST (total)", ascending=False)
+    st.dataframe(tabla, hide_index=True, width="stretch",
+                 column_config={c: st.column_config.ProgressColumn(c, min_value=0.0, max_value=1.0, format="%.3f")
+                                for c in ("S1 (primer orden)", "ST (total)")})
+    st.caption(f"{r.evaluaciones:,} evaluaciones ({r.validas:,} de {r.n:,} filas válidas). ST - S1 es la parte "
+               "que una entrada aporta solo a través de interacciones con las demás.")
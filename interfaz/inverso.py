@@ -0,0 +1,61 @@
+"""Sección de diseño inverso compartida por las páginas de convección."""
+import math
+
+import numpy as np
+import streamlit as st
+
+from calculos.inverso import CONVERGIDO, FUERA_DE_ALCANCE, LIMITES, NOMBRES_ESTADO, SALTO
+from calculos.unidades import desde_si
+
+MAGNITUDES = {"q": ("Transferencia de calor q", "W"), "h": ("Coeficiente de convección h", "W/m²·K")}
+
+
+def seccion_diseno_inverso(resolver, incognitas, actuales):
+    """Busca la velocidad, diámetro o longitud que da un q o h objetivo.
+
+    `resolver(objetivo, incognita, magnitud)` llama al motor de `calculos.inverso`
+    con las demás entradas de la página (SI). `incognitas` asocia cada incógnita
+    a (etiqueta, dimensión, unidad de la página) y `actuales` trae el q y el h
+    del cálculo directo, que son el objetivo inicial.
+    """
+    with st.expander("🎯 Diseño inverso: velocidad, diámetro o longitud para un q o h objetivo"):
+        col1, col2 = st.columns(2)
+        with col1:
+            magnitud = st.radio("Magnitud objetivo", list(MAGNITUDES), horizontal=True,
+                                format_func=lambda m: MAGNITUDES[m][0])
+            incognita = st.selectbox("Incógnita", list(incognitas), format_func=lambda i: incognitas[i][0])
+        nombre, unidad_magnitud = MAGNITUDES[magnitud]
+        with col2:
+            inicial = actuales.get(magnitud)
+            objetivo = st.number_input(f"Valor objetivo ({unidad_magnitud})",
+                                       value=float(inicial) if inicial and math.isfinite(inicial) else 1.0,
+                                       format="%.4f")
+        if not st.button("Resolver diseño inverso"):
+            return
+
+        try:
+            r = {c: np.asarray(v).item() for c, v in resolver(objetivo, incognita, magnitud).items()}
+        except Exception as e:
+            st.error(f"Error en el diseño inverso: {str(e)}")
+            return
+
+        etiqueta, dimension, unidad = incognitas[incognita]
+        lo, hi = (desde_si(v, dimension, unidad) for v in LIMITES[incognita])
+        if r["estado"] == FUERA_DE_ALCANCE:
+            alcance = ("ningún valor válido de la correlación" if math.isnan(r["alcance_min"]) else
+                       f"{nombre} entre {r['alcance_min']:.4g} y {r['alcance_max']:.4g} {unidad_magnitud}")
+            st.error(f"❌ {NOMBRES_ESTADO[FUERA_DE_ALCANCE]}: con {etiqueta.lower()} entre "
+                     f"{lo:.4g} y {hi:.4g} {unidad} se obtiene {alcance}")
+            return
+
+        st.metric(etiqueta, f"{desde_si(r[incognita], dimension, unidad):.6g} {unidad}")
+        Re = r.get("Re", r.get("Re_L"))
+        resumen = (f"{nombre} = {r[magnitud]:.4f} {unidad_magnitud} · Re = {Re:,.0f} · "
+                   f"{r['iteraciones']} iteraciones · residuo relativo {r['residuo']:.1e}")
+        if r["estado"] == CONVERGIDO:
+            st.success(resumen)
+        elif r["estado"] == SALTO:
+            st.warning(f"⚠️ {NOMBRES_ESTADO[SALTO]}: ningún valor da exactamente el objetivo; "
+                       f"se muestra el punto del cambio de correlación. {resumen}")
+        else:
+            st.warning(f"⚠️ {NOMBRES_ESTADO[r['estado']]}. {resumen}")
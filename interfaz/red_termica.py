@@ -0,0 +1,88 @@
+"""Modo red de resistencias de la página de conducción."""
+import numpy as np
+import streamlit as st
+
+from calculos.red_termica import CONDUCCION, CONTACTO, CONVECCION, TIPOS, red_desde_tablas, tablas_solucion
+from calculos.unidades import a_si, desde_si
+from interfaz.graficos import grafico_linea_interactivo
+
+PUNTOS_BARRIDO = 50
+
+
+def _ejemplo(unidad_temp, unidad_espesor, unidad_k, unidad_h, unidad_area):
+    """Pared con montantes en paralelo al aislante y una resistencia de contacto con el revestimiento"""
+    # pandas solo se carga al entrar al modo red, no en el arranque de la página de conducción
+    import pandas as pd
+
+    T = desde_si(np.array([20.0, -10.0]), "temperatura", unidad_temp)
+    nodos = pd.DataFrame({"nodo": ["interior", "exterior"], f"T [{unidad_temp}]": T, "q [W]": [0.0, 0.0]})
+    L = desde_si(np.array([0.09, 0.09, 0.012]), "longitud", unidad_espesor)
+    k = desde_si(np.array([0.04, 0.12, 0.7]), "conductividad", unidad_k)
+    h = desde_si(np.array([8.0, 25.0]), "coef_h", unidad_h)
+    A = desde_si(np.array([1.0, 0.85, 0.15]), "area", unidad_area)
+    elementos = pd.DataFrame({
+        "desde": ["interior", "pared_in", "pared_in", "pared_out", "revestimiento", "revestimiento_ext"],
+        "hasta": ["pared_in", "pared_out", "pared_out", "revestimiento", "revestimiento_ext", "exterior"],
+        "tipo": [CONVECCION, CONDUCCION, CONDUCCION, CONTACTO, CONDUCCION, CONVECCION],
+        f"L [{unidad_espesor}]": [None, L[0], L[1], None, L[2], None],
+        f"k [{unidad_k}]": [None, k[0], k[1], None, k[2], None],
+        f"h [{unidad_h}]": [h[0], None, None, None, None, h[1]],
+        "R_c [m²·K/W]": [None, None, None, 0.002, None, None],
+        f"A [{unidad_area}]": [A[0], A[1], A[2], A[0], A[0], A[0]],
+        "R [K/W]": [None] * 6,
+    })
+    return nodos, elementos
+
+
+def mostrar_red_termica(unidad_temp, unidad_espesor, unidad_k, unidad_h, unidad_area, unidad_flujo):
+    """Editor de nodos y resistencias, solución nodal y barrido de una temperatura de frontera"""
+    st.title("Conducción - Red de resistencias térmicas")
+    st.info("Nodos con temperatura fija (fronteras) o libres con una fuente q, unidos por resistencias de "
+            "conducción (L/kA), convección (1/hA), contacto (R''c/A) o de valor directo (R). Los caminos en "
+            "paralelo son elementos repetidos entre los mismos nodos.")
+
+    nodos, elementos = _ejemplo(unidad_temp, unidad_espesor, unidad_k, unidad_h, unidad_area)
+    st.subheader("Nodos")
+    st.caption("Deja T vacía para un nodo libre. Los nodos que solo aparecen en los elementos son libres.")
+    nodos = st.data_editor(nodos, num_rows="dynamic", width="stretch", key="red_nodos")
+    st.subheader("Elementos")
+    elementos = st.data_editor(
+        elementos, num_rows="dynamic", width="stretch", key="red_elementos",
+        column_config={"tipo": st.column_config.SelectboxColumn("tipo", options=list(TIPOS), required=True)})
+
+    try:
+        red = red_desde_tablas(nodos.dropna(subset=["nodo"]),
+                               elementos.dropna(subset=["desde", "hasta"], how="all"))
+        sol = red.resolver()
+    except Exception as e:
+        st.error(f"Error en la red: {str(e)}")
+        st.stop()
+    temperaturas, flujos = tablas_solucion(red, sol)
+
+    st.subheader("Resultados")
+    entrante = sol.q_frontera[sol.q_frontera > 0].sum()
+    cols = st.columns(3)
+    cols[0].metric("Nodos", len(red.nombres))
+    cols[1].metric("Elementos", len(flujos))
+    cols[2].metric("Calor que atraviesa la red", f"{desde_si(entrante, 'potencia', unidad_flujo):.3f} {unidad_flujo}")
+    temperaturas[f"T [{unidad_temp}]"] = desde_si(temperaturas.pop("T [°C]").to_numpy(), "temperatura", unidad_temp)
+    temperaturas[f"q_frontera [{unidad_flujo}]"] = desde_si(temperaturas.pop("q_frontera [W]").to_numpy(),
+                                                            "potencia", unidad_flujo)
+    flujos[f"q [{unidad_flujo}]"] = desde_si(flujos.pop("q [W]").to_numpy(), "potencia", unidad_flujo)
+    col1, col2 = st.columns(2)
+    col1.dataframe(temperaturas, width="stretch", hide_index=True)
+    col2.dataframe(flujos, width="stretch", hide_index=True)
+
+    fronteras = [n for n, f in zip(red.nombres, red.frontera) if f]
+    with st.expander("📈 Barrido de una temperatura de frontera (misma factorización)"):
+        col1, col2, col3 = st.columns(3)
+        nodo = col1.selectbox("Nodo de frontera", fronteras)
+        actual = desde_si(sol.T[red.nombres.index(nodo)], "temperatura", unidad_temp)
+        T_min = col2.number_input(f"Desde ({unidad_temp})", value=float(actual) - 20.0)
+        T_max = col3.number_input(f"Hasta ({unidad_temp})", value=float(actual) + 20.0)
+        barrido = np.linspace(T_min, T_max, PUNTOS_BARRIDO)
+        res = red.resolver({nodo: a_si(barrido, "temperatura", unidad_temp)})
+        q_nodo = res.q_frontera[fronteras.index(nodo)]
+        grafico_linea_interactivo(barrido, desde_si(q_nodo, "potencia", unidad_flujo),
+                                  f"T de {nodo} ({unidad_temp})", f"Calor que entra por {nodo} ({unidad_flujo})",
+                                  titulo=f"Calor por {nodo} en {PUNTOS_BARRIDO} escenarios")
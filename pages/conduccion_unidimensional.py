@@ -1,78 +1,25 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.patches import Wedge
-from io import StringIO
-import os
+
+from calculos import cache_resultados
+from calculos.propiedades import ARCHIVOS_MATERIALES, tabla_materiales
+from calculos.incertidumbre import CONDUCCION
+from calculos.reportes import PLANTILLA_CONDUCCION, TITULOS_CONDUCCION, generar
+from calculos.transitorio import discretizar, simular
+from calculos.unidades import a_si, desde_si
+from interfaz.graficos import figura_temporal, mostrar, mostrar_figura
+from interfaz.incertidumbre import seccion_incertidumbre
+from interfaz.red_termica import mostrar_red_termica
 
 # --- Configuración inicial
 st.set_page_config(layout="wide")
 
-# --- Funciones de conversión de unidades
-def convertir_longitud(valor, unidad_entrada):
-    factores = {"m": 1.0, "cm": 0.01, "mm": 0.001, "in": 0.0254, "ft": 0.3048}
-    return valor * factores[unidad_entrada]
-
-def convertir_espesor(valor, unidad_entrada):
-    factores = {"m": 1.0, "cm": 0.01, "mm": 0.001, "in": 0.0254, "ft": 0.3048, "μm": 1e-6}
-    return valor * factores[unidad_entrada]
-
-def convertir_radio(valor, unidad_entrada):
-    factores = {"m": 1.0, "cm": 0.01, "mm": 0.001, "in": 0.0254, "ft": 0.3048}
-    return valor * factores[unidad_entrada]
-
-def convertir_area(valor, unidad_entrada):
-    factores = {"m²": 1.0, "cm²": 0.0001, "mm²": 1e-6, "ft²": 0.092903, "in²": 0.00064516}
-    return valor * factores[unidad_entrada]
-
-def convertir_temperatura(valor, unidad_entrada):
-    if unidad_entrada == "°F": return (valor - 32) * 5/9
-    elif unidad_entrada == "K": return valor - 273.15
-    return valor
-
-def convertir_k(valor, unidad_entrada):
-    factores = {"W/m·K": 1.0, "W/cm·K": 100, "W/mm·K": 1000, "BTU/(h·ft·°F)": 1.73073}
-    return valor * factores[unidad_entrada]
-
-def convertir_h(valor, unidad_entrada):
-    factores = {"W/m²·K": 1.0, "W/cm²·K": 10000, "BTU/(h·ft²·°F)": 5.67826}
-    return valor * factores[unidad_entrada]
-
-def formatear_resultado(valor, unidad_salida, tipo):
-    if tipo == "flujo":
-        factores = {"W": 1.0, "BTU/h": 3.41214, "kcal/h": 0.859845}
-        return valor * factores[unidad_salida]
-    elif tipo == "flujo_area":
-        factores = {"W/m²": 1.0, "BTU/(h·ft²)": 0.316998, "kcal/(h·m²)": 0.859845}
-        return valor * factores[unidad_salida]
-
-@st.cache_data
 def cargar_materiales():
-    """Cargar todos los archivos CSV de materiales - solo columnas necesarias"""
+    """Materiales del almacén compartido: categoría -> (nombres, matriz k/rho/cp) de solo lectura"""
     materiales_dict = {}
-    archivos_materiales = {
-        "Metales sólidos": "tabla_a3.csv",
-        "No metales sólidos": "tabla_a4.csv", 
-        "Materiales de construcción": "tabla_a5.csv",
-        "Aislantes": "tabla_a6.csv"
-    }
-    
-    # Solo leer las columnas necesarias para el cálculo
-    columnas_necesarias = ["Material", "Conductividad térmica (W/m·K)"]
-    
-    for categoria, archivo in archivos_materiales.items():
+    for categoria, archivo in ARCHIVOS_MATERIALES.items():
         try:
-            if os.path.exists(archivo):
-                # Leer solo las columnas necesarias
-                df = pd.read_csv(archivo, usecols=columnas_necesarias)
-                # Verificar que tenga las columnas necesarias
-                if all(col in df.columns for col in columnas_necesarias):
-                    materiales_dict[categoria] = df
-                else:
-                    st.warning(f"El archivo {archivo} no tiene las columnas necesarias: {columnas_necesarias}")
-            else:
-                st.warning(f"No se encontró el archivo: {archivo}")
+            materiales_dict[categoria] = tabla_materiales(categoria)
         except Exception as e:
             st.error(f"Error al cargar {archivo}: {str(e)}")
     
@@ -84,25 +31,39 @@ def cargar_materiales():
     return materiales_dict
 
 def crear_datos_ejemplo():
-    """Crear datos de ejemplo si no se encuentran los archivos CSV - solo columnas necesarias"""
-    return {
-        "Metales sólidos": pd.DataFrame({
-            "Material": ["Aluminio", "Cobre", "Acero inoxidable", "Hierro", "Plomo"],
-            "Conductividad térmica (W/m·K)": [237.0, 401.0, 16.2, 80.2, 35.3]
-        }),
-        "No metales sólidos": pd.DataFrame({
-            "Material": ["Vidrio", "Cuarzo", "Granito", "Mármol", "Hielo"],
-            "Conductividad térmica (W/m·K)": [1.4, 1.3, 2.8, 2.1, 1.88]
-        }),
-        "Materiales de construcción": pd.DataFrame({
-            "Material": ["Concreto", "Ladrillo", "Madera de pino", "Yeso", "Asfalto"],
-            "Conductividad térmica (W/m·K)": [1.4, 0.72, 0.12, 0.17, 0.062]
-        }),
-        "Aislantes": pd.DataFrame({
-            "Material": ["Lana de vidrio", "Poliestireno expandido", "Espuma de poliuretano", "Corcho", "Aire"],
-            "Conductividad térmica (W/m·K)": [0.038, 0.036, 0.026, 0.045, 0.026]
-        })
+    """Crear datos de ejemplo si no se encuentran los archivos CSV - solo conductividad"""
+    ejemplo = {
+        "Metales sólidos": (("Aluminio", "Cobre", "Acero inoxidable", "Hierro", "Plomo"),
+                            [237.0, 401.0, 16.2, 80.2, 35.3]),
+        "No metales sólidos": (("Vidrio", "Cuarzo", "Granito", "Mármol", "Hielo"),
+                               [1.4, 1.3, 2.8, 2.1, 1.88]),
+        "Materiales de construcción": (("Concreto", "Ladrillo", "Madera de pino", "Yeso", "Asfalto"),
+                                       [1.4, 0.72, 0.12, 0.17, 0.062]),
+        "Aislantes": (("Lana de vidrio", "Poliestireno expandido", "Espuma de poliuretano", "Corcho", "Aire"),
+                      [0.038, 0.036, 0.026, 0.045, 0.026])
     }
+    datos = {}
+    for categoria, (nombres, k) in ejemplo.items():
+        matriz = np.full((len(nombres), 3), np.nan)
+        matriz[:, 0] = k
+        matriz.flags.writeable = False
+        datos[categoria] = (nombres, matriz)
+    return datos
+
+def buscar_material(materiales_dict, nombre):
+    """Devuelve (categoría, k) del material o (None, None) si no está en la base de datos"""
+    for categoria, (nombres, matriz) in materiales_dict.items():
+        if nombre in nombres:
+            return categoria, matriz[nombres.index(nombre), 0]
+    return None, None
+
+def capacidad_material(materiales_dict, nombre):
+    """Devuelve (densidad, calor específico) del material; NaN si la tabla no los trae"""
+    for nombres, matriz in materiales_dict.values():
+        if nombre in nombres:
+            fila = matriz[nombres.index(nombre)]
+            return float(fila[1]), float(fila[2])
+    return np.nan, np.nan
 
 def generar_color(i):
     colores_base = [
@@ -111,11 +72,13 @@ def generar_color(i):
     ]
     return colores_base[i % len(colores_base)]
 
-def dibujar_anillos_radiales(radios, unidad_radio, unidad_espesor):
-    fig, ax = plt.subplots(figsize=(8, 8))
+def dibujar_anillos_radiales(fig, radios, unidad_radio, unidad_espesor):
+    from matplotlib.patches import Wedge
+
+    ax = fig.subplots()
     
     # Factor de conversión para espesores
-    factor_espesor = {"m": 1.0, "cm": 100, "mm": 1000, "in": 39.3701, "ft": 3.28084, "μm": 1e6}[unidad_espesor]
+    factor_espesor = desde_si(1.0, "longitud", unidad_espesor)
     
     for i, (r_i, r_o, mat) in enumerate(radios):
         espesor_display = (r_o - r_i) * factor_espesor
@@ -135,12 +98,11 @@ def dibujar_anillos_radiales(radios, unidad_radio, unidad_espesor):
     ax.set_ylim(-max_radio * 1.1, max_radio * 1.1)
     ax.axis('off')
     ax.set_title(f"Configuración de Capas Cilíndricas", fontsize=14, weight='bold')
-    st.pyplot(fig)
 
-def dibujar_capas_rectangulares(capas, unidad_espesor):
-    fig, ax = plt.subplots(figsize=(12, 4))
+def dibujar_capas_rectangulares(fig, capas, unidad_espesor):
+    ax = fig.subplots()
     
-    factor_espesor = {"m": 1.0, "cm": 100, "mm": 1000, "in": 39.3701, "ft": 3.28084, "μm": 1e6}[unidad_espesor]
+    factor_espesor = desde_si(1.0, "longitud", unidad_espesor)
     inicio = 0
     
     for i, capa in enumerate(capas):
@@ -160,7 +122,6 @@ def dibujar_capas_rectangulares(capas, unidad_espesor):
     ax.set_ylim(-0.6, 0.6)
     ax.axis('off')
     ax.set_title(f"Configuración de Capas Planas", fontsize=14, weight='bold')
-    st.pyplot(fig)
 
 # --- Sidebar mejorado con explicaciones
 st.sidebar.title("⚙️ Configuración de Unidades")
@@ -172,6 +133,10 @@ geometria = st.sidebar.selectbox("Geometría del problema",
                                 ["Plana", "Cilíndrica", "Esférica"],
                                 help="Selecciona el tipo de geometría para el análisis de conducción")
 
+analisis = st.sidebar.radio("Tipo de análisis", ["Estacionario", "Transitorio", "Red de resistencias"],
+                            help="Transitorio: evolución de la temperatura en el tiempo con diferencias finitas (Crank–Nicolson). "
+                                 "Red de resistencias: nodos y resistencias en cualquier topología (caminos en paralelo, contacto)")
+
 st.sidebar.markdown("---")
 st.sidebar.subheader("Unidades de Dimensiones")
 
@@ -232,12 +197,12 @@ st.sidebar.markdown(f"""
 - **Resultados:** {unidad_flujo}
 """)
 
+if analisis == "Red de resistencias":
+    mostrar_red_termica(unidad_temp, unidad_espesor, unidad_k, unidad_h, unidad_area, unidad_flujo)
+    st.stop()
+
 # --- Título principal con información de unidades
-titulo = {
-    "Plana": "Pared Compuesta en Serie (Plana)",
-    "Cilíndrica": "Cilindro Multicapa en Serie",
-    "Esférica": "Esfera Multicapa en Serie"
-}[geometria]
+titulo = TITULOS_CONDUCCION[geometria]
 
 st.title(f"Conducción - {titulo}")
 st.info(f"**Sistema de unidades activo:** Longitud = {unidad_longitud} | Radios = {unidad_radio} | Espesores = {unidad_espesor} | Temperatura = {unidad_temp}")
@@ -285,6 +250,25 @@ if usar_conveccion:
 else:
     h_in = h_out = 0
 
+if analisis == "Transitorio":
+    st.subheader("Régimen Transitorio")
+    st.caption("Sin convección, las temperaturas interna y externa se imponen en las superficies desde t = 0.")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        T_inicial = st.number_input(f"Temperatura inicial de la pared ({unidad_temp})",
+                                    value=25.0, step=1.0,
+                                    help="Temperatura uniforme de todas las capas en t = 0")
+        unidad_tiempo = st.selectbox("Unidad de tiempo", ["s", "min", "h"], index=2)
+    with col2:
+        t_total = st.number_input(f"Tiempo total ({unidad_tiempo})", value=2.0,
+                                  min_value=0.0001, step=1.0)
+        n_pasos = st.number_input("Pasos de tiempo", value=500, min_value=1, step=100,
+                                  help="Crank–Nicolson es estable para cualquier paso; más pasos dan más precisión")
+    with col3:
+        n_nodos = st.number_input("Nodos en el espesor", value=200, min_value=n_capas, step=50,
+                                  help="Se reparten entre las capas según su espesor")
+        n_perfiles = st.slider("Perfiles a graficar", 2, 12, 6)
+
 # Cargar materiales desde los archivos CSV
 materiales_dict = cargar_materiales()
 
@@ -295,10 +279,14 @@ st.info(f"**Unidades activas para esta sección:** Radios = {unidad_radio} | Esp
 # Mostrar información sobre los materiales cargados
 if materiales_dict:
     with st.expander("📚 Base de Datos de Materiales Disponibles"):
-        for categoria, df in materiales_dict.items():
-            st.write(f"**{categoria}:** {len(df)} materiales disponibles")
-            if not df.empty:
-                st.dataframe(df, use_container_width=True)
+        import pandas as pd
+        for categoria, (nombres, matriz) in materiales_dict.items():
+            st.write(f"**{categoria}:** {len(nombres)} materiales disponibles")
+            if nombres:
+                st.dataframe(pd.DataFrame({
+                    "Material": nombres,
+                    "Conductividad térmica (W/m·K)": matriz[:, 0]
+                }), use_container_width=True)
 
 tabla_capas = []
 radios = []
@@ -328,21 +316,18 @@ for i in range(n_capas):
                                            key=f"cat_{i}",
                                            help="Selecciona la categoría del material")
                     
-                    if categoria in materiales_dict and not materiales_dict[categoria].empty:
-                        df_categoria = materiales_dict[categoria]
+                    if categoria in materiales_dict and materiales_dict[categoria][0]:
+                        nombres_categoria, matriz_categoria = materiales_dict[categoria]
                         mat = st.selectbox("Seleccionar material", 
-                                         df_categoria["Material"].tolist(), 
+                                         list(nombres_categoria), 
                                          key=f"mat_sel_{i}",
                                          help=f"Materiales disponibles en la categoría: {categoria}")
                         
                         # Obtener propiedades del material seleccionado
-                        df_filtrado = df_categoria[df_categoria["Material"].str.strip() == mat.strip()]
-                        if not df_filtrado.empty:
-                            valor_crudo = df_filtrado.iloc[0]["Conductividad térmica (W/m·K)"]
-                            try:
-                                k_valor = float(valor_crudo)
-                            except ValueError:
-                                st.error(f"⚠️ Valor de conductividad no numérico para '{mat}': '{valor_crudo}'. Se usa k=1.0 W/m·K")
+                        if mat in nombres_categoria:
+                            k_valor = float(matriz_categoria[nombres_categoria.index(mat), 0])
+                            if np.isnan(k_valor):
+                                st.error(f"⚠️ Valor de conductividad no numérico para '{mat}'. Se usa k=1.0 W/m·K")
                                 k_valor = 1.0
                         else:
                             st.error(f"⚠️ El material '{mat}' no se encontró en la tabla.")
@@ -362,37 +347,52 @@ for i in range(n_capas):
                     k = 1.0
                     mat = "Material desconocido"
             
-            k = convertir_k(float(k), unidad_k)
+            k = a_si(float(k), "conductividad", unidad_k)
+
+            # Densidad y calor específico solo hacen falta en régimen transitorio
+            rho_capa, cp_capa = np.nan, np.nan
+            if analisis == "Transitorio":
+                if not manual:
+                    rho_capa, cp_capa = capacidad_material(materiales_dict, mat)
+                if np.isnan(rho_capa) or np.isnan(cp_capa):
+                    rho_capa = st.number_input("Densidad (kg/m³)", min_value=0.001,
+                                               value=1000.0 if np.isnan(rho_capa) else rho_capa,
+                                               key=f"rho_{i}")
+                    cp_capa = st.number_input("Calor específico (J/kg·K)", min_value=0.001,
+                                              value=1000.0 if np.isnan(cp_capa) else cp_capa,
+                                              key=f"cp_{i}")
+                else:
+                    st.write(f"• ρ = {rho_capa} kg/m³, cp = {cp_capa} J/kg·K")
         
         with col2:
             st.markdown("**Dimensiones**")
             if i == 0 and geometria != "Plana":
-                r_i = convertir_radio(
+                r_i = a_si(
                     st.number_input(f"Radio interior ({unidad_radio})", 
                                   min_value=0.0001, value=0.01, key="r_i", step=0.001,
                                   help=f"Radio interno de la primera capa en {unidad_radio}"), 
-                    unidad_radio)
+                    "longitud", unidad_radio)
                 
-                e = convertir_espesor(
+                e = a_si(
                     st.number_input(f"Espesor de la capa ({unidad_espesor})", 
                                   min_value=0.0001, value=0.005, key=f"e_{i}", step=0.001,
                                   help=f"Espesor de esta capa en {unidad_espesor}"), 
-                    unidad_espesor)
+                    "longitud", unidad_espesor)
                 
                 r_o = r_i + e
                 r_i_actual = r_o
                 radios.append((r_i, r_o, mat))
                 
                 # Mostrar información calculada
-                factor_display_radio = {"m": 1.0, "cm": 100, "mm": 1000, "in": 39.3701, "ft": 3.28084}[unidad_radio]
+                factor_display_radio = desde_si(1.0, "longitud", unidad_radio)
                 st.success(f"Radio exterior: {r_o * factor_display_radio:.4f} {unidad_radio}")
                 
             else:
-                e = convertir_espesor(
+                e = a_si(
                     st.number_input(f"Espesor de la capa ({unidad_espesor})", 
                                   min_value=0.0001, value=0.005, key=f"e_{i}", step=0.001,
                                   help=f"Espesor de esta capa en {unidad_espesor}"), 
-                    unidad_espesor)
+                    "longitud", unidad_espesor)
                 
                 if geometria != "Plana":
                     r_i = r_i_actual
@@ -401,7 +401,7 @@ for i in range(n_capas):
                     r_i_actual = r_o
                     
                     # Mostrar información calculada
-                    factor_display_radio = {"m": 1.0, "cm": 100, "mm": 1000, "in": 39.3701, "ft": 3.28084}[unidad_radio]
+                    factor_display_radio = desde_si(1.0, "longitud", unidad_radio)
                     st.success(f"Radio exterior: {r_o * factor_display_radio:.4f} {unidad_radio}")
         
         with col3:
@@ -410,47 +410,138 @@ for i in range(n_capas):
             if geometria != "Plana" and radios:
                 st.metric("Geometría", geometria)
     
-    tabla_capas.append({"material": mat, "L": e, "k": k})
+    tabla_capas.append({"material": mat, "L": e, "k": k, "rho": rho_capa, "cp": cp_capa})
 
 # --- Visualización mejorada
 st.subheader("📊 Visualización de la Configuración")
 if geometria == "Plana":
-    dibujar_capas_rectangulares(tabla_capas, unidad_espesor)
+    mostrar(dibujar_capas_rectangulares, tabla_capas, unidad_espesor, figsize=(12, 4))
 else:
-    dibujar_anillos_radiales(radios, unidad_radio, unidad_espesor)
+    mostrar(dibujar_anillos_radiales, radios, unidad_radio, unidad_espesor, figsize=(8, 8))
 
 # --- Cálculo con resultados más detallados
-if st.button("**Calcular Transferencia de Calor**", type="primary"):
+if analisis == "Transitorio":
+    if st.button("**Simular Régimen Transitorio**", type="primary"):
+        with st.spinner("Simulando..."):
+            T1_C = a_si(T1, "temperatura", unidad_temp)
+            T2_C = a_si(T2, "temperatura", unidad_temp)
+            T0_C = a_si(T_inicial, "temperatura", unidad_temp)
+            area_si = a_si(A_total, "area", unidad_area) if geometria == "Plana" else 1.0
+            longitud_si = a_si(L_cil, "longitud", unidad_longitud) if geometria != "Plana" else 1.0
+            r_i_si = radios[0][0] if radios else None
+            # Sin convección, h infinito impone la temperatura en la superficie
+            h_in_si = a_si(h_in, "coef_h", unidad_h) if usar_conveccion else np.inf
+            h_out_si = a_si(h_out, "coef_h", unidad_h) if usar_conveccion else np.inf
+            dt = a_si(t_total, "tiempo", unidad_tiempo) / n_pasos
+
+            try:
+                malla = discretizar(
+                    geometria,
+                    [[c["L"] for c in tabla_capas]], [[c["k"] for c in tabla_capas]],
+                    [[c["rho"] for c in tabla_capas]], [[c["cp"] for c in tabla_capas]],
+                    n_nodos=int(n_nodos), area=area_si, longitud=longitud_si, r_i=r_i_si)
+            except ValueError as e:
+                st.error(f"Error en la malla: {str(e)}")
+                st.stop()
+
+            # Se guardan q en ~200 instantes y solo los perfiles que se grafican,
+            # repartidos entre el inicio y el final aunque no caigan en múltiplos de `cada`
+            cada = max(int(n_pasos) // 200, 1)
+            pasos_perfil = set(np.linspace(0, int(n_pasos), n_perfiles).round().astype(int).tolist())
+            tiempos, q_entra, q_sale, perfiles = [], [], [], []
+            for foto in simular(malla, T0_C, dt, int(n_pasos), h_in=h_in_si, T_in=T1_C,
+                                h_out=h_out_si, T_out=T2_C, cada=cada, pasos=pasos_perfil):
+                tiempos.append(foto.t)
+                q_entra.append(foto.q_in[0])
+                q_sale.append(foto.q_out[0])
+                if foto.paso in pasos_perfil:
+                    perfiles.append((foto.t, foto.T[0]))
+
+            estacionario = cache_resultados.calcular(
+                cache_resultados.CONDUCCION, geometria, T1_C, T2_C,
+                [[c["L"] for c in tabla_capas]], [[c["k"] for c in tabla_capas]],
+                area=area_si, longitud=longitud_si, r_i=r_i_si,
+                h_in=a_si(h_in, "coef_h", unidad_h) if h_in > 0 else 0.0,
+                h_out=a_si(h_out, "coef_h", unidad_h) if h_out > 0 else 0.0,
+                cache=cache_resultados.cache_compartida())
+            q_estacionario = float(estacionario["q"][0])
+
+        st.success("**Simulación Completada**")
+        factor_tiempo = a_si(1.0, "tiempo", unidad_tiempo)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Calor que entra (final)",
+                      f"{desde_si(q_entra[-1], 'potencia', unidad_flujo):.2f} {unidad_flujo}")
+        with col2:
+            st.metric("Calor que sale (final)",
+                      f"{desde_si(q_sale[-1], 'potencia', unidad_flujo):.2f} {unidad_flujo}")
+        with col3:
+            st.metric("Flujo estacionario",
+                      f"{desde_si(q_estacionario, 'potencia', unidad_flujo):.2f} {unidad_flujo}")
+
+        # Perfiles de temperatura en el espesor
+        import pandas as pd
+
+        st.subheader("Perfiles de Temperatura")
+        unidad_eje = unidad_espesor if geometria == "Plana" else unidad_radio
+        factor_eje = desde_si(1.0, "longitud", unidad_eje)
+        with figura_temporal((10, 5)) as fig:
+            ax = fig.subplots()
+            for t, T in perfiles:
+                ax.plot(malla.x[0] * factor_eje, T, label=f"t = {t / factor_tiempo:.4g} {unidad_tiempo}")
+            cambios = np.flatnonzero(np.diff(malla.capa[0])) + 1
+            for cara in malla.caras[0, cambios]:
+                ax.axvline(cara * factor_eje, color="k", linestyle="--", linewidth=1)
+            ax.set_xlabel(f"{'Posición' if geometria == 'Plana' else 'Radio'} ({unidad_eje})")
+            ax.set_ylabel("Temperatura (°C)")
+            ax.grid(True, alpha=0.3)
+            ax.legend()
+            mostrar_figura(fig)
+
+        # Calor en las superficies a lo largo del tiempo
+        st.subheader("Calor en las Superficies")
+        with figura_temporal((10, 4)) as fig:
+            ax = fig.subplots()
+            t_graf = np.array(tiempos) / factor_tiempo
+            ax.plot(t_graf, desde_si(np.array(q_entra), "potencia", unidad_flujo), label="Entra (cara interna)")
+            ax.plot(t_graf, desde_si(np.array(q_sale), "potencia", unidad_flujo), label="Sale (cara externa)")
+            ax.axhline(desde_si(q_estacionario, "potencia", unidad_flujo), color="k",
+                       linestyle=":", label="Estacionario")
+            ax.set_xlabel(f"Tiempo ({unidad_tiempo})")
+            ax.set_ylabel(f"Flujo de calor ({unidad_flujo})")
+            ax.grid(True, alpha=0.3)
+            ax.legend()
+            mostrar_figura(fig)
+
+        # --- EXPORTACIÓN A CSV ---
+        st.subheader("Exportar Resultados")
+        perfiles_df = pd.DataFrame(
+            {f"T [°C] t={t:.6g} s": T for t, T in perfiles},
+            index=pd.Index(malla.x[0], name="posicion [m]" if geometria == "Plana" else "radio [m]"))
+        st.download_button(
+            label="📥 Descargar perfiles en CSV",
+            data=perfiles_df.to_csv(float_format="%.6f"),
+            file_name=f"transitorio_{geometria.lower()}_{n_capas}capas.csv",
+            mime="text/csv")
+
+elif st.button("**Calcular Transferencia de Calor**", type="primary"):
     with st.spinner("Calculando..."):
-        T1_C = convertir_temperatura(T1, unidad_temp)
-        T2_C = convertir_temperatura(T2, unidad_temp)
+        T1_C = a_si(T1, "temperatura", unidad_temp)
+        T2_C = a_si(T2, "temperatura", unidad_temp)
         
-        if geometria == "Plana":
-            A_m2 = convertir_area(A_total, unidad_area)
-            R_capas = sum(c["L"] / (c["k"] * A_m2) for c in tabla_capas)
-            R_conv_in = 1 / (convertir_h(h_in, unidad_h) * A_m2) if h_in > 0 else 0
-            R_conv_out = 1 / (convertir_h(h_out, unidad_h) * A_m2) if h_out > 0 else 0
-            R_total = R_capas + R_conv_in + R_conv_out
-            
-        elif geometria == "Cilíndrica":
-            L_cil_m = convertir_longitud(L_cil, unidad_longitud)
-            R_capas = 0
-            for (r_i, r_o, _), c in zip(radios, tabla_capas):
-                R_capas += np.log(r_o / r_i) / (2 * np.pi * L_cil_m * c["k"])
-            R_conv_in = 1 / (convertir_h(h_in, unidad_h) * 2 * np.pi * radios[0][0] * L_cil_m) if h_in > 0 else 0
-            R_conv_out = 1 / (convertir_h(h_out, unidad_h) * 2 * np.pi * radios[-1][1] * L_cil_m) if h_out > 0 else 0
-            R_total = R_capas + R_conv_in + R_conv_out
-            
-        elif geometria == "Esférica":
-            R_capas = 0
-            for (r_i, r_o, _), c in zip(radios, tabla_capas):
-                R_capas += (1 / (4 * np.pi * c["k"])) * (1/r_i - 1/r_o)
-            R_conv_in = 1 / (convertir_h(h_in, unidad_h) * 4 * np.pi * radios[0][0]**2) if h_in > 0 else 0
-            R_conv_out = 1 / (convertir_h(h_out, unidad_h) * 4 * np.pi * radios[-1][1]**2) if h_out > 0 else 0
-            R_total = R_capas + R_conv_in + R_conv_out
-
-        q = (T1_C - T2_C) / R_total
-        A_ref = convertir_area(A_total, unidad_area) if geometria == "Plana" else 1
+        # Todas las capas se resuelven en una sola pasada del motor vectorizado
+        resultado = cache_resultados.calcular(
+            cache_resultados.CONDUCCION, geometria, T1_C, T2_C,
+            [[c["L"] for c in tabla_capas]], [[c["k"] for c in tabla_capas]],
+            area=a_si(A_total, "area", unidad_area) if geometria == "Plana" else 1.0,
+            longitud=a_si(L_cil, "longitud", unidad_longitud) if geometria != "Plana" else 1.0,
+            r_i=radios[0][0] if radios else None,
+            h_in=a_si(h_in, "coef_h", unidad_h) if h_in > 0 else 0.0,
+            h_out=a_si(h_out, "coef_h", unidad_h) if h_out > 0 else 0.0,
+            cache=cache_resultados.cache_compartida())
+        R_capas, R_conv_in, R_conv_out, R_total, q = (
+            float(resultado[c][0]) for c in ("R_capas", "R_conv_in", "R_conv_out", "R_total", "q"))
+        A_ref = a_si(A_total, "area", unidad_area) if geometria == "Plana" else 1
 
         # Mostrar resultados detallados
         st.success("**Cálculo Completado**")
@@ -459,15 +550,17 @@ if st.button("**Calcular Transferencia de Calor**", type="primary"):
         with col1:
             st.metric("Diferencia de temperatura", f"{T1_C - T2_C:.2f} °C")
             st.metric("Flujo de calor total", 
-                     f"{formatear_resultado(q, unidad_flujo, 'flujo'):.2f} {unidad_flujo}")
+                     f"{desde_si(q, 'potencia', unidad_flujo):.2f} {unidad_flujo}")
             
         with col2:
             st.metric("Resistencia total", f"{R_total:.6f} K/W")
             if geometria == "Plana":
                 st.metric("📊 Flujo por área", 
-                         f"{formatear_resultado(q/A_ref, unidad_flujo_area, 'flujo_area'):.2f} {unidad_flujo_area}")
+                         f"{desde_si(q/A_ref, 'flujo_calor', unidad_flujo_area):.2f} {unidad_flujo_area}")
 
         # Desglose de resistencias
+        import pandas as pd
+
         st.subheader("Desglose de Resistencias")
         resistencias_df = pd.DataFrame({
             "Componente": ["Convección interna", "Capas (conducción)", "Convección externa"],
@@ -479,103 +572,34 @@ if st.button("**Calcular Transferencia de Calor**", type="primary"):
         # --- EXPORTACIÓN A TXT ---
         st.subheader("Exportar Resultados")
 
-        def crear_txt_resultados():
-            """Función para crear el archivo TXT con todos los datos y resultados"""
-            
-            output = StringIO()
-            
-            # Encabezado
-            output.write("="*80 + "\n")
-            output.write(f"ANÁLISIS DE CONDUCCIÓN - {titulo.upper()}\n")
-            output.write("="*80 + "\n\n")
-            
-            # Datos de entrada
-            output.write("DATOS DE ENTRADA:\n")
-            output.write("-"*50 + "\n")
-            output.write(f"Geometría del problema:        {geometria}\n")
-            output.write(f"Número de capas:               {n_capas}\n")
-            output.write(f"Temperatura interna:           {T1:.2f} {unidad_temp}\n")
-            output.write(f"Temperatura externa:           {T2:.2f} {unidad_temp}\n")
-            
-            if geometria == "Plana":
-                output.write(f"Área total de transferencia:   {A_total:.4f} {unidad_area}\n")
-            else:
-                output.write(f"Longitud del cilindro:         {L_cil:.4f} {unidad_longitud}\n")
-            
-            if usar_conveccion:
-                output.write(f"Coef. convección interior:    {h_in:.2f} {unidad_h}\n")
-                output.write(f"Coef. convección exterior:     {h_out:.2f} {unidad_h}\n")
-            else:
-                output.write("Convección:                    No incluida\n")
-            
-            output.write(f"\nSistema de unidades usado:     Long={unidad_longitud}, Radio={unidad_radio}, Esp={unidad_espesor}, Temp={unidad_temp}\n")
-            output.write("\n")
-            
-            # Configuración de capas
-            output.write("CONFIGURACIÓN DE CAPAS:\n")
-            output.write("-"*50 + "\n")
-            for i, capa in enumerate(tabla_capas):
-                output.write(f"Capa {i+1}:\n")
-                output.write(f"  Material:                    {capa['material']}\n")
-                output.write(f"  Espesor:                     {capa['L']:.6f} m\n")
-                output.write(f"  Conductividad térmica:       {capa['k']:.6f} W/m·K\n")
-                
-                if geometria != "Plana" and i < len(radios):
-                    r_i, r_o, _ = radios[i]
-                    output.write(f"  Radio interior:              {r_i:.6f} m\n")
-                    output.write(f"  Radio exterior:              {r_o:.6f} m\n")
-                output.write("\n")
-            
-            # Resistencias térmicas
-            output.write("RESISTENCIAS TÉRMICAS:\n")
-            output.write("-"*50 + "\n")
-            output.write(f"Resistencia por convección interna:  {R_conv_in:.8f} K/W ({R_conv_in/R_total*100:.2f}%)\n")
-            output.write(f"Resistencia por conducción (capas):  {R_capas:.8f} K/W ({R_capas/R_total*100:.2f}%)\n")
-            output.write(f"Resistencia por convección externa:  {R_conv_out:.8f} K/W ({R_conv_out/R_total*100:.2f}%)\n")
-            output.write(f"Resistencia térmica total:           {R_total:.8f} K/W\n")
-            output.write("\n")
-            
-            # Resultados del análisis
-            output.write("RESULTADOS DEL ANÁLISIS:\n")
-            output.write("-"*50 + "\n")
-            output.write(f"Diferencia de temperatura:     {T1_C - T2_C:.2f} °C\n")
-            output.write(f"Flujo de calor total:          {formatear_resultado(q, unidad_flujo, 'flujo'):.6f} {unidad_flujo}\n")
-            output.write(f"Flujo de calor (base SI):      {q:.6f} W\n")
-            
-            if geometria == "Plana":
-                output.write(f"Flujo de calor por área:       {formatear_resultado(q/A_ref, unidad_flujo_area, 'flujo_area'):.6f} {unidad_flujo_area}\n")
-                output.write(f"Área de referencia:            {A_ref:.6f} m²\n")
-            
-            # Información sobre materiales utilizados
-            output.write("\n")
-            output.write("MATERIALES UTILIZADOS:\n")
-            output.write("-"*50 + "\n")
-            for i, capa in enumerate(tabla_capas):
-                output.write(f"Capa {i+1}: {capa['material']}\n")
-                # Si el material viene de la base de datos, mostrar propiedades
-                material_encontrado = False
-                for categoria, df in materiales_dict.items():
-                    if not df.empty and capa['material'] in df['Material'].values:
-                        material_info = df[df['Material'] == capa['material']].iloc[0]
-                        output.write(f"  Categoría: {categoria}\n")
-                        output.write(f"  Conductividad térmica: {material_info['Conductividad térmica (W/m·K)']} W/m·K\n")
-                        material_encontrado = True
-                        break
-                if not material_encontrado:
-                    output.write(f"  Material personalizado\n")
-                    output.write(f"  Conductividad térmica: {capa['k']:.6f} W/m·K\n")
-                output.write("\n")
-            
-            output.write("\n")
-            output.write("="*80 + "\n")
-            output.write("Fin del reporte\n")
-            output.write("="*80 + "\n")
-            
-            return output.getvalue()
+        # Los resultados solo existen en la ejecución del botón: el reporte se arma aquí, una vez
+        capas_reporte = []
+        for i, capa in enumerate(tabla_capas):
+            categoria_mat, k_tabla = buscar_material(materiales_dict, capa['material'])
+            r_i, r_o, _ = radios[i] if geometria != "Plana" and i < len(radios) else (None, None, None)
+            capas_reporte.append({
+                "n": i + 1, "material": capa['material'], "L": capa['L'], "k": capa['k'],
+                "r_i": r_i, "r_o": r_o, "categoria": categoria_mat,
+                "k_tabla": "-" if categoria_mat is None or np.isnan(k_tabla) else k_tabla,
+            })
+        txt_data = generar(PLANTILLA_CONDUCCION, {
+            "titulo": titulo.upper(), "geometria": geometria, "n_capas": n_capas,
+            "T1": T1, "T2": T2,
+            "A_total": A_total if geometria == "Plana" else None,
+            "L_cil": L_cil if geometria != "Plana" else None,
+            "usar_conveccion": usar_conveccion, "h_in": h_in, "h_out": h_out,
+            "unidad_temp": unidad_temp, "unidad_area": unidad_area, "unidad_longitud": unidad_longitud,
+            "unidad_radio": unidad_radio, "unidad_espesor": unidad_espesor, "unidad_h": unidad_h,
+            "unidad_flujo": unidad_flujo, "unidad_flujo_area": unidad_flujo_area,
+            "capas": capas_reporte,
+            "R_conv_in": R_conv_in, "R_capas": R_capas, "R_conv_out": R_conv_out, "R_total": R_total,
+            "pct_conv_in": R_conv_in/R_total*100, "pct_capas": R_capas/R_total*100,
+            "pct_conv_out": R_conv_out/R_total*100,
+            "dT": T1_C - T2_C, "q": q, "q_unidad": desde_si(q, "potencia", unidad_flujo),
+            "q_area_unidad": desde_si(q/A_ref, "flujo_calor", unidad_flujo_area), "A_ref": A_ref,
+        })
 
         # Botón para descargar TXT
-        txt_data = crear_txt_resultados()
-
         st.download_button(
             label="📥 Descargar resultados en TXT",
             data=txt_data,
@@ -586,4 +610,20 @@ if st.button("**Calcular Transferencia de Calor**", type="primary"):
 
         # Mostrar vista previa del TXT
         with st.expander("Vista previa del archivo TXT"):
-            st.text(txt_data)
\ No newline at end of file
+            st.text(txt_data)
+
+# Las tolerancias de k cubren la dispersión de las tablas de materiales
+if analisis == "Estacionario":
+    variables_mc = {"T1": ("T interna", a_si(T1, "temperatura", unidad_temp), 0.5, unidad_temp),
+                    "T2": ("T externa", a_si(T2, "temperatura", unidad_temp), 0.5, unidad_temp)}
+    for i, capa in enumerate(tabla_capas, start=1):
+        variables_mc[f"e{i}"] = (f"Espesor capa {i}", capa["L"], 2.0, None)
+        variables_mc[f"k{i}"] = (f"k capa {i}", capa["k"], 5.0, None)
+    if usar_conveccion:
+        variables_mc["h_in"] = ("h interior", a_si(h_in, "coef_h", unidad_h), 10.0, None)
+        variables_mc["h_out"] = ("h exterior", a_si(h_out, "coef_h", unidad_h), 10.0, None)
+    seccion_incertidumbre(
+        CONDUCCION, variables_mc, unidad_flujo, geometria=geometria, capas=n_capas,
+        area=a_si(A_total, "area", unidad_area) if geometria == "Plana" else 1.0,
+        longitud=a_si(L_cil, "longitud", unidad_longitud) if geometria != "Plana" else 1.0,
+        r_i=radios[0][0] if radios else None)
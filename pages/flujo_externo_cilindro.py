@@ -1,8 +1,19 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
 from math import pi
-from io import StringIO
+
+from calculos import incertidumbre
+from calculos.cilindro_externo import CHURCHILL, COMPACTA, nusselt_churchill, nusselt_compacto
+from calculos.inverso import inverso_cilindro
+from calculos.propiedades import ARCHIVOS_FLUIDOS, propiedades_en, tiene_fases
+from calculos.reportes import PLANTILLA_CILINDRO, generar
+from calculos.unidades import a_si
+from interfaz.banco_tubos import mostrar_banco_tubos
+from interfaz.incertidumbre import seccion_incertidumbre
+from interfaz.inverso import seccion_diseno_inverso
+
+CILINDRO = "Cilindro individual"
+BANCO = "Banco de tubos"
 
 # --- Configuración de la página ---
 st.set_page_config(
@@ -11,158 +22,18 @@ st.set_page_config(
     layout="wide"
 )
 
-# --- Conversión de unidades ---
-def convertir_temperatura(valor, unidad_origen, unidad_destino):
-    if unidad_origen == unidad_destino:
-        return valor
-
-    # Convertir origen a °C
-    if unidad_origen == "°F":
-        valor = (valor - 32) * 5/9
-    elif unidad_origen == "K":
-        valor = valor - 273.15
-    elif unidad_origen == "R":
-        valor = (valor - 491.67) * 5/9
-
-    # Convertir °C a destino
-    if unidad_destino == "°F":
-        return valor * 9/5 + 32
-    elif unidad_destino == "K":
-        return valor + 273.15
-    elif unidad_destino == "R":
-        return (valor + 273.15) * 9/5
-    return valor
-
-def convertir_velocidad(valor, unidad):
-    factores = {
-        "m/s": 1,
-        "km/h": 1 / 3.6,
-        "cm/s": 0.01,
-        "ft/s": 0.3048,
-        "mph": 0.44704
-    }
-    return valor * factores[unidad]
-
-def convertir_longitud(valor, unidad):
-    factores = {
-        "m": 1,
-        "mm": 0.001,
-        "cm": 0.01,
-        "ft": 0.3048,
-        "in": 0.0254
-    }
-    return valor * factores[unidad]
-
-# --- Correlaciones ---
-def calcular_h_churchill(Re, Pr, k, D):
-    """Correlación de Churchill-Bernstein para flujo cruzado en cilindros"""
-    if Pr <= 0.2:
-        return None
-    
-    term1 = 0.62 * (Re**0.5) * (Pr**(1/3))
-    term2 = (1 + (0.4/Pr)**(2/3))**(1/4)
-    term3 = (1 + (Re/282000)**(5/8))**(4/5)
-    
-    Nu = 0.3 + term1 / term2 * term3
-    return Nu * k / D
-
-def calcular_h_compacto(Re, Pr, k, D, df_coef):
-    """Correlación compacta usando coeficientes C y m"""
-    try:
-        # Buscar el rango de Re adecuado
-        for _, row in df_coef.iterrows():
-            rango = row['Re_D Range']
-            if '–' in rango:
-                re_min, re_max = map(float, rango.split('–'))
-            elif '-' in rango:
-                re_min, re_max = map(float, rango.split('-'))
-            else:
-                continue
-                
-            if re_min <= Re <= re_max:
-                C = row['C']
-                m = row['m']
-                Nu = C * (Re ** m) * (Pr ** (1/3))
-                return Nu * k / D
-        
-        st.error("No se encontró coeficiente para el rango de Re calculado")
-        return None
-    except Exception as e:
-        st.error(f"Error en correlación compacta: {str(e)}")
-        return None
-
-# --- Carga de datos ---
-@st.cache_data
-def cargar_datos():
-    archivos = {
-        "agua saturada": "tabla_a9.csv",
-        "refrigerante 134a": "tabla_a10.csv",
-        "amoniaco": "tabla_a11.csv",
-        "propano": "tabla_a12.csv",
-        "aire": "tabla_a15.csv",
-        "glicerina": "tabla_glicerina.csv",
-        "isobutano": "tabla_isobutano.csv",
-        "metano": "tabla_metano.csv",
-        "metanol": "tabla_metanol.csv",
-        "aceite para motor": "tabla_aceitemotor.csv"
-    }
-    
-    datos = {}
-    for fluido, archivo in archivos.items():
-        try:
-            df = pd.read_csv(archivo)
-            if df.empty:
-                st.error(f"El archivo {archivo} está vacío")
-                datos[fluido] = None
-            else:
-                datos[fluido] = df
-        except FileNotFoundError:
-            st.error(f"Error: Archivo no encontrado - {archivo}")
-            datos[fluido] = None
-        except Exception as e:
-            st.error(f"Error al cargar {archivo}: {str(e)}")
-            datos[fluido] = None
-    
-    # Cargar coeficientes para correlación compacta
-    try:
-        df_coef = pd.read_csv('cylinder_cross_flow_constants.csv')
-    except:
-        df_coef = None
-        st.error("No se pudo cargar los coeficientes para la correlación compacta")
-    
-    # Filtrar fluidos no cargados
-    datos = {k: v for k, v in datos.items() if v is not None}
-    return (datos, df_coef) if datos else (None, None)
-
 # --- Obtener propiedades termofísicas ---
-def obtener_propiedades(df, T_pelicula, fase=None):
+def obtener_propiedades(fluido, T_pelicula, fase=None):
+    """Propiedades desde el almacén compartido de tablas (vistas de solo lectura)"""
     try:
-        if 'Densidad líquido (kg/m³)' in df.columns:  # Fluido bifásico
-            if fase == "Líquido":
-                props = {
-                    'densidad': np.interp(T_pelicula, df['Temp. (°C)'], df['Densidad líquido (kg/m³)']),
-                    'viscosidad': np.interp(T_pelicula, df['Temp. (°C)'], df['Viscosidad dinámica líquido (kg/m·s)']),
-                    'k': np.interp(T_pelicula, df['Temp. (°C)'], df['Conductividad térmica líquido (W/m·K)']),
-                    'Pr': np.interp(T_pelicula, df['Temp. (°C)'], df['Número de Prandtl líquido']),
-                    'cp': np.interp(T_pelicula, df['Temp. (°C)'], df['Calor específico líquido (J/kg·K)'])
-                }
-            else:  # Vapor
-                props = {
-                    'densidad': np.interp(T_pelicula, df['Temp. (°C)'], df['Densidad vapor (kg/m³)']),
-                    'viscosidad': np.interp(T_pelicula, df['Temp. (°C)'], df['Viscosidad dinámica vapor (kg/m·s)']),
-                    'k': np.interp(T_pelicula, df['Temp. (°C)'], df['Conductividad térmica vapor (W/m·K)']),
-                    'Pr': np.interp(T_pelicula, df['Temp. (°C)'], df['Número de Prandtl vapor']),
-                    'cp': np.interp(T_pelicula, df['Temp. (°C)'], df['Calor específico vapor (J/kg·K)'])
-                }
-        else:  # Fluido monofásico
-            props = {
-                'densidad': np.interp(T_pelicula, df['Temp. (°C)'], df['Densidad (kg/m³)']),
-                'viscosidad': np.interp(T_pelicula, df['Temp. (°C)'], df['Viscosidad dinámica (kg/m·s)']),
-                'k': np.interp(T_pelicula, df['Temp. (°C)'], df['Conductividad térmica (W/m·K)']),
-                'Pr': np.interp(T_pelicula, df['Temp. (°C)'], df['Número de Prandtl']),
-                'cp': np.interp(T_pelicula, df['Temp. (°C)'], df['Calor específico (J/kg·K)'])
-            }
-        return props
+        p = propiedades_en(fluido, T_pelicula, fase)
+        return {
+            'densidad': p.rho,
+            'viscosidad': p.mu,
+            'k': p.k,
+            'Pr': p.pr,
+            'cp': p.cp
+        }
     except Exception as e:
         st.error(f"Error al obtener propiedades: {str(e)}")
         return None
@@ -170,28 +41,20 @@ def obtener_propiedades(df, T_pelicula, fase=None):
 # --- Interfaz principal ---
 st.title("Convección externa en Cilindros")
 
-# Cargar datos
-datos, df_coef = cargar_datos()
-
-if datos is None:
-    st.error("No se pudo cargar ningún archivo de datos. Verifica los archivos CSV.")
-    st.stop()
-
-fluidos_disponibles = list(datos.keys())
-if not fluidos_disponibles:
-    st.error("No hay datos disponibles para ningún fluido")
-    st.stop()
+fluidos_disponibles = list(ARCHIVOS_FLUIDOS.keys())
 
 with st.sidebar:
     st.header("⚙️ Configuración")
     fluido = st.selectbox("Fluido:", options=fluidos_disponibles)
     
     # Mostrar selector de fase solo para fluidos bifásicos
-    if 'Densidad líquido (kg/m³)' in datos[fluido].columns:
+    if tiene_fases(fluido):
         fase = st.radio("Fase:", ["Líquido", "Vapor"], horizontal=True)
     
-    correlacion = st.radio("Correlación para h:", 
-                         ['Compacta (C y m)', 'Completa (Churchill-Bernstein)'])
+    configuracion = st.radio("Configuración:", [CILINDRO, BANCO])
+    if configuracion == CILINDRO:
+        correlacion = st.radio("Correlación para h:", 
+                             ['Compacta (C y m)', 'Completa (Churchill-Bernstein)'])
     
     st.subheader("Unidades")
     unidad_temp = st.selectbox("Temperatura", ["°C", "°F", "K", "R"])
@@ -199,6 +62,12 @@ with st.sidebar:
     unidad_dia = st.selectbox("Diámetro", ["m", "mm", "cm", "ft", "in"])
     unidad_long = st.selectbox("Longitud", ["m", "mm", "cm", "ft", "in"])
 
+# Banco de tubos: Zukauskas con avance fila por fila, en su propio módulo de interfaz
+if configuracion == BANCO:
+    mostrar_banco_tubos(fluido, fase if tiene_fases(fluido) else None,
+                        unidad_temp, unidad_vel, unidad_dia, unidad_long)
+    st.stop()
+
 # Entradas de usuario
 col1, col2 = st.columns(2)
 with col1:
@@ -215,11 +84,11 @@ if unidad_temp in ["K", "R"] and (T_fluido_input < 0 or T_superficie_input < 0):
     st.stop()
 
 # Conversión a unidades base
-T_fluido = convertir_temperatura(T_fluido_input, unidad_temp, "°C")
-T_superficie = convertir_temperatura(T_superficie_input, unidad_temp, "°C")
-velocidad = convertir_velocidad(velocidad_input, unidad_vel)
-diametro = convertir_longitud(diametro_input, unidad_dia)
-longitud = convertir_longitud(longitud_input, unidad_long)
+T_fluido = a_si(T_fluido_input, "temperatura", unidad_temp)
+T_superficie = a_si(T_superficie_input, "temperatura", unidad_temp)
+velocidad = a_si(velocidad_input, "velocidad", unidad_vel)
+diametro = a_si(diametro_input, "longitud", unidad_dia)
+longitud = a_si(longitud_input, "longitud", unidad_long)
 
 # 1. Temperatura de película
 T_pelicula = (T_fluido + T_superficie) / 2
@@ -227,10 +96,10 @@ st.subheader("1. Temperatura de película")
 st.latex(rf"T_{{película}} = \frac{{T_{{fluido}} + T_{{superficie}}}}{{2}} = \frac{{{T_fluido:.1f} + {T_superficie:.1f}}}{{2}} = {T_pelicula:.1f}°C")
 
 # 2. Propiedades termofísicas
-if 'Densidad líquido (kg/m³)' in datos[fluido].columns:
-    props = obtener_propiedades(datos[fluido], T_pelicula, fase)
+if tiene_fases(fluido):
+    props = obtener_propiedades(fluido, T_pelicula, fase)
 else:
-    props = obtener_propiedades(datos[fluido], T_pelicula)
+    props = obtener_propiedades(fluido, T_pelicula)
 
 if props is None:
     st.error("Error al obtener propiedades termofísicas")
@@ -255,25 +124,24 @@ st.latex(rf"Re = \frac{{V \cdot D \cdot \rho}}{{\mu}} = \frac{{{velocidad:.4f} \
 st.subheader("4. Coeficiente de convección (h)")
 
 if correlacion == 'Completa (Churchill-Bernstein)':
-    h = calcular_h_churchill(Re, props['Pr'], props['k'], diametro)
-    if h is None:
+    Nu = float(nusselt_churchill(Re, props['Pr']))
+    if np.isnan(Nu):
         st.error("❌ La correlación Churchill-Bernstein requiere Pr > 0.2")
         st.stop()
+    h = Nu * props['k'] / diametro
     
     st.latex(r"""
     \text{Correlación Churchill-Bernstein (válida para Pr > 0.2):}
     """)
-    st.latex(rf"Nu = 0.3 + \frac{{0.62 \cdot {Re:.2f}^{{1/2}} \cdot {props['Pr']:.4f}^{{1/3}}}}{{\left[1 + \left(\frac{{0.4}}{{{props['Pr']:.4f}}}\right)^{{2/3}}\right]^{{1/4}}}} \cdot \left[1 + \left(\frac{{{Re:.2f}}}{{282000}}\right)^{{5/8}}\right]^{{4/5}} = {h/props['k']*diametro:.2f}")
+    st.latex(rf"Nu = 0.3 + \frac{{0.62 \cdot {Re:.2f}^{{1/2}} \cdot {props['Pr']:.4f}^{{1/3}}}}{{\left[1 + \left(\frac{{0.4}}{{{props['Pr']:.4f}}}\right)^{{2/3}}\right]^{{1/4}}}} \cdot \left[1 + \left(\frac{{{Re:.2f}}}{{282000}}\right)^{{5/8}}\right]^{{4/5}} = {Nu:.2f}")
     
-    st.latex(rf"h = \frac{{Nu \cdot k}}{{D}} = \frac{{{h/props['k']*diametro:.2f} \cdot {props['k']:.6f}}}{{{diametro:.4f}}} = {h:.2f} \, \text{{W/m}}²\text{{K}}")
+    st.latex(rf"h = \frac{{Nu \cdot k}}{{D}} = \frac{{{Nu:.2f} \cdot {props['k']:.6f}}}{{{diametro:.4f}}} = {h:.2f} \, \text{{W/m}}²\text{{K}}")
 else:
-    if df_coef is None:
-        st.error("No se encontraron coeficientes para la correlación compacta")
-        st.stop()
-    
-    h = calcular_h_compacto(Re, props['Pr'], props['k'], diametro, df_coef)
-    if h is None:
+    Nu = float(nusselt_compacto(Re, props['Pr']))
+    if np.isnan(Nu):
+        st.error("No se encontró coeficiente para el rango de Re calculado")
         st.stop()
+    h = Nu * props['k'] / diametro
     
     st.latex(r"""
     \text{Correlación compacta:}
@@ -291,95 +159,50 @@ cols[1].latex(rf"\Delta T = {T_superficie:.1f} - {T_fluido:.1f} = {T_superficie
 cols[2].latex(rf"q = h \cdot A \cdot \Delta T = {h:.2f} \cdot {A:.4f} \cdot {T_superficie - T_fluido:.1f}")
 st.success(f"## 🔥 Transferencia de calor: {q:.2f} W")
 
+seccion_diseno_inverso(
+    lambda objetivo, incognita, magnitud: inverso_cilindro(
+        objetivo, incognita, T_fluido, T_superficie, velocidad, diametro, longitud, fluido,
+        fase if tiene_fases(fluido) else None,
+        correlacion=CHURCHILL if correlacion == 'Completa (Churchill-Bernstein)' else COMPACTA,
+        magnitud=magnitud),
+    {"V": ("Velocidad", "velocidad", unidad_vel), "D": ("Diámetro", "longitud", unidad_dia),
+     "L": ("Longitud", "longitud", unidad_long)},
+    {"q": q, "h": h})
+
+seccion_incertidumbre(
+    incertidumbre.CILINDRO,
+    {"T_fluido": ("T del fluido", T_fluido, 0.5, unidad_temp),
+     "T_superficie": ("T de superficie", T_superficie, 0.5, unidad_temp),
+     "V": ("Velocidad", velocidad, 2.0, None), "D": ("Diámetro", diametro, 1.0, None),
+     "L": ("Longitud", longitud, 1.0, None)},
+    errores_tabla=True, fluido=fluido, fase=fase if tiene_fases(fluido) else None,
+    correlacion=CHURCHILL if correlacion == 'Completa (Churchill-Bernstein)' else COMPACTA)
+
 # --- EXPORTACIÓN A TXT ---
 st.subheader("Exportar Resultados")
 
-def crear_txt_resultados():
-    """Función para crear el archivo TXT con todos los datos y resultados"""
-    
-    output = StringIO()
-    
-    # Encabezado
-    output.write("="*80 + "\n")
-    output.write("ANÁLISIS DE CONVECCIÓN EXTERNA EN CILINDROS\n")
-    output.write("="*80 + "\n\n")
-    
-    # Datos de entrada
-    output.write("DATOS DE ENTRADA:\n")
-    output.write("-"*50 + "\n")
-    output.write(f"Fluido seleccionado:           {fluido}\n")
-    if 'Densidad líquido (kg/m³)' in datos[fluido].columns:
-        output.write(f"Fase del fluido:               {fase}\n")
-    else:
-        output.write(f"Fase del fluido:               Monofásico\n")
-    output.write(f"Temperatura del fluido:        {T_fluido_input:.2f} {unidad_temp}\n")
-    output.write(f"Temperatura de superficie:     {T_superficie_input:.2f} {unidad_temp}\n")
-    output.write(f"Velocidad del fluido:          {velocidad_input:.2f} {unidad_vel}\n")
-    output.write(f"Diámetro del cilindro:         {diametro_input:.4f} {unidad_dia}\n")
-    output.write(f"Longitud del cilindro:         {longitud_input:.4f} {unidad_long}\n")
-    output.write(f"Correlación utilizada:         {correlacion}\n")
-    output.write(f"\nSistema de unidades usado:     Temp={unidad_temp}, Vel={unidad_vel}, Diám={unidad_dia}, Long={unidad_long}\n")
-    output.write("\n")
-    
-    # Propiedades del fluido
-    output.write("PROPIEDADES DEL FLUIDO:\n")
-    output.write("-"*50 + "\n")
-    output.write(f"Temperatura de película:       {T_pelicula:.2f} °C\n")
-    output.write(f"Densidad:                      {props['densidad']:.2f} kg/m³\n")
-    output.write(f"Viscosidad dinámica:           {props['viscosidad']:.6e} kg/m·s\n")
-    output.write(f"Conductividad térmica:         {props['k']:.6f} W/m·K\n")
-    output.write(f"Número de Prandtl:             {props['Pr']:.6f}\n")
-    output.write(f"Calor específico:              {props['cp']:.1f} J/kg·K\n")
-    output.write("\n")
-    
-    # Números adimensionales
-    output.write("NÚMEROS ADIMENSIONALES:\n")
-    output.write("-"*50 + "\n")
-    output.write(f"Número de Reynolds:            {Re:.2f}\n")
-    output.write(f"Número de Prandtl:             {props['Pr']:.6f}\n")
-    output.write("\n")
-    
-    # Resultados del análisis
-    output.write("RESULTADOS DEL ANÁLISIS:\n")
-    output.write("-"*50 + "\n")
-    Nu = h * diametro / props['k']
-    output.write(f"Correlación utilizada:         {correlacion}\n")
-    output.write(f"Número de Nusselt:             {Nu:.6f}\n")
-    output.write(f"Coeficiente de convección:     {h:.6f} W/m²·K\n")
-    output.write(f"Área de transferencia:         {A:.6f} m²\n")
-    output.write(f"Diferencia de temperatura:     {T_superficie - T_fluido:.2f} °C\n")
-    output.write(f"Transferencia de calor:        {q:.6f} W\n")
-    output.write("\n")
-    
-    # Validación de correlaciones
-    output.write("VALIDACIÓN:\n")
-    output.write("-"*50 + "\n")
-    if correlacion == 'Completa (Churchill-Bernstein)':
-        if props['Pr'] > 0.2:
-            output.write("✓ Correlación Churchill-Bernstein válida (Pr > 0.2)\n")
-        else:
-            output.write("⚠ Correlación Churchill-Bernstein no válida (Pr ≤ 0.2)\n")
-    else:
-        output.write("✓ Correlación compacta utilizada\n")
-    
-    output.write("\n")
-    output.write("="*80 + "\n")
-    output.write("Fin del reporte\n")
-    output.write("="*80 + "\n")
-    
-    return output.getvalue()
+# El reporte se arma con la plantilla solo cuando se descarga o se pide la vista previa
+contexto_reporte = {
+    "fluido": fluido,
+    "fase": fase if tiene_fases(fluido) else "Monofásico",
+    "T_fluido": T_fluido_input, "T_superficie": T_superficie_input,
+    "velocidad": velocidad_input, "diametro": diametro_input, "longitud": longitud_input,
+    "correlacion": correlacion, "churchill": correlacion == 'Completa (Churchill-Bernstein)',
+    "unidad_temp": unidad_temp, "unidad_vel": unidad_vel, "unidad_dia": unidad_dia, "unidad_long": unidad_long,
+    "T_pelicula": T_pelicula, "rho": props['densidad'], "mu": props['viscosidad'], "k": props['k'],
+    "pr": props['Pr'], "cp": props['cp'],
+    "Re": Re, "Nu": Nu, "h": h, "A": A, "dT": T_superficie - T_fluido, "q": q,
+}
 
 # Botón para descargar TXT
-txt_data = crear_txt_resultados()
-
 st.download_button(
     label="📥 Descargar resultados en TXT",
-    data=txt_data,
+    data=lambda: generar(PLANTILLA_CILINDRO, contexto_reporte),
     file_name=f"reporte_cilindro_{fluido.replace(' ', '_')}_{correlacion.split()[0]}.txt",
     mime="text/plain",
     help="Descarga un archivo TXT con todos los datos de entrada, propiedades del fluido y resultados del análisis"
 )
 
 # Mostrar vista previa del TXT
-with st.expander("Vista previa del archivo TXT"):
-    st.text(txt_data)
\ No newline at end of file
+if st.toggle("Vista previa del archivo TXT"):
+    st.text(generar(PLANTILLA_CILINDRO, contexto_reporte))
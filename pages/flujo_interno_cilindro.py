@@ -1,101 +1,43 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-from math import pi, log
-from io import StringIO
-
-# --- Conversión de unidades (se mantiene igual) ---
-def convertir_temperatura(valor, unidad_origen, unidad_destino):
-    if unidad_origen == unidad_destino:
-        return valor
-    if unidad_origen == "°F":
-        valor = (valor - 32) * 5/9
-    elif unidad_origen == "K":
-        valor = valor - 273.15
-    elif unidad_origen == "R":
-        valor = (valor - 491.67) * 5/9
-
-    if unidad_destino == "°F":
-        return valor * 9/5 + 32
-    elif unidad_destino == "K":
-        return valor + 273.15
-    elif unidad_destino == "R":
-        return (valor + 273.15) * 9/5
-    return valor
-
-def convertir_velocidad(valor, unidad):
-    factores = {"m/s": 1, "km/h": 1/3.6, "cm/s": 0.01, "ft/s": 0.3048, "mph": 0.44704}
-    return valor * factores[unidad]
-
-def convertir_longitud(valor, unidad):
-    factores = {"m": 1, "mm": 0.001, "cm": 0.01, "ft": 0.3048, "in": 0.0254}
-    return valor * factores[unidad]
-
-# --- Carga de datos (se mantiene igual) ---
-@st.cache_data
-def cargar_datos():
-    archivos = {
-        "agua saturada": "tabla_a9.csv",
-        "refrigerante 134a": "tabla_a10.csv",
-        "amoniaco": "tabla_a11.csv",
-        "propano": "tabla_a12.csv",
-        "aire": "tabla_a15.csv",
-        "glicerina": "tabla_glicerina.csv",
-        "isobutano": "tabla_isobutano.csv",
-        "metano": "tabla_metano.csv",
-        "metanol": "tabla_metanol.csv",
-        "aceite para motor": "tabla_aceitemotor.csv"
+from math import pi
+
+from calculos import cache_resultados
+from calculos.propiedades import ARCHIVOS_FLUIDOS, FLUIDOS_CON_FASES, propiedades_en
+from calculos.flujo_interno import diferencia_media_logaritmica
+from calculos.incertidumbre import TUBO
+from calculos.inverso import inverso_tubo
+from calculos.reportes import PLANTILLA_TUBO, generar
+from calculos.unidades import a_si
+from interfaz.incertidumbre import seccion_incertidumbre
+from interfaz.inverso import seccion_diseno_inverso
+
+MODO_CONOCIDA = "Temperatura de salida conocida"
+MODO_BALANCE = "Calcular temperatura de salida (balance de energía)"
+
+# --- Función de interpolación sobre el almacén compartido de tablas ---
+def interpolar_propiedades(fluido, T_pelicula, fase=None):
+    p = propiedades_en(fluido, T_pelicula, fase)
+    return {
+        'densidad': p.rho,
+        'viscosidad': p.mu,
+        'k': p.k,
+        'Pr': p.pr
     }
-    data = {}
-    for nombre, archivo in archivos.items():
-        try:
-            data[nombre] = pd.read_csv(archivo)
-        except Exception as e:
-            st.error(f"No se pudo cargar {archivo}: {e}")
-            data[nombre] = None
-    return data
-
-# --- Función de interpolación (se mantiene igual) ---
-def interpolar_propiedades(df, T_pelicula, tiene_fases=False, fase=None):
-    props = {}
-    
-    if tiene_fases and fase:
-        sufijo = "líquido" if fase == "líquido" else "vapor"
-        props = {
-            'densidad': np.interp(T_pelicula, df['Temp. (°C)'], df[f'Densidad {sufijo} (kg/m³)']),
-            'viscosidad': np.interp(T_pelicula, df['Temp. (°C)'], df[f'Viscosidad dinámica {sufijo} (kg/m·s)']),
-            'k': np.interp(T_pelicula, df['Temp. (°C)'], df[f'Conductividad térmica {sufijo} (W/m·K)']),
-            'Pr': np.interp(T_pelicula, df['Temp. (°C)'], df[f'Número de Prandtl {sufijo}'])
-        }
-    else:
-        props = {
-            'densidad': np.interp(T_pelicula, df['Temp. (°C)'], df['Densidad (kg/m³)']),
-            'viscosidad': np.interp(T_pelicula, df['Temp. (°C)'], df['Viscosidad dinámica (kg/m·s)']),
-            'k': np.interp(T_pelicula, df['Temp. (°C)'], df['Conductividad térmica (W/m·K)']),
-            'Pr': np.interp(T_pelicula, df['Temp. (°C)'], df['Número de Prandtl'])
-        }
-    
-    return props
 
 # --- Función para calcular temperatura media logarítmica ---
 def calcular_TML(T_entrada, T_salida, T_pared):
-    ΔT1 = abs(T_pared - T_entrada)
-    ΔT2 = abs(T_pared - T_salida) 
-    if ΔT1 == ΔT2:
-        return ΔT1  # Evita división por cero cuando ΔT1 = ΔT2
-    return (ΔT2 - ΔT1) / log(ΔT2 / ΔT1)
+    # ΔT1 = ΔT2 y salida igual a la pared se resuelven en el motor sin dividir por cero
+    return float(diferencia_media_logaritmica(T_entrada, T_salida, T_pared))
 
 # --- Programa principal modificado ---
 st.title("Convección Interna Forzada en Tubos - Temperatura Constante")
 
-fluidos = cargar_datos()
-
 with st.sidebar:
     st.header("⚙️ Configuración")
-    fluido = st.selectbox("Fluido", list(fluidos.keys()))
+    modo = st.radio("Modo de cálculo", [MODO_CONOCIDA, MODO_BALANCE])
+    fluido = st.selectbox("Fluido", list(ARCHIVOS_FLUIDOS.keys()))
     
-    fluidos_con_fases = ["agua saturada", "refrigerante 134a", "amoniaco", "propano"]
-    tiene_fases = fluido in fluidos_con_fases
+    tiene_fases = fluido in FLUIDOS_CON_FASES
     
     if tiene_fases:
         fase = st.radio("Fase", ["líquido", "vapor"], horizontal=True)
@@ -113,7 +55,10 @@ with col1:
 with col2:
     T_pared_input = st.number_input(f"Temperatura de la pared ({unidad_temp})", value=100.0)
     longitud_input = st.number_input(f"Longitud del tubo ({unidad_long})", value=1.0)
-    T_salida_input = st.number_input(f"Temperatura de salida del fluido ({unidad_temp})", value=50.0)
+    if modo == MODO_CONOCIDA:
+        T_salida_input = st.number_input(f"Temperatura de salida del fluido ({unidad_temp})", value=50.0)
+    else:
+        T_salida_input = T_entrada_input
 
 # Validación de temperatura
 if unidad_temp in ["K", "R"] and (T_entrada_input < 0 or T_pared_input < 0 or T_salida_input < 0):
@@ -121,12 +66,25 @@ if unidad_temp in ["K", "R"] and (T_entrada_input < 0 or T_pared_input < 0 or T_
     st.stop()
 
 # Conversión de unidades
-T_entrada = convertir_temperatura(T_entrada_input, unidad_temp, "°C")
-T_pared = convertir_temperatura(T_pared_input, unidad_temp, "°C")
-T_salida = convertir_temperatura(T_salida_input, unidad_temp, "°C")
-velocidad = convertir_velocidad(velocidad_input, unidad_vel)
-diametro = convertir_longitud(diametro_input, unidad_dia)
-longitud = convertir_longitud(longitud_input, unidad_long)
+T_entrada = a_si(T_entrada_input, "temperatura", unidad_temp)
+T_pared = a_si(T_pared_input, "temperatura", unidad_temp)
+T_salida = a_si(T_salida_input, "temperatura", unidad_temp)
+velocidad = a_si(velocidad_input, "velocidad", unidad_vel)
+diametro = a_si(diametro_input, "longitud", unidad_dia)
+longitud = a_si(longitud_input, "longitud", unidad_long)
+
+# Balance de energía: T_salida, propiedades y h se iteran juntos en el motor
+if modo == MODO_BALANCE:
+    try:
+        balance = {k: v.item() for k, v in cache_resultados.calcular(
+            cache_resultados.BALANCE_TUBO, T_entrada, T_pared, velocidad, diametro, longitud,
+            fluido, fase if tiene_fases else None, cache=cache_resultados.cache_compartida()).items()}
+    except Exception as e:
+        st.error(f"Error en los cálculos: {str(e)}")
+        st.stop()
+    T_salida = balance["T_salida"]
+    if not balance["convergido"]:
+        st.warning(f"⚠️ El balance de energía no convergió en {balance['iteraciones']} iteraciones")
 
 # Cálculo de temperatura media logarítmica
 TML = calcular_TML(T_entrada, T_salida, T_pared)
@@ -138,16 +96,12 @@ with col_temp1:
     st.metric("Temperatura media logarítmica", f"{TML:.2f} °C")
 with col_temp2:
     st.metric("Temperatura de película", f"{T_pelicula:.2f} °C")
-
-# Obtener datos del fluido seleccionado
-df = fluidos[fluido]
-if df is None:
-    st.error("No hay datos del fluido seleccionado")
-    st.stop()
+if modo == MODO_BALANCE:
+    st.metric("Temperatura de salida (balance de energía)", f"{T_salida:.2f} °C")
 
 # Interpolar propiedades
 try:
-    props = interpolar_propiedades(df, T_pelicula, tiene_fases, fase if tiene_fases else None)
+    props = interpolar_propiedades(fluido, T_pelicula, fase if tiene_fases else None)
     
     st.subheader("2. Propiedades termofísicas")
     col_prop1, col_prop2 = st.columns(2)
@@ -192,96 +146,59 @@ try:
     
     st.subheader("5. Transferencia de calor")
     st.latex(rf"q = h \cdot A \cdot \Delta T_{{ml}} = {h:.2f} \times {A:.4f} \times {TML:.2f} = {q:.2f} \, \text{{W}}")
+    if modo == MODO_BALANCE:
+        q = balance["q"]
+        st.latex(rf"q = \dot m \cdot c_p \cdot |T_{{s}} - T_{{e}}| = {balance['m']:.4e} \times {balance['cp']:.1f} \times {abs(T_salida - T_entrada):.4f} = {q:.2f} \, \text{{W}}")
+        st.info(f"Temperatura de salida por balance de energía: **{T_salida:.4f} °C** "
+                f"({balance['iteraciones']} iteraciones)")
     st.success(f"**Transferencia de calor total:** {q:.2f} W")
+
+    # Con balance de energía, cada evaluación del diseño inverso vuelve a cerrar el balance
+    seccion_diseno_inverso(
+        lambda objetivo, incognita, magnitud: inverso_tubo(
+            objetivo, incognita, T_entrada, None if modo == MODO_BALANCE else T_salida, T_pared,
+            velocidad, diametro, longitud, fluido, fase if tiene_fases else None, magnitud=magnitud),
+        {"V": ("Velocidad", "velocidad", unidad_vel), "D": ("Diámetro", "longitud", unidad_dia),
+         "L": ("Longitud", "longitud", unidad_long)},
+        {"q": q, "h": h})
+
+    # Con balance de energía cada muestra cierra su propio balance
+    temperaturas = {"T_entrada": ("T de entrada", T_entrada, 0.5, unidad_temp),
+                    "T_pared": ("T de pared", T_pared, 0.5, unidad_temp)}
+    if modo != MODO_BALANCE:
+        temperaturas["T_salida"] = ("T de salida", T_salida, 0.5, unidad_temp)
+    seccion_incertidumbre(
+        TUBO,
+        {**temperaturas, "V": ("Velocidad", velocidad, 2.0, None), "D": ("Diámetro", diametro, 1.0, None),
+         "L": ("Longitud", longitud, 1.0, None)},
+        errores_tabla=True, fluido=fluido, fase=fase if tiene_fases else None)
     
     # --- EXPORTACIÓN A TXT ---
     st.subheader("Exportar Resultados")
 
-    def crear_txt_resultados():
-        """Función para crear el archivo TXT con todos los datos y resultados"""
-        
-        output = StringIO()
-        
-        # Encabezado
-        output.write("="*80 + "\n")
-        output.write("ANÁLISIS DE CONVECCIÓN INTERNA FORZADA EN TUBOS\n")
-        output.write("="*80 + "\n\n")
-        
-        # Datos de entrada
-        output.write("DATOS DE ENTRADA:\n")
-        output.write("-"*50 + "\n")
-        output.write(f"Fluido seleccionado:           {fluido}\n")
-        if tiene_fases:
-            output.write(f"Fase del fluido:               {fase}\n")
-        output.write(f"Temperatura de entrada:        {T_entrada:.2f} °C\n")
-        output.write(f"Temperatura de salida:         {T_salida:.2f} °C\n")
-        output.write(f"Temperatura de pared:          {T_pared:.2f} °C\n")
-        output.write(f"Velocidad del fluido:          {velocidad:.4f} m/s\n")
-        output.write(f"Diámetro interno del tubo:     {diametro:.6f} m\n")
-        output.write(f"Longitud del tubo:             {longitud:.4f} m\n")
-        output.write(f"Régimen térmico:               {regimen_termico}\n")
-        output.write(f"\nSistema de unidades usado:     Temp=°C, Vel=m/s, Long=m\n")
-        output.write("\n")
-        
-        # Temperaturas características
-        output.write("TEMPERATURAS CARACTERÍSTICAS:\n")
-        output.write("-"*50 + "\n")
-        output.write(f"Temperatura de película:       {T_pelicula:.4f} °C\n")
-        output.write(f"Temperatura media logarítmica: {TML:.4f} °C\n")
-        output.write("\n")
-        
-        # Propiedades termofísicas
-        output.write("PROPIEDADES TERMOFÍSICAS (a temperatura de película):\n")
-        output.write("-"*50 + "\n")
-        output.write(f"Densidad (ρ):                  {props['densidad']:.6f} kg/m³\n")
-        output.write(f"Viscosidad dinámica (μ):       {props['viscosidad']:.6e} kg/m·s\n")
-        output.write(f"Conductividad térmica (k):     {props['k']:.6f} W/m·K\n")
-        output.write(f"Número de Prandtl (Pr):        {props['Pr']:.6f}\n")
-        output.write("\n")
-        
-        # Análisis dimensional
-        output.write("ANÁLISIS DIMENSIONAL:\n")
-        output.write("-"*50 + "\n")
-        output.write(f"Número de Reynolds:            {Re:.2f}\n")
-        output.write(f"Régimen de flujo:              {regimen}\n")
-        output.write(f"Número de Nusselt:             {Nu:.4f}\n")
-        output.write("\n")
-        
-        # Resultados del análisis
-        output.write("RESULTADOS DEL ANÁLISIS:\n")
-        output.write("-"*50 + "\n")
-        output.write(f"Coeficiente de transferencia:  {h:.4f} W/m²·K\n")
-        output.write(f"Área de transferencia:         {A:.6f} m²\n")
-        output.write(f"Transferencia de calor total:  {q:.4f} W\n")
-        
-        # Información adicional
-        if Re < 2300:
-            output.write(f"\nCorrelación utilizada:         Nu = 3.66 (flujo laminar desarrollado)\n")
-        else:
-            output.write(f"\nCorrelación utilizada:         Nu = 0.023 × Re^0.8 × Pr^{n} (Dittus-Boelter)\n")
-            output.write(f"Exponente n utilizado:         {n} ({'calentamiento' if n == 0.4 else 'enfriamiento'})\n")
-        
-        output.write("\n")
-        output.write("="*80 + "\n")
-        output.write("Fin del reporte - Convección Interna Forzada\n")
-        output.write("="*80 + "\n")
-        
-        return output.getvalue()
+    # El reporte se arma con la plantilla solo cuando se descarga o se pide la vista previa
+    contexto_reporte = {
+        "fluido": fluido, "fase": fase if tiene_fases else None,
+        "T_entrada": T_entrada, "T_salida": T_salida, "T_pared": T_pared,
+        "velocidad": velocidad, "diametro": diametro, "longitud": longitud,
+        "regimen_termico": regimen_termico, "balance": balance if modo == MODO_BALANCE else None,
+        "T_pelicula": T_pelicula, "TML": TML,
+        "rho": props['densidad'], "mu": props['viscosidad'], "k": props['k'], "pr": props['Pr'],
+        "Re": Re, "regimen": regimen, "Nu": Nu, "n": n, "h": h, "A": A, "q": q,
+    }
 
     # Botón para descargar TXT
-    txt_data = crear_txt_resultados()
-
     st.download_button(
         label="📥 Descargar resultados en TXT",
-        data=txt_data,
+        data=lambda: generar(PLANTILLA_TUBO, contexto_reporte),
         file_name=f"reporte_conveccion_{fluido.replace(' ', '_')}_{regimen.lower()}.txt",
         mime="text/plain",
         help="Descarga un archivo TXT con todos los datos de entrada, propiedades termofísicas y resultados del análisis"
     )
 
     # Mostrar vista previa del TXT
-    with st.expander("Vista previa del archivo TXT"):
-        st.text(txt_data)
+    if st.toggle("Vista previa del archivo TXT"):
+        st.text(generar(PLANTILLA_TUBO, contexto_reporte))
 
 except Exception as e:
     st.error(f"Error en los cálculos: {str(e)}")
\ No newline at end of file